@@ -0,0 +1,85 @@
+"""
+Endpoints administrativos (exigem chave em ADMIN_API_KEYS).
+"""
+
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from app.api.auth import require_admin_api_key
+from app.database import get_db
+from app.models import ScrapingJob
+from app.profiling import artifact_path, profiling_manager
+from app.schemas import ProfilingJobRequest, ProfilingWindowRequest
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/api/admin",
+    tags=["admin"],
+    dependencies=[Depends(require_admin_api_key)],
+)
+
+
+@router.get("/profiling")
+async def get_profiling_status():
+    """Estado atual do profiling e artefatos gerados."""
+    return {
+        **profiling_manager.status(),
+        "artifacts": profiling_manager.list_artifacts(),
+    }
+
+
+@router.post("/profiling/window")
+async def start_profiling_window(request: ProfilingWindowRequest):
+    """Liga o profiling do worker por N segundos."""
+    try:
+        return profiling_manager.start_window(
+            seconds=request.seconds,
+            mode=request.mode.value,
+            label=request.label,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    except RuntimeError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+
+
+@router.post("/profiling/jobs/{job_id}")
+async def profile_job(
+    job_id: str,
+    request: ProfilingJobRequest | None = None,
+    db: Session = Depends(get_db),
+):
+    """Liga o profiling durante a execucao de um job (imediato se ja estiver rodando)."""
+    job = db.query(ScrapingJob).filter(ScrapingJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job nao encontrado")
+    if job.status in {"completed", "failed"}:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job ja finalizado (status={job.status}).",
+        )
+
+    mode = (request or ProfilingJobRequest()).mode.value
+    try:
+        return profiling_manager.arm_job(job_id, mode=mode)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+
+
+@router.post("/profiling/stop")
+async def stop_profiling():
+    """Encerra o profiling ativo e grava os artefatos."""
+    return {"artifacts": profiling_manager.stop()}
+
+
+@router.get("/profiling/artifacts/{name}")
+async def download_profiling_artifact(name: str):
+    """Baixa um artefato de .artifacts/profiling/."""
+    path, error = artifact_path(name)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error)
+    return FileResponse(path, filename=path.name)
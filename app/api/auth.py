@@ -24,6 +24,11 @@ def _configured_api_keys() -> List[str]:
     return [key.strip() for key in raw.split(",") if key.strip()]
 
 
+def _configured_admin_api_keys() -> List[str]:
+    raw = getattr(settings, "admin_api_keys", None) or ""
+    return [key.strip() for key in raw.split(",") if key.strip()]
+
+
 def _public_paths() -> List[str]:
     raw = settings.api_auth_public_paths or ""
     return [path.strip() for path in raw.split(",") if path.strip()]
@@ -61,3 +66,32 @@ def require_private_api_key(
         )
 
     return True
+
+
+def require_admin_api_key(
+    provided_api_key: str | None = Security(api_key_header),
+) -> bool:
+    """
+    Validates API key for admin endpoints (ADMIN_API_KEYS).
+    Admin endpoints are disabled when no admin key is configured.
+    """
+    admin_keys = _configured_admin_api_keys()
+    if not admin_keys:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin endpoints disabled: no ADMIN_API_KEYS configured.",
+        )
+
+    if not provided_api_key:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing API key.",
+        )
+
+    if not any(secrets.compare_digest(provided_api_key, expected) for expected in admin_keys):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin API key required.",
+        )
+
+    return True
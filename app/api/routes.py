@@ -5,19 +5,27 @@ Define as rotas para scraping, consulta de dados, etc.
 
 import logging
 import asyncio
-from typing import Any
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request, status
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+import time
+import uuid
+from typing import Annotated, Any
+from fastapi import APIRouter, Depends, Header, HTTPException, BackgroundTasks, Request, Response, status
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.orm import Session, defer
+from sqlalchemy import func, insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm.attributes import flag_modified
-from datetime import datetime, timedelta
+from datetime import datetime
 from urllib.parse import urlparse
+import orjson
 
-from app.database import get_db
+from app.database import SessionLocal, get_db
 from app.schemas import (
     ScrapingJobCreate,
     ScrapingJobResponse,
+    ScrapingBatchCreate,
+    ScrapingBatchResponse,
+    ScrapingBatchStatusResponse,
     ScrapingCompleteResponse,
     ProfileScrapeRequest,
     ProfileScrapeResponse,
@@ -33,9 +41,33 @@ from app.schemas import (
     InteractionResponse,
     ErrorResponse,
 )
-from app.models import Profile, Post, Interaction, ScrapingJob, InstagramSession
+from app.models import Profile, Post, Interaction, ScrapingJob, ScrapingBatchJob, InstagramSession, WebhookDelivery
 from app.scraper.instagram_scraper import instagram_scraper
 from app.scraper.browser_use_agent import browser_use_agent
+from app.metrics import (
+    SCRAPE_JOB_DURATION_SECONDS,
+    SCRAPE_JOBS_COALESCED_TOTAL,
+    SCRAPE_JOBS_IN_PROGRESS,
+    SCRAPE_JOBS_TOTAL,
+)
+from app.profiling import profiling_manager
+from app.interaction_export import (
+    EXPORT_FORMATS,
+    build_export_query,
+    iter_csv,
+    iter_ndjson,
+    parse_interaction_type,
+)
+from app.pagination import InvalidCursorError, apply_keyset, next_cursor
+from app.ttl_cache import TTLCache
+from app.job_coalescing import find_coalescable_job, find_coalescable_jobs, scrape_request_fingerprint
+from app.job_results import load_job_result, save_job_result
+from app.job_events import job_events
+from app.job_recovery import is_job_stale, job_heartbeat, stale_job_error_message
+from app.webhooks import subscribe_job_webhook, validate_callback_url
+from app.http_cache import is_not_modified, not_modified_response, validator_headers, weak_etag
+from app.profile_cache import profile_cache
+from app.tracing import span, start_trace
 from config import settings
 
 logger = logging.getLogger(__name__)
@@ -111,72 +143,6 @@ def _require_active_scrape_session(
     return normalized_username, active_session
 
 
-def _build_stale_job_error_message(status: str) -> str:
-    if status == "running":
-        return "Job interrompido: processo reiniciado ou timeout excedido durante execucao em background."
-    if status == "pending":
-        return "Job interrompido: processo reiniciado antes de iniciar execucao em background."
-    return "Job interrompido por estado inconsistente."
-
-
-def _is_scraping_job_stale(job: ScrapingJob, now: datetime) -> bool:
-    max_running_minutes = max(1, int(getattr(settings, "scrape_job_max_running_minutes", 30)))
-    max_pending_minutes = max(1, int(getattr(settings, "scrape_job_max_pending_minutes", 15)))
-
-    if job.status == "running":
-        running_since = job.started_at or job.created_at
-        if running_since is None:
-            return True
-        cutoff = now - timedelta(minutes=max_running_minutes)
-        return running_since <= cutoff
-
-    if job.status == "pending":
-        created_at = job.created_at
-        if created_at is None:
-            return True
-        cutoff = now - timedelta(minutes=max_pending_minutes)
-        return created_at <= cutoff
-
-    return False
-
-
-def recover_stale_scraping_jobs(
-    db: Session,
-    force_recover_running: bool = False,
-) -> dict[str, int]:
-    if not bool(getattr(settings, "scrape_job_stale_recovery_enabled", True)):
-        return {"running": 0, "pending": 0, "total": 0}
-
-    now = datetime.utcnow()
-    updated_running = 0
-    updated_pending = 0
-
-    candidate_jobs = (
-        db.query(ScrapingJob)
-        .filter(ScrapingJob.status.in_(["running", "pending"]))
-        .all()
-    )
-
-    for job in candidate_jobs:
-        if not force_recover_running and not _is_scraping_job_stale(job, now):
-            continue
-        previous_status = str(job.status or "").strip().lower()
-        job.status = "failed"
-        job.completed_at = now
-        if not job.error_message:
-            job.error_message = _build_stale_job_error_message(previous_status)
-        if previous_status == "running":
-            updated_running += 1
-        elif previous_status == "pending":
-            updated_pending += 1
-
-    total = updated_running + updated_pending
-    if total:
-        db.commit()
-
-    return {"running": updated_running, "pending": updated_pending, "total": total}
-
-
 def mark_scraping_job_failed_if_stale(db: Session, job: ScrapingJob) -> bool:
     if not bool(getattr(settings, "scrape_job_stale_recovery_enabled", True)):
         return False
@@ -184,19 +150,67 @@ def mark_scraping_job_failed_if_stale(db: Session, job: ScrapingJob) -> bool:
         return False
 
     now = datetime.utcnow()
-    if not _is_scraping_job_stale(job, now):
+    if not is_job_stale(job, now):
         return False
 
     stale_status = str(job.status or "").strip().lower()
     job.status = "failed"
     job.completed_at = now
     if not job.error_message:
-        job.error_message = _build_stale_job_error_message(stale_status)
+        job.error_message = stale_job_error_message(stale_status)
     db.commit()
     db.refresh(job)
     return True
 
 
+IfNoneMatch = Annotated[str | None, Header()]
+IfModifiedSince = Annotated[str | None, Header()]
+
+# Corpos serializados de resultados de jobs concluidos, por ETag. A ETag inclui todas as
+# entradas da resposta (job, versao do perfil, parametros), entao nunca e preciso invalidar.
+_results_bodies: TTLCache[bytes] = TTLCache(
+    maxsize=int(getattr(settings, "scrape_results_body_cache_size", 256)),
+    ttl_seconds=int(getattr(settings, "scrape_results_body_cache_seconds", 600)),
+)
+
+
+def _conditional_results(
+    etag_parts: tuple[Any, ...],
+    last_modified: datetime | None,
+    if_none_match: str | None,
+    if_modified_since: str | None,
+) -> tuple[Response | None, dict[str, str]]:
+    """304 ou corpo do LRU quando possivel; senao (None, headers de validacao para a resposta)."""
+    headers = validator_headers(weak_etag(*etag_parts), last_modified)
+    if is_not_modified(headers["ETag"], last_modified, if_none_match, if_modified_since):
+        return not_modified_response(headers), headers
+    body = _results_bodies.get(headers["ETag"])
+    if body is not None:
+        return Response(content=body, media_type="application/json", headers=headers), headers
+    return None, headers
+
+
+def _results_response(
+    result: BaseModel,
+    raw_result: Any,
+    include_raw: bool,
+    headers: dict[str, str] | None = None,
+) -> ORJSONResponse:
+    """
+    Resposta dos endpoints de resultados: o schema ja validado vira dict e vai direto para o
+    orjson, sem a revalidacao + jsonable_encoder do response_model. `raw_result` entra sem
+    validacao (ja e JSON puro, lido de scraping_job_results) e sai da resposta com include_raw=false.
+    """
+    content = result.model_dump(exclude={"raw_result"})
+    if include_raw:
+        content["raw_result"] = raw_result
+    response = ORJSONResponse(content, headers=headers)
+    max_bytes = int(getattr(settings, "scrape_results_body_cache_max_bytes", 4_000_000))
+    if headers and "ETag" in headers and len(response.body) <= max_bytes:
+        _results_bodies.set(headers["ETag"], response.body)
+    return response
+
+
 # ==================== Health Check ====================
 
 @router.get("/health")
@@ -210,6 +224,49 @@ async def health_check():
 
 # ==================== Scraping Endpoints ====================
 
+async def _validated_callback_url(callback_url: str | None) -> str | None:
+    try:
+        return await validate_callback_url(callback_url)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+def _coalesced_scraping_job_response(
+    db: Session,
+    fingerprint: str,
+    callback_url: str | None = None,
+) -> ScrapingJobResponse | None:
+    """Job identico em voo (ou concluido recentemente) para anexar a requisicao, se houver."""
+    job, reason = find_coalescable_job(db, fingerprint)
+    if job is not None and reason == "in_flight" and mark_scraping_job_failed_if_stale(db, job):
+        job, reason = find_coalescable_job(db, fingerprint)
+    if job is None:
+        return None
+    if callback_url:
+        # Job "fresh" ja terminou: o dispatcher entrega no proximo ciclo.
+        subscribe_job_webhook(db, job.id, callback_url)
+        db.commit()
+
+    SCRAPE_JOBS_COALESCED_TOTAL.inc(reason=reason)
+    logger.info("🔗 Requisicao de scraping anexada ao job %s (%s)", job.id, reason)
+    return _scraping_job_response(job, coalesced=True)
+
+
+def _scraping_job_response(job: ScrapingJob, coalesced: bool = False) -> ScrapingJobResponse:
+    return ScrapingJobResponse(
+        id=job.id,
+        profile_url=job.profile_url,
+        status=job.status,
+        started_at=job.started_at,
+        completed_at=job.completed_at,
+        error_message=job.error_message,
+        posts_scraped=job.posts_scraped or 0,
+        interactions_scraped=job.interactions_scraped or 0,
+        created_at=job.created_at,
+        coalesced=coalesced,
+    )
+
+
 @router.post("/scrape", response_model=ScrapingJobResponse)
 async def start_scraping(
     request: ScrapingJobCreate,
@@ -249,14 +306,43 @@ async def start_scraping(
         except RuntimeError as exc:
             raise HTTPException(status_code=400, detail=str(exc))
         request_payload["session_username"] = session_username
+        callback_url = await _validated_callback_url(request.callback_url)
+
+        fingerprint = None
+        if bool(getattr(settings, "scrape_job_coalesce_enabled", True)):
+            # Fingerprint com defaults aplicados: omitir um campo == enviar o default.
+            fingerprint_payload = request.model_dump(mode="json")
+            fingerprint_payload.update(
+                profile_url=normalized_profile_url,
+                flow=flow,
+                session_username=session_username,
+            )
+            fingerprint = scrape_request_fingerprint(fingerprint_payload)
+            coalesced_response = _coalesced_scraping_job_response(db, fingerprint, callback_url)
+            if coalesced_response is not None:
+                return coalesced_response
 
         job = ScrapingJob(
             profile_url=normalized_profile_url,
             status="pending",
             metadata_json={"request": request_payload},
+            request_fingerprint=fingerprint,
         )
         db.add(job)
-        db.commit()
+        try:
+            db.flush()
+            if callback_url:
+                subscribe_job_webhook(db, job.id, callback_url)
+            db.commit()
+        except IntegrityError:
+            # Outra requisicao identica criou o job em voo entre a busca e o insert.
+            db.rollback()
+            coalesced_response = (
+                _coalesced_scraping_job_response(db, fingerprint, callback_url) if fingerprint else None
+            )
+            if coalesced_response is None:
+                raise
+            return coalesced_response
         db.refresh(job)
 
         # Executar scraping em background
@@ -283,6 +369,211 @@ async def start_scraping(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Cada IntegrityError no insert do lote e uma corrida com requisicao concorrente.
+_BATCH_INSERT_ATTEMPTS = 3
+
+
+def _insert_scraping_batch(
+    db: Session,
+    batch_id: str,
+    profile_urls: list[str],
+    request_options: dict[str, Any],
+    fingerprints: dict[str, str],
+    callback_url: str | None,
+) -> tuple[list[ScrapingJobResponse], list[tuple[str, str]]]:
+    """
+    Coalesce os perfis com jobs existentes e insere os demais com um INSERT multi-linha.
+    Retorna (respostas na ordem de profile_urls, [(job_id, profile_url)] a executar).
+    """
+    existing = find_coalescable_jobs(db, fingerprints.values())
+    for fingerprint, (job, reason) in list(existing.items()):
+        if reason == "in_flight" and mark_scraping_job_failed_if_stale(db, job):
+            del existing[fingerprint]
+
+    now = datetime.utcnow()
+    responses: list[ScrapingJobResponse] = []
+    to_run: list[tuple[str, str]] = []
+    job_rows: list[dict[str, Any]] = []
+    member_rows: list[dict[str, Any]] = []
+    webhook_rows: list[dict[str, Any]] = []
+    for position, profile_url in enumerate(profile_urls):
+        fingerprint = fingerprints.get(profile_url)
+        match = existing.get(fingerprint) if fingerprint else None
+        if match is not None:
+            job, reason = match
+            SCRAPE_JOBS_COALESCED_TOTAL.inc(reason=reason)
+            if callback_url:
+                subscribe_job_webhook(db, job.id, callback_url)
+            responses.append(_scraping_job_response(job, coalesced=True))
+            job_id = job.id
+        else:
+            job_id = str(uuid.uuid4())
+            job_rows.append(
+                {
+                    "id": job_id,
+                    "profile_url": profile_url,
+                    "status": "pending",
+                    "created_at": now,
+                    # Na fila em memoria deste processo: o heartbeat mantem o lease ate rodar.
+                    "heartbeat_at": now,
+                    "metadata_json": {"request": {**request_options, "profile_url": profile_url}, "batch_id": batch_id},
+                    "request_fingerprint": fingerprint,
+                }
+            )
+            if callback_url:
+                webhook_rows.append(
+                    {
+                        "id": str(uuid.uuid4()),
+                        "job_id": job_id,
+                        "callback_url": callback_url,
+                        "status": "pending",
+                        "attempts": 0,
+                        "next_attempt_at": now,
+                        "created_at": now,
+                    }
+                )
+            responses.append(ScrapingJobResponse(id=job_id, profile_url=profile_url, status="pending", created_at=now))
+            to_run.append((job_id, profile_url))
+        member_rows.append({"batch_id": batch_id, "job_id": job_id, "position": position, "created_at": now})
+
+    if job_rows:
+        db.execute(insert(ScrapingJob), job_rows)
+    db.execute(insert(ScrapingBatchJob), member_rows)
+    if webhook_rows:
+        db.execute(insert(WebhookDelivery), webhook_rows)
+    db.commit()
+    return responses, to_run
+
+
+@router.post("/scrape/batch", response_model=ScrapingBatchResponse)
+async def start_scraping_batch(
+    request: ScrapingBatchCreate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+):
+    """
+    Cria um job de scraping por perfil com as mesmas opcoes.
+
+    A sessao e validada uma vez, os jobs entram num unico INSERT e rodam em background
+    com concorrencia limitada (SCRAPE_BATCH_CONCURRENCY). Progresso em
+    GET /api/scrape/batch/{batch_id}.
+    """
+    try:
+        flow = str(request.flow or "default").strip().lower()
+        try:
+            session_username, _ = _require_active_scrape_session(db, request.session_username or "", flow)
+        except RuntimeError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        callback_url = await _validated_callback_url(request.callback_url)
+
+        profile_urls = list(
+            dict.fromkeys(_normalize_profile_url(url) for url in request.profile_urls if (url or "").strip())
+        )
+        if not profile_urls:
+            raise HTTPException(status_code=400, detail="Campo 'profile_urls' nao tem perfis validos.")
+
+        request_options = request.model_dump(mode="json", exclude_unset=True, exclude={"profile_urls"})
+        request_options.update(flow=flow, session_username=session_username)
+
+        fingerprints: dict[str, str] = {}
+        if bool(getattr(settings, "scrape_job_coalesce_enabled", True)):
+            # Mesmo fingerprint do POST /scrape: lotes e requisicoes avulsas coalescem entre si.
+            fingerprint_payload = request.model_dump(mode="json", exclude={"profile_urls"})
+            fingerprint_payload.update(flow=flow, session_username=session_username)
+            fingerprints = {
+                url: scrape_request_fingerprint({**fingerprint_payload, "profile_url": url}) for url in profile_urls
+            }
+
+        batch_id = str(uuid.uuid4())
+        for attempt in range(1, _BATCH_INSERT_ATTEMPTS + 1):
+            try:
+                responses, to_run = _insert_scraping_batch(
+                    db, batch_id, profile_urls, request_options, fingerprints, callback_url
+                )
+                break
+            except IntegrityError:
+                # Requisicao concorrente criou um dos jobs em voo; a proxima tentativa se anexa a ele.
+                db.rollback()
+                if attempt == _BATCH_INSERT_ATTEMPTS:
+                    raise HTTPException(
+                        status_code=409,
+                        detail="Lote em conflito com requisicoes concorrentes para os mesmos perfis; tente novamente.",
+                    )
+
+        for job_id, _ in to_run:
+            job_heartbeat.register(job_id)
+        if to_run:
+            background_tasks.add_task(_run_scrape_batch, batch_id, to_run, request_options)
+
+        logger.info(
+            "✅ Lote de scraping %s criado: %s perfis, %s jobs novos",
+            batch_id,
+            len(responses),
+            len(to_run),
+        )
+        return ScrapingBatchResponse(
+            batch_id=batch_id,
+            total=len(responses),
+            created=len(to_run),
+            coalesced=len(responses) - len(to_run),
+            jobs=responses,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Erro ao criar lote de scraping: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/scrape/batch/{batch_id}", response_model=ScrapingBatchStatusResponse)
+async def get_scraping_batch_status(
+    batch_id: str,
+    include_jobs: bool = False,
+    db: Session = Depends(get_db),
+):
+    """Contagem de jobs do lote por status (uma agregacao); `include_jobs=true` lista os jobs."""
+    rows = (
+        db.query(
+            ScrapingJob.status,
+            func.count(ScrapingJob.id),
+            func.coalesce(func.sum(ScrapingJob.posts_scraped), 0),
+            func.coalesce(func.sum(ScrapingJob.interactions_scraped), 0),
+        )
+        .join(ScrapingBatchJob, ScrapingBatchJob.job_id == ScrapingJob.id)
+        .filter(ScrapingBatchJob.batch_id == batch_id)
+        .group_by(ScrapingJob.status)
+        .all()
+    )
+    if not rows:
+        raise HTTPException(status_code=404, detail="Lote não encontrado")
+
+    counts = {str(row[0]): int(row[1]) for row in rows}
+    jobs = None
+    if include_jobs:
+        batch_jobs = (
+            db.query(ScrapingJob)
+            .options(defer(ScrapingJob.metadata_json))
+            .join(ScrapingBatchJob, ScrapingBatchJob.job_id == ScrapingJob.id)
+            .filter(ScrapingBatchJob.batch_id == batch_id)
+            .order_by(ScrapingBatchJob.position)
+            .all()
+        )
+        jobs = [_scraping_job_response(job) for job in batch_jobs]
+
+    return ScrapingBatchStatusResponse(
+        batch_id=batch_id,
+        total=sum(counts.values()),
+        pending=counts.get("pending", 0),
+        running=counts.get("running", 0),
+        completed=counts.get("completed", 0),
+        failed=counts.get("failed", 0),
+        finished=not (counts.get("pending") or counts.get("running")),
+        posts_scraped=sum(int(row[2]) for row in rows),
+        interactions_scraped=sum(int(row[3]) for row in rows),
+        jobs=jobs,
+    )
+
+
 @router.get("/scrape/{job_id}", response_model=ScrapingJobResponse)
 async def get_scraping_status(
     job_id: str,
@@ -299,7 +590,13 @@ async def get_scraping_status(
         Status do job
     """
     try:
-        job = db.query(ScrapingJob).filter(ScrapingJob.id == job_id).first()
+        # Polling de status nao precisa do metadata (request/timeline).
+        job = (
+            db.query(ScrapingJob)
+            .options(defer(ScrapingJob.metadata_json))
+            .filter(ScrapingJob.id == job_id)
+            .first()
+        )
 
         if not job:
             raise HTTPException(status_code=404, detail="Job não encontrado")
@@ -325,16 +622,113 @@ async def get_scraping_status(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/scrape/{job_id}/results", response_model=ScrapingCompleteResponse)
+TERMINAL_JOB_STATUSES = ("completed", "failed")
+
+
+def _read_job_status_snapshot(job_id: str) -> dict[str, Any] | None:
+    db = SessionLocal()
+    try:
+        job = (
+            db.query(ScrapingJob)
+            .options(defer(ScrapingJob.metadata_json))
+            .filter(ScrapingJob.id == job_id)
+            .first()
+        )
+        if not job:
+            return None
+        return ScrapingJobResponse(
+            id=job.id,
+            profile_url=job.profile_url,
+            status=job.status,
+            started_at=job.started_at,
+            completed_at=job.completed_at,
+            error_message=job.error_message,
+            posts_scraped=job.posts_scraped or 0,
+            interactions_scraped=job.interactions_scraped or 0,
+            created_at=job.created_at,
+        ).model_dump(mode="json", exclude={"coalesced"})
+    finally:
+        db.close()
+
+
+def _sse_message(event: str, data: Any, event_id: int | None = None) -> bytes:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\n".encode("utf-8") + b"data: " + orjson.dumps(data) + b"\n\n"
+
+
+@router.get("/scrape/{job_id}/events")
+async def stream_scraping_events(job_id: str, request: Request):
+    """
+    Stream SSE do job: evento `status` a cada transição (e um inicial com o estado atual)
+    e eventos de progresso (`story_collected`, `post_completed`) enquanto o job roda.
+    O stream termina depois do status `completed`/`failed`.
+    """
+    snapshot = await asyncio.to_thread(_read_job_status_snapshot, job_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+
+    poll_seconds = max(0.5, float(getattr(settings, "scrape_job_events_poll_seconds", 5)))
+
+    async def _events():
+        # Assina so quando o corpo comeca a ser enviado (o finally garante o unsubscribe).
+        queue = job_events.subscribe(job_id)
+        current = snapshot
+        sequence = 1
+        try:
+            yield _sse_message("status", current, sequence)
+            while current["status"] not in TERMINAL_JOB_STATUSES:
+                if await request.is_disconnected():
+                    return
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout=poll_seconds)
+                except asyncio.TimeoutError:
+                    # Fallback para jobs executando em outra réplica: uma leitura leve por intervalo.
+                    event, data = "status", None
+                if event != "status":
+                    sequence += 1
+                    yield _sse_message(event, data, sequence)
+                    continue
+                latest = await asyncio.to_thread(_read_job_status_snapshot, job_id)
+                if latest is None:
+                    return
+                if latest == current:
+                    yield b": keepalive\n\n"
+                    continue
+                current = latest
+                sequence += 1
+                yield _sse_message("status", current, sequence)
+        finally:
+            job_events.unsubscribe(job_id, queue)
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/scrape/{job_id}/results", response_model=ScrapingCompleteResponse, response_class=ORJSONResponse)
 async def get_scraping_results(
     job_id: str,
+    interactions_limit: int | None = None,
+    interactions_cursor: str | None = None,
+    include_raw: bool = True,
+    if_none_match: IfNoneMatch = None,
+    if_modified_since: IfModifiedSince = None,
     db: Session = Depends(get_db),
 ):
     """
     Obtém resultados completos de um job de scraping.
 
+    Jobs concluidos respondem com ETag/Last-Modified (304 em requisicoes condicionais) e o
+    corpo fica num LRU em memoria.
+
     Args:
         job_id: ID do job
+        interactions_limit: (fluxo default) pagina as interações por (created_at, id);
+            sem limite e sem cursor retorna todas
+        interactions_cursor: `next_interactions_cursor` da página anterior
+        include_raw: false omite `raw_result` (o maior campo nos fluxos de stories/likes)
         db: Sessão do banco de dados
 
     Returns:
@@ -547,13 +941,24 @@ async def get_scraping_results(
         metadata = job.metadata_json or {}
         request_payload = metadata.get("request", {}) if isinstance(metadata.get("request"), dict) else {}
         flow = metadata.get("flow") or request_payload.get("flow")
-        flow_result = metadata.get("result")
+        etag_parts = ("scrape_results", job.id, job.completed_at, include_raw, interactions_limit, interactions_cursor)
+
+        if flow in ("recent_likes", "stories_interactions"):
+            # Resultado vem so do blob do job: imutavel depois de concluido.
+            cached, cache_headers = _conditional_results(
+                etag_parts, job.completed_at, if_none_match, if_modified_since
+            )
+            if cached is not None:
+                return cached
+
+        # No fluxo default o resultado so e usado quando o perfil nao esta no banco.
+        flow_result = load_job_result(db, job) if flow in ("recent_likes", "stories_interactions") else None
 
         if flow == "recent_likes" and isinstance(flow_result, dict):
             posts = flow_result.get("posts", []) or []
             summary = flow_result.get("summary", {}) or {}
             profile_payload = flow_result.get("profile", {}) or {}
-            return ScrapingCompleteResponse(
+            result = ScrapingCompleteResponse(
                 job_id=job.id,
                 status=job.status,
                 flow="recent_likes",
@@ -579,10 +984,10 @@ async def get_scraping_results(
                 extracted_posts=posts,
                 total_posts=_safe_int(summary.get("total_posts", len(posts)) or 0),
                 total_interactions=_safe_int(summary.get("total_like_users", 0) or 0),
-                raw_result=flow_result,
                 error_message=job.error_message,
                 completed_at=job.completed_at,
             )
+            return _results_response(result, flow_result, include_raw, cache_headers)
 
         if flow == "stories_interactions" and isinstance(flow_result, dict):
             summary = flow_result.get("summary", {}) or {}
@@ -591,7 +996,7 @@ async def get_scraping_results(
                 flow_result.get("story_posts", [])
                 or flow_result.get("stories", [])
             )
-            return ScrapingCompleteResponse(
+            result = ScrapingCompleteResponse(
                 job_id=job.id,
                 status=job.status,
                 flow="stories_interactions",
@@ -619,10 +1024,10 @@ async def get_scraping_results(
                     )
                     or 0
                 ),
-                raw_result=flow_result,
                 error_message=job.error_message,
                 completed_at=job.completed_at,
             )
+            return _results_response(result, flow_result, include_raw, cache_headers)
 
         # Buscar perfil associado
         profile = db.query(Profile).filter(
@@ -643,6 +1048,21 @@ async def get_scraping_results(
                     Profile.instagram_username == username
                 ).first()
 
+        # Fluxo default: a resposta le posts/interacoes atuais do perfil, versionados por
+        # profiles.updated_at; sem perfil, vem do resultado gravado (imutavel).
+        profile_version = profile.updated_at if profile else None
+        cached, cache_headers = _conditional_results(
+            (*etag_parts, profile.id if profile else None, profile_version),
+            max((value for value in (job.completed_at, profile_version) if value is not None), default=None),
+            if_none_match,
+            if_modified_since,
+        )
+        if cached is not None:
+            return cached
+
+        if not profile and flow_result is None:
+            flow_result = load_job_result(db, job)
+
         if not profile and isinstance(flow_result, dict):
             posts = flow_result.get("posts", []) or []
             story_posts = (
@@ -655,7 +1075,7 @@ async def get_scraping_results(
             )
             summary = flow_result.get("summary", {}) or {}
             profile_payload = flow_result.get("profile", {}) or {}
-            return ScrapingCompleteResponse(
+            result = ScrapingCompleteResponse(
                 job_id=job.id,
                 status=job.status,
                 flow=flow or "default",
@@ -700,10 +1120,10 @@ async def get_scraping_results(
                     )
                     or 0
                 ),
-                raw_result=flow_result,
                 error_message=job.error_message,
                 completed_at=job.completed_at,
             )
+            return _results_response(result, flow_result, include_raw, cache_headers)
 
         if not profile:
             logger.warning(
@@ -718,7 +1138,7 @@ async def get_scraping_results(
                 if flow == "stories_interactions" and isinstance(flow_result, dict)
                 else []
             )
-            return ScrapingCompleteResponse(
+            result = ScrapingCompleteResponse(
                 job_id=job.id,
                 status=job.status,
                 flow=flow or "default",
@@ -734,16 +1154,69 @@ async def get_scraping_results(
                 story_posts=story_posts,
                 total_posts=_safe_int(job.posts_scraped, 0),
                 total_interactions=_safe_int(job.interactions_scraped, 0),
-                raw_result=flow_result if isinstance(flow_result, dict) else None,
                 error_message=job.error_message,
                 completed_at=job.completed_at,
             )
+            return _results_response(
+                result, flow_result if isinstance(flow_result, dict) else None, include_raw, cache_headers
+            )
 
-        # Buscar posts e interações
-        posts = db.query(Post).filter(Post.profile_id == profile.id).all()
-        interactions = db.query(Interaction).filter(
-            Interaction.profile_id == profile.id
-        ).all()
+        # Buscar posts e interações (somente colunas usadas na resposta)
+        posts = (
+            db.query(Post.id, Post.post_url, Post.caption, Post.like_count, Post.comment_count)
+            .filter(Post.profile_id == profile.id)
+            .all()
+        )
+        interactions_query = db.query(
+            Interaction.id,
+            Interaction.post_id,
+            Interaction.interaction_type,
+            Interaction.user_url,
+            Interaction.user_username,
+            Interaction.user_bio,
+            Interaction.user_is_private,
+            Interaction.comment_text,
+            Interaction.created_at,
+        ).filter(Interaction.profile_id == profile.id)
+
+        next_interactions_cursor = None
+        if interactions_limit is None and not interactions_cursor:
+            interactions = interactions_query.all()
+            total_interactions = len(interactions)
+        else:
+            safe_limit = min(max(int(interactions_limit or 500), 1), 5000)
+            try:
+                page_query = apply_keyset(
+                    interactions_query,
+                    Interaction.created_at,
+                    Interaction.id,
+                    interactions_cursor,
+                )
+            except InvalidCursorError as exc:
+                raise HTTPException(status_code=400, detail=str(exc))
+            interactions = page_query.limit(safe_limit + 1).all()
+            next_interactions_cursor = next_cursor(interactions, safe_limit)
+            interactions = interactions[:safe_limit]
+            total_interactions = (
+                db.query(func.count(Interaction.id))
+                .filter(Interaction.profile_id == profile.id)
+                .scalar()
+                or 0
+            )
+
+        # Hash join em uma passada: post_id -> interações do post.
+        interactions_by_post: dict[str, list[dict[str, Any]]] = {}
+        for interaction in interactions:
+            interactions_by_post.setdefault(interaction.post_id, []).append(
+                {
+                    "type": interaction.interaction_type.value,
+                    "user_url": interaction.user_url,
+                    "user_username": interaction.user_username,
+                    "user_bio": interaction.user_bio,
+                    "is_private": interaction.user_is_private,
+                    "comment_text": interaction.comment_text,
+                }
+            )
 
         # Montar resposta
         result = ScrapingCompleteResponse(
@@ -763,29 +1236,18 @@ async def get_scraping_results(
                         "caption": post.caption,
                         "like_count": post.like_count,
                         "comment_count": post.comment_count,
-                        "interactions": [
-                            {
-                                "type": interaction.interaction_type.value,
-                                "user_url": interaction.user_url,
-                                "user_username": interaction.user_username,
-                                "user_bio": interaction.user_bio,
-                                "is_private": interaction.user_is_private,
-                                "comment_text": interaction.comment_text,
-                            }
-                            for interaction in interactions
-                            if interaction.post_id == post.id
-                        ],
+                        "interactions": interactions_by_post.get(post.id, []),
                     }
                     for post in posts
                 ],
             },
             total_posts=len(posts),
-            total_interactions=len(interactions),
+            total_interactions=total_interactions,
+            next_interactions_cursor=next_interactions_cursor,
             error_message=job.error_message,
             completed_at=job.completed_at,
         )
-
-        return result
+        return _results_response(result, None, include_raw, cache_headers)
 
     except HTTPException:
         raise
@@ -796,6 +1258,35 @@ async def get_scraping_results(
 
 # ==================== Profile Endpoints ====================
 
+# Totais das listagens por perfil: COUNT(*) cacheado por alguns segundos, fora do caminho
+# da paginação (um COUNT em perfis grandes custa mais que a própria página).
+_listing_totals: TTLCache[int] = TTLCache(
+    maxsize=4096,
+    ttl_seconds=int(getattr(settings, "profile_listing_total_cache_seconds", 60)),
+)
+
+
+def _cached_listing_total(db: Session, model: Any, profile_id: str) -> int:
+    return _listing_totals.get_or_set(
+        (model.__tablename__, profile_id),
+        lambda: int(
+            db.query(func.count(model.id)).filter(model.profile_id == profile_id).scalar() or 0
+        ),
+    )
+
+
+def _keyset_page(query: Any, model: Any, cursor: str | None, skip: int, limit: int) -> tuple[list[Any], str | None]:
+    """Página por (created_at, id): `cursor` (keyset) ou, por compatibilidade, `skip` (offset)."""
+    try:
+        query = apply_keyset(query, model.created_at, model.id, cursor)
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if not cursor and skip > 0:
+        query = query.offset(skip)
+    rows = query.limit(limit + 1).all()
+    return rows[:limit], next_cursor(rows, limit)
+
+
 @router.post("/profiles/scrape", response_model=ProfileScrapeResponse)
 async def scrape_profile_info(
     request: ProfileScrapeRequest,
@@ -917,6 +1408,7 @@ async def generic_scrape(
             raise HTTPException(status_code=400, detail="Campo 'url' e obrigatorio.")
         if not instruction_prompt:
             raise HTTPException(status_code=400, detail="Campo 'prompt' e obrigatorio.")
+        callback_url = await _validated_callback_url(request.callback_url)
 
         if session_username:
             session = _get_active_instagram_session(db, session_username)
@@ -951,6 +1443,9 @@ async def generic_scrape(
             },
         )
         db.add(job)
+        db.flush()
+        if callback_url:
+            subscribe_job_webhook(db, job.id, callback_url)
         db.commit()
         db.refresh(job)
 
@@ -980,7 +1475,12 @@ async def generic_scrape(
 @router.get("/generic_scrape/{job_id}", response_model=ScrapingJobResponse)
 async def get_generic_scrape_status(job_id: str, db: Session = Depends(get_db)):
     try:
-        job = db.query(ScrapingJob).filter(ScrapingJob.id == job_id).first()
+        job = (
+            db.query(ScrapingJob)
+            .options(defer(ScrapingJob.metadata_json))
+            .filter(ScrapingJob.id == job_id)
+            .first()
+        )
         if not job:
             raise HTTPException(status_code=404, detail="Job não encontrado")
 
@@ -1002,8 +1502,14 @@ async def get_generic_scrape_status(job_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/generic_scrape/{job_id}/results", response_model=GenericScrapeJobResultResponse)
-async def get_generic_scrape_results(job_id: str, db: Session = Depends(get_db)):
+@router.get("/generic_scrape/{job_id}/results", response_model=GenericScrapeJobResultResponse, response_class=ORJSONResponse)
+async def get_generic_scrape_results(
+    job_id: str,
+    include_raw: bool = True,
+    if_none_match: IfNoneMatch = None,
+    if_modified_since: IfModifiedSince = None,
+    db: Session = Depends(get_db),
+):
     try:
         job = db.query(ScrapingJob).filter(ScrapingJob.id == job_id).first()
         if not job:
@@ -1015,20 +1521,31 @@ async def get_generic_scrape_results(job_id: str, db: Session = Depends(get_db))
                 content={"detail": f"Job ainda não foi concluído. Status: {job.status}"},
             )
 
+        cached, cache_headers = _conditional_results(
+            ("job_results", job.id, job.status, job.completed_at, include_raw),
+            job.completed_at,
+            if_none_match,
+            if_modified_since,
+        )
+        if cached is not None:
+            return cached
+
         metadata = job.metadata_json if isinstance(job.metadata_json, dict) else {}
         request_payload = metadata.get("request") if isinstance(metadata.get("request"), dict) else {}
-        result_payload = metadata.get("result") if isinstance(metadata.get("result"), dict) else {}
+        result_payload = load_job_result(db, job)
+        if not isinstance(result_payload, dict):
+            result_payload = {}
 
-        return GenericScrapeJobResultResponse(
+        result = GenericScrapeJobResultResponse(
             job_id=job.id,
             status=job.status,
             url=str(request_payload.get("url") or job.profile_url),
             prompt=str(request_payload.get("prompt") or ""),
             data=result_payload.get("data"),
-            raw_result=result_payload.get("raw_result"),
             error_message=job.error_message or result_payload.get("error"),
             completed_at=job.completed_at,
         )
+        return _results_response(result, result_payload.get("raw_result"), include_raw, cache_headers)
     except HTTPException:
         raise
     except Exception as e:
@@ -1052,6 +1569,7 @@ async def investing_scrape(
             raise HTTPException(status_code=400, detail="Campo 'url' e obrigatorio.")
         if not instruction_prompt:
             raise HTTPException(status_code=400, detail="Campo 'prompt' e obrigatorio.")
+        callback_url = await _validated_callback_url(request.callback_url)
 
         request_payload = request.model_dump(mode="json", exclude_unset=True)
         request_payload["url"] = target_url
@@ -1065,6 +1583,9 @@ async def investing_scrape(
             },
         )
         db.add(job)
+        db.flush()
+        if callback_url:
+            subscribe_job_webhook(db, job.id, callback_url)
         db.commit()
         db.refresh(job)
 
@@ -1094,7 +1615,12 @@ async def investing_scrape(
 @router.get("/investing_scrape/{job_id}", response_model=ScrapingJobResponse)
 async def get_investing_scrape_status(job_id: str, db: Session = Depends(get_db)):
     try:
-        job = db.query(ScrapingJob).filter(ScrapingJob.id == job_id).first()
+        job = (
+            db.query(ScrapingJob)
+            .options(defer(ScrapingJob.metadata_json))
+            .filter(ScrapingJob.id == job_id)
+            .first()
+        )
         if not job:
             raise HTTPException(status_code=404, detail="Job não encontrado")
 
@@ -1116,8 +1642,14 @@ async def get_investing_scrape_status(job_id: str, db: Session = Depends(get_db)
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/investing_scrape/{job_id}/results", response_model=InvestingScrapeJobResultResponse)
-async def get_investing_scrape_results(job_id: str, db: Session = Depends(get_db)):
+@router.get("/investing_scrape/{job_id}/results", response_model=InvestingScrapeJobResultResponse, response_class=ORJSONResponse)
+async def get_investing_scrape_results(
+    job_id: str,
+    include_raw: bool = True,
+    if_none_match: IfNoneMatch = None,
+    if_modified_since: IfModifiedSince = None,
+    db: Session = Depends(get_db),
+):
     try:
         job = db.query(ScrapingJob).filter(ScrapingJob.id == job_id).first()
         if not job:
@@ -1129,20 +1661,31 @@ async def get_investing_scrape_results(job_id: str, db: Session = Depends(get_db
                 content={"detail": f"Job ainda não foi concluído. Status: {job.status}"},
             )
 
+        cached, cache_headers = _conditional_results(
+            ("job_results", job.id, job.status, job.completed_at, include_raw),
+            job.completed_at,
+            if_none_match,
+            if_modified_since,
+        )
+        if cached is not None:
+            return cached
+
         metadata = job.metadata_json if isinstance(job.metadata_json, dict) else {}
         request_payload = metadata.get("request") if isinstance(metadata.get("request"), dict) else {}
-        result_payload = metadata.get("result") if isinstance(metadata.get("result"), dict) else {}
+        result_payload = load_job_result(db, job)
+        if not isinstance(result_payload, dict):
+            result_payload = {}
 
-        return InvestingScrapeJobResultResponse(
+        result = InvestingScrapeJobResultResponse(
             job_id=job.id,
             status=job.status,
             url=str(request_payload.get("url") or job.profile_url),
             prompt=str(request_payload.get("prompt") or ""),
             data=result_payload.get("data"),
-            raw_result=result_payload.get("raw_result"),
             error_message=job.error_message or result_payload.get("error"),
             completed_at=job.completed_at,
         )
+        return _results_response(result, result_payload.get("raw_result"), include_raw, cache_headers)
     except HTTPException:
         raise
     except Exception as e:
@@ -1150,9 +1693,29 @@ async def get_investing_scrape_results(job_id: str, db: Session = Depends(get_db
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _profile_validators(
+    response: Response | None,
+    etag_parts: tuple[Any, ...],
+    profile: Profile | ProfileResponse,
+    if_none_match: str | None,
+    if_modified_since: str | None,
+) -> Response | None:
+    """ETag/Last-Modified por profiles.updated_at; retorna a resposta 304 quando couber."""
+    last_modified = profile.updated_at
+    headers = validator_headers(weak_etag(*etag_parts, last_modified), last_modified)
+    if is_not_modified(headers["ETag"], last_modified, if_none_match, if_modified_since):
+        return not_modified_response(headers)
+    if response is not None:
+        response.headers.update(headers)
+    return None
+
+
 @router.get("/profiles/{username}", response_model=ProfileResponse)
 async def get_profile(
     username: str,
+    response: Response = None,
+    if_none_match: IfNoneMatch = None,
+    if_modified_since: IfModifiedSince = None,
     db: Session = Depends(get_db),
 ):
     """
@@ -1166,9 +1729,8 @@ async def get_profile(
         Informacoes do perfil
     """
     try:
-        profile = db.query(Profile).filter(
-            Profile.instagram_username == username
-        ).first()
+        # Read-through em memoria (invalidado por _save_profile); busca por lower(username).
+        profile = profile_cache.get(db, username)
 
         if not profile:
             logger.info(
@@ -1182,14 +1744,17 @@ async def get_profile(
                 save_to_db=True,
                 cache_ttl_days=settings.profile_cache_ttl_days,
             )
-            profile = db.query(Profile).filter(
-                Profile.instagram_username == username
-            ).first()
+            profile = profile_cache.get(db, username)
 
         if not profile:
             raise HTTPException(status_code=404, detail="Perfil nao encontrado")
 
-        return ProfileResponse.from_orm(profile)
+        not_modified = _profile_validators(
+            response, ("profile", profile.id), profile, if_none_match, if_modified_since
+        )
+        if not_modified is not None:
+            return not_modified
+        return profile
 
     except HTTPException:
         raise
@@ -1198,24 +1763,35 @@ async def get_profile(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Teto de `limit` por pagina nas listagens do perfil; valores maiores sao reduzidos (o
+# `limit` aplicado volta na resposta). Vale tambem para quem ainda pagina por `skip`.
+PROFILE_POSTS_PAGE_MAX = 500
+PROFILE_INTERACTIONS_PAGE_MAX = 1000
+
+
 @router.get("/profiles/{username}/posts")
 async def get_profile_posts(
     username: str,
     skip: int = 0,
     limit: int = 10,
+    cursor: str | None = None,
+    response: Response = None,
+    if_none_match: IfNoneMatch = None,
+    if_modified_since: IfModifiedSince = None,
     db: Session = Depends(get_db),
 ):
     """
-    Obtém posts de um perfil.
+    Obtém posts de um perfil, ordenados por (created_at, id).
 
     Args:
         username: Username do perfil
-        skip: Número de posts a pular
-        limit: Número máximo de posts a retornar
+        skip: (Legado) Número de posts a pular; prefira `cursor`
+        limit: Número máximo de posts a retornar (limitado a PROFILE_POSTS_PAGE_MAX=500)
+        cursor: `next_cursor` da página anterior
         db: Sessão do banco de dados
 
     Returns:
-        Lista de posts
+        Página de posts, `next_cursor`, `limit` aplicado e `total` de posts do perfil
     """
     try:
         profile = db.query(Profile).filter(
@@ -1225,13 +1801,25 @@ async def get_profile_posts(
         if not profile:
             raise HTTPException(status_code=404, detail="Perfil não encontrado")
 
-        posts = db.query(Post).filter(
-            Post.profile_id == profile.id
-        ).offset(skip).limit(limit).all()
+        safe_limit = min(max(int(limit), 1), PROFILE_POSTS_PAGE_MAX)
+        not_modified = _profile_validators(
+            response,
+            ("posts", profile.id, skip, safe_limit, cursor),
+            profile,
+            if_none_match,
+            if_modified_since,
+        )
+        if not_modified is not None:
+            return not_modified
+
+        query = db.query(Post).filter(Post.profile_id == profile.id)
+        posts, page_cursor = _keyset_page(query, Post, cursor, skip, safe_limit)
 
         return {
             "username": username,
-            "total": len(posts),
+            "total": _cached_listing_total(db, Post, profile.id),
+            "limit": safe_limit,
+            "next_cursor": page_cursor,
             "posts": [PostResponse.from_orm(post) for post in posts],
         }
 
@@ -1247,19 +1835,24 @@ async def get_profile_interactions(
     username: str,
     skip: int = 0,
     limit: int = 50,
+    cursor: str | None = None,
+    response: Response = None,
+    if_none_match: IfNoneMatch = None,
+    if_modified_since: IfModifiedSince = None,
     db: Session = Depends(get_db),
 ):
     """
-    Obtém interações de um perfil.
+    Obtém interações de um perfil, ordenadas por (created_at, id).
 
     Args:
         username: Username do perfil
-        skip: Número de interações a pular
-        limit: Número máximo de interações a retornar
+        skip: (Legado) Número de interações a pular; prefira `cursor`
+        limit: Número máximo de interações a retornar (limitado a PROFILE_INTERACTIONS_PAGE_MAX=1000)
+        cursor: `next_cursor` da página anterior
         db: Sessão do banco de dados
 
     Returns:
-        Lista de interações
+        Página de interações, `next_cursor`, `limit` aplicado e `total` de interações do perfil
     """
     try:
         profile = db.query(Profile).filter(
@@ -1269,13 +1862,25 @@ async def get_profile_interactions(
         if not profile:
             raise HTTPException(status_code=404, detail="Perfil não encontrado")
 
-        interactions = db.query(Interaction).filter(
-            Interaction.profile_id == profile.id
-        ).offset(skip).limit(limit).all()
+        safe_limit = min(max(int(limit), 1), PROFILE_INTERACTIONS_PAGE_MAX)
+        not_modified = _profile_validators(
+            response,
+            ("interactions", profile.id, skip, safe_limit, cursor),
+            profile,
+            if_none_match,
+            if_modified_since,
+        )
+        if not_modified is not None:
+            return not_modified
+
+        query = db.query(Interaction).filter(Interaction.profile_id == profile.id)
+        interactions, page_cursor = _keyset_page(query, Interaction, cursor, skip, safe_limit)
 
         return {
             "username": username,
-            "total": len(interactions),
+            "total": _cached_listing_total(db, Interaction, profile.id),
+            "limit": safe_limit,
+            "next_cursor": page_cursor,
             "interactions": [
                 InteractionResponse.from_orm(interaction)
                 for interaction in interactions
@@ -1289,6 +1894,61 @@ async def get_profile_interactions(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/profiles/{username}/interactions/export")
+async def export_profile_interactions(
+    username: str,
+    format: str = "ndjson",
+    interaction_type: str | None = None,
+    post_url: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Exporta todas as interações de um perfil em streaming (NDJSON ou CSV).
+
+    Args:
+        username: Username do perfil
+        format: ndjson (padrão) ou csv
+        interaction_type: Filtra por tipo (like, comment, share, save, view)
+        post_url: Filtra por post
+        since / until: Intervalo [since, until) sobre created_at
+        db: Sessão do banco de dados
+
+    Returns:
+        StreamingResponse com uma linha por interação, ordenadas por (created_at, id)
+    """
+    export_format = (format or "").strip().lower()
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="format deve ser ndjson ou csv")
+    try:
+        parsed_type = parse_interaction_type(interaction_type)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    profile = db.query(Profile.id).filter(
+        Profile.instagram_username == username
+    ).first()
+    if not profile:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+
+    statement = build_export_query(
+        profile.id,
+        interaction_type=parsed_type,
+        post_url=post_url,
+        since=since,
+        until=until,
+    )
+    body = iter_csv if export_format == "csv" else iter_ndjson
+    return StreamingResponse(
+        body(SessionLocal, statement),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{username}_interactions.{export_format}"',
+        },
+    )
+
+
 # ==================== Session Endpoints ====================
 
 @router.get("/instagram_sessions")
@@ -1390,6 +2050,12 @@ async def _scrape_profile_background(job_id: str, profile_url: str, options: dic
         options: opções avançadas do fluxo
     """
     db = None
+    metric_flow = str((options or {}).get("flow") or "default").lower().strip()
+    metric_status = "failed"
+    job_started = time.perf_counter()
+    SCRAPE_JOBS_IN_PROGRESS.inc(flow=metric_flow)
+    trace = start_trace(job_id, flow=metric_flow, profile_url=profile_url)
+    profiling_manager.job_started(job_id)
     try:
         db = next(get_db())
 
@@ -1397,11 +2063,15 @@ async def _scrape_profile_background(job_id: str, profile_url: str, options: dic
         job = db.query(ScrapingJob).filter(ScrapingJob.id == job_id).first()
         if not job:
             logger.error(f"Job não encontrado: {job_id}")
+            metric_status = "not_found"
             return
 
         job.status = "running"
         job.started_at = datetime.utcnow()
+        job.heartbeat_at = job.started_at
         db.commit()
+        job_heartbeat.register(job_id)
+        job_events.status_changed(job_id)
 
         opts = dict(options or {})
         flow = (opts.get("flow") or "default").lower().strip()
@@ -1424,11 +2094,12 @@ async def _scrape_profile_background(job_id: str, profile_url: str, options: dic
         # Mesmo que venha true na request, forçamos false neste job.
         collect_like_user_profiles = False
 
-        session_username, _ = _require_active_scrape_session(
-            db,
-            session_username,
-            flow,
-        )
+        with span("session.require_active", session_username=session_username):
+            session_username, _ = _require_active_scrape_session(
+                db,
+                session_username,
+                flow,
+            )
 
         # Executar scraping de acordo com o fluxo.
         if test_mode:
@@ -1647,10 +2318,13 @@ async def _scrape_profile_background(job_id: str, profile_url: str, options: dic
         metadata = dict(base_metadata)
         metadata["flow"] = flow
         metadata["options"] = dict(opts)
-        metadata["result"] = result
+        metadata.pop("result", None)
+        metadata["timeline"] = trace.timeline()
         job.metadata_json = metadata
         flag_modified(job, "metadata_json")
+        save_job_result(db, job_id, result)
         db.commit()
+        metric_status = "completed"
 
         logger.info(f"✅ Job concluído: {job_id}")
 
@@ -1663,13 +2337,41 @@ async def _scrape_profile_background(job_id: str, profile_url: str, options: dic
                 job.status = "failed"
                 job.error_message = str(e)
                 job.completed_at = datetime.utcnow()
+                metadata = dict(job.metadata_json) if isinstance(job.metadata_json, dict) else {}
+                metadata["timeline"] = trace.timeline()
+                job.metadata_json = metadata
+                flag_modified(job, "metadata_json")
                 db.commit()
 
     finally:
+        profiling_manager.job_finished(job_id)
+        job_heartbeat.unregister(job_id)
+        job_events.status_changed(job_id)
+        trace.log_summary()
+        trace.close()
+        SCRAPE_JOBS_IN_PROGRESS.dec(flow=metric_flow)
+        SCRAPE_JOBS_TOTAL.inc(flow=metric_flow, status=metric_status)
+        SCRAPE_JOB_DURATION_SECONDS.observe(
+            time.perf_counter() - job_started,
+            flow=metric_flow,
+            status=metric_status,
+        )
         if db:
             db.close()
 
 
+async def _run_scrape_batch(batch_id: str, jobs: list[tuple[str, str]], options: dict) -> None:
+    """Executa os jobs de um lote com no maximo SCRAPE_BATCH_CONCURRENCY ao mesmo tempo."""
+    semaphore = asyncio.Semaphore(max(1, int(getattr(settings, "scrape_batch_concurrency", 3))))
+
+    async def run(job_id: str, profile_url: str) -> None:
+        async with semaphore:
+            await _scrape_profile_background(job_id=job_id, profile_url=profile_url, options=dict(options))
+
+    logger.info("📦 Executando lote %s: %s jobs", batch_id, len(jobs))
+    await asyncio.gather(*(run(job_id, profile_url) for job_id, profile_url in jobs))
+
+
 async def _generic_scrape_background(
     job_id: str,
     target_url: str,
@@ -1682,6 +2384,7 @@ async def _generic_scrape_background(
     Executa generic scrape em background.
     """
     db = None
+    profiling_manager.job_started(job_id)
     try:
         db = next(get_db())
         job = db.query(ScrapingJob).filter(ScrapingJob.id == job_id).first()
@@ -1691,7 +2394,10 @@ async def _generic_scrape_background(
 
         job.status = "running"
         job.started_at = datetime.utcnow()
+        job.heartbeat_at = job.started_at
         db.commit()
+        job_heartbeat.register(job_id)
+        job_events.status_changed(job_id)
 
         storage_state = None
         normalized_session_username = _normalize_session_username(session_username)
@@ -1753,9 +2459,9 @@ async def _generic_scrape_background(
         base_metadata = job.metadata_json if isinstance(job.metadata_json, dict) else {}
         metadata = dict(base_metadata)
         metadata["flow"] = "generic"
-        metadata["result"] = result
         job.metadata_json = metadata
         flag_modified(job, "metadata_json")
+        save_job_result(db, job_id, result)
 
         error_message = result.get("error")
         if not error_message and isinstance(result.get("data"), dict):
@@ -1785,6 +2491,9 @@ async def _generic_scrape_background(
                 job.completed_at = datetime.utcnow()
                 db.commit()
     finally:
+        profiling_manager.job_finished(job_id)
+        job_heartbeat.unregister(job_id)
+        job_events.status_changed(job_id)
         if db:
             db.close()
 
@@ -1801,6 +2510,7 @@ async def _investing_scrape_background(
     Executa investing scrape em background garantindo login/sessao persistida.
     """
     db = None
+    profiling_manager.job_started(job_id)
     try:
         db = next(get_db())
         job = db.query(ScrapingJob).filter(ScrapingJob.id == job_id).first()
@@ -1810,7 +2520,10 @@ async def _investing_scrape_background(
 
         job.status = "running"
         job.started_at = datetime.utcnow()
+        job.heartbeat_at = job.started_at
         db.commit()
+        job_heartbeat.register(job_id)
+        job_events.status_changed(job_id)
 
         if test_mode:
             await asyncio.sleep(test_duration_seconds)
@@ -1838,9 +2551,9 @@ async def _investing_scrape_background(
         base_metadata = job.metadata_json if isinstance(job.metadata_json, dict) else {}
         metadata = dict(base_metadata)
         metadata["flow"] = "investing"
-        metadata["result"] = result
         job.metadata_json = metadata
         flag_modified(job, "metadata_json")
+        save_job_result(db, job_id, result)
 
         if result.get("error"):
             job.status = "failed"
@@ -1864,5 +2577,8 @@ async def _investing_scrape_background(
                 job.completed_at = datetime.utcnow()
                 db.commit()
     finally:
+        profiling_manager.job_finished(job_id)
+        job_heartbeat.unregister(job_id)
+        job_events.status_changed(job_id)
         if db:
             db.close()
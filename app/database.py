@@ -2,9 +2,13 @@
 Configuração de conexão com o banco de dados PostgreSQL.
 """
 
-from sqlalchemy import create_engine, event, inspect, text
+from pathlib import Path
+from typing import Any, Optional
+
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import NullPool
+from app.metrics import pool_usage
 from config import settings
 import logging
 
@@ -15,13 +19,20 @@ database_url = settings.database_url
 if database_url.startswith("postgres://"):
     database_url = database_url.replace("postgres://", "postgresql://", 1)
 
+# connect_timeout e especifico do psycopg2; SQLite (testes/benchmarks) usa "timeout".
+if database_url.startswith("sqlite"):
+    connect_args = {"timeout": settings.request_timeout, "check_same_thread": False}
+else:
+    connect_args = {"connect_timeout": settings.request_timeout}
+
 # Criar engine do SQLAlchemy
 engine = create_engine(
     database_url,
     echo=settings.sqlalchemy_echo,
     poolclass=NullPool if settings.fastapi_env == "production" else None,
-    connect_args={"connect_timeout": settings.request_timeout}
+    connect_args=connect_args
 )
+pool_usage.attach(engine)
 
 # Criar session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -39,146 +50,82 @@ def get_db() -> Session:
         db.close()
 
 
-def init_db():
-    """
-    Inicializa o banco de dados criando todas as tabelas.
-    Deve ser chamado uma vez na inicialização da aplicação.
-    """
-    from app.models import Base
-    
-    try:
-        Base.metadata.create_all(bind=engine)
-        _ensure_profiles_full_name_column()
-        _ensure_interactions_post_url_column()
-        _ensure_interaction_type_view_value()
-        logger.info("✅ Banco de dados inicializado com sucesso")
-    except Exception as e:
-        logger.error(f"❌ Erro ao inicializar banco de dados: {e}")
-        raise
+# Revisao Alembic esperada por este codigo (atualizar junto com cada nova migracao;
+# test_schema_migrations confere contra migrations/versions).
+SCHEMA_HEAD_REVISION = "0009_profiles_username_lower_index"
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+# Chave do pg_advisory_lock que serializa migracoes entre replicas.
+MIGRATION_LOCK_KEY = 7_263_801
 
 
-def _ensure_profiles_full_name_column() -> None:
+def get_schema_revision() -> Optional[str]:
     """
-    Garante coluna full_name na tabela profiles para bases antigas.
+    Revisao registrada em alembic_version (uma unica query) ou None quando o banco
+    ainda nao e gerenciado por migracoes.
     """
     try:
-        inspector = inspect(engine)
-        if "profiles" not in inspector.get_table_names():
-            return
+        with engine.connect() as conn:
+            return conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except Exception:
+        return None
 
-        column_names = {col["name"] for col in inspector.get_columns("profiles")}
-        if "full_name" in column_names:
-            return
 
-        dialect = engine.dialect.name
-        with engine.begin() as conn:
-            if dialect == "postgresql":
-                conn.execute(text("ALTER TABLE profiles ADD COLUMN IF NOT EXISTS full_name VARCHAR(255)"))
-            else:
-                conn.execute(text("ALTER TABLE profiles ADD COLUMN full_name VARCHAR(255)"))
-        logger.info("✅ Coluna profiles.full_name criada com sucesso")
-    except Exception as e:
-        logger.warning("⚠️ Não foi possível garantir coluna profiles.full_name: %s", e)
+def _alembic_config(connection: Any = None) -> Any:
+    from alembic.config import Config
 
+    config = Config(str(PROJECT_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(PROJECT_ROOT / "migrations"))
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
 
-def _ensure_interactions_post_url_column() -> None:
+
+def run_migrations(target: str = "head") -> None:
     """
-    Garante coluna post_url e índice/unique em interactions para dedupe rápido.
+    Aplica as migracoes Alembic ate `target`. No Postgres, segura um advisory lock de
+    sessao para que apenas uma replica migre por vez (as demais esperam e encontram o
+    schema ja atualizado).
     """
-    try:
-        inspector = inspect(engine)
-        if "interactions" not in inspector.get_table_names():
-            return
-
-        column_names = {col["name"] for col in inspector.get_columns("interactions")}
-        dialect = engine.dialect.name
+    from alembic import command
+
+    use_lock = engine.dialect.name == "postgresql"
+    with engine.connect() as conn:
+        if use_lock:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            conn.commit()
+        try:
+            command.upgrade(_alembic_config(conn), target)
+            conn.commit()
+        finally:
+            if use_lock:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+                conn.commit()
 
-        with engine.begin() as conn:
-            if "post_url" not in column_names:
-                if dialect == "postgresql":
-                    conn.execute(text("ALTER TABLE interactions ADD COLUMN IF NOT EXISTS post_url VARCHAR(500)"))
-                else:
-                    conn.execute(text("ALTER TABLE interactions ADD COLUMN post_url VARCHAR(500)"))
-
-            if "comment_posted_at" not in column_names:
-                if dialect == "postgresql":
-                    conn.execute(text("ALTER TABLE interactions ADD COLUMN IF NOT EXISTS comment_posted_at VARCHAR(64)"))
-                else:
-                    conn.execute(text("ALTER TABLE interactions ADD COLUMN comment_posted_at VARCHAR(64)"))
-
-            # índice simples por post_url
-            try:
-                index_names = {idx["name"] for idx in inspector.get_indexes("interactions")}
-            except Exception:
-                index_names = set()
-            if "ix_interactions_post_url" not in index_names:
-                conn.execute(text("CREATE INDEX IF NOT EXISTS ix_interactions_post_url ON interactions (post_url)"))
-
-            # unique para dedupe por post_url + user_url + interaction_type
-            try:
-                unique_names = {uc["name"] for uc in inspector.get_unique_constraints("interactions")}
-            except Exception:
-                unique_names = set()
-            if "uq_interactions_post_url_user_url_type" not in unique_names:
-                conn.execute(
-                    text(
-                        "CREATE UNIQUE INDEX IF NOT EXISTS "
-                        "uq_interactions_post_url_user_url_type "
-                        "ON interactions (post_url, user_url, interaction_type)"
-                    )
-                )
-
-        logger.info("✅ Coluna/índices interactions.post_url garantidos com sucesso")
-    except Exception as e:
-        logger.warning("⚠️ Não foi possível garantir interactions.post_url: %s", e)
 
-
-def _ensure_interaction_type_view_value() -> None:
+def init_db():
     """
-    Garante que o enum interactiontype (PostgreSQL) contenha o valor VIEW/view
-    no mesmo padrao de caixa ja existente no enum.
+    Confere a versao do schema no startup (uma query em alembic_version).
+    Se estiver atras de SCHEMA_HEAD_REVISION, aplica as migracoes pendentes
+    (DATABASE_AUTO_MIGRATE=true) ou falha pedindo `alembic upgrade head`.
     """
     try:
-        if engine.dialect.name != "postgresql":
+        current = get_schema_revision()
+        if current == SCHEMA_HEAD_REVISION:
+            logger.info("✅ Schema do banco na versao %s", current)
             return
 
-        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
-            type_exists = conn.execute(
-                text(
-                    "SELECT 1 FROM pg_type WHERE typname = 'interactiontype' LIMIT 1"
-                )
-            ).scalar()
-            if not type_exists:
-                return
-
-            labels_rows = conn.execute(
-                text(
-                    """
-                    SELECT e.enumlabel
-                    FROM pg_type t
-                    JOIN pg_enum e ON e.enumtypid = t.oid
-                    WHERE t.typname = 'interactiontype'
-                    """
-                )
-            ).fetchall()
-            existing_labels = {str(row[0]) for row in labels_rows}
-
-            if "LIKE" in existing_labels:
-                target_label = "VIEW"
-            elif "like" in existing_labels:
-                target_label = "view"
-            else:
-                target_label = "VIEW"
-
-            if target_label not in existing_labels:
-                conn.execute(
-                    text(f"ALTER TYPE interactiontype ADD VALUE '{target_label}'")
-                )
-                logger.info("✅ Valor '%s' adicionado ao enum interactiontype", target_label)
-            else:
-                logger.info("✅ Enum interactiontype já contém valor '%s'", target_label)
+        if not getattr(settings, "database_auto_migrate", True):
+            raise RuntimeError(
+                f"Schema do banco desatualizado (atual={current or 'nenhuma'}, "
+                f"esperado={SCHEMA_HEAD_REVISION}). Rode `alembic upgrade head`."
+            )
+
+        logger.info("🔧 Aplicando migracoes do banco: %s -> %s", current or "nenhuma", SCHEMA_HEAD_REVISION)
+        run_migrations()
+        logger.info("✅ Banco de dados inicializado com sucesso")
     except Exception as e:
-        logger.warning("⚠️ Não foi possível garantir enum interactiontype com valor VIEW/view: %s", e)
+        logger.error(f"❌ Erro ao inicializar banco de dados: {e}")
+        raise
 
 
 def drop_db():
@@ -193,6 +140,8 @@ def drop_db():
     
     try:
         Base.metadata.drop_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
         logger.warning("⚠️ Banco de dados foi limpo")
     except Exception as e:
         logger.error(f"❌ Erro ao limpar banco de dados: {e}")
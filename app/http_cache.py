@@ -0,0 +1,75 @@
+"""
+Validadores HTTP (ETag / Last-Modified) e respostas 304.
+
+As ETags sao fracas (`W/"..."`) e derivadas de versoes ja presentes nas linhas lidas
+(`scraping_jobs.completed_at`, `profiles.updated_at`) mais os parametros da requisicao, de
+modo que a checagem condicional acontece antes das consultas pesadas. `profiles.updated_at`
+e renovado sempre que posts/interacoes do perfil sao gravados.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import orjson
+from fastapi import Response
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def weak_etag(*parts: Any) -> str:
+    digest = hashlib.sha256(orjson.dumps(parts, default=str)).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(_as_utc(value).replace(microsecond=0), usegmt=True)
+
+
+def _parse_http_date(value: str) -> Optional[datetime]:
+    try:
+        return _as_utc(parsedate_to_datetime(value))
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [item.strip() for item in if_none_match.split(",")]
+    if "*" in candidates:
+        return True
+    # Comparacao fraca (RFC 9110 13.1.2): ignora o prefixo W/.
+    opaque = etag.removeprefix("W/")
+    return any(candidate.removeprefix("W/") == opaque for candidate in candidates)
+
+
+def is_not_modified(
+    etag: str,
+    last_modified: Optional[datetime],
+    if_none_match: Optional[str],
+    if_modified_since: Optional[str],
+) -> bool:
+    """If-None-Match tem precedencia; If-Modified-Since so vale sem ele (RFC 9110 13.2.2)."""
+    if if_none_match:
+        return _etag_matches(if_none_match, etag)
+    if if_modified_since and last_modified is not None:
+        since = _parse_http_date(if_modified_since)
+        return since is not None and _as_utc(last_modified).replace(microsecond=0) <= since
+    return False
+
+
+def not_modified_response(headers: Dict[str, str]) -> Response:
+    return Response(status_code=304, headers=headers)
@@ -0,0 +1,134 @@
+"""
+Export em streaming das interacoes de um perfil (NDJSON ou CSV).
+
+As linhas vem de um cursor server-side (`yield_per`, que no Postgres/psycopg2 usa
+`stream_results`) ordenado por (created_at, id) e sao emitidas em blocos; a memoria do
+processo fica constante independente do tamanho do perfil.
+
+O gerador abre a propria sessao: a sessao do `Depends(get_db)` e fechada antes de o
+corpo de um StreamingResponse ser enviado.
+"""
+
+import csv
+import io
+from datetime import datetime
+from typing import Any, Callable, Iterator, Optional
+
+import orjson
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import Interaction, InteractionType
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+EXPORT_COLUMNS = (
+    "id",
+    "type",
+    "post_url",
+    "user_username",
+    "user_url",
+    "user_bio",
+    "user_is_private",
+    "user_follower_count",
+    "comment_text",
+    "comment_likes",
+    "comment_replies",
+    "comment_posted_at",
+    "created_at",
+)
+
+YIELD_PER = 1000
+
+
+def parse_interaction_type(value: Optional[str]) -> Optional[InteractionType]:
+    if not value:
+        return None
+    try:
+        return InteractionType(value.strip().lower())
+    except ValueError as exc:
+        allowed = ", ".join(item.value for item in InteractionType)
+        raise ValueError(f"interaction_type invalido: {value} (use {allowed})") from exc
+
+
+def build_export_query(
+    profile_id: str,
+    interaction_type: Optional[InteractionType] = None,
+    post_url: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Any:
+    statement = select(
+        Interaction.id,
+        Interaction.interaction_type,
+        Interaction.post_url,
+        Interaction.user_username,
+        Interaction.user_url,
+        Interaction.user_bio,
+        Interaction.user_is_private,
+        Interaction.user_follower_count,
+        Interaction.comment_text,
+        Interaction.comment_likes,
+        Interaction.comment_replies,
+        Interaction.comment_posted_at,
+        Interaction.created_at,
+    ).where(Interaction.profile_id == profile_id)
+    if interaction_type is not None:
+        statement = statement.where(Interaction.interaction_type == interaction_type)
+    if post_url:
+        statement = statement.where(Interaction.post_url == post_url)
+    if since is not None:
+        statement = statement.where(Interaction.created_at >= since)
+    if until is not None:
+        statement = statement.where(Interaction.created_at < until)
+    return statement.order_by(Interaction.created_at, Interaction.id).execution_options(yield_per=YIELD_PER)
+
+
+def _row_values(row: Any) -> tuple:
+    return (
+        row.id,
+        row.interaction_type.value if row.interaction_type is not None else None,
+        row.post_url,
+        row.user_username,
+        row.user_url,
+        row.user_bio,
+        row.user_is_private,
+        row.user_follower_count,
+        row.comment_text,
+        row.comment_likes,
+        row.comment_replies,
+        row.comment_posted_at,
+        row.created_at.isoformat() if row.created_at else None,
+    )
+
+
+def _iter_rows(session_factory: Callable[[], Session], statement: Any) -> Iterator[Any]:
+    db = session_factory()
+    try:
+        for partition in db.execute(statement).partitions():
+            yield partition
+    finally:
+        db.close()
+
+
+def iter_ndjson(session_factory: Callable[[], Session], statement: Any) -> Iterator[bytes]:
+    for partition in _iter_rows(session_factory, statement):
+        yield b"".join(
+            orjson.dumps(dict(zip(EXPORT_COLUMNS, _row_values(row)))) + b"\n" for row in partition
+        )
+
+
+def iter_csv(session_factory: Callable[[], Session], statement: Any) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for partition in _iter_rows(session_factory, statement):
+        writer.writerows(_row_values(row) for row in partition)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
@@ -0,0 +1,118 @@
+"""
+Coalescencia de jobs de scraping identicos.
+
+Cada POST /api/scrape recebe um fingerprint (URL normalizada, flow, sessao e opcoes com
+defaults aplicados) gravado em `scraping_jobs.request_fingerprint`. Antes de criar um job:
+
+- se existe job pending/running com o mesmo fingerprint, a requisicao e anexada a ele;
+- senao, se existe job completed com o mesmo fingerprint dentro de
+  SCRAPE_JOB_COALESCE_FRESH_SECONDS, o resultado dele e reaproveitado.
+
+O indice unico parcial `uq_scraping_jobs_inflight_fingerprint` (status pending/running) e
+o indice de jobs em voo: duas replicas que tentam criar o mesmo job ao mesmo tempo geram
+IntegrityError em uma delas, que entao se anexa ao job vencedor.
+"""
+
+import hashlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import orjson
+from sqlalchemy.orm import Session
+
+from app.models import ScrapingJob
+from config import settings
+
+IN_FLIGHT_STATUSES = ("pending", "running")
+
+# Campos que nao mudam o resultado do /scrape (compatibilidade e entrega por webhook).
+_IGNORED_OPTIONS = frozenset({"collect_like_user_profiles", "callback_url"})
+
+
+def scrape_request_fingerprint(request_payload: Dict[str, Any]) -> str:
+    """sha256 do payload normalizado (chaves ordenadas; campos ignorados removidos)."""
+    canonical = {key: value for key, value in request_payload.items() if key not in _IGNORED_OPTIONS}
+    return hashlib.sha256(orjson.dumps(canonical, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+def find_in_flight_job(db: Session, fingerprint: str) -> Optional[ScrapingJob]:
+    return (
+        db.query(ScrapingJob)
+        .filter(
+            ScrapingJob.request_fingerprint == fingerprint,
+            ScrapingJob.status.in_(IN_FLIGHT_STATUSES),
+        )
+        .first()
+    )
+
+
+def find_fresh_completed_job(
+    db: Session,
+    fingerprint: str,
+    now: Optional[datetime] = None,
+) -> Optional[ScrapingJob]:
+    fresh_seconds = int(getattr(settings, "scrape_job_coalesce_fresh_seconds", 600))
+    if fresh_seconds <= 0:
+        return None
+    cutoff = (now or datetime.utcnow()) - timedelta(seconds=fresh_seconds)
+    return (
+        db.query(ScrapingJob)
+        .filter(
+            ScrapingJob.request_fingerprint == fingerprint,
+            ScrapingJob.status == "completed",
+            ScrapingJob.completed_at >= cutoff,
+        )
+        .order_by(ScrapingJob.completed_at.desc())
+        .first()
+    )
+
+
+def find_coalescable_job(
+    db: Session,
+    fingerprint: str,
+    now: Optional[datetime] = None,
+) -> Tuple[Optional[ScrapingJob], Optional[str]]:
+    """Retorna (job, motivo) com motivo "in_flight" ou "fresh"; (None, None) se nao houver."""
+    job = find_in_flight_job(db, fingerprint)
+    if job is not None:
+        return job, "in_flight"
+    job = find_fresh_completed_job(db, fingerprint, now=now)
+    if job is not None:
+        return job, "fresh"
+    return None, None
+
+
+def find_coalescable_jobs(
+    db: Session,
+    fingerprints: Iterable[str],
+    now: Optional[datetime] = None,
+) -> Dict[str, Tuple[ScrapingJob, str]]:
+    """Versao em lote de `find_coalescable_job`: duas consultas IN para todos os fingerprints."""
+    wanted = set(fingerprints)
+    if not wanted:
+        return {}
+    found: Dict[str, Tuple[ScrapingJob, str]] = {}
+    in_flight = db.query(ScrapingJob).filter(
+        ScrapingJob.request_fingerprint.in_(wanted),
+        ScrapingJob.status.in_(IN_FLIGHT_STATUSES),
+    )
+    for job in in_flight:
+        found[job.request_fingerprint] = (job, "in_flight")
+
+    fresh_seconds = int(getattr(settings, "scrape_job_coalesce_fresh_seconds", 600))
+    remaining = wanted - set(found)
+    if fresh_seconds <= 0 or not remaining:
+        return found
+    cutoff = (now or datetime.utcnow()) - timedelta(seconds=fresh_seconds)
+    fresh = (
+        db.query(ScrapingJob)
+        .filter(
+            ScrapingJob.request_fingerprint.in_(remaining),
+            ScrapingJob.status == "completed",
+            ScrapingJob.completed_at >= cutoff,
+        )
+        .order_by(ScrapingJob.completed_at.desc())
+    )
+    for job in fresh:
+        found.setdefault(job.request_fingerprint, (job, "fresh"))
+    return found
@@ -0,0 +1,76 @@
+"""
+Eventos ao vivo dos jobs de scraping para o stream SSE (`GET /api/scrape/{job_id}/events`).
+
+- `job_events.status_changed(job_id)`: chamado pelos jobs em background apos gravar uma
+  transicao de status; os assinantes releem o status no banco (fonte da verdade).
+- `emit_progress(event, **data)`: progresso incremental (story coletado, post concluido)
+  emitido de dentro do scraper. Usa o trace corrente (`app.tracing`) para descobrir o job,
+  sem precisar passar o job_id pelas assinaturas do scraper.
+
+O hub e local ao processo. Um cliente conectado a outra replica ainda recebe as
+transicoes de status pelo polling leve do stream (SCRAPE_JOB_EVENTS_POLL_SECONDS), mas nao
+o progresso incremental.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Set, Tuple
+
+from app.tracing import current_trace
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBER_QUEUE_SIZE = 256
+
+JobEvent = Tuple[str, Optional[Dict[str, Any]]]
+
+
+class JobEventHub:
+    def __init__(self):
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    def subscribe(self, job_id: str) -> "asyncio.Queue[JobEvent]":
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(job_id)
+        if not queues:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[job_id]
+
+    def subscriber_count(self, job_id: str) -> int:
+        return len(self._subscribers.get(job_id, ()))
+
+    def publish(self, job_id: str, event: str, data: Optional[Dict[str, Any]] = None) -> None:
+        queues = self._subscribers.get(job_id)
+        if not queues:
+            return
+        for queue in list(queues):
+            if queue.full():
+                # Cliente lento: descarta o evento mais antigo em vez de bloquear o job.
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+            queue.put_nowait((event, data))
+
+    def status_changed(self, job_id: str) -> None:
+        self.publish(job_id, "status")
+
+
+job_events = JobEventHub()
+
+
+def emit_progress(event: str, **data: Any) -> None:
+    """Publica progresso do job do trace corrente; no-op fora de um job ou sem assinantes."""
+    trace = current_trace()
+    if trace is None:
+        return
+    try:
+        job_events.publish(trace.trace_id, event, data)
+    except Exception as exc:
+        logger.debug("Falha ao publicar progresso %s: %s", event, exc)
@@ -0,0 +1,297 @@
+"""
+Recuperacao de jobs de scraping orfaos com varias replicas.
+
+- Heartbeat: cada processo atualiza `scraping_jobs.heartbeat_at` dos jobs que esta
+  executando (um unico UPDATE por intervalo para todos os jobs locais).
+- Lease: um job "running" cujo heartbeat e mais velho que SCRAPE_JOB_LEASE_SECONDS pertence
+  a um processo que morreu. Jobs "pending" usam created_at, exceto os enfileirados em
+  memoria por um lote (/scrape/batch), que tambem recebem heartbeat enquanto esperam.
+- Lider: apenas a replica que obtiver `pg_try_advisory_lock` executa a varredura, que e um
+  unico UPDATE set-based (SQLite/processo unico: sempre lider).
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Set
+
+from sqlalchemy import and_, case, func, or_, text, update
+from sqlalchemy.orm import Session
+
+from app import database
+from app.models import ScrapingJob
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Chave do pg_try_advisory_lock que elege o lider do sweeper.
+SWEEPER_LOCK_KEY = 7_263_802
+
+STALE_RUNNING_MESSAGE = "Job interrompido: processo reiniciado ou timeout excedido durante execucao em background."
+STALE_PENDING_MESSAGE = "Job interrompido: processo reiniciado antes de iniciar execucao em background."
+
+
+def stale_job_error_message(status: str) -> str:
+    if status == "running":
+        return STALE_RUNNING_MESSAGE
+    if status == "pending":
+        return STALE_PENDING_MESSAGE
+    return "Job interrompido por estado inconsistente."
+
+
+def _cutoffs(now: datetime) -> Dict[str, datetime]:
+    lease_seconds = max(1, int(getattr(settings, "scrape_job_lease_seconds", 120)))
+    max_running_minutes = max(1, int(getattr(settings, "scrape_job_max_running_minutes", 30)))
+    max_pending_minutes = max(1, int(getattr(settings, "scrape_job_max_pending_minutes", 15)))
+    return {
+        "lease": now - timedelta(seconds=lease_seconds),
+        "running": now - timedelta(minutes=max_running_minutes),
+        "pending": now - timedelta(minutes=max_pending_minutes),
+    }
+
+
+def is_job_stale(job: ScrapingJob, now: datetime) -> bool:
+    """Mesmo criterio de `stale_jobs_clause`, para um job ja carregado."""
+    cutoffs = _cutoffs(now)
+    if job.status == "running":
+        if job.heartbeat_at is not None:
+            return job.heartbeat_at <= cutoffs["lease"]
+        running_since = job.started_at or job.created_at
+        return running_since is None or running_since <= cutoffs["running"]
+    if job.status == "pending":
+        if job.heartbeat_at is not None:
+            return job.heartbeat_at <= cutoffs["lease"]
+        return job.created_at is None or job.created_at <= cutoffs["pending"]
+    return False
+
+
+def stale_jobs_clause(now: datetime, force_recover_running: bool = False) -> Any:
+    cutoffs = _cutoffs(now)
+    running_since = func.coalesce(ScrapingJob.started_at, ScrapingJob.created_at)
+    if force_recover_running:
+        running_stale = ScrapingJob.status == "running"
+    else:
+        running_stale = and_(
+            ScrapingJob.status == "running",
+            or_(
+                ScrapingJob.heartbeat_at <= cutoffs["lease"],
+                and_(
+                    ScrapingJob.heartbeat_at.is_(None),
+                    or_(running_since.is_(None), running_since <= cutoffs["running"]),
+                ),
+            ),
+        )
+    pending_stale = and_(
+        ScrapingJob.status == "pending",
+        or_(
+            ScrapingJob.heartbeat_at <= cutoffs["lease"],
+            and_(
+                ScrapingJob.heartbeat_at.is_(None),
+                or_(ScrapingJob.created_at.is_(None), ScrapingJob.created_at <= cutoffs["pending"]),
+            ),
+        ),
+    )
+    return or_(running_stale, pending_stale)
+
+
+def sweep_stale_jobs(
+    db: Session,
+    now: Optional[datetime] = None,
+    force_recover_running: bool = False,
+) -> Dict[str, int]:
+    """
+    Marca jobs orfaos como failed em um unico UPDATE ... RETURNING.
+    Jobs que chegaram a rodar tem started_at; isso separa running/pending na contagem.
+    """
+    if not bool(getattr(settings, "scrape_job_stale_recovery_enabled", True)):
+        return {"running": 0, "pending": 0, "total": 0}
+
+    now = now or datetime.utcnow()
+    statement = (
+        update(ScrapingJob)
+        .where(stale_jobs_clause(now, force_recover_running=force_recover_running))
+        .values(
+            status="failed",
+            completed_at=now,
+            error_message=func.coalesce(
+                ScrapingJob.error_message,
+                case((ScrapingJob.status == "running", STALE_RUNNING_MESSAGE), else_=STALE_PENDING_MESSAGE),
+            ),
+        )
+        .returning(ScrapingJob.id, ScrapingJob.started_at)
+        .execution_options(synchronize_session=False)
+    )
+    rows = db.execute(statement).all()
+    db.commit()
+
+    running = sum(1 for row in rows if row.started_at is not None)
+    return {"running": running, "pending": len(rows) - running, "total": len(rows)}
+
+
+class JobHeartbeat:
+    """Jobs em execucao (ou na fila de um lote) neste processo; `beat()` renova o lease com um UPDATE."""
+
+    def __init__(self):
+        self._job_ids: Set[str] = set()
+
+    def register(self, job_id: str) -> None:
+        self._job_ids.add(job_id)
+
+    def unregister(self, job_id: str) -> None:
+        self._job_ids.discard(job_id)
+
+    @property
+    def job_ids(self) -> Set[str]:
+        return set(self._job_ids)
+
+    def beat(self, db: Session, now: Optional[datetime] = None) -> int:
+        job_ids = list(self._job_ids)
+        if not job_ids:
+            return 0
+        result = db.execute(
+            update(ScrapingJob)
+            .where(ScrapingJob.id.in_(job_ids), ScrapingJob.status.in_(("pending", "running")))
+            .values(heartbeat_at=now or datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return int(result.rowcount or 0)
+
+
+class LeaderLock:
+    """
+    Lideranca via pg_try_advisory_lock, mantida numa conexao dedicada enquanto o processo
+    estiver vivo. Se a conexao cair, o lock e liberado pelo Postgres e outra replica assume.
+    """
+
+    def __init__(self, key: int = SWEEPER_LOCK_KEY):
+        self.key = key
+        self._connection: Any = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._connection is not None or database.engine.dialect.name != "postgresql"
+
+    def acquire(self) -> bool:
+        engine = database.engine
+        if engine.dialect.name != "postgresql":
+            return True
+
+        if self._connection is not None:
+            try:
+                self._connection.execute(text("SELECT 1"))
+                self._connection.commit()
+                return True
+            except Exception as exc:
+                logger.warning("⚠️ Conexao do lider perdida; tentando reeleicao: %s", exc)
+                self._discard_connection()
+
+        connection = engine.connect()
+        try:
+            acquired = bool(
+                connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}).scalar()
+            )
+            connection.commit()
+        except Exception as exc:
+            connection.close()
+            logger.warning("⚠️ Falha ao tentar lideranca do sweeper: %s", exc)
+            return False
+
+        if not acquired:
+            connection.close()
+            return False
+        self._connection = connection
+        logger.info("👑 Este processo e o lider do sweeper de jobs")
+        return True
+
+    def _discard_connection(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is None:
+            return
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def release(self) -> None:
+        if self._connection is None:
+            return
+        try:
+            self._connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+            self._connection.commit()
+        except Exception:
+            pass
+        self._discard_connection()
+
+
+class StaleJobSweeper:
+    """Loop em background: heartbeat dos jobs locais e, se lider, varredura de jobs orfaos."""
+
+    def __init__(
+        self,
+        heartbeat: JobHeartbeat,
+        leader: LeaderLock,
+        session_factory: Optional[Callable[[], Session]] = None,
+    ):
+        self.heartbeat = heartbeat
+        self.leader = leader
+        self._session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+        self._last_sweep = 0.0
+
+    def _new_session(self) -> Session:
+        factory = self._session_factory or database.SessionLocal
+        return factory()
+
+    def run_once(self, force_recover_running: bool = False, sweep: bool = True) -> Dict[str, int]:
+        """Um ciclo sincrono (heartbeat + varredura se lider). Executado via asyncio.to_thread."""
+        db = self._new_session()
+        try:
+            self.heartbeat.beat(db)
+            if not sweep or not self.leader.acquire():
+                return {"running": 0, "pending": 0, "total": 0}
+            self._last_sweep = time.monotonic()
+            recovered = sweep_stale_jobs(db, force_recover_running=force_recover_running)
+            if recovered["total"]:
+                logger.warning(
+                    "⚠️ Recovery de jobs stale: running=%s pending=%s total=%s",
+                    recovered["running"],
+                    recovered["pending"],
+                    recovered["total"],
+                )
+            return recovered
+        finally:
+            db.close()
+
+    async def _run(self) -> None:
+        heartbeat_interval = max(1, int(getattr(settings, "scrape_job_heartbeat_interval_seconds", 30)))
+        sweep_interval = max(1, int(getattr(settings, "scrape_job_sweep_interval_seconds", 60)))
+        force_first = bool(getattr(settings, "scrape_job_recover_running_on_startup", False))
+        first = True
+        while True:
+            try:
+                due = first or time.monotonic() - self._last_sweep >= sweep_interval
+                await asyncio.to_thread(self.run_once, force_first and first, due)
+            except Exception as exc:
+                logger.warning("⚠️ Falha no ciclo do sweeper de jobs: %s", exc)
+            first = False
+            await asyncio.sleep(min(heartbeat_interval, sweep_interval))
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await asyncio.to_thread(self.leader.release)
+
+
+job_heartbeat = JobHeartbeat()
+job_sweeper = StaleJobSweeper(job_heartbeat, LeaderLock())
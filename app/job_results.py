@@ -0,0 +1,106 @@
+"""
+Resultados de jobs de scraping fora da linha de `scraping_jobs`.
+
+O `result` completo de um job (viewers de stories, curtidores, comentarios) pode ter
+varios MB. Ele fica em `scraping_job_results`, serializado com orjson e comprimido
+(gzip por padrao; zstd se SCRAPE_JOB_RESULT_COMPRESSION=zstd e o pacote `zstandard`
+estiver instalado). `scraping_jobs.metadata` guarda apenas request/flow/options/timeline,
+entao o polling de status le uma linha pequena; o resultado so e lido pelos endpoints
+de resultados.
+
+Jobs concluidos antes desta tabela continuam com `metadata["result"]`; `load_job_result`
+usa esse valor como fallback.
+"""
+
+import gzip
+import logging
+from typing import Any, Optional, Tuple
+
+import orjson
+from sqlalchemy.orm import Session
+
+from app.models import ScrapingJob, ScrapingJobResult
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+_zstd_fallback_logged = False
+
+
+def _zstandard() -> Any:
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def _configured_encoding() -> str:
+    global _zstd_fallback_logged
+    encoding = str(getattr(settings, "scrape_job_result_compression", "gzip") or "gzip").strip().lower()
+    if encoding == "none":
+        return "identity"
+    if encoding == "zstd":
+        if _zstandard() is not None:
+            return "zstd"
+        if not _zstd_fallback_logged:
+            logger.warning("⚠️ SCRAPE_JOB_RESULT_COMPRESSION=zstd sem o pacote zstandard; usando gzip")
+            _zstd_fallback_logged = True
+    return "gzip"
+
+
+def encode_result(result: Any, encoding: Optional[str] = None) -> Tuple[str, bytes, int]:
+    """Serializa e comprime; retorna (encoding, payload, tamanho descomprimido)."""
+    raw = orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS)
+    encoding = encoding or _configured_encoding()
+    if encoding == "zstd":
+        zstandard = _zstandard()
+        if zstandard is None:
+            raise RuntimeError("Compressao zstd requer o pacote zstandard")
+        return encoding, zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw), len(raw)
+    if encoding == "gzip":
+        return encoding, gzip.compress(raw, compresslevel=GZIP_LEVEL, mtime=0), len(raw)
+    if encoding == "identity":
+        return encoding, raw, len(raw)
+    raise RuntimeError(f"Encoding de resultado desconhecido: {encoding}")
+
+
+def decode_result(encoding: str, payload: bytes) -> Any:
+    if encoding == "gzip":
+        raw = gzip.decompress(payload)
+    elif encoding == "zstd":
+        zstandard = _zstandard()
+        if zstandard is None:
+            raise RuntimeError("Resultado comprimido com zstd; instale o pacote zstandard para le-lo")
+        raw = zstandard.ZstdDecompressor().decompress(payload)
+    elif encoding == "identity":
+        raw = payload
+    else:
+        raise RuntimeError(f"Encoding de resultado desconhecido: {encoding}")
+    return orjson.loads(raw)
+
+
+def save_job_result(db: Session, job_id: str, result: Any) -> ScrapingJobResult:
+    """Grava (ou substitui) o resultado do job; o commit fica com o chamador."""
+    encoding, payload, raw_size = encode_result(result)
+    row = db.get(ScrapingJobResult, job_id)
+    if row is None:
+        row = ScrapingJobResult(job_id=job_id)
+        db.add(row)
+    row.encoding = encoding
+    row.payload = payload
+    row.raw_size = raw_size
+    row.stored_size = len(payload)
+    return row
+
+
+def load_job_result(db: Session, job: ScrapingJob) -> Any:
+    """Resultado do job (tabela dedicada ou, para jobs antigos, metadata["result"])."""
+    row = db.get(ScrapingJobResult, job.id)
+    if row is not None:
+        return decode_result(row.encoding, row.payload)
+    metadata = job.metadata_json if isinstance(job.metadata_json, dict) else {}
+    return metadata.get("result")
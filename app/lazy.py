@@ -0,0 +1,56 @@
+"""
+Singletons criados sob demanda.
+
+Os objetos de scraping (BrowserUseAgent, InstagramScraper, AIExtractor) eram instanciados
+no import do modulo. `LazySingleton` mantem o mesmo nome importavel
+(`from app.scraper.browser_use_agent import browser_use_agent`) e repassa atributos para a
+instancia real, que so e criada no primeiro acesso ou quando o lifespan chama `initialize()`.
+"""
+
+import threading
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LazySingleton(Generic[T]):
+    """Proxy para uma instancia criada na primeira utilizacao (thread-safe)."""
+
+    __slots__ = ("_factory", "_name", "_instance", "_lock")
+
+    def __init__(self, factory: Callable[[], T], name: str):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def initialize(self) -> T:
+        instance: Optional[T] = self._instance
+        if instance is None:
+            with self._lock:
+                instance = self._instance
+                if instance is None:
+                    instance = self._factory()
+                    object.__setattr__(self, "_instance", instance)
+        return instance
+
+    @property
+    def initialized(self) -> bool:
+        return self._instance is not None
+
+    def reset(self) -> None:
+        """Descarta a instancia atual (a proxima utilizacao cria outra)."""
+        object.__setattr__(self, "_instance", None)
+
+    def __getattr__(self, item: str) -> Any:
+        return getattr(self.initialize(), item)
+
+    def __setattr__(self, item: str, value: Any) -> None:
+        setattr(self.initialize(), item, value)
+
+    def __delattr__(self, item: str) -> None:
+        delattr(self.initialize(), item)
+
+    def __repr__(self) -> str:
+        state = "initialized" if self._instance is not None else "pending"
+        return f"<LazySingleton {self._name} ({state})>"
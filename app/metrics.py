@@ -0,0 +1,411 @@
+"""
+Metricas no formato texto do Prometheus (exposition format 0.0.4), sem dependencias externas.
+
+Os coletores sao singletons de modulo; o endpoint GET /metrics chama
+`registry.render()`. Metricas "de leitura" (ex.: pool do banco) entram via
+`registry.register_collector`, avaliado a cada scrape.
+"""
+
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+JOB_DURATION_BUCKETS = (5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 900.0, 1800.0, 3600.0)
+BATCH_SIZE_BUCKETS = (1.0, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape_label_value(str(value))}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{_escape_label_value(extra[1])}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: Dict[str, object]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Metrica {self.name} espera labels {self.labelnames}, recebeu {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        if amount < 0:
+            raise ValueError("Counter so pode aumentar")
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: object) -> float:
+        return self._values.get(self._label_values(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(_Metric):
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: object) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: object) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: object) -> float:
+        return self._values.get(self._label_values(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(bucket) for bucket in buckets))
+        # Por serie: contagem por bucket (nao cumulativa), soma e total.
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            counts, totals = self._series.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0, 0.0]))
+            index = len(self.buckets)
+            for position, bound in enumerate(self.buckets):
+                if value <= bound:
+                    index = position
+                    break
+            counts[index] += 1
+            totals[0] += value
+            totals[1] += 1
+
+    @contextmanager
+    def time(self, **labels: object) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: object) -> int:
+        series = self._series.get(self._label_values(labels))
+        return int(series[1][1]) if series else 0
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            items = sorted((key, (list(counts), list(totals))) for key, (counts, totals) in self._series.items())
+        for key, (counts, totals) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            base_labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{base_labels} {_format_value(totals[0])}")
+            lines.append(f"{self.name}_count{base_labels} {_format_value(totals[1])}")
+        return lines
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class MetricsRegistry:
+    """Conjunto de metricas do processo + coletores avaliados no momento do scrape."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))  # type: ignore[return-value]
+
+    def register_collector(self, collector: Callable[[], None]) -> None:
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in list(self._collectors):
+            try:
+                collector()
+            except Exception as exc:
+                logger.warning("Falha ao coletar metricas (%s): %s", getattr(collector, "__name__", collector), exc)
+        lines: List[str] = []
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda item: item.name)
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Zera todas as series (usado em testes)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+
+registry = MetricsRegistry()
+
+# ==================== Jobs ====================
+
+SCRAPE_JOBS_TOTAL = registry.counter(
+    "scrape_jobs_total",
+    "Jobs de scraping finalizados por fluxo e status.",
+    ("flow", "status"),
+)
+SCRAPE_JOBS_IN_PROGRESS = registry.gauge(
+    "scrape_jobs_in_progress",
+    "Jobs de scraping em execucao neste processo.",
+    ("flow",),
+)
+SCRAPE_JOBS_COALESCED_TOTAL = registry.counter(
+    "scrape_jobs_coalesced_total",
+    "Requisicoes /api/scrape anexadas a um job identico (in_flight ou fresh).",
+    ("reason",),
+)
+SCRAPE_JOB_DURATION_SECONDS = registry.histogram(
+    "scrape_job_duration_seconds",
+    "Duracao dos jobs de scraping (running -> completed/failed).",
+    ("flow", "status"),
+    buckets=JOB_DURATION_BUCKETS,
+)
+WEBHOOK_DELIVERIES_TOTAL = registry.counter(
+    "webhook_deliveries_total",
+    "Eventos de webhook de conclusao por resultado (delivered/retry/failed).",
+    ("result",),
+)
+
+# ==================== Browserless / navegador ====================
+
+BROWSERLESS_REQUEST_DURATION_SECONDS = registry.histogram(
+    "browserless_request_duration_seconds",
+    "Latencia das requisicoes HTTP ao Browserless (sem a espera do semaforo).",
+    ("endpoint",),
+)
+BROWSERLESS_REQUEST_ERRORS_TOTAL = registry.counter(
+    "browserless_request_errors_total",
+    "Respostas nao-200 e falhas de rede do Browserless por endpoint e codigo.",
+    ("endpoint", "code"),
+)
+BROWSERLESS_SEMAPHORE_WAIT_SECONDS = registry.histogram(
+    "browserless_semaphore_wait_seconds",
+    "Espera pelo semaforo de concorrencia do BrowserlessClient.",
+)
+INSTAGRAM_TAB_SEMAPHORE_WAIT_SECONDS = registry.histogram(
+    "instagram_tab_semaphore_wait_seconds",
+    "Espera por uma aba livre (semaforo por conta + fila de abas) no recent_likes.",
+)
+BROWSER_CDP_CONNECT_SECONDS = registry.histogram(
+    "browser_cdp_connect_seconds",
+    "Tempo para conectar/iniciar a sessao CDP.",
+    ("result",),
+)
+BROWSER_AGENT_STARTUP_SECONDS = registry.histogram(
+    "browser_agent_startup_seconds",
+    "Tempo entre agent.run() e o primeiro passo (conexao CDP + setup do navegador).",
+    ("stage",),
+)
+
+# ==================== OpenAI ====================
+
+OPENAI_REQUEST_DURATION_SECONDS = registry.histogram(
+    "openai_request_duration_seconds",
+    "Latencia das chamadas de LLM.",
+    ("client", "model"),
+)
+OPENAI_TOKENS_TOTAL = registry.counter(
+    "openai_tokens_total",
+    "Tokens consumidos por cliente e tipo (prompt/completion).",
+    ("client", "kind"),
+)
+OPENAI_RATE_LIMITED_TOTAL = registry.counter(
+    "openai_rate_limited_total",
+    "Chamadas de LLM rejeitadas por rate limit (429).",
+    ("client",),
+)
+
+# ==================== Banco ====================
+
+DB_POOL_CONNECTIONS = registry.gauge(
+    "db_pool_connections",
+    "Conexoes do banco por estado (open/checked_out/checked_in; size/overflow so em pools com tamanho fixo).",
+    ("state",),
+)
+DB_PERSIST_BATCH_SIZE = registry.histogram(
+    "db_persist_batch_size",
+    "Quantidade de linhas por lote de persistencia.",
+    ("kind",),
+    buckets=BATCH_SIZE_BUCKETS,
+)
+
+
+def record_llm_usage(client: str, usage: object) -> None:
+    """Soma tokens a partir de um objeto `usage` (OpenAI ou browser-use)."""
+    if usage is None:
+        return
+    prompt_tokens = getattr(usage, "prompt_tokens", None) or 0
+    completion_tokens = getattr(usage, "completion_tokens", None) or 0
+    if prompt_tokens:
+        OPENAI_TOKENS_TOTAL.inc(float(prompt_tokens), client=client, kind="prompt")
+    if completion_tokens:
+        OPENAI_TOKENS_TOTAL.inc(float(completion_tokens), client=client, kind="completion")
+
+
+class PoolUsageTracker:
+    """
+    Conexoes abertas e em uso contadas por eventos do pool. Funciona com qualquer poolclass;
+    com NullPool (producao) o pool nao expoe size()/checkedout().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open = 0
+        self.checked_out = 0
+
+    def _add(self, field: str, amount: int) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + amount)
+
+    def attach(self, engine: Any) -> None:
+        event.listen(engine, "connect", lambda *args: self._add("open", 1))
+        event.listen(engine, "close", lambda *args: self._add("open", -1))
+        # Conexao desanexada do pool deixa de ser contada aqui (fecha via close_detached).
+        event.listen(engine, "detach", lambda *args: self._add("open", -1))
+        event.listen(engine, "checkout", lambda *args: self._add("checked_out", 1))
+        event.listen(engine, "checkin", lambda *args: self._add("checked_out", -1))
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "open": self.open,
+                "checked_out": self.checked_out,
+                "checked_in": max(0, self.open - self.checked_out),
+            }
+
+
+pool_usage = PoolUsageTracker()
+
+
+def collect_db_pool_metrics() -> None:
+    from app.database import engine
+
+    for state, value in pool_usage.snapshot().items():
+        DB_POOL_CONNECTIONS.set(float(value), state=state)
+    for state, reader in (("size", "size"), ("overflow", "overflow")):
+        method = getattr(engine.pool, reader, None)
+        if callable(method):
+            DB_POOL_CONNECTIONS.set(float(method()), state=state)
+
+
+registry.register_collector(collect_db_pool_metrics)
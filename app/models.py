@@ -2,7 +2,7 @@
 Modelos SQLAlchemy para persistência de dados do Instagram.
 """
 
-from sqlalchemy import Column, String, Integer, Text, Boolean, DateTime, ForeignKey, JSON, Enum, UniqueConstraint
+from sqlalchemy import Column, String, Integer, Text, Boolean, DateTime, ForeignKey, JSON, Enum, Index, UniqueConstraint, LargeBinary, text, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -41,6 +41,11 @@ class Profile(Base):
     last_scraped_at = Column(DateTime, nullable=True)
     metadata_json = Column("metadata", JSON, nullable=True)
 
+    __table_args__ = (
+        # Buscas por func.lower(instagram_username) (app/profile_cache.py, _save_profile).
+        Index("ix_profiles_instagram_username_lower", func.lower(instagram_username)),
+    )
+
     # Relacionamentos
     posts = relationship("Post", back_populates="profile", cascade="all, delete-orphan")
     interactions = relationship("Interaction", back_populates="profile", cascade="all, delete-orphan")
@@ -53,6 +58,10 @@ class Profile(Base):
 class Post(Base):
     """Modelo para posts do Instagram."""
     __tablename__ = "posts"
+    __table_args__ = (
+        # Paginacao por keyset dos posts de um perfil (app/pagination.py).
+        Index("ix_posts_profile_id_created_at_id", "profile_id", "created_at", "id"),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     profile_id = Column(String(36), ForeignKey("profiles.id"), nullable=False, index=True)
@@ -87,6 +96,8 @@ class Interaction(Base):
             "interaction_type",
             name="uq_interactions_post_url_user_url_type",
         ),
+        # Paginacao por keyset das interacoes de um perfil (app/pagination.py).
+        Index("ix_interactions_profile_id_created_at_id", "profile_id", "created_at", "id"),
     )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -118,22 +129,89 @@ class Interaction(Base):
 class ScrapingJob(Base):
     """Modelo para rastrear jobs de scraping."""
     __tablename__ = "scraping_jobs"
+    __table_args__ = (
+        Index("ix_scraping_jobs_status_heartbeat_at", "status", "heartbeat_at"),
+        Index("ix_scraping_jobs_request_fingerprint", "request_fingerprint", "completed_at"),
+        # Indice de jobs em voo: no maximo um job pending/running por fingerprint.
+        Index(
+            "uq_scraping_jobs_inflight_fingerprint",
+            "request_fingerprint",
+            unique=True,
+            postgresql_where=text("status IN ('pending', 'running')"),
+            sqlite_where=text("status IN ('pending', 'running')"),
+        ),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     profile_url = Column(String(500), nullable=False)
     status = Column(String(50), default="pending")  # pending, running, completed, failed
     started_at = Column(DateTime, nullable=True)
+    # Atualizado periodicamente pelo processo que executa o job (lease de execucao).
+    heartbeat_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
     error_message = Column(Text, nullable=True)
     posts_scraped = Column(Integer, default=0)
     interactions_scraped = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
     metadata_json = Column("metadata", JSON, nullable=True)
+    # sha256 da requisicao normalizada (app/job_coalescing.py); NULL para jobs nao coalesciveis.
+    request_fingerprint = Column(String(64), nullable=True)
 
     def __repr__(self):
         return f"<ScrapingJob(url={self.profile_url}, status={self.status})>"
 
 
+class ScrapingJobResult(Base):
+    """Resultado completo de um job, comprimido e fora da linha de scraping_jobs."""
+    __tablename__ = "scraping_job_results"
+
+    job_id = Column(String(36), ForeignKey("scraping_jobs.id", ondelete="CASCADE"), primary_key=True)
+    encoding = Column(String(16), nullable=False)  # gzip, zstd, identity
+    payload = Column(LargeBinary, nullable=False)
+    raw_size = Column(Integer, nullable=False)
+    stored_size = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ScrapingJobResult(job={self.job_id}, encoding={self.encoding}, bytes={self.stored_size})>"
+
+
+class ScrapingBatchJob(Base):
+    """Membro de um lote do POST /scrape/batch (um job pode estar em varios lotes via coalescencia)."""
+    __tablename__ = "scraping_batch_jobs"
+
+    batch_id = Column(String(36), primary_key=True)
+    job_id = Column(String(36), ForeignKey("scraping_jobs.id", ondelete="CASCADE"), primary_key=True)
+    position = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ScrapingBatchJob(batch={self.batch_id}, job={self.job_id})>"
+
+
+class WebhookDelivery(Base):
+    """Outbox de webhooks de conclusao: uma linha por (job, callback_url)."""
+    __tablename__ = "webhook_outbox"
+    __table_args__ = (
+        UniqueConstraint("job_id", "callback_url", name="uq_webhook_outbox_job_callback"),
+        Index("ix_webhook_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    job_id = Column(String(36), ForeignKey("scraping_jobs.id", ondelete="CASCADE"), nullable=False)
+    callback_url = Column(String(1000), nullable=False)
+    status = Column(String(20), nullable=False, default="pending")  # pending, delivered, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    # Enviada quando o job termina e next_attempt_at <= agora (backoff entre tentativas).
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    delivered_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<WebhookDelivery(job={self.job_id}, status={self.status}, attempts={self.attempts})>"
+
+
 class InstagramSession(Base):
     """SessÃµes autenticadas do Instagram para reutilizaÃ§Ã£o."""
     __tablename__ = "instagram_sessions"
@@ -0,0 +1,62 @@
+"""
+Paginacao por keyset (cursor) ordenada por (created_at, id).
+
+O cursor e opaco para o cliente: base64url de `[created_at ISO, id]` da ultima linha da
+pagina. A proxima pagina filtra `(created_at, id) > cursor`, que usa os indices
+compostos `(<fk>, created_at, id)` e custa o mesmo em qualquer profundidade.
+"""
+
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, Optional, Sequence, Tuple
+
+import orjson
+from sqlalchemy import and_, or_
+
+
+class InvalidCursorError(ValueError):
+    """Cursor malformado ou adulterado."""
+
+
+def encode_cursor(created_at: Optional[datetime], row_id: str) -> str:
+    payload = orjson.dumps([created_at.isoformat() if created_at else None, row_id])
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = orjson.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(row_id, str):
+            raise TypeError("id")
+        return (datetime.fromisoformat(created_at) if created_at else None), row_id
+    except (binascii.Error, orjson.JSONDecodeError, TypeError, ValueError, UnicodeEncodeError) as exc:
+        raise InvalidCursorError("Cursor de paginacao invalido") from exc
+
+
+def apply_keyset(query: Any, created_at_column: Any, id_column: Any, cursor: Optional[str]) -> Any:
+    """Ordena por (created_at, id) e, com cursor, retorna apenas linhas posteriores a ele."""
+    query = query.order_by(created_at_column, id_column)
+    if not cursor:
+        return query
+    created_at, row_id = decode_cursor(cursor)
+    if created_at is None:
+        return query.filter(created_at_column.is_(None), id_column > row_id)
+    return query.filter(
+        or_(
+            created_at_column > created_at,
+            and_(created_at_column == created_at, id_column > row_id),
+        )
+    )
+
+
+def next_cursor(rows: Sequence[Any], limit: int) -> Optional[str]:
+    """
+    Cursor da proxima pagina. Espera `limit + 1` linhas consultadas: a linha extra so indica
+    que ha mais resultados e deve ser descartada pelo chamador.
+    """
+    if len(rows) <= limit:
+        return None
+    last = rows[limit - 1]
+    return encode_cursor(last.created_at, last.id)
@@ -0,0 +1,81 @@
+"""
+Cache read-through de perfis por username normalizado (minusculo, sem @).
+
+Guarda `ProfileResponse` (snapshot imutavel, sem sessao do SQLAlchemy) num TTLCache local
+ao processo. `InstagramScraper._save_profile` invalida a entrada no processo que grava;
+as demais replicas enxergam a mudanca em ate PROFILE_LOOKUP_CACHE_SECONDS. Perfis
+inexistentes nao sao cacheados (o proximo acesso normalmente dispara um scrape).
+
+Consultas no banco usam `lower(instagram_username)`, coberto pelo indice funcional
+`ix_profiles_instagram_username_lower`.
+"""
+
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models import Profile
+from app.schemas import ProfileResponse
+from app.ttl_cache import TTLCache
+from config import settings
+
+
+_BOOLEAN_FIELDS = ("is_private", "verified")
+
+
+def normalize_username(username: Optional[str]) -> str:
+    return (username or "").strip().lstrip("@").lower()
+
+
+def profile_snapshot(profile: Profile) -> ProfileResponse:
+    """Snapshot tolerante: `_save_profile` pode gravar NULL em is_private/verified."""
+    data = {field: getattr(profile, field) for field in ProfileResponse.model_fields}
+    for field in _BOOLEAN_FIELDS:
+        data[field] = bool(data[field])
+    return ProfileResponse.model_validate(data)
+
+
+class ProfileLookupCache:
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self._cache: TTLCache[ProfileResponse] = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+
+    def get(
+        self,
+        db: Session,
+        username: Optional[str],
+        profile_url: Optional[str] = None,
+    ) -> Optional[ProfileResponse]:
+        """Snapshot do perfil; no miss consulta por username e, se informado, por profile_url."""
+        key = normalize_username(username)
+        cached = self._cache.get(key) if key else None
+        if cached is not None:
+            return cached
+
+        profile = None
+        if key:
+            profile = db.query(Profile).filter(func.lower(Profile.instagram_username) == key).first()
+        if profile is None and profile_url:
+            profile = db.query(Profile).filter(Profile.instagram_url == profile_url).first()
+        if profile is None:
+            return None
+
+        snapshot = profile_snapshot(profile)
+        # Chave pelo username gravado: um match por URL nao fica sob outro username.
+        self._cache.set(normalize_username(snapshot.instagram_username), snapshot)
+        return snapshot
+
+    def invalidate(self, *usernames: Optional[str]) -> None:
+        for username in usernames:
+            key = normalize_username(username)
+            if key:
+                self._cache.invalidate(key)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+profile_cache = ProfileLookupCache(
+    maxsize=int(getattr(settings, "profile_lookup_cache_size", 10000)),
+    ttl_seconds=float(getattr(settings, "profile_lookup_cache_seconds", 300)),
+)
@@ -0,0 +1,279 @@
+"""
+Profiling sob demanda para workers em producao (acionado pelos endpoints /api/admin/profiling).
+
+Modos:
+- "cprofile": cProfile na thread do event loop; gera `.prof` (pstats/snakeviz) e `.txt`.
+- "sampler": amostrador de pilha em thread separada (sys._current_frames) com overhead
+  baixo; gera `.folded` (flamegraph) e `.txt` com as funcoes mais frequentes.
+
+Escopos:
+- janela de N segundos (`start_window`);
+- um job especifico (`arm_job`): o profiler liga quando o job inicia (ou imediatamente,
+  se ja estiver rodando) e desliga ao terminar. Como todos os jobs dividem o mesmo
+  event loop, trabalho de jobs concorrentes tambem aparece no perfil.
+
+Apenas um profiler ativo por processo. Saida em `.artifacts/profiling/`, ao lado de
+`.artifacts/stories-debug/`.
+"""
+
+import asyncio
+import cProfile
+import io
+import logging
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILING_MODES = ("cprofile", "sampler")
+
+
+def _artifacts_dir() -> Path:
+    return Path(__file__).resolve().parents[1] / ".artifacts" / "profiling"
+
+
+def _safe_label(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "-", value).strip("-")[:80] or "profile"
+
+
+class _StackSampler:
+    """Amostra a pilha de uma thread em intervalo fixo e agrega pilhas identicas."""
+
+    def __init__(self, thread_id: int, interval_seconds: float):
+        self.thread_id = thread_id
+        self.interval_seconds = max(0.001, interval_seconds)
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiling-sampler", daemon=True)
+
+    @staticmethod
+    def _frame_label(frame: Any) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack: List[str] = []
+            while frame is not None:
+                stack.append(self._frame_label(frame))
+                frame = frame.f_back
+            stack.reverse()
+            self.stacks[tuple(stack)] += 1
+            self.samples += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+    def folded(self) -> str:
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top_report(self, limit: int = 60) -> str:
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        for stack, count in self.stacks.items():
+            if stack:
+                self_counts[stack[-1]] += count
+            for label in set(stack):
+                total_counts[label] += count
+        total = max(1, self.samples)
+        lines = [f"amostras={self.samples} intervalo_ms={self.interval_seconds * 1000:.1f}", ""]
+        lines.append("self%    total%   funcao")
+        for label, count in self_counts.most_common(limit):
+            lines.append(f"{count * 100 / total:6.2f}  {total_counts[label] * 100 / total:6.2f}   {label}")
+        return "\n".join(lines) + "\n"
+
+
+class _ActiveProfile:
+    def __init__(self, mode: str, label: str, job_id: Optional[str], seconds: Optional[float]):
+        self.mode = mode
+        self.label = label
+        self.job_id = job_id
+        self.seconds = seconds
+        self.started_at = datetime.utcnow()
+        self._started_perf = time.perf_counter()
+        self.profiler: Optional[cProfile.Profile] = None
+        self.sampler: Optional[_StackSampler] = None
+        self.stop_task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self.mode == "cprofile":
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        else:
+            interval_ms = float(getattr(settings, "profiling_sampler_interval_ms", 10) or 10)
+            self.sampler = _StackSampler(threading.get_ident(), interval_ms / 1000.0)
+            self.sampler.start()
+
+    def stop(self) -> List[str]:
+        """Desliga o profiler e grava os artefatos; retorna os caminhos gerados."""
+        elapsed = time.perf_counter() - self._started_perf
+        output_dir = _artifacts_dir()
+        output_dir.mkdir(parents=True, exist_ok=True)
+        stem = f"{self.started_at.strftime('%Y%m%dT%H%M%S')}_{_safe_label(self.label)}_{self.mode}"
+        header = (
+            f"modo={self.mode} label={self.label} job_id={self.job_id or '-'} "
+            f"inicio={self.started_at.isoformat()} duracao_s={elapsed:.2f}\n\n"
+        )
+        artifacts: List[str] = []
+
+        if self.profiler is not None:
+            self.profiler.disable()
+            prof_path = output_dir / f"{stem}.prof"
+            self.profiler.dump_stats(str(prof_path))
+            buffer = io.StringIO()
+            stats = pstats.Stats(self.profiler, stream=buffer)
+            stats.sort_stats("cumulative").print_stats(60)
+            stats.sort_stats("tottime").print_stats(30)
+            txt_path = output_dir / f"{stem}.txt"
+            txt_path.write_text(header + buffer.getvalue(), encoding="utf-8")
+            artifacts.extend([str(prof_path), str(txt_path)])
+
+        if self.sampler is not None:
+            self.sampler.stop()
+            folded_path = output_dir / f"{stem}.folded"
+            folded_path.write_text(self.sampler.folded(), encoding="utf-8")
+            txt_path = output_dir / f"{stem}.txt"
+            txt_path.write_text(header + self.sampler.top_report(), encoding="utf-8")
+            artifacts.extend([str(folded_path), str(txt_path)])
+
+        return artifacts
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "label": self.label,
+            "job_id": self.job_id,
+            "seconds": self.seconds,
+            "started_at": self.started_at.isoformat(),
+            "elapsed_seconds": round(time.perf_counter() - self._started_perf, 2),
+        }
+
+
+class ProfilingManager:
+    """Estado do profiling do processo (um profiler ativo por vez + jobs armados)."""
+
+    def __init__(self):
+        self._active: Optional[_ActiveProfile] = None
+        self._armed_jobs: Dict[str, str] = {}
+        self._running_jobs: set[str] = set()
+        self._last_artifacts: List[str] = []
+
+    @staticmethod
+    def _validate_mode(mode: str) -> str:
+        normalized = (mode or "cprofile").strip().lower()
+        if normalized not in PROFILING_MODES:
+            raise ValueError(f"Modo de profiling invalido: {mode}. Use {', '.join(PROFILING_MODES)}.")
+        return normalized
+
+    def _start(self, mode: str, label: str, job_id: Optional[str] = None, seconds: Optional[float] = None) -> _ActiveProfile:
+        if self._active is not None:
+            raise RuntimeError(f"Ja existe um profiling ativo ({self._active.label}).")
+        active = _ActiveProfile(mode, label, job_id, seconds)
+        active.start()
+        self._active = active
+        logger.info("🔬 Profiling iniciado: modo=%s label=%s", mode, label)
+        return active
+
+    def _stop(self) -> List[str]:
+        active = self._active
+        if active is None:
+            return []
+        self._active = None
+        if active.stop_task is not None and active.stop_task is not asyncio.current_task():
+            active.stop_task.cancel()
+        artifacts = active.stop()
+        self._last_artifacts = artifacts
+        logger.info("🔬 Profiling finalizado: label=%s artefatos=%s", active.label, artifacts)
+        return artifacts
+
+    def start_window(self, seconds: float, mode: str = "cprofile", label: Optional[str] = None) -> Dict[str, Any]:
+        """Perfila o processo por N segundos (chamar de dentro do event loop)."""
+        max_seconds = float(getattr(settings, "profiling_max_window_seconds", 600) or 600)
+        if seconds <= 0 or seconds > max_seconds:
+            raise ValueError(f"seconds deve estar entre 0 e {max_seconds:g}.")
+        active = self._start(self._validate_mode(mode), label or f"window-{int(seconds)}s", seconds=seconds)
+
+        async def _stop_after_window() -> None:
+            await asyncio.sleep(seconds)
+            if self._active is active:
+                self._stop()
+
+        active.stop_task = asyncio.create_task(_stop_after_window())
+        return active.describe()
+
+    def arm_job(self, job_id: str, mode: str = "cprofile") -> Dict[str, Any]:
+        """Marca um job para profiling; se ja estiver rodando, liga o profiler agora."""
+        normalized_mode = self._validate_mode(mode)
+        if job_id in self._running_jobs:
+            return self._start(normalized_mode, f"job-{job_id}", job_id=job_id).describe()
+        self._armed_jobs[job_id] = normalized_mode
+        return {"job_id": job_id, "mode": normalized_mode, "armed": True}
+
+    def job_started(self, job_id: str) -> None:
+        self._running_jobs.add(job_id)
+        mode = self._armed_jobs.pop(job_id, None)
+        if mode is None:
+            return
+        try:
+            self._start(mode, f"job-{job_id}", job_id=job_id)
+        except RuntimeError as exc:
+            logger.warning("Profiling do job %s ignorado: %s", job_id, exc)
+
+    def job_finished(self, job_id: str) -> None:
+        self._running_jobs.discard(job_id)
+        if self._active is not None and self._active.job_id == job_id:
+            self._stop()
+
+    def stop(self) -> List[str]:
+        return self._stop()
+
+    def list_artifacts(self, limit: int = 50) -> List[Dict[str, Any]]:
+        output_dir = _artifacts_dir()
+        if not output_dir.exists():
+            return []
+        files = sorted(output_dir.iterdir(), key=lambda path: path.stat().st_mtime, reverse=True)
+        return [
+            {
+                "name": path.name,
+                "size_bytes": path.stat().st_size,
+                "modified_at": datetime.utcfromtimestamp(path.stat().st_mtime).isoformat(),
+            }
+            for path in files[:limit]
+            if path.is_file()
+        ]
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "active": self._active.describe() if self._active is not None else None,
+            "armed_jobs": dict(self._armed_jobs),
+            "last_artifacts": list(self._last_artifacts),
+        }
+
+
+profiling_manager = ProfilingManager()
+
+
+def artifact_path(name: str) -> Tuple[Optional[Path], str]:
+    """Resolve um artefato pelo nome, impedindo path traversal."""
+    output_dir = _artifacts_dir().resolve()
+    candidate = (output_dir / name).resolve()
+    if candidate.parent != output_dir or not candidate.is_file():
+        return None, "Artefato nao encontrado."
+    return candidate, ""
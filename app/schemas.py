@@ -164,6 +164,10 @@ class GenericScrapeRequest(BaseModel):
         le=1800,
         description="Duracao da simulacao em segundos quando test_mode=true",
     )
+    callback_url: Optional[str] = Field(
+        default=None,
+        description="URL http(s) que recebe um POST assinado quando o job terminar (completed/failed)",
+    )
 
 
 class GenericScrapeResponse(BaseModel):
@@ -206,6 +210,10 @@ class InvestingScrapeRequest(BaseModel):
         le=1800,
         description="Duracao da simulacao em segundos quando test_mode=true",
     )
+    callback_url: Optional[str] = Field(
+        default=None,
+        description="URL http(s) que recebe um POST assinado quando o job terminar (completed/failed)",
+    )
 
 
 class InvestingScrapeJobResultResponse(BaseModel):
@@ -284,9 +292,8 @@ class InteractionResponse(InteractionBase):
 
 # ==================== Scraping Job Schemas ====================
 
-class ScrapingJobCreate(BaseModel):
-    """Schema para criar job de scraping."""
-    profile_url: str = Field(..., description="URL do perfil Instagram a ser raspado")
+class ScrapingJobOptions(BaseModel):
+    """Opcoes de um job de scraping (compartilhadas por /scrape e /scrape/batch)."""
     session_username: Optional[str] = Field(
         default=None,
         description="Username da sessao Instagram ativa a reutilizar (obrigatorio em todos os flows do /scrape)",
@@ -324,6 +331,25 @@ class ScrapingJobCreate(BaseModel):
         le=1800,
         description="Duracao da simulacao em segundos quando test_mode=true",
     )
+    callback_url: Optional[str] = Field(
+        default=None,
+        description="URL http(s) que recebe um POST assinado quando o job terminar (completed/failed)",
+    )
+
+
+class ScrapingJobCreate(ScrapingJobOptions):
+    """Schema para criar job de scraping."""
+    profile_url: str = Field(..., description="URL do perfil Instagram a ser raspado")
+
+
+class ScrapingBatchCreate(ScrapingJobOptions):
+    """Varios perfis com as mesmas opcoes; um job por perfil."""
+    profile_urls: List[str] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="URLs (ou usernames) dos perfis; duplicados viram um unico job",
+    )
 
 
 class ScrapingJobResponse(BaseModel):
@@ -337,11 +363,38 @@ class ScrapingJobResponse(BaseModel):
     posts_scraped: int = 0
     interactions_scraped: int = 0
     created_at: datetime
+    coalesced: bool = Field(
+        default=False,
+        description="True quando a requisicao foi anexada a um job identico em andamento ou recente",
+    )
 
     class Config:
         from_attributes = True
 
 
+class ScrapingBatchResponse(BaseModel):
+    """Jobs criados (ou coalescidos) por um POST /scrape/batch."""
+    batch_id: str
+    total: int
+    created: int
+    coalesced: int
+    jobs: List[ScrapingJobResponse]
+
+
+class ScrapingBatchStatusResponse(BaseModel):
+    """Progresso agregado de um lote."""
+    batch_id: str
+    total: int
+    pending: int = 0
+    running: int = 0
+    completed: int = 0
+    failed: int = 0
+    finished: bool
+    posts_scraped: int = 0
+    interactions_scraped: int = 0
+    jobs: Optional[List[ScrapingJobResponse]] = None
+
+
 # ==================== Scraping Result Schemas ====================
 
 class ScrapingResultInteraction(BaseModel):
@@ -431,11 +484,32 @@ class ScrapingCompleteResponse(BaseModel):
     story_posts: List[ScrapingStoryPostResult] = []
     total_posts: int = 0
     total_interactions: int = 0
+    next_interactions_cursor: Optional[str] = None
     raw_result: Optional[Dict[str, Any]] = None
     error_message: Optional[str] = None
     completed_at: Optional[datetime] = None
 
 
+# ==================== Admin Schemas ====================
+
+class ProfilingModeSchema(str, Enum):
+    """Modos de profiling sob demanda."""
+    CPROFILE = "cprofile"
+    SAMPLER = "sampler"
+
+
+class ProfilingWindowRequest(BaseModel):
+    """Liga o profiling do processo por N segundos."""
+    seconds: float = Field(..., gt=0, le=3600, description="Duracao da janela de profiling")
+    mode: ProfilingModeSchema = ProfilingModeSchema.CPROFILE
+    label: Optional[str] = Field(default=None, max_length=80)
+
+
+class ProfilingJobRequest(BaseModel):
+    """Liga o profiling durante a execucao de um job."""
+    mode: ProfilingModeSchema = ProfilingModeSchema.CPROFILE
+
+
 # ==================== Error Schemas ====================
 
 class ErrorResponse(BaseModel):
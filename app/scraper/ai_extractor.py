@@ -5,9 +5,11 @@ Usa OpenAI Vision + GPT para extrair dados estruturados de screenshots e HTML.
 
 import json
 import logging
+import time
 from typing import Optional, Dict, Any, List
-from openai import AsyncOpenAI, RateLimitError
 from config import settings
+from app.lazy import LazySingleton
+from app.metrics import OPENAI_RATE_LIMITED_TOTAL, OPENAI_REQUEST_DURATION_SECONDS, record_llm_usage
 
 logger = logging.getLogger(__name__)
 
@@ -18,8 +20,12 @@ class AIExtractor:
     Abordagem híbrida: combina visão computacional com processamento de texto.
     """
 
+    # Quantidade de HTML enviada nos prompts (o restante e descartado).
+    HTML_PROMPT_MAX_CHARS = 5000
+    USER_HTML_PROMPT_MAX_CHARS = 3000
+
     def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.openai_api_key)
+        self._client: Any = None
         self.model_vision = settings.openai_model_vision  # Para análise de imagens
         self.model_text = settings.openai_model_text  # Para processamento de texto (mais barato)
         self.fallback_model_text = (settings.openai_fallback_model_text or "").strip() or None
@@ -27,7 +33,31 @@ class AIExtractor:
         self.temperature_text = settings.openai_temperature_text
         self.temperature_vision = settings.openai_temperature_vision
 
+    @property
+    def client(self) -> Any:
+        """Cliente criado no primeiro uso (o SDK openai so e importado quando necessario)."""
+        client = getattr(self, "_client", None)
+        if client is None:
+            client = self._client = self._create_client()
+        return client
+
+    @client.setter
+    def client(self, value: Any) -> None:
+        self._client = value
+
+    def _create_client(self) -> Any:
+        """Cliente de chat conforme LLM_BACKEND (openai | replay)."""
+        if str(getattr(settings, "llm_backend", "openai") or "openai").strip().lower() == "replay":
+            from app.stubs.fake_llm import ReplayAsyncOpenAI
+
+            return ReplayAsyncOpenAI()
+        from openai import AsyncOpenAI
+
+        return AsyncOpenAI(api_key=settings.openai_api_key)
+
     def _is_rate_limit_error(self, exc: Exception) -> bool:
+        from openai import RateLimitError
+
         if isinstance(exc, RateLimitError):
             return True
         if getattr(exc, "status_code", None) == 429:
@@ -61,7 +91,7 @@ class AIExtractor:
         temperature: float,
     ):
         try:
-            return await self.client.chat.completions.create(
+            return await self._timed_chat_completion(
                 model=model,
                 messages=messages,
                 temperature=temperature,
@@ -77,12 +107,40 @@ class AIExtractor:
                 model,
                 fallback_model,
             )
-            return await self.client.chat.completions.create(
+            return await self._timed_chat_completion(
                 model=fallback_model,
                 messages=messages,
                 temperature=temperature,
             )
 
+    async def _timed_chat_completion(
+        self,
+        *,
+        model: str,
+        messages: List[Dict[str, Any]],
+        temperature: float,
+    ):
+        """Chamada de chat registrando latencia, tokens e 429 nas metricas."""
+        started = time.perf_counter()
+        try:
+            response = await self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+            )
+        except Exception as exc:
+            if self._is_rate_limit_error(exc):
+                OPENAI_RATE_LIMITED_TOTAL.inc(client="extractor")
+            raise
+        finally:
+            OPENAI_REQUEST_DURATION_SECONDS.observe(
+                time.perf_counter() - started,
+                client="extractor",
+                model=model,
+            )
+        record_llm_usage("extractor", getattr(response, "usage", None))
+        return response
+
     async def extract_profile_info(
         self,
         screenshot_base64: Optional[str] = None,
@@ -151,7 +209,7 @@ class AIExtractor:
                 messages[0]["content"].append(
                     {
                         "type": "text",
-                        "text": f"\nHTML da página:\n{html_content[:5000]}",  # Limitar tamanho
+                        "text": f"\nHTML da página:\n{html_content[:self.HTML_PROMPT_MAX_CHARS]}",  # Limitar tamanho
                     }
                 )
 
@@ -247,7 +305,7 @@ class AIExtractor:
                 messages[0]["content"].append(
                     {
                         "type": "text",
-                        "text": f"\nHTML da página:\n{html_content[:5000]}",
+                        "text": f"\nHTML da página:\n{html_content[:self.HTML_PROMPT_MAX_CHARS]}",
                     }
                 )
 
@@ -338,7 +396,7 @@ class AIExtractor:
                 messages[0]["content"].append(
                     {
                         "type": "text",
-                        "text": f"\nHTML:\n{html_content[:5000]}",
+                        "text": f"\nHTML:\n{html_content[:self.HTML_PROMPT_MAX_CHARS]}",
                     }
                 )
 
@@ -421,7 +479,7 @@ class AIExtractor:
                 messages[0]["content"].append(
                     {
                         "type": "text",
-                        "text": f"\nHTML:\n{html_content[:3000]}",
+                        "text": f"\nHTML:\n{html_content[:self.USER_HTML_PROMPT_MAX_CHARS]}",
                     }
                 )
 
@@ -446,4 +504,4 @@ class AIExtractor:
 
 
 # Instância global do extrator
-ai_extractor = AIExtractor()
+ai_extractor: AIExtractor = LazySingleton(AIExtractor, "ai_extractor")  # type: ignore[assignment]
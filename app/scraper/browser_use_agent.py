@@ -7,26 +7,48 @@ import logging
 import asyncio
 import inspect
 import json
-import re
 import tempfile
-import unicodedata
+import time
 from pathlib import Path
-from typing import Optional, Dict, Any, List, Union, Callable, Awaitable
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Union, Callable, Awaitable
 from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from uuid import uuid4
 
-from browser_use import Agent, BrowserSession, ChatOpenAI
 import httpx
 import websockets
 from config import settings
 from app.models import InstagramSession, InvestingSession
+from app.metrics import (
+    BROWSER_AGENT_STARTUP_SECONDS,
+    BROWSER_CDP_CONNECT_SECONDS,
+    OPENAI_RATE_LIMITED_TOTAL,
+    OPENAI_REQUEST_DURATION_SECONDS,
+    record_llm_usage,
+)
+from app.tracing import Span, span, start_span, traced
+from app.scraper.time_parsing import parse_absolute_date, parse_instagram_timestamp, relative_time_to_hours
 from sqlalchemy.orm import Session
 from sqlalchemy import func
+from app.lazy import LazySingleton
+
+if TYPE_CHECKING:
+    from browser_use import Agent, BrowserSession, ChatOpenAI
 
 logger = logging.getLogger(__name__)
 
 
+def _browser_use() -> Any:
+    """
+    Importa browser_use sob demanda. O import custa ~1s (cdp, openai, modelos pydantic) e
+    so e necessario quando um job abre navegador; a API sobe sem ele.
+    """
+    import browser_use
+
+    BrowserUseAgent._patch_browser_use_ax_tree()
+    return browser_use
+
+
 class BrowserUseAgent:
     """
     Agente que usa Browser Use para navegar e interagir com o Instagram.
@@ -55,8 +77,8 @@ class BrowserUseAgent:
             log = logging.getLogger(name)
             log.setLevel(level)
             log.propagate = True
-        self._patch_browser_use_ax_tree()
-        self._patch_websocket_compression(self.ws_compression_mode)
+        # Patches de AX tree/websockets sao aplicados no primeiro uso (ver _browser_use()
+        # e _create_browser_session), nao no import.
         logger.info("Browser Use WebSocket compression mode: %s", self.ws_compression_mode)
         if self.fallback_model:
             logger.info("Browser Use fallback model enabled: %s -> %s", self.model, self.fallback_model)
@@ -312,6 +334,7 @@ class BrowserUseAgent:
 
         return self._build_browserless_cdp_url()
 
+    @traced("browserless.session_create")
     async def _create_browserless_session(self) -> Dict[str, Any]:
         if not settings.browserless_session_enabled:
             return {}
@@ -369,7 +392,7 @@ class BrowserUseAgent:
             return await value
         return value
 
-    async def _safe_stop_session(self, session: BrowserSession) -> None:
+    async def _safe_stop_session(self, session: "BrowserSession") -> None:
         stop_fn = getattr(session, "stop", None)
         if stop_fn is None:
             return
@@ -380,7 +403,7 @@ class BrowserUseAgent:
         except Exception as exc:
             logger.warning("Erro ao encerrar sessao do browser: %s", exc)
 
-    async def _detach_browser_session(self, session: BrowserSession) -> None:
+    async def _detach_browser_session(self, session: "BrowserSession") -> None:
         disconnect_fn = getattr(session, "disconnect", None)
         if callable(disconnect_fn):
             try:
@@ -392,7 +415,7 @@ class BrowserUseAgent:
                 logger.warning("Erro ao desconectar sessao do browser: %s", exc)
         await self._safe_stop_session(session)
 
-    def _patch_event_bus_for_stop(self, browser_session: BrowserSession):
+    def _patch_event_bus_for_stop(self, browser_session: "BrowserSession"):
         event_bus = getattr(browser_session, "event_bus", None)
         if event_bus is None:
             return None
@@ -448,7 +471,7 @@ class BrowserUseAgent:
         cdp_url: str,
         storage_state: Optional[Union[Dict[str, Any], str, Path]] = None,
         user_agent: Optional[str] = None,
-    ) -> BrowserSession:
+    ) -> "BrowserSession":
         """
         Cria BrowserSession com fallback de argumentos para diferentes versoes do browser-use.
         """
@@ -478,12 +501,12 @@ class BrowserUseAgent:
         ctor_attempts.append({**base_kwargs})
         for kwargs in ctor_attempts:
             try:
-                session = BrowserSession(**kwargs)
+                session = _browser_use().BrowserSession(**kwargs)
                 break
             except TypeError:
                 continue
         if session is None:
-            session = BrowserSession(cdp_url=cdp_url, storage_state=clean_storage_state)
+            session = _browser_use().BrowserSession(cdp_url=cdp_url, storage_state=clean_storage_state)
 
         keep_alive_setters = (
             getattr(session, "set_keep_alive", None),
@@ -510,10 +533,10 @@ class BrowserUseAgent:
     def _create_agent(
         self,
         task: str,
-        llm: ChatOpenAI,
-        browser_session: BrowserSession,
+        llm: "ChatOpenAI",
+        browser_session: "BrowserSession",
         **extra_kwargs: Any,
-    ) -> Agent:
+    ) -> "Agent":
         possible_kwargs = {
             "task": task,
             "llm": llm,
@@ -525,17 +548,99 @@ class BrowserUseAgent:
             "keep_browser_session": True,
         }
         possible_kwargs.update(extra_kwargs)
+        agent_cls = _browser_use().Agent
         try:
-            sig = inspect.signature(Agent.__init__)
+            sig = inspect.signature(agent_cls.__init__)
             allowed = {k: v for k, v in possible_kwargs.items() if k in sig.parameters}
         except Exception:
             allowed = possible_kwargs
-        return Agent(**allowed)
+        return agent_cls(**allowed)
+
+    async def _run_agent(
+        self,
+        agent: "Agent",
+        stage: str,
+        run_kwargs: Optional[Dict[str, Any]] = None,
+        **attributes: Any,
+    ) -> Any:
+        """
+        Executa agent.run() dentro de um span `agent.run`, com um span `agent.step`
+        por passo (chamada de LLM + acoes) via hooks on_step_start/on_step_end.
+        """
+        kwargs = dict(run_kwargs or {})
+        step_spans: List[Span] = []
+        run_span = span("agent.run", stage=stage, **attributes)
+
+        async def _on_step_start(_agent: Any) -> None:
+            if not step_spans:
+                # Tempo ate o primeiro passo ~= conexao CDP + setup do navegador.
+                run_span.set_attribute("startup_ms", round(run_span.duration_ms, 1))
+                BROWSER_AGENT_STARTUP_SECONDS.observe(run_span.duration_ms / 1000.0, stage=stage)
+            step_spans.append(start_span("agent.step", stage=stage, step=len(step_spans) + 1))
+
+        async def _on_step_end(_agent: Any) -> None:
+            if step_spans:
+                step_spans[-1].end()
+
+        try:
+            run_params = inspect.signature(agent.run).parameters
+            if "on_step_start" in run_params and "on_step_end" in run_params:
+                kwargs.setdefault("on_step_start", _on_step_start)
+                kwargs.setdefault("on_step_end", _on_step_end)
+        except Exception:
+            pass
+
+        with run_span:
+            try:
+                history = await agent.run(**kwargs)
+            finally:
+                for step_span in step_spans:
+                    step_span.end()
+                run_span.set_attribute("steps", len(step_spans))
+        return history
+
+    def _create_llm(self, model: Optional[str] = None) -> Any:
+        """
+        Cria o LLM dos agentes conforme LLM_BACKEND (openai | replay).
+        """
+        model_name = model or self.model
+        if str(getattr(settings, "llm_backend", "openai") or "openai").strip().lower() == "replay":
+            from app.stubs.fake_llm import ReplayChatModel
+
+            return self._instrument_llm(ReplayChatModel(model=model_name), model_name)
+        return self._instrument_llm(_browser_use().ChatOpenAI(model=model_name, api_key=self.api_key), model_name)
+
+    def _instrument_llm(self, llm: Any, model_name: str) -> Any:
+        """Envolve llm.ainvoke para registrar latencia, tokens e 429 (client=agent)."""
+        original_ainvoke = llm.ainvoke
+
+        async def _timed_ainvoke(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                result = await original_ainvoke(*args, **kwargs)
+            except Exception as exc:
+                if self._contains_rate_limit_error(str(exc)):
+                    OPENAI_RATE_LIMITED_TOTAL.inc(client="agent")
+                raise
+            finally:
+                OPENAI_REQUEST_DURATION_SECONDS.observe(
+                    time.perf_counter() - started,
+                    client="agent",
+                    model=model_name,
+                )
+            record_llm_usage("agent", getattr(result, "usage", None))
+            return result
+
+        try:
+            llm.ainvoke = _timed_ainvoke
+        except Exception:
+            logger.debug("LLM %s nao permite instrumentar ainvoke.", type(llm).__name__)
+        return llm
 
-    def _create_fallback_llm(self) -> Optional[ChatOpenAI]:
+    def _create_fallback_llm(self) -> Optional[Any]:
         if not self.fallback_model:
             return None
-        return ChatOpenAI(model=self.fallback_model, api_key=self.api_key)
+        return self._create_llm(self.fallback_model)
 
     def _get_latest_session(
         self,
@@ -634,7 +739,7 @@ class BrowserUseAgent:
 
     async def _get_browser_session_cookie_snapshot(
         self,
-        browser_session: BrowserSession,
+        browser_session: "BrowserSession",
     ) -> Dict[str, Any]:
         getter = getattr(browser_session, "_cdp_get_cookies", None)
         if not callable(getter):
@@ -666,7 +771,7 @@ class BrowserUseAgent:
 
     async def _force_apply_storage_state(
         self,
-        browser_session: BrowserSession,
+        browser_session: "BrowserSession",
         storage_state: Optional[Union[Dict[str, Any], str, Path]],
     ) -> None:
         payload = self._read_storage_state_payload(storage_state)
@@ -702,7 +807,7 @@ class BrowserUseAgent:
 
     async def _ensure_browser_session_storage_state_loaded(
         self,
-        browser_session: BrowserSession,
+        browser_session: "BrowserSession",
     ) -> None:
         storage_state = getattr(browser_session.browser_profile, "storage_state", None)
         if not storage_state:
@@ -907,7 +1012,7 @@ class BrowserUseAgent:
 
     async def _send_cdp_command(
         self,
-        browser_session: BrowserSession,
+        browser_session: "BrowserSession",
         method: str,
         params: Optional[Dict[str, Any]] = None,
     ) -> Optional[Dict[str, Any]]:
@@ -942,7 +1047,7 @@ class BrowserUseAgent:
 
     async def _prepare_browserless_reconnect(
         self,
-        browser_session: BrowserSession,
+        browser_session: "BrowserSession",
     ) -> Optional[str]:
         timeout_ms = getattr(settings, "browserless_reconnect_timeout_ms", 60000)
         response = await self._send_cdp_command(
@@ -1002,166 +1107,11 @@ class BrowserUseAgent:
 
     def _relative_time_to_hours(self, text: Optional[str]) -> Optional[float]:
         """Converte texto relativo do Instagram para horas."""
-        if text is None:
-            return None
-
-        cleaned = str(text).strip().lower()
-        if not cleaned:
-            return None
-
-        cleaned = cleaned.replace("\u2022", " ").replace("\u00b7", " ")
-        cleaned = re.sub(r"\b(editado|editada|edited)\b", "", cleaned)
-        cleaned = re.sub(r"\bago\b", "", cleaned)
-        cleaned = re.sub(r"\bh[aá]\b", "", cleaned)
-        cleaned = re.sub(r"\s+", " ", cleaned).strip()
-
-        if cleaned in {"now", "just now", "agora", "agora mesmo"}:
-            return 0.0
-        if cleaned in {"today", "hoje"}:
-            return 0.0
-        if cleaned in {"yesterday", "ontem"}:
-            return 24.0
-
-        patterns = [
-            (r"(\d+(?:[.,]\d+)?)\s*(?:s|sec|secs|second|seconds|seg|segs|segundo|segundos)\b", 1 / 3600),
-            (r"(\d+(?:[.,]\d+)?)\s*(?:m|min|mins|minute|minutes|minuto|minutos)\b", 1 / 60),
-            (r"(\d+(?:[.,]\d+)?)\s*(?:h|hr|hrs|hour|hours|hora|horas)\b", 1),
-            (r"(\d+(?:[.,]\d+)?)\s*(?:d|day|days|dia|dias)\b", 24),
-            (r"(\d+(?:[.,]\d+)?)\s*(?:w|wk|wks|week|weeks|sem|semana|semanas)\b", 24 * 7),
-            (r"(\d+(?:[.,]\d+)?)\s*(?:mo|month|months|mes|m[eê]s|meses)\b", 24 * 30),
-            (r"(\d+(?:[.,]\d+)?)\s*(?:y|yr|year|years|ano|anos)\b", 24 * 365),
-        ]
-
-        for pattern, multiplier in patterns:
-            match = re.search(pattern, cleaned)
-            if not match:
-                continue
-            value = match.group(1).replace(",", ".")
-            try:
-                return float(value) * multiplier
-            except ValueError:
-                return None
-
-        return None
+        return relative_time_to_hours(text)
 
     def _parse_absolute_date(self, text: str, now: datetime) -> Optional[datetime]:
         """Interpreta datas absolutas simples do Instagram em UTC."""
-        if not text:
-            return None
-
-        cleaned = text.strip().lower()
-        if not cleaned:
-            return None
-
-        normalized = unicodedata.normalize("NFD", cleaned)
-        normalized = "".join(ch for ch in normalized if unicodedata.category(ch) != "Mn")
-        normalized = normalized.replace(",", " ").replace(".", " ")
-        normalized = re.sub(r"\bde\b", " ", normalized)
-        normalized = re.sub(r"\s+", " ", normalized).strip()
-
-        month_map = {
-            "january": 1,
-            "jan": 1,
-            "february": 2,
-            "feb": 2,
-            "fevereiro": 2,
-            "fev": 2,
-            "march": 3,
-            "mar": 3,
-            "marco": 3,
-            "abril": 4,
-            "apr": 4,
-            "april": 4,
-            "maio": 5,
-            "may": 5,
-            "jun": 6,
-            "june": 6,
-            "junho": 6,
-            "jul": 7,
-            "july": 7,
-            "julho": 7,
-            "aug": 8,
-            "august": 8,
-            "ago": 8,
-            "agosto": 8,
-            "sep": 9,
-            "sept": 9,
-            "september": 9,
-            "set": 9,
-            "setembro": 9,
-            "oct": 10,
-            "october": 10,
-            "out": 10,
-            "outubro": 10,
-            "nov": 11,
-            "november": 11,
-            "novembro": 11,
-            "dec": 12,
-            "december": 12,
-            "dez": 12,
-            "dezembro": 12,
-        }
-
-        tokens = normalized.split()
-        if not tokens:
-            return None
-
-        def _parse_day(token: str) -> Optional[int]:
-            match = re.match(r"(\d{1,2})", token)
-            if not match:
-                return None
-            day = int(match.group(1))
-            return day if 1 <= day <= 31 else None
-
-        def _parse_year(token: Optional[str]) -> Optional[int]:
-            if not token:
-                return None
-            match = re.match(r"(\d{2,4})", token)
-            if not match:
-                return None
-            year = int(match.group(1))
-            return year + 2000 if year < 100 else year
-
-        for idx, token in enumerate(tokens):
-            month = month_map.get(token)
-            if not month:
-                continue
-
-            day = None
-            year = None
-
-            if idx + 1 < len(tokens):
-                day = _parse_day(tokens[idx + 1])
-                if day is not None and idx + 2 < len(tokens):
-                    year = _parse_year(tokens[idx + 2])
-
-            if day is None and idx > 0:
-                day = _parse_day(tokens[idx - 1])
-                if day is not None and idx + 1 < len(tokens):
-                    year = _parse_year(tokens[idx + 1])
-
-            if day is None:
-                continue
-
-            if year is None:
-                year = now.year
-                try:
-                    candidate = datetime(year, month, day, tzinfo=timezone.utc)
-                except ValueError:
-                    return None
-                if candidate.date() > now.date():
-                    try:
-                        candidate = datetime(year - 1, month, day, tzinfo=timezone.utc)
-                    except ValueError:
-                        return None
-                return candidate
-
-            try:
-                return datetime(year, month, day, tzinfo=timezone.utc)
-            except ValueError:
-                return None
-
-        return None
+        return parse_absolute_date(text, now)
 
     def _parse_instagram_timestamp(
         self,
@@ -1169,35 +1119,7 @@ class BrowserUseAgent:
         now: Optional[datetime] = None,
     ) -> Optional[datetime]:
         """Converte timestamps do Instagram para datetime UTC quando possivel."""
-        if value is None:
-            return None
-
-        effective_now = now or datetime.now(timezone.utc)
-        if isinstance(value, datetime):
-            return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
-
-        text = str(value).strip()
-        if not text:
-            return None
-
-        iso_candidate = text.replace("Z", "+00:00").replace("z", "+00:00")
-        try:
-            parsed = datetime.fromisoformat(iso_candidate)
-            return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
-        except Exception:
-            pass
-
-        lowered = text.lower()
-        if lowered in {"now", "just now", "agora", "agora mesmo", "today", "hoje"}:
-            return effective_now
-        if lowered in {"yesterday", "ontem"}:
-            return effective_now - timedelta(days=1)
-
-        relative_hours = self._relative_time_to_hours(lowered)
-        if relative_hours is not None:
-            return effective_now - timedelta(hours=relative_hours)
-
-        return self._parse_absolute_date(lowered, effective_now)
+        return parse_instagram_timestamp(value, now=now)
 
     def _should_send_direct_message(
         self,
@@ -1220,25 +1142,29 @@ class BrowserUseAgent:
 
     async def _ensure_browser_session_connected(
         self,
-        browser_session: BrowserSession,
+        browser_session: "BrowserSession",
         timeout_ms: int = 15000,
     ) -> None:
         timeout_s = max(1.0, float(timeout_ms) / 1000.0)
         errors: List[str] = []
 
-        for method_name in ("start", "connect"):
-            method = getattr(browser_session, method_name, None)
-            if not callable(method):
-                continue
-            try:
-                await asyncio.wait_for(
-                    self._maybe_await(method()),
-                    timeout=timeout_s,
-                )
-                await self._ensure_browser_session_storage_state_loaded(browser_session)
-                return
-            except Exception as exc:
-                errors.append(f"{method_name}: {exc}")
+        with span("browser.cdp_connect", timeout_ms=timeout_ms) as connect_span:
+            for method_name in ("start", "connect"):
+                method = getattr(browser_session, method_name, None)
+                if not callable(method):
+                    continue
+                try:
+                    await asyncio.wait_for(
+                        self._maybe_await(method()),
+                        timeout=timeout_s,
+                    )
+                    await self._ensure_browser_session_storage_state_loaded(browser_session)
+                    connect_span.set_attribute("method", method_name)
+                    BROWSER_CDP_CONNECT_SECONDS.observe(connect_span.duration_ms / 1000.0, result="ok")
+                    return
+                except Exception as exc:
+                    errors.append(f"{method_name}: {exc}")
+            BROWSER_CDP_CONNECT_SECONDS.observe(connect_span.duration_ms / 1000.0, result="error")
 
         details = "; ".join(errors) if errors else "no start/connect method available"
         raise RuntimeError(
@@ -1247,27 +1173,29 @@ class BrowserUseAgent:
 
     async def _navigate_to_url_with_timeout(
         self,
-        browser_session: BrowserSession,
+        browser_session: "BrowserSession",
         url: str,
         timeout_ms: int = 15000,
         new_tab: bool = False,
     ) -> None:
         await self._ensure_browser_session_connected(browser_session, timeout_ms=timeout_ms)
-        try:
-            from browser_use.browser.events import NavigateToUrlEvent
+        with span("browser.navigate", url=url, new_tab=new_tab) as navigate_span:
+            try:
+                from browser_use.browser.events import NavigateToUrlEvent
 
-            event = browser_session.event_bus.dispatch(
-                NavigateToUrlEvent(
-                    url=url,
-                    new_tab=new_tab,
-                    timeout_ms=int(timeout_ms),
+                event = browser_session.event_bus.dispatch(
+                    NavigateToUrlEvent(
+                        url=url,
+                        new_tab=new_tab,
+                        timeout_ms=int(timeout_ms),
+                    )
                 )
-            )
-            await event
-            await event.event_result(raise_if_any=True, raise_if_none=False)
-            return
-        except Exception:
-            await browser_session.navigate_to(url, new_tab=new_tab)
+                await event
+                await event.event_result(raise_if_any=True, raise_if_none=False)
+                return
+            except Exception:
+                navigate_span.set_attribute("fallback", "navigate_to")
+                await browser_session.navigate_to(url, new_tab=new_tab)
 
     def _parse_evaluate_payload(self, value: Any) -> Any:
         if value is None:
@@ -1298,6 +1226,109 @@ class BrowserUseAgent:
         raw = await page.evaluate(script, *args)
         return self._parse_evaluate_payload(raw)
 
+    @staticmethod
+    def _build_page_condition_wait_script(predicate_js: str) -> str:
+        """
+        Monta um script que resolve assim que o predicado ficar verdadeiro.
+
+        `predicate_js` e uma factory `(...args) => () => boolean`: ela roda uma vez
+        no inicio (podendo capturar o estado base da pagina) e o predicado
+        devolvido e reavaliado a cada mutacao do DOM (MutationObserver), em
+        eventos de navegacao SPA (popstate/hashchange) e num poll leve de
+        seguranca, ja que history.pushState nao dispara evento nenhum.
+        """
+        return (
+            """
+        (...args) => new Promise((resolve) => {
+          const timeoutMs = Math.max(0, Number(args[0] || 0));
+          const predicateArgs = Array.isArray(args[1]) ? args[1] : [];
+          let predicate = () => false;
+          try {
+            predicate = ("""
+            + predicate_js.strip()
+            + """)(...predicateArgs);
+          } catch (e) {}
+          const startedAt = Date.now();
+          let done = false;
+          let observer = null;
+          let pollTimer = null;
+          let timeoutTimer = null;
+          const onNavigation = () => check('navigation');
+          const finish = (ready, trigger) => {
+            if (done) return;
+            done = true;
+            try { if (observer) observer.disconnect(); } catch (e) {}
+            try { if (pollTimer) clearInterval(pollTimer); } catch (e) {}
+            try { if (timeoutTimer) clearTimeout(timeoutTimer); } catch (e) {}
+            window.removeEventListener('popstate', onNavigation);
+            window.removeEventListener('hashchange', onNavigation);
+            resolve({ ready, trigger, elapsed_ms: Date.now() - startedAt });
+          };
+          function check(trigger) {
+            if (done) return;
+            let ok = false;
+            try { ok = Boolean(predicate()); } catch (e) { ok = false; }
+            if (ok) finish(true, trigger);
+          }
+
+          check('initial');
+          if (done) return;
+          try {
+            observer = new MutationObserver(() => check('mutation'));
+            observer.observe(document.documentElement || document, {
+              childList: true,
+              subtree: true,
+              attributes: true,
+              characterData: true
+            });
+          } catch (e) {}
+          window.addEventListener('popstate', onNavigation);
+          window.addEventListener('hashchange', onNavigation);
+          pollTimer = setInterval(() => check('poll'), 200);
+          timeoutTimer = setTimeout(() => finish(false, 'timeout'), timeoutMs);
+        })
+        """
+        )
+
+    async def _wait_for_page_condition(
+        self,
+        page: Any,
+        predicate_js: str,
+        *predicate_args: Any,
+        timeout_seconds: float,
+    ) -> bool:
+        """
+        Aguarda ate o predicado JS ficar verdadeiro na pagina, ou ate o timeout.
+
+        Substitui sleeps fixos: retorna assim que a pagina sinaliza prontidao e,
+        no pior caso, espera o mesmo tempo que o sleep original esperaria.
+        """
+        if page is None:
+            await asyncio.sleep(timeout_seconds)
+            return False
+
+        timeout_ms = max(0, int(timeout_seconds * 1000))
+        script = self._build_page_condition_wait_script(predicate_js)
+        started_at = asyncio.get_event_loop().time()
+        try:
+            result = await asyncio.wait_for(
+                self._evaluate_page_json(page, script, timeout_ms, list(predicate_args)),
+                timeout=timeout_seconds + 5.0,
+            )
+        except Exception as exc:
+            # Contexto destruido (navegacao) ou CDP instavel: cai para o sleep restante,
+            # limitado para nao pagar o pior caso inteiro em cada troca de pagina.
+            logger.debug("Readiness: falha ao aguardar condicao na pagina: %s", exc)
+            elapsed = asyncio.get_event_loop().time() - started_at
+            remaining = max(0.0, timeout_seconds - elapsed)
+            if remaining > 0:
+                await asyncio.sleep(min(remaining, 0.5))
+            return False
+
+        if isinstance(result, dict):
+            return bool(result.get("ready"))
+        return bool(result)
+
     def _stories_debug_root_dir(self) -> Path:
         return Path(__file__).resolve().parents[2] / ".artifacts" / "stories-debug"
 
@@ -1423,7 +1454,7 @@ class BrowserUseAgent:
 
     async def _scrape_story_interactions_via_js(
         self,
-        browser_session: BrowserSession,
+        browser_session: "BrowserSession",
         profile_url: str,
         story_url: str,
         safe_max_interactions: int,
@@ -1854,7 +1885,22 @@ class BrowserUseAgent:
         extract_story_viewers_script = """
         (...args) => (async () => {
           const maxUsers = Math.max(1, Number(args[0] || 300));
-          const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+          // Resolve na primeira mutacao da lista (linhas novas renderizadas) ou no timeout.
+          const waitForListChange = (target, timeoutMs) => new Promise((resolve) => {
+            let settled = false;
+            let observer = null;
+            const finish = (changed) => {
+              if (settled) return;
+              settled = true;
+              try { if (observer) observer.disconnect(); } catch (e) {}
+              resolve(changed);
+            };
+            try {
+              observer = new MutationObserver(() => finish(true));
+              observer.observe(target, { childList: true, subtree: true });
+            } catch (e) {}
+            setTimeout(() => finish(false), timeoutMs);
+          });
           const dialog = document.querySelector('div[role="dialog"]');
           if (!dialog) {
             return { popup_opened: false, viewer_users: [], liked_users: [] };
@@ -2036,7 +2082,7 @@ class BrowserUseAgent:
               const beforeHeight = scrollable.scrollHeight;
               const step = Math.max(260, Math.floor(scrollable.clientHeight * 0.75));
               scrollable.scrollTop = Math.min(beforeTop + step, scrollable.scrollHeight);
-              await sleep(280);
+              const listChanged = await waitForListChange(scrollable, 280);
 
               collectFromCurrentDom();
               if (usersMap.size >= maxUsers) break;
@@ -2046,7 +2092,8 @@ class BrowserUseAgent:
               const topUnchanged = Math.abs(afterTop - beforeTop) <= 2;
               const heightUnchanged = Math.abs(afterHeight - beforeHeight) <= 2;
               if (topUnchanged && heightUnchanged) {
-                stagnantRounds += 1;
+                // Mutacao sem mudanca de scroll (ex.: spinner) nao conta como rodada estagnada.
+                if (!listChanged) stagnantRounds += 1;
               } else {
                 stagnantRounds = 0;
               }
@@ -2173,6 +2220,67 @@ class BrowserUseAgent:
         }
         """
 
+        # Predicados de prontidao (factories) usados por _wait_for_page_condition
+        # no lugar dos sleeps fixos entre transicoes do viewer.
+        document_ready_predicate = """
+        (...args) => () => document.readyState === 'complete'
+          && Boolean(document.querySelector('main, section, div[role="dialog"]'))
+        """
+
+        navigation_predicate = """
+        (...args) => {
+          const baseHref = String(args[0] || window.location.href || '');
+          const baseDialogs = document.querySelectorAll('div[role="dialog"]').length;
+          return () => (window.location.href || '') !== baseHref
+            || document.querySelectorAll('div[role="dialog"]').length !== baseDialogs;
+        }
+        """
+
+        profile_gate_cleared_predicate = """
+        (...args) => {
+          const baseHref = String(args[0] || window.location.href || '');
+          const modalWasOpen = Boolean(args[1]);
+          return () => {
+            if ((window.location.href || '') !== baseHref) return true;
+            return modalWasOpen && !document.querySelector('div[role="dialog"]');
+          };
+        }
+        """
+
+        story_changed_predicate = """
+        (...args) => {
+          const previousStoryId = String(args[0] || '');
+          return () => {
+            const match = (window.location.href || '').match(/\\/stories\\/[^\\/?#]+\\/(\\d+)(?:\\/|$)/i);
+            return !match || match[1] !== previousStoryId;
+          };
+        }
+        """
+
+        seen_by_control_predicate = """
+        (...args) => () => Array.from(document.querySelectorAll('button,div[role="button"],a,span'))
+          .some((el) => /^(seen by|visto por)\\s*\\d+/i.test((el.textContent || '').trim()))
+        """
+
+        viewers_modal_ready_predicate = """
+        (...args) => () => {
+          const dialog = document.querySelector('div[role="dialog"]');
+          if (!dialog) return false;
+          const dialogText = (dialog.textContent || '').toLowerCase();
+          if (!(dialogText.includes('visualizador') || dialogText.includes('viewer'))) return false;
+          return dialog.querySelectorAll('a[href^="/"]').length > 0;
+        }
+        """
+
+        viewers_modal_closed_predicate = """
+        (...args) => () => {
+          const dialog = document.querySelector('div[role="dialog"]');
+          if (!dialog) return true;
+          const dialogText = (dialog.textContent || '').toLowerCase();
+          return !(dialogText.includes('visualizador') || dialogText.includes('viewer'));
+        }
+        """
+
         debug_username = target_username or "instagram"
         debug_run_id = (
             f"{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_"
@@ -2272,7 +2380,13 @@ class BrowserUseAgent:
             )
             action_data = action_raw if isinstance(action_raw, dict) else {}
             if action_data.get("handled"):
-                await asyncio.sleep(0.8)
+                await self._wait_for_page_condition(
+                    page_obj,
+                    profile_gate_cleared_predicate,
+                    effective_state.get("current_url") or "",
+                    bool(effective_state.get("profile_gate_modal_open")),
+                    timeout_seconds=0.8,
+                )
                 post_action_raw = await self._evaluate_page_json(page_obj, state_script, target_username)
                 post_action_state = post_action_raw if isinstance(post_action_raw, dict) else {}
                 modal_closed = bool(
@@ -2298,7 +2412,13 @@ class BrowserUseAgent:
                     action_data.get("x"),
                     action_data.get("y"),
                 ):
-                    await asyncio.sleep(1.2)
+                    await self._wait_for_page_condition(
+                        page_obj,
+                        profile_gate_cleared_predicate,
+                        post_action_state.get("current_url") or effective_state.get("current_url") or "",
+                        bool(effective_state.get("profile_gate_modal_open")),
+                        timeout_seconds=1.2,
+                    )
                     post_mouse_raw = await self._evaluate_page_json(page_obj, state_script, target_username)
                     post_mouse_state = post_mouse_raw if isinstance(post_mouse_raw, dict) else {}
                     modal_closed = bool(
@@ -2356,6 +2476,17 @@ class BrowserUseAgent:
             state_data = state_raw if isinstance(state_raw, dict) else {}
             return page_obj, state_data
 
+        async def _wait_on_current_page(predicate_js: str, timeout_seconds: float) -> bool:
+            try:
+                page_obj = await browser_session.get_current_page()
+            except Exception:
+                page_obj = None
+            return await self._wait_for_page_condition(
+                page_obj,
+                predicate_js,
+                timeout_seconds=timeout_seconds,
+            )
+
         async def _wait_for_story_url(
             max_wait_seconds: float = 20.0,
         ) -> tuple[Optional[Any], Dict[str, Any], bool]:
@@ -2383,7 +2514,15 @@ class BrowserUseAgent:
                 story_id_value = self._extract_story_id_from_url(current_story_url_value)
                 if current_story_url_value and story_id_value:
                     return last_page, last_state, True
-                await asyncio.sleep(1.0)
+                await self._wait_for_page_condition(
+                    page_obj,
+                    navigation_predicate,
+                    state_data.get("current_url") or "",
+                    timeout_seconds=max(
+                        0.0,
+                        min(1.0, deadline - asyncio.get_event_loop().time()),
+                    ),
+                )
 
             return last_page, last_state, False
 
@@ -2422,7 +2561,12 @@ class BrowserUseAgent:
                             page_reason,
                             click_data.get("method") or "unknown",
                         )
-                        await asyncio.sleep(1.2)
+                        await self._wait_for_page_condition(
+                            page_obj,
+                            navigation_predicate,
+                            current_state.get("current_url") or "",
+                            timeout_seconds=1.2,
+                        )
                         await _capture_story_debug(
                             page_obj,
                             f"recovery_clicked_{page_reason}",
@@ -2463,7 +2607,7 @@ class BrowserUseAgent:
                     timeout_ms=30000,
                     new_tab=False,
                 )
-                await asyncio.sleep(2.5)
+                await _wait_on_current_page(document_ready_predicate, timeout_seconds=2.5)
                 page_obj, state_data = await _read_state_from_current_page()
                 opened, _ = await _attempt_open_story_from_page(
                     page_obj,
@@ -2481,7 +2625,7 @@ class BrowserUseAgent:
             timeout_ms=30000,
             new_tab=False,
         )
-        await asyncio.sleep(1.0)
+        await _wait_on_current_page(document_ready_predicate, timeout_seconds=1.0)
 
         page, initial_state, initial_ready = await _wait_for_story_url(max_wait_seconds=20.0)
         if not initial_ready and not initial_state.get("login_required"):
@@ -2693,9 +2837,17 @@ class BrowserUseAgent:
                 click_raw = await self._evaluate_page_json(page, click_seen_by_script)
                 click_data = click_raw if isinstance(click_raw, dict) else {}
                 if not click_data.get("clicked"):
-                    await asyncio.sleep(0.8)
+                    await self._wait_for_page_condition(
+                        page,
+                        seen_by_control_predicate,
+                        timeout_seconds=0.8,
+                    )
                     continue
-                await asyncio.sleep(10.0)
+                await self._wait_for_page_condition(
+                    page,
+                    viewers_modal_ready_predicate,
+                    timeout_seconds=10.0,
+                )
                 modal_state_raw = await self._evaluate_page_json(page, state_script)
                 modal_state = modal_state_raw if isinstance(modal_state_raw, dict) else {}
                 popup_open = bool(modal_state.get("viewers_modal_open"))
@@ -2854,7 +3006,11 @@ class BrowserUseAgent:
 
             for _close_try in range(3):
                 await self._evaluate_page_json(page, close_modal_script)
-                await asyncio.sleep(0.6)
+                await self._wait_for_page_condition(
+                    page,
+                    viewers_modal_closed_predicate,
+                    timeout_seconds=0.6,
+                )
                 modal_state_raw = await self._evaluate_page_json(page, state_script)
                 modal_state = modal_state_raw if isinstance(modal_state_raw, dict) else {}
                 if not bool(modal_state.get("viewers_modal_open")):
@@ -2867,7 +3023,12 @@ class BrowserUseAgent:
                 if not next_data.get("clicked"):
                     await asyncio.sleep(0.8)
                     continue
-                await asyncio.sleep(1.2)
+                await self._wait_for_page_condition(
+                    page,
+                    story_changed_predicate,
+                    story_id,
+                    timeout_seconds=1.2,
+                )
                 _, new_state, _ = await _wait_for_story_url(max_wait_seconds=6.0)
                 next_story_url = self._normalize_story_url_value(
                     new_state.get("story_url") or new_state.get("current_url")
@@ -2964,6 +3125,23 @@ class BrowserUseAgent:
             return legacy_ua.strip()
         return None
 
+    def get_isolated_storage_state(
+        self,
+        storage_state: Optional[Dict[str, Any]],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Copia do storage_state sem o vinculo com a sessao Browserless persistente.
+
+        Workers paralelos usam essa copia para abrir um contexto proprio com os
+        mesmos cookies, sem disputar a aba da sessao reconectavel.
+        """
+        if not isinstance(storage_state, dict):
+            return storage_state
+        isolated = dict(storage_state)
+        isolated.pop("_browserless_reconnect", None)
+        isolated.pop("_browserless_session", None)
+        return isolated
+
     def _build_cookie_jar(self, cookies: List[Dict[str, Any]]) -> httpx.Cookies:
         jar = httpx.Cookies()
         for cookie in cookies:
@@ -3120,7 +3298,7 @@ class BrowserUseAgent:
             return state_raw if isinstance(state_raw, dict) else {}
 
         async def _stabilize_state(
-            browser_session: BrowserSession,
+            browser_session: "BrowserSession",
             username: str,
             attempts: int = 6,
             delay_seconds: float = 1.0,
@@ -3339,7 +3517,7 @@ class BrowserUseAgent:
 
     async def _export_storage_state_with_retry(
         self,
-        browser_session: BrowserSession,
+        browser_session: "BrowserSession",
         attempts: int = 2,
     ) -> Dict[str, Any]:
         last_error: Optional[BaseException] = None
@@ -3355,6 +3533,7 @@ class BrowserUseAgent:
             raise last_error
         return {}
 
+    @traced("session.ensure", capture=("instagram_username",))
     async def ensure_instagram_session(
         self,
         db: Session,
@@ -3449,7 +3628,7 @@ class BrowserUseAgent:
 
         cdp_url = connect_url or await self._resolve_browserless_cdp_url()
         browser_session = self._create_browser_session(cdp_url)
-        llm = ChatOpenAI(model=self.model, api_key=self.api_key)
+        llm = self._create_llm()
 
         login_task = f"""
         Voce esta em um navegador controlado por IA.
@@ -3491,7 +3670,7 @@ class BrowserUseAgent:
                 pass
         restore_event_bus = self._patch_event_bus_for_stop(browser_session)
         try:
-            history = await agent.run()
+            history = await self._run_agent(agent, "instagram_login")
             if not history.is_done() or not history.is_successful():
                 raise RuntimeError("Login nao foi concluido com sucesso.")
             final_text = (history.final_result() or "").strip().upper()
@@ -3628,7 +3807,7 @@ class BrowserUseAgent:
 
         cdp_url = await self._resolve_browserless_cdp_url()
         browser_session = self._create_browser_session(cdp_url)
-        llm = ChatOpenAI(model=self.model, api_key=self.api_key)
+        llm = self._create_llm()
 
         login_task = f"""
         Voce esta em um navegador controlado por IA.
@@ -3658,7 +3837,7 @@ class BrowserUseAgent:
         login_ok = False
         restore_event_bus = self._patch_event_bus_for_stop(browser_session)
         try:
-            history = await agent.run()
+            history = await self._run_agent(agent, "investing_login")
             if not history.is_done() or not history.is_successful():
                 raise RuntimeError("Login Investing nao foi concluido com sucesso.")
 
@@ -3804,7 +3983,7 @@ class BrowserUseAgent:
                         storage_state=storage_state_for_session,
                         user_agent=session_user_agent,
                     )
-                    llm = ChatOpenAI(model=self.model, api_key=self.api_key)
+                    llm = self._create_llm()
                     agent = self._create_agent(
                         task=task,
                         llm=llm,
@@ -3812,7 +3991,7 @@ class BrowserUseAgent:
                     )
 
                     restore_event_bus = self._patch_event_bus_for_stop(browser_session)
-                    history = await agent.run()
+                    history = await self._run_agent(agent, "profile_posts", profile_url=profile_url, attempt=attempt)
 
                     if not history.is_done():
                         logger.warning("âš ï¸ Browser Use nÃ£o completou a tarefa")
@@ -3994,7 +4173,7 @@ class BrowserUseAgent:
                         storage_state=storage_state_for_session,
                         user_agent=session_user_agent,
                     )
-                    llm = ChatOpenAI(model=self.model, api_key=self.api_key)
+                    llm = self._create_llm()
                     agent = self._create_agent(
                         task=task,
                         llm=llm,
@@ -4012,7 +4191,13 @@ class BrowserUseAgent:
                             run_kwargs["max_steps"] = 2
                     except Exception:
                         run_kwargs = {}
-                    history = await agent.run(**run_kwargs) if run_kwargs else await agent.run()
+                    history = await self._run_agent(
+                        agent,
+                        "post_like_users",
+                        run_kwargs=run_kwargs,
+                        post_url=post_url,
+                        attempt=attempt,
+                    )
                     final_result = history.final_result() or ""
 
                     if (not history.is_successful()) and self._contains_protocol_error(final_result) and attempt < max_retries:
@@ -4249,7 +4434,7 @@ class BrowserUseAgent:
                         storage_state=storage_state_for_session,
                         user_agent=session_user_agent,
                     )
-                    llm = ChatOpenAI(model=self.model, api_key=self.api_key)
+                    llm = self._create_llm()
                     agent = self._create_agent(
                         task=task,
                         llm=llm,
@@ -4257,7 +4442,7 @@ class BrowserUseAgent:
                     )
 
                     restore_event_bus = self._patch_event_bus_for_stop(browser_session)
-                    history = await agent.run()
+                    history = await self._run_agent(agent, "post_comments", post_url=post_url, attempt=attempt)
                     final_result = history.final_result() or ""
 
                     if (not history.is_successful()) and self._contains_protocol_error(final_result) and attempt < max_retries:
@@ -4440,6 +4625,7 @@ class BrowserUseAgent:
         finally:
             self._cleanup_storage_state_temp_file(storage_state_file)
 
+    @traced("browser.story_interactions", capture=("profile_url", "max_interactions"))
     async def scrape_story_interactions(
         self,
         profile_url: str,
@@ -4721,7 +4907,7 @@ class BrowserUseAgent:
                         storage_state=storage_state_for_session,
                         user_agent=session_user_agent,
                     )
-                    llm = ChatOpenAI(model=self.model, api_key=self.api_key)
+                    llm = self._create_llm()
                     agent = self._create_agent(
                         task=task,
                         llm=llm,
@@ -4729,7 +4915,7 @@ class BrowserUseAgent:
                     )
 
                     restore_event_bus = self._patch_event_bus_for_stop(browser_session)
-                    history = await agent.run()
+                    history = await self._run_agent(agent, "profile_basic_info", profile_url=profile_url, attempt=attempt)
                     final_result = history.final_result() or ""
 
                     if (not history.is_successful()) and self._contains_protocol_error(final_result) and attempt < max_retries:
@@ -4938,7 +5124,7 @@ class BrowserUseAgent:
                     - checked_at: ISO-8601 datetime string
                     """
 
-                    llm = ChatOpenAI(model=self.model, api_key=self.api_key)
+                    llm = self._create_llm()
                     agent = self._create_agent(
                         task=task,
                         llm=llm,
@@ -4947,7 +5133,7 @@ class BrowserUseAgent:
                         max_failures=6,
                         step_timeout=180,
                     )
-                    history = await agent.run()
+                    history = await self._run_agent(agent, "direct_message", profile_url=profile_url, attempt=attempt)
                     final_result = (history.final_result() or "").strip()
                     logger.info(
                         "Direct Agent final result (tentativa %s): %s",
@@ -5081,7 +5267,7 @@ class BrowserUseAgent:
                         storage_state=storage_state_for_session,
                         user_agent=session_user_agent,
                     )
-                    llm = ChatOpenAI(model=self.model, api_key=self.api_key)
+                    llm = self._create_llm()
 
                     task = f"""
                     Voce e um agente de scraping generico.
@@ -5106,7 +5292,7 @@ class BrowserUseAgent:
                     )
 
                     restore_event_bus = self._patch_event_bus_for_stop(browser_session)
-                    history = await agent.run()
+                    history = await self._run_agent(agent, "generic_scrape", url=url, attempt=attempt)
                     final_result = history.final_result() or ""
 
                     if (not history.is_successful()) and self._contains_protocol_error(final_result) and attempt < max_retries:
@@ -5233,4 +5419,4 @@ class BrowserUseAgent:
 
 
 # InstÃ¢ncia global do agente
-browser_use_agent = BrowserUseAgent()
+browser_use_agent: BrowserUseAgent = LazySingleton(BrowserUseAgent, "browser_use_agent")  # type: ignore[assignment]
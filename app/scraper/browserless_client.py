@@ -5,14 +5,27 @@ Fornece métodos para interagir com navegador headless via API Browserless.
 
 import httpx
 import base64
+import codecs
+import json
 import logging
 import asyncio
-from typing import Optional, Dict, Any
+import tempfile
+import time
+from typing import Optional, Dict, Any, IO, Awaitable, Callable, Tuple
 from config import settings
+from app.metrics import (
+    BROWSERLESS_REQUEST_DURATION_SECONDS,
+    BROWSERLESS_REQUEST_ERRORS_TOTAL,
+    BROWSERLESS_SEMAPHORE_WAIT_SECONDS,
+)
 
 logger = logging.getLogger(__name__)
 
 
+class BrowserlessResponseTooLarge(RuntimeError):
+    """Resposta do Browserless excedeu o limite configurado de bytes."""
+
+
 class BrowserlessClient:
     """Cliente para comunicação com Browserless."""
 
@@ -23,6 +36,8 @@ class BrowserlessClient:
         self.max_retries = max(1, settings.browserless_request_retries)
         self.retry_backoff_seconds = max(0.1, settings.browserless_retry_backoff_seconds)
         self.semaphore = asyncio.Semaphore(max(1, settings.browserless_max_concurrency))
+        self.max_response_bytes = max(1, int(getattr(settings, "browserless_max_response_bytes", 25 * 1024 * 1024)))
+        self.spool_max_memory_bytes = max(0, int(getattr(settings, "browserless_spool_max_memory_bytes", 1024 * 1024)))
         self._script_endpoints = ["/execute", "/function"]
         self.client = httpx.AsyncClient(timeout=httpx.Timeout(self.timeout))
 
@@ -53,32 +68,69 @@ class BrowserlessClient:
         payload: Dict[str, Any],
         url_for_log: str,
         fallback_fields: Optional[list[str]] = None,
-    ) -> httpx.Response:
+        read_body: Optional[Callable[[httpx.Response], Awaitable[Any]]] = None,
+    ) -> Any:
+        """
+        POST com retry/backoff.
+
+        Com `read_body` a requisicao e feita em streaming: a resposta 200 e entregue ao
+        callback (que consome e fecha o corpo) e o retorno dele e o resultado. Erros de
+        transporte no meio do corpo tambem entram no retry. O semaforo e liberado assim
+        que chegam os headers; a leitura do corpo nao ocupa vaga de concorrencia.
+        """
         last_exc: Optional[Exception] = None
         full_url = f"{self.host}{endpoint}"
+        stream = read_body is not None
 
-        for attempt in range(1, self.max_retries + 1):
-            try:
-                async with self.semaphore:
-                    response = await self.client.post(
+        async def _finish(response: httpx.Response) -> Any:
+            return response if read_body is None else await read_body(response)
+
+        async def _send(body: Dict[str, Any]) -> httpx.Response:
+            wait_started = time.perf_counter()
+            async with self.semaphore:
+                request_started = time.perf_counter()
+                BROWSERLESS_SEMAPHORE_WAIT_SECONDS.observe(request_started - wait_started)
+                try:
+                    if not stream:
+                        return await self.client.post(
+                            full_url,
+                            json=body,
+                            headers=self._get_headers(),
+                        )
+                    request = self.client.build_request(
+                        "POST",
                         full_url,
-                        json=payload,
+                        json=body,
                         headers=self._get_headers(),
                     )
+                    # Em streaming mede ate os headers; a leitura do corpo fica com o chamador.
+                    streamed = await self.client.send(request, stream=True)
+                finally:
+                    BROWSERLESS_REQUEST_DURATION_SECONDS.observe(
+                        time.perf_counter() - request_started,
+                        endpoint=endpoint,
+                    )
+            if streamed.status_code != 200:
+                # Respostas de erro sao pequenas: le o corpo para os checks abaixo.
+                try:
+                    await streamed.aread()
+                finally:
+                    await streamed.aclose()
+            return streamed
+
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                response = await _send(payload)
 
                 if response.status_code == 200:
-                    return response
+                    return await _finish(response)
+                BROWSERLESS_REQUEST_ERRORS_TOTAL.inc(endpoint=endpoint, code=str(response.status_code))
 
                 if fallback_fields and self._is_field_validation_error(response, fallback_fields):
                     fallback_payload = self._strip_payload_fields(payload, fallback_fields)
-                    async with self.semaphore:
-                        response = await self.client.post(
-                            full_url,
-                            json=fallback_payload,
-                            headers=self._get_headers(),
-                        )
+                    response = await _send(fallback_payload)
                     if response.status_code == 200:
-                        return response
+                        return await _finish(response)
 
                 retriable_statuses = {408, 429, 500, 502, 503, 504}
                 if response.status_code in retriable_statuses and attempt < self.max_retries:
@@ -93,6 +145,10 @@ class BrowserlessClient:
 
             except (httpx.TimeoutException, httpx.NetworkError, httpx.TransportError) as exc:
                 last_exc = exc
+                BROWSERLESS_REQUEST_ERRORS_TOTAL.inc(
+                    endpoint=endpoint,
+                    code="timeout" if isinstance(exc, httpx.TimeoutException) else "network",
+                )
                 if attempt < self.max_retries:
                     await asyncio.sleep(self.retry_backoff_seconds * attempt)
                     continue
@@ -103,6 +159,80 @@ class BrowserlessClient:
             ) from last_exc
         raise RuntimeError(f"Browserless {endpoint} falhou para {url_for_log}")
 
+    def _new_spool(self) -> IO[bytes]:
+        return tempfile.SpooledTemporaryFile(max_size=self.spool_max_memory_bytes, mode="w+b")
+
+    def _check_declared_size(self, response: httpx.Response, max_bytes: int, url_for_log: str) -> None:
+        declared = response.headers.get("content-length")
+        if declared and declared.isdigit() and int(declared) > max_bytes:
+            raise BrowserlessResponseTooLarge(
+                f"Resposta do Browserless para {url_for_log} excede o limite "
+                f"({declared} > {max_bytes} bytes)"
+            )
+
+    async def _read_response_to_spool(
+        self,
+        response: httpx.Response,
+        url_for_log: str,
+        max_bytes: Optional[int] = None,
+    ) -> IO[bytes]:
+        """
+        Copia o corpo (stream) para um buffer temporario que vai para disco acima de
+        `spool_max_memory_bytes`. Aborta ao passar de `max_bytes`.
+        """
+        limit = max_bytes or self.max_response_bytes
+        spool = self._new_spool()
+        total = 0
+        try:
+            self._check_declared_size(response, limit, url_for_log)
+            async for chunk in response.aiter_bytes():
+                total += len(chunk)
+                if total > limit:
+                    raise BrowserlessResponseTooLarge(
+                        f"Resposta do Browserless para {url_for_log} excede o limite ({limit} bytes)"
+                    )
+                spool.write(chunk)
+            spool.seek(0)
+            return spool
+        except BaseException:
+            spool.close()
+            raise
+        finally:
+            await response.aclose()
+
+    async def _read_response_to_buffer(
+        self,
+        response: httpx.Response,
+        url_for_log: str,
+        max_bytes: Optional[int] = None,
+    ) -> memoryview:
+        limit = max_bytes or self.max_response_bytes
+        buffer = bytearray()
+        try:
+            self._check_declared_size(response, limit, url_for_log)
+            async for chunk in response.aiter_bytes():
+                if len(buffer) + len(chunk) > limit:
+                    raise BrowserlessResponseTooLarge(
+                        f"Resposta do Browserless para {url_for_log} excede o limite ({limit} bytes)"
+                    )
+                buffer += chunk
+        finally:
+            await response.aclose()
+        return memoryview(buffer)
+
+    @staticmethod
+    def _response_encoding(response: httpx.Response) -> str:
+        encoding = response.charset_encoding or "utf-8"
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            encoding = "utf-8"
+        return encoding
+
+    @staticmethod
+    def _is_json_response(response: httpx.Response) -> bool:
+        return "application/json" in response.headers.get("content-type", "").lower()
+
     async def close(self):
         """Fecha a conexão com Browserless."""
         await self.client.aclose()
@@ -114,7 +244,27 @@ class BrowserlessClient:
             "Content-Type": "application/json",
         }
 
-    async def screenshot(
+    def _build_page_payload(
+        self,
+        url: str,
+        timeout: int,
+        wait_for: Optional[str] = None,
+        cookies: Optional[list[dict]] = None,
+        user_agent: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {
+            "url": url,
+            "timeout": timeout,
+        }
+        if wait_for:
+            payload["waitFor"] = wait_for
+        if cookies:
+            payload["cookies"] = cookies
+        if user_agent:
+            payload["userAgent"] = user_agent
+        return payload
+
+    async def screenshot_bytes(
         self,
         url: str,
         full_page: bool = True,
@@ -122,107 +272,222 @@ class BrowserlessClient:
         timeout: int = 30000,
         cookies: Optional[list[dict]] = None,
         user_agent: Optional[str] = None,
-    ) -> str:
+        max_bytes: Optional[int] = None,
+    ) -> memoryview:
         """
-        Captura screenshot de uma URL.
-
-        Args:
-            url: URL a ser capturada
-            full_page: Se True, captura a página inteira
-            wait_for: Seletor CSS para esperar antes de capturar
-            timeout: Timeout em ms
+        Captura screenshot de uma URL e devolve os bytes da imagem sem copias extras.
 
         Returns:
-            Screenshot em base64
+            memoryview sobre os bytes da imagem (limitado a `max_bytes`)
         """
         try:
-            payload = {
-                "url": url,
-                "fullPage": full_page,
-                "timeout": timeout,
-            }
+            payload = self._build_page_payload(url, timeout, wait_for, cookies, user_agent)
+            payload["fullPage"] = full_page
 
-            if wait_for:
-                payload["waitFor"] = wait_for
-            if cookies:
-                payload["cookies"] = cookies
-            if user_agent:
-                payload["userAgent"] = user_agent
+            async def _read(response: httpx.Response) -> Tuple[memoryview, bool]:
+                is_json = self._is_json_response(response)
+                return await self._read_response_to_buffer(response, url, max_bytes=max_bytes), is_json
 
-            response = await self._post_with_retry(
+            image, is_json = await self._post_with_retry(
                 endpoint="/screenshot",
                 payload=payload,
                 url_for_log=url,
                 fallback_fields=["fullPage", "timeout", "cookies", "userAgent"],
+                read_body=_read,
             )
-
-            # Alguns Browserless retornam JSON com base64, outros retornam bytes da imagem.
-            content_type = response.headers.get("content-type", "").lower()
-            if "application/json" in content_type:
-                screenshot_data = response.json().get("data")
-            else:
-                screenshot_data = base64.b64encode(response.content).decode("ascii")
-            logger.info(f"✅ Screenshot capturado: {url}")
-            return screenshot_data
+            if is_json:
+                # Alguns Browserless retornam JSON com base64 em "data".
+                data = json.loads(image.tobytes()).get("data") or ""
+                image = memoryview(base64.b64decode(data))
+            logger.info(f"✅ Screenshot capturado: {url} ({image.nbytes} bytes)")
+            return image
 
         except Exception as e:
             logger.error(f"❌ Erro ao capturar screenshot de {url}: {e}")
             raise
 
-    async def get_html(
+    async def screenshot(
         self,
         url: str,
+        full_page: bool = True,
         wait_for: Optional[str] = None,
         timeout: int = 30000,
         cookies: Optional[list[dict]] = None,
         user_agent: Optional[str] = None,
+        max_bytes: Optional[int] = None,
     ) -> str:
         """
-        Obtém HTML de uma URL.
+        Captura screenshot de uma URL.
 
         Args:
-            url: URL a ser acessada
-            wait_for: Seletor CSS para esperar antes de retornar
+            url: URL a ser capturada
+            full_page: Se True, captura a página inteira
+            wait_for: Seletor CSS para esperar antes de capturar
             timeout: Timeout em ms
+            max_bytes: Limite de tamanho da resposta (default: BROWSERLESS_MAX_RESPONSE_BYTES)
 
         Returns:
-            HTML da página
+            Screenshot em base64
+        """
+        image = await self.screenshot_bytes(
+            url,
+            full_page=full_page,
+            wait_for=wait_for,
+            timeout=timeout,
+            cookies=cookies,
+            user_agent=user_agent,
+            max_bytes=max_bytes,
+        )
+        return base64.b64encode(image).decode("ascii")
+
+    async def get_html_stream(
+        self,
+        url: str,
+        wait_for: Optional[str] = None,
+        timeout: int = 30000,
+        cookies: Optional[list[dict]] = None,
+        user_agent: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+    ) -> IO[bytes]:
+        """
+        Obtém HTML de uma URL em um buffer temporario (memoria/disco), sem montar a string.
+
+        Returns:
+            Arquivo binario posicionado no inicio, com o HTML em UTF-8. O chamador fecha.
         """
         try:
-            payload = {
-                "url": url,
-                "timeout": timeout,
-            }
+            payload = self._build_page_payload(url, timeout, wait_for, cookies, user_agent)
 
-            if wait_for:
-                payload["waitFor"] = wait_for
-            if cookies:
-                payload["cookies"] = cookies
-            if user_agent:
-                payload["userAgent"] = user_agent
+            async def _read(response: httpx.Response) -> Tuple[IO[bytes], bool, str]:
+                is_json = self._is_json_response(response)
+                encoding = self._response_encoding(response)
+                return await self._read_response_to_spool(response, url, max_bytes=max_bytes), is_json, encoding
 
-            response = await self._post_with_retry(
+            spool, is_json, encoding = await self._post_with_retry(
                 endpoint="/content",
                 payload=payload,
                 url_for_log=url,
                 fallback_fields=["timeout", "cookies", "userAgent"],
+                read_body=_read,
             )
-
-            content_type = response.headers.get("content-type", "").lower()
-            if "application/json" in content_type:
+            if is_json:
                 try:
-                    html = response.json().get("data")
+                    html = json.load(spool).get("data") or ""
                 except ValueError:
-                    html = response.text
-            else:
-                html = response.text
+                    html = None
+                if html is not None:
+                    spool.close()
+                    spool = self._new_spool()
+                    spool.write(str(html).encode("utf-8"))
+                spool.seek(0)
+            elif encoding.lower().replace("_", "-") not in {"utf-8", "utf8", "ascii"}:
+                transcoded = self._new_spool()
+                reader = codecs.getreader(encoding)(spool, errors="replace")
+                for text_chunk in iter(lambda: reader.read(64 * 1024), ""):
+                    transcoded.write(text_chunk.encode("utf-8"))
+                spool.close()
+                transcoded.seek(0)
+                spool = transcoded
             logger.info(f"✅ HTML obtido: {url}")
-            return html
+            return spool
+
+        except Exception as e:
+            logger.error(f"❌ Erro ao obter HTML de {url}: {e}")
+            raise
+
+    async def get_html_prefix(
+        self,
+        url: str,
+        max_chars: int,
+        wait_for: Optional[str] = None,
+        timeout: int = 30000,
+        cookies: Optional[list[dict]] = None,
+        user_agent: Optional[str] = None,
+    ) -> str:
+        """
+        Obtém apenas os primeiros `max_chars` caracteres do HTML.
+
+        Para consumidores que truncam o HTML (ex.: prompts da IA): le o stream
+        incrementalmente e encerra a conexao ao atingir o limite.
+        """
+        try:
+            payload = self._build_page_payload(url, timeout, wait_for, cookies, user_agent)
+
+            async def _read_prefix(response: httpx.Response) -> str:
+                if self._is_json_response(response):
+                    # JSON precisa ser lido inteiro para extrair "data".
+                    spool = await self._read_response_to_spool(response, url)
+                    try:
+                        html = str(json.load(spool).get("data") or "")
+                    except ValueError:
+                        spool.seek(0)
+                        html = spool.read().decode("utf-8", errors="replace")
+                    finally:
+                        spool.close()
+                    return html
+
+                decoder = codecs.getincrementaldecoder(self._response_encoding(response))(errors="replace")
+                parts: list[str] = []
+                collected = 0
+                try:
+                    async for chunk in response.aiter_bytes():
+                        text = decoder.decode(chunk)
+                        parts.append(text)
+                        collected += len(text)
+                        if collected >= max_chars:
+                            break
+                    else:
+                        parts.append(decoder.decode(b"", final=True))
+                finally:
+                    await response.aclose()
+                return "".join(parts)
+
+            html = await self._post_with_retry(
+                endpoint="/content",
+                payload=payload,
+                url_for_log=url,
+                fallback_fields=["timeout", "cookies", "userAgent"],
+                read_body=_read_prefix,
+            )
+            logger.info(f"✅ HTML (prefixo) obtido: {url}")
+            return html[:max_chars]
 
         except Exception as e:
             logger.error(f"❌ Erro ao obter HTML de {url}: {e}")
             raise
 
+    async def get_html(
+        self,
+        url: str,
+        wait_for: Optional[str] = None,
+        timeout: int = 30000,
+        cookies: Optional[list[dict]] = None,
+        user_agent: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+    ) -> str:
+        """
+        Obtém HTML de uma URL.
+
+        Args:
+            url: URL a ser acessada
+            wait_for: Seletor CSS para esperar antes de retornar
+            timeout: Timeout em ms
+            max_bytes: Limite de tamanho da resposta (default: BROWSERLESS_MAX_RESPONSE_BYTES)
+
+        Returns:
+            HTML da página
+        """
+        spool = await self.get_html_stream(
+            url,
+            wait_for=wait_for,
+            timeout=timeout,
+            cookies=cookies,
+            user_agent=user_agent,
+            max_bytes=max_bytes,
+        )
+        with spool:
+            return spool.read().decode("utf-8", errors="replace")
+
     async def execute_script(
         self,
         url: str,
@@ -312,20 +577,17 @@ class BrowserlessClient:
             logger.error(f"❌ Erro ao executar script em {url}: {e}")
             raise
 
-    async def pdf(
+    async def pdf_stream(
         self,
         url: str,
         timeout: int = 30000,
-    ) -> bytes:
+        max_bytes: Optional[int] = None,
+    ) -> IO[bytes]:
         """
-        Gera PDF de uma URL.
-
-        Args:
-            url: URL a ser convertida
-            timeout: Timeout em ms
+        Gera PDF de uma URL em um buffer temporario (memoria/disco).
 
         Returns:
-            PDF em bytes
+            Arquivo binario posicionado no inicio. O chamador fecha.
         """
         try:
             payload = {
@@ -333,20 +595,41 @@ class BrowserlessClient:
                 "timeout": timeout,
             }
 
-            response = await self._post_with_retry(
+            spool = await self._post_with_retry(
                 endpoint="/pdf",
                 payload=payload,
                 url_for_log=url,
                 fallback_fields=["timeout"],
+                read_body=lambda response: self._read_response_to_spool(response, url, max_bytes=max_bytes),
             )
-            pdf_data = response.content
             logger.info(f"✅ PDF gerado: {url}")
-            return pdf_data
+            return spool
 
         except Exception as e:
             logger.error(f"❌ Erro ao gerar PDF de {url}: {e}")
             raise
 
+    async def pdf(
+        self,
+        url: str,
+        timeout: int = 30000,
+        max_bytes: Optional[int] = None,
+    ) -> bytes:
+        """
+        Gera PDF de uma URL.
+
+        Args:
+            url: URL a ser convertida
+            timeout: Timeout em ms
+            max_bytes: Limite de tamanho da resposta (default: BROWSERLESS_MAX_RESPONSE_BYTES)
+
+        Returns:
+            PDF em bytes
+        """
+        spool = await self.pdf_stream(url, timeout=timeout, max_bytes=max_bytes)
+        with spool:
+            return spool.read()
+
     async def health_check(self) -> bool:
         """
         Verifica se Browserless está acessível.
@@ -10,6 +10,7 @@ import re
 import json
 import html as html_lib
 import unicodedata
+import weakref
 from urllib.parse import urlparse
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timezone, timedelta
@@ -17,14 +18,37 @@ from datetime import datetime, timezone, timedelta
 from app.scraper.browserless_client import BrowserlessClient
 from app.scraper.browser_use_agent import browser_use_agent
 from app.scraper.ai_extractor import AIExtractor
+from app.scraper.profile_parser import parse_profile_payload
+from app.scraper.time_parsing import parse_absolute_date, relative_time_to_hours, relative_times_to_hours
 from app.models import Profile, Post, Interaction, InteractionType
 from app.database import SessionLocal
+from app.job_events import emit_progress
+from app.lazy import LazySingleton
+from app.profile_cache import profile_cache
+from app.metrics import DB_PERSIST_BATCH_SIZE, INSTAGRAM_TAB_SEMAPHORE_WAIT_SECONDS
+from app.tracing import span, traced
 from sqlalchemy.orm import Session
 from sqlalchemy import func, or_
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Semaforos por conta Instagram (session_username), compartilhados entre jobs do processo.
+# Referencias fracas: a entrada some quando nenhum job em andamento segura o semaforo.
+_account_tab_semaphores: "weakref.WeakValueDictionary[str, asyncio.Semaphore]" = weakref.WeakValueDictionary()
+
+
+def _account_tab_limit() -> int:
+    return max(1, int(getattr(settings, "instagram_account_max_parallel_tabs", 3) or 1))
+
+
+def _get_account_tab_semaphore(session_username: str) -> asyncio.Semaphore:
+    semaphore = _account_tab_semaphores.get(session_username)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(_account_tab_limit())
+        _account_tab_semaphores[session_username] = semaphore
+    return semaphore
+
 
 class InstagramScraper:
     """
@@ -103,6 +127,7 @@ class InstagramScraper:
             "user_username": user_username or None,
         }
 
+    @traced("db.persist_story")
     async def _persist_story_interaction_item(
         self,
         db: Session,
@@ -640,20 +665,13 @@ class InstagramScraper:
             "posted_at": posted_at,
         }
 
-    def _extract_profile_info_from_html(
+    def _extract_profile_fields_with_regex(
         self,
-        html_content: Optional[str],
+        text: str,
+        extracted: Dict[str, Any],
         username_hint: Optional[str] = None,
-    ) -> Dict[str, Any]:
-        """
-        Extração determinística de dados de perfil a partir do HTML do Instagram.
-        """
-        if not html_content:
-            return {}
-
-        extracted: Dict[str, Any] = {}
-        text = html_content
-
+    ) -> None:
+        """Fallback por regex quando o HTML nao traz o payload JSON do perfil."""
         def _bool_from_match(pattern: str) -> Optional[bool]:
             match = re.search(pattern, text)
             if not match:
@@ -697,6 +715,23 @@ class InstagramScraper:
         extracted["following_count"] = _int_from_match(r'"edge_follow":\{"count":(\d+)')
         extracted["post_count"] = _int_from_match(r'"edge_owner_to_timeline_media":\{"count":(\d+)')
 
+    def _extract_profile_info_from_html(
+        self,
+        html_content: Optional[str],
+        username_hint: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Extração determinística de dados de perfil a partir do HTML do Instagram.
+        """
+        if not html_content:
+            return {}
+
+        text = html_content
+        # Caminho rapido: payload JSON do perfil decodificado em uma passada.
+        extracted: Dict[str, Any] = parse_profile_payload(text, username_hint=username_hint)
+        if not extracted:
+            self._extract_profile_fields_with_regex(text, extracted, username_hint)
+
         # Fallback via meta description (útil quando o payload principal não vem completo)
         if any(extracted.get(k) is None for k in ("follower_count", "following_count", "post_count", "bio")):
             meta_match = re.search(
@@ -1002,6 +1037,7 @@ class InstagramScraper:
 
         return merged[:max_posts]
 
+    @traced("scraper.posts_fallback", capture=("profile_url", "max_posts"))
     async def _fallback_scrape_posts_via_browserless(
         self,
         profile_url: str,
@@ -1038,8 +1074,10 @@ class InstagramScraper:
                 except Exception as exc:
                     logger.warning("âš ï¸ Falha ao capturar screenshot do post %s: %s", post_url, exc)
                 try:
-                    post_html = await self.browserless.get_html(
+                    # A IA so usa o inicio do HTML: evita baixar/decodificar a pagina inteira.
+                    post_html = await self.browserless.get_html_prefix(
                         post_url,
+                        max_chars=self.ai_extractor.HTML_PROMPT_MAX_CHARS,
                         cookies=cookies,
                         user_agent=user_agent,
                     )
@@ -1099,173 +1137,14 @@ class InstagramScraper:
         Converte texto relativo (ex: "3 h", "2d", "1 sem") para horas.
         Retorna None quando nao consegue interpretar.
         """
-        if text is None:
-            return None
-
-        cleaned = str(text).strip().lower()
-        if not cleaned:
-            return None
-
-        cleaned = cleaned.replace("\u2022", " ").replace("\u00b7", " ")
-        cleaned = re.sub(r"\b(editado|editada|edited)\b", "", cleaned)
-        cleaned = re.sub(r"\bago\b", "", cleaned)
-        cleaned = re.sub(r"\bh[a\u00e1]\b", "", cleaned)
-        cleaned = cleaned.strip()
-
-        if cleaned in {"now", "just now", "agora", "agora mesmo"}:
-            return 0.0
-        if cleaned in {"today", "hoje"}:
-            return 0.0
-        if cleaned in {"yesterday", "ontem"}:
-            return 24.0
-
-        patterns = [
-            (r"(\d+(?:[.,]\d+)?)\s*(?:s|seg|segs|segundo|segundos|sec|secs|second|seconds)\b", 1 / 3600),
-            (r"(\d+(?:[.,]\d+)?)\s*(?:m|min|mins|minute|minutes|minuto|minutos)\b", 1 / 60),
-            (r"(\d+(?:[.,]\d+)?)\s*(?:h|hr|hrs|hour|hours|hora|horas)\b", 1),
-            (r"(\d+(?:[.,]\d+)?)\s*(?:d|day|days|dia|dias)\b", 24),
-            (r"(\d+(?:[.,]\d+)?)\s*(?:w|wk|wks|week|weeks|sem|semana|semanas)\b", 24 * 7),
-            (r"(\d+(?:[.,]\d+)?)\s*(?:mo|month|months|mes|m[e\u00ea]s|meses)\b", 24 * 30),
-            (r"(\d+(?:[.,]\d+)?)\s*(?:y|yr|year|years|ano|anos)\b", 24 * 365),
-        ]
-
-        for pattern, hour_multiplier in patterns:
-            match = re.search(pattern, cleaned)
-            if not match:
-                continue
-            value = match.group(1).replace(",", ".")
-            try:
-                return float(value) * hour_multiplier
-            except ValueError:
-                return None
-
-        return None
+        return relative_time_to_hours(text)
 
     def _parse_absolute_date(self, text: str, now: datetime) -> Optional[datetime]:
         """
         Tenta interpretar datas absolutas sem ano (ex: "January 23", "23 de janeiro").
         Retorna datetime em UTC quando possivel.
         """
-        if not text:
-            return None
-
-        cleaned = text.strip().lower()
-        if not cleaned:
-            return None
-
-        normalized = unicodedata.normalize("NFD", cleaned)
-        normalized = "".join(ch for ch in normalized if unicodedata.category(ch) != "Mn")
-        normalized = normalized.replace(",", " ").replace(".", " ")
-        normalized = re.sub(r"\bde\b", " ", normalized)
-        normalized = re.sub(r"\s+", " ", normalized).strip()
-
-        month_map = {
-            "january": 1,
-            "jan": 1,
-            "february": 2,
-            "feb": 2,
-            "fevereiro": 2,
-            "fev": 2,
-            "march": 3,
-            "mar": 3,
-            "marco": 3,
-            "abril": 4,
-            "apr": 4,
-            "april": 4,
-            "maio": 5,
-            "may": 5,
-            "jun": 6,
-            "june": 6,
-            "junho": 6,
-            "jul": 7,
-            "july": 7,
-            "julho": 7,
-            "aug": 8,
-            "august": 8,
-            "ago": 8,
-            "agosto": 8,
-            "sep": 9,
-            "sept": 9,
-            "september": 9,
-            "set": 9,
-            "setembro": 9,
-            "oct": 10,
-            "october": 10,
-            "out": 10,
-            "outubro": 10,
-            "nov": 11,
-            "november": 11,
-            "novembro": 11,
-            "dec": 12,
-            "december": 12,
-            "dez": 12,
-            "dezembro": 12,
-        }
-
-        tokens = normalized.split()
-        if not tokens:
-            return None
-
-        def _parse_day(token: str) -> Optional[int]:
-            match = re.match(r"(\d{1,2})", token)
-            if not match:
-                return None
-            day = int(match.group(1))
-            if 1 <= day <= 31:
-                return day
-            return None
-
-        def _parse_year(token: Optional[str]) -> Optional[int]:
-            if not token:
-                return None
-            match = re.match(r"(\d{2,4})", token)
-            if not match:
-                return None
-            year = int(match.group(1))
-            if year < 100:
-                year += 2000
-            return year
-
-        for idx, token in enumerate(tokens):
-            month = month_map.get(token)
-            if not month:
-                continue
-
-            day = None
-            year = None
-
-            if idx + 1 < len(tokens):
-                day = _parse_day(tokens[idx + 1])
-                if day is not None and idx + 2 < len(tokens):
-                    year = _parse_year(tokens[idx + 2])
-
-            if day is None and idx > 0:
-                day = _parse_day(tokens[idx - 1])
-                if day is not None and idx + 1 < len(tokens):
-                    year = _parse_year(tokens[idx + 1])
-
-            if day is None:
-                continue
-
-            if year is None:
-                year = now.year
-                try:
-                    candidate = datetime(year, month, day, tzinfo=timezone.utc)
-                except ValueError:
-                    return None
-                if candidate.date() > now.date():
-                    try:
-                        candidate = datetime(year - 1, month, day, tzinfo=timezone.utc)
-                    except ValueError:
-                        return None
-                return candidate
-
-            try:
-                return datetime(year, month, day, tzinfo=timezone.utc)
-            except ValueError:
-                return None
-
-        return None
+        return parse_absolute_date(text, now)
 
     def _is_recent_post(self, posted_at: Any, recent_days: int = 1) -> bool:
         """
@@ -1348,8 +1227,9 @@ class InstagramScraper:
                 cookies=cookies,
                 user_agent=user_agent,
             )
-            html = await self.browserless.get_html(
+            html = await self.browserless.get_html_prefix(
                 user_url,
+                max_chars=self.ai_extractor.USER_HTML_PROMPT_MAX_CHARS,
                 cookies=cookies,
                 user_agent=user_agent,
             )
@@ -1375,6 +1255,7 @@ class InstagramScraper:
                 "error": str(exc),
             }
 
+    @traced("flow.default", capture=("profile_url", "max_posts"))
     async def scrape_profile(
         self,
         profile_url: str,
@@ -1472,6 +1353,7 @@ class InstagramScraper:
             logger.exception("Erro ao raspar perfil completo %s: %s", profile_url, e)
             raise
 
+    @traced("scraper.profile_info", capture=("profile_url",))
     async def scrape_profile_info(
         self,
         profile_url: str,
@@ -1495,10 +1377,7 @@ class InstagramScraper:
 
             if db and cache_ttl_days > 0:
                 ttl_cutoff = datetime.utcnow() - timedelta(days=cache_ttl_days)
-                cached = db.query(Profile).filter(
-                    (Profile.instagram_url == profile_url)
-                    | (func.lower(Profile.instagram_username) == username_fallback)
-                ).first()
+                cached = profile_cache.get(db, username_fallback, profile_url=profile_url)
                 if cached and cached.last_scraped_at and cached.last_scraped_at >= ttl_cutoff:
                     logger.info(
                         "Perfil %s retornado do cache (TTL %s dias).",
@@ -1718,6 +1597,7 @@ class InstagramScraper:
             logger.exception("Erro ao extrair dados do perfil %s: %s", profile_url, e)
             raise
 
+    @traced("flow.recent_likes", capture=("profile_url", "max_posts"))
     async def scrape_recent_posts_like_users(
         self,
         profile_url: str,
@@ -1778,15 +1658,17 @@ class InstagramScraper:
             total_recent_posts = 0
             all_interactions: List[Dict[str, Any]] = []
 
-            for post in posts_data[:max_posts]:
+            async def _process_post(
+                post: Dict[str, Any],
+                post_storage_state: Optional[Dict[str, Any]],
+            ) -> Optional[tuple[Dict[str, Any], List[Dict[str, Any]]]]:
                 post_url = post.get("post_url")
                 if not post_url:
-                    continue
+                    return None
 
                 posted_at = post.get("posted_at")
                 is_recent = self._is_recent_post(posted_at, recent_days=recent_days)
-                if is_recent:
-                    total_recent_posts += 1
+                post_interactions: List[Dict[str, Any]] = []
 
                 post_payload: Dict[str, Any] = {
                     "post_url": post_url,
@@ -1803,12 +1685,11 @@ class InstagramScraper:
 
                 if not is_recent:
                     post_payload["error"] = "post_older_than_window"
-                    extracted_posts.append(post_payload)
-                    continue
+                    return post_payload, post_interactions
 
                 like_users_result = await browser_use_agent.scrape_post_like_users(
                     post_url=post_url,
-                    storage_state=storage_state,
+                    storage_state=post_storage_state,
                     max_users=max_like_users_per_post,
                 )
 
@@ -1823,7 +1704,7 @@ class InstagramScraper:
                             dedup_users.append(item)
                     post_payload["like_users"] = dedup_users
                     for user_url in post_payload["like_users"]:
-                        all_interactions.append({
+                        post_interactions.append({
                             "type": "like",
                             "user_url": user_url,
                             "user_username": self._extract_username_from_url(user_url),
@@ -1832,29 +1713,89 @@ class InstagramScraper:
                 else:
                     post_payload["like_users"] = []
 
-                total_like_users += len(post_payload["like_users"])
-                if is_recent:
-                    try:
-                        comment_interactions = await self._scrape_post_interactions(
-                            post_url=post_url,
-                            post_data=post,
-                            storage_state=storage_state,
-                            recent_days=recent_days,
-                        )
-                        comment_interactions = [
-                            item for item in comment_interactions
-                            if item.get("type") == "comment"
-                        ]
-                        for interaction in comment_interactions:
-                            interaction["_post_url"] = post_url
-                        all_interactions.extend(comment_interactions)
-                    except Exception as exc:
-                        logger.warning("Falha ao extrair comentarios do post %s: %s", post_url, exc)
+                try:
+                    comment_interactions = await self._scrape_post_interactions(
+                        post_url=post_url,
+                        post_data=post,
+                        storage_state=post_storage_state,
+                        recent_days=recent_days,
+                    )
+                    comment_interactions = [
+                        item for item in comment_interactions
+                        if item.get("type") == "comment"
+                    ]
+                    for interaction in comment_interactions:
+                        interaction["_post_url"] = post_url
+                    post_interactions.extend(comment_interactions)
+                except Exception as exc:
+                    logger.warning("Falha ao extrair comentarios do post %s: %s", post_url, exc)
 
                 # Enriquecimento de perfis curtidores foi removido do /scrape.
                 # Mantemos like_users_data vazio por compatibilidade de contrato.
+                return post_payload, post_interactions
+
+            # Posts sao processados em paralelo em ate K abas. A aba 0 reaproveita a
+            # sessao Browserless persistente; as demais abrem contextos proprios com os
+            # mesmos cookies. O semaforo por conta limita o total entre jobs simultaneos.
+            selected_posts = posts_data[:max_posts]
+            parallel_tabs = max(1, int(getattr(settings, "recent_likes_parallel_tabs", 3) or 1))
+            parallel_tabs = min(parallel_tabs, max(1, len(selected_posts)))
+            account_semaphore = _get_account_tab_semaphore(normalized_session_username)
+            free_tabs: asyncio.Queue[int] = asyncio.Queue()
+            for tab_index in range(parallel_tabs):
+                free_tabs.put_nowait(tab_index)
+            isolated_storage_state = browser_use_agent.get_isolated_storage_state(storage_state)
+            progress = {"posts_completed": 0}
+
+            async def _process_post_in_tab(
+                post: Dict[str, Any],
+            ) -> Optional[tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+                with span("scraper.recent_likes_post", post_url=post.get("post_url")) as post_span:
+                    async with account_semaphore:
+                        tab_index = await free_tabs.get()
+                        post_span.set_attributes(tab=tab_index, tab_wait_ms=round(post_span.duration_ms, 1))
+                        INSTAGRAM_TAB_SEMAPHORE_WAIT_SECONDS.observe(post_span.duration_ms / 1000.0)
+                        try:
+                            post_storage_state = storage_state if tab_index == 0 else isolated_storage_state
+                            post_result = await _process_post(post, post_storage_state)
+                        finally:
+                            free_tabs.put_nowait(tab_index)
+                progress["posts_completed"] += 1
+                emit_progress(
+                    "post_completed",
+                    post_url=post.get("post_url"),
+                    like_users=len(post_result[0].get("like_users") or []) if post_result else 0,
+                    posts_completed=progress["posts_completed"],
+                    posts_total=len(selected_posts),
+                )
+                return post_result
 
+            logger.info(
+                "recent_likes: processando %s posts em ate %s abas (limite por conta=%s)",
+                len(selected_posts),
+                parallel_tabs,
+                _account_tab_limit(),
+            )
+            post_tasks = [asyncio.create_task(_process_post_in_tab(post)) for post in selected_posts]
+            try:
+                post_results = await asyncio.gather(*post_tasks)
+            finally:
+                # Se um post falhar (ou o job for cancelado), as demais abas param aqui e
+                # liberam o semaforo da conta antes do erro subir.
+                for task in post_tasks:
+                    task.cancel()
+                await asyncio.gather(*post_tasks, return_exceptions=True)
+
+            # gather preserva a ordem de entrada: o merge segue a ordem original dos posts.
+            for post_result in post_results:
+                if post_result is None:
+                    continue
+                post_payload, post_interactions = post_result
+                if post_payload.get("is_recent"):
+                    total_recent_posts += 1
+                    total_like_users += len(post_payload["like_users"])
                 extracted_posts.append(post_payload)
+                all_interactions.extend(post_interactions)
 
             result = {
                 "status": "success",
@@ -1894,6 +1835,7 @@ class InstagramScraper:
             logger.exception("âŒ Erro no fluxo recent_likes para %s: %s", profile_url, exc)
             raise
 
+    @traced("flow.stories_interactions", capture=("profile_url",))
     async def scrape_stories_interactions(
         self,
         profile_url: str,
@@ -1969,6 +1911,12 @@ class InstagramScraper:
                         "Story persistido antes da navegacao seguinte: %s",
                         persisted_story_url,
                     )
+                    emit_progress(
+                        "story_collected",
+                        story_url=persisted_story_url,
+                        stories_collected=len(persisted_story_urls),
+                        **persisted_story_stats[persisted_story_url],
+                    )
 
             raw_result = await browser_use_agent.scrape_story_interactions(
                 profile_url=profile_url,
@@ -2360,6 +2308,7 @@ class InstagramScraper:
             logger.exception("Erro no fluxo direct_message para %s: %s", profile_url, exc)
             raise
 
+    @traced("scraper.posts", capture=("profile_url", "max_posts"))
     async def _scrape_posts(
         self,
         profile_url: str,
@@ -2447,6 +2396,7 @@ class InstagramScraper:
                 return fallback_posts[:max_posts]
             return []
 
+    @traced("scraper.post_comments", capture=("post_url",))
     async def _scrape_post_interactions(
         self,
         post_url: str,
@@ -2496,11 +2446,10 @@ class InstagramScraper:
 
             comments_payload = comments_result.get("comments")
             comments = comments_payload if isinstance(comments_payload, list) else []
+            comments = [comment for comment in comments if isinstance(comment, dict)]
+            comment_hours = relative_times_to_hours(comment.get("comment_posted_at") for comment in comments)
 
-            for comment in comments:
-                if not isinstance(comment, dict):
-                    continue
-
+            for comment, hours in zip(comments, comment_hours):
                 user_username = str(comment.get("user_username") or "").strip().lstrip("@")
                 user_url = str(comment.get("user_url") or "").strip()
                 if not user_url and user_username:
@@ -2518,7 +2467,6 @@ class InstagramScraper:
                     continue
 
                 comment_posted_at = comment.get("comment_posted_at")
-                hours = self._relative_time_to_hours(comment_posted_at)
                 within_window = True
                 if limit_hours is not None and hours is not None and hours > limit_hours:
                     within_window = False
@@ -2560,6 +2508,7 @@ class InstagramScraper:
             logger.error(f"âŒ Erro ao raspar interaÃ§Ãµes do post: {e}")
             return []
 
+    @traced("db.save_profile")
     async def _save_profile(
         self,
         db: Session,
@@ -2587,6 +2536,7 @@ class InstagramScraper:
             full_name = profile_info.get("full_name")
 
             if existing:
+                previous_username = existing.instagram_username
                 existing.instagram_username = username
                 existing.instagram_url = normalized_profile_url
                 if full_name is not None:
@@ -2603,6 +2553,7 @@ class InstagramScraper:
                 existing.verified = profile_info.get("verified", False)
                 existing.last_scraped_at = datetime.utcnow()
                 db.commit()
+                profile_cache.invalidate(username, previous_username)
                 logger.info("Perfil atualizado: %s", username)
                 return existing
 
@@ -2621,6 +2572,7 @@ class InstagramScraper:
             db.add(profile)
             db.commit()
             db.refresh(profile)
+            profile_cache.invalidate(username)
             logger.info("Novo perfil salvo: %s", username)
             return profile
 
@@ -2629,6 +2581,7 @@ class InstagramScraper:
             db.rollback()
             raise
 
+    @traced("db.save_posts_interactions")
     async def _save_posts_and_interactions(
         self,
         db: Session,
@@ -2645,6 +2598,8 @@ class InstagramScraper:
             posts_data: Lista de posts
             interactions: Lista de interações
         """
+        DB_PERSIST_BATCH_SIZE.observe(len(posts_data), kind="posts")
+        DB_PERSIST_BATCH_SIZE.observe(len(interactions), kind="interactions")
         try:
             for post_data in posts_data:
                 post_url = post_data.get("post_url")
@@ -2723,6 +2678,11 @@ class InstagramScraper:
                             comment_posted_at=(interaction_data.get("comment_posted_at") if interaction_type == InteractionType.COMMENT else None),
                         )
                         db.add(interaction)
+            # profiles.updated_at versiona posts/interacoes do perfil (ETag das listagens e resultados).
+            db.query(Profile).filter(Profile.id == profile_id).update(
+                {Profile.updated_at: datetime.utcnow()},
+                synchronize_session=False,
+            )
             db.commit()
             logger.info(
                 "Persistencia de posts/interacoes concluida: posts=%s interactions=%s",
@@ -2737,4 +2697,4 @@ class InstagramScraper:
 
 
 # InstÃ¢ncia global do scraper
-instagram_scraper = InstagramScraper()
+instagram_scraper: InstagramScraper = LazySingleton(InstagramScraper, "instagram_scraper")  # type: ignore[assignment]
@@ -0,0 +1,132 @@
+"""
+Parser estruturado do HTML de perfil do Instagram.
+
+O perfil chega com o usuario embutido em blocos `<script type="application/json">` (ou no
+legado `window._sharedData`). Em vez de varias buscas por regex no documento inteiro,
+localiza apenas os blocos que mencionam campos de perfil, decodifica cada um uma vez
+(orjson) e extrai todos os campos do objeto de usuario encontrado.
+"""
+
+import re
+from typing import Any, Dict, Iterator, List, Optional
+
+import orjson
+
+_SHARED_DATA_PREFIX_RE = re.compile(r"^\s*window\._sharedData\s*=\s*")
+
+# Marcadores baratos (substring) para decidir se vale decodificar um bloco.
+_PROFILE_MARKERS = ('"edge_followed_by"', '"follower_count"', '"biography"')
+
+_COUNT_FIELDS = (
+    ("follower_count", "edge_followed_by", "follower_count"),
+    ("following_count", "edge_follow", "following_count"),
+    ("post_count", "edge_owner_to_timeline_media", "media_count"),
+)
+
+
+def _candidate_payloads(html_content: str) -> Iterator[str]:
+    """
+    Localiza os <script> que contem marcadores de perfil a partir do proprio marcador
+    (busca literal), sem varrer o corpo de todos os scripts da pagina.
+    """
+    seen_starts = set()
+    for marker in _PROFILE_MARKERS:
+        position = html_content.find(marker)
+        while position != -1:
+            start = html_content.rfind("<script", 0, position)
+            end = html_content.find("</script>", position)
+            if start == -1 or end == -1:
+                break
+            tag_end = html_content.find(">", start, position)
+            inside_script = tag_end != -1 and html_content.rfind("</script>", start, position) == -1
+            if inside_script and start not in seen_starts:
+                seen_starts.add(start)
+                attrs = html_content[start:tag_end].lower()
+                body = html_content[tag_end + 1:end]
+                if "application/json" in attrs:
+                    yield body.strip()
+                else:
+                    prefix = _SHARED_DATA_PREFIX_RE.match(body)
+                    if prefix:
+                        yield body[prefix.end():].strip().rstrip(";")
+            position = html_content.find(marker, end)
+
+
+def _is_user_node(node: Dict[str, Any]) -> bool:
+    return isinstance(node.get("username"), str) and any(
+        key in node for key in ("edge_followed_by", "follower_count", "biography")
+    )
+
+
+def _iter_user_nodes(payload: Any) -> Iterator[Dict[str, Any]]:
+    stack: List[Any] = [payload]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if _is_user_node(node):
+                yield node
+            stack.extend(value for value in node.values() if isinstance(value, (dict, list)))
+        elif isinstance(node, list):
+            stack.extend(value for value in reversed(node) if isinstance(value, (dict, list)))
+
+
+def _count(node: Dict[str, Any], edge_key: str, flat_key: str) -> Optional[int]:
+    edge = node.get(edge_key)
+    value = edge.get("count") if isinstance(edge, dict) else node.get(flat_key)
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return None
+
+
+def _optional_bool(value: Any) -> Optional[bool]:
+    return value if isinstance(value, bool) else None
+
+
+def find_profile_user(html_content: Optional[str], username_hint: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Retorna o objeto de usuario embutido no HTML (o do `username_hint`, quando informado;
+    senao o primeiro encontrado) ou None.
+    """
+    if not html_content:
+        return None
+
+    hint = (username_hint or "").strip().lstrip("@").lower()
+    first_user: Optional[Dict[str, Any]] = None
+    for raw_payload in _candidate_payloads(html_content):
+        try:
+            payload = orjson.loads(raw_payload)
+        except orjson.JSONDecodeError:
+            continue
+        for user in _iter_user_nodes(payload):
+            if not hint or user["username"].lower() == hint:
+                return user
+            if first_user is None:
+                first_user = user
+    return first_user
+
+
+def parse_profile_payload(html_content: Optional[str], username_hint: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Extrai username, full_name, bio, is_private, verified e contadores do payload JSON.
+    Retorna {} quando o HTML nao traz o objeto de usuario (o chamador usa o fallback por regex).
+    """
+    user = find_profile_user(html_content, username_hint=username_hint)
+    if user is None:
+        return {}
+
+    extracted: Dict[str, Any] = {"username": user["username"]}
+    full_name = user.get("full_name")
+    if isinstance(full_name, str):
+        extracted["full_name"] = full_name
+    biography = user.get("biography")
+    if isinstance(biography, str):
+        extracted["bio"] = biography
+    extracted["is_private"] = _optional_bool(user.get("is_private"))
+    extracted["verified"] = _optional_bool(user.get("is_verified"))
+    for field, edge_key, flat_key in _COUNT_FIELDS:
+        extracted[field] = _count(user, edge_key, flat_key)
+    return extracted
@@ -0,0 +1,267 @@
+"""
+Interpretacao de expressoes de tempo do Instagram ("3 h", "2 sem", "23 de janeiro", ISO).
+
+Compartilhado por InstagramScraper (comentarios/posts recentes) e BrowserUseAgent (DMs).
+Os padroes sao compilados uma unica vez e o resultado e memorizado (LRU) pela string
+normalizada: o mesmo "1 d"/"2 h" se repete centenas de vezes num job de comentarios.
+Datas absolutas memorizam apenas (mes, dia, ano); a resolucao contra `now` e feita a
+cada chamada, entao o cache nao envelhece.
+"""
+
+import re
+import unicodedata
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Tuple
+
+CACHE_SIZE = 4096
+
+_NOW_WORDS = frozenset({"now", "just now", "agora", "agora mesmo"})
+_TODAY_WORDS = frozenset({"today", "hoje"})
+_YESTERDAY_WORDS = frozenset({"yesterday", "ontem"})
+
+_BULLETS_TABLE = str.maketrans({"•": " ", "·": " "})
+_NOISE_RE = re.compile(r"\b(?:editado|editada|edited|ago|h[aá])\b")
+_SPACES_RE = re.compile(r"\s+")
+
+# Uma unica alternancia para todas as unidades; o grupo nomeado que casou indica a unidade.
+_RELATIVE_RE = re.compile(
+    r"(?P<value>\d+(?:[.,]\d+)?)\s*(?:"
+    r"(?P<seconds>s|sec|secs|second|seconds|seg|segs|segundo|segundos)"
+    r"|(?P<minutes>m|min|mins|minute|minutes|minuto|minutos)"
+    r"|(?P<hours>h|hr|hrs|hour|hours|hora|horas)"
+    r"|(?P<days>d|day|days|dia|dias)"
+    r"|(?P<weeks>w|wk|wks|week|weeks|sem|semana|semanas)"
+    r"|(?P<months>mo|month|months|mes|m[eê]s|meses)"
+    r"|(?P<years>y|yr|year|years|ano|anos)"
+    r")\b"
+)
+
+# Ordem = prioridade quando o texto tem mais de uma expressao (mesma regra das versoes antigas,
+# que testavam um padrao por unidade nessa ordem).
+_UNIT_HOURS = {
+    "seconds": (0, 1 / 3600),
+    "minutes": (1, 1 / 60),
+    "hours": (2, 1),
+    "days": (3, 24),
+    "weeks": (4, 24 * 7),
+    "months": (5, 24 * 30),
+    "years": (6, 24 * 365),
+}
+
+_DATE_PUNCTUATION_TABLE = str.maketrans({",": " ", ".": " "})
+_DE_RE = re.compile(r"\bde\b")
+_DAY_RE = re.compile(r"\d{1,2}")
+_YEAR_RE = re.compile(r"\d{2,4}")
+
+_MONTHS = {
+    "january": 1,
+    "jan": 1,
+    "february": 2,
+    "feb": 2,
+    "fevereiro": 2,
+    "fev": 2,
+    "march": 3,
+    "mar": 3,
+    "marco": 3,
+    "abril": 4,
+    "apr": 4,
+    "april": 4,
+    "maio": 5,
+    "may": 5,
+    "jun": 6,
+    "june": 6,
+    "junho": 6,
+    "jul": 7,
+    "july": 7,
+    "julho": 7,
+    "aug": 8,
+    "august": 8,
+    "ago": 8,
+    "agosto": 8,
+    "sep": 9,
+    "sept": 9,
+    "september": 9,
+    "set": 9,
+    "setembro": 9,
+    "oct": 10,
+    "october": 10,
+    "out": 10,
+    "outubro": 10,
+    "nov": 11,
+    "november": 11,
+    "novembro": 11,
+    "dec": 12,
+    "december": 12,
+    "dez": 12,
+    "dezembro": 12,
+}
+
+DateParts = Tuple[int, int, Optional[int]]
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _relative_hours_cached(lowered: str) -> Optional[float]:
+    cleaned = _NOISE_RE.sub("", lowered.translate(_BULLETS_TABLE))
+    cleaned = _SPACES_RE.sub(" ", cleaned).strip()
+
+    if cleaned in _NOW_WORDS or cleaned in _TODAY_WORDS:
+        return 0.0
+    if cleaned in _YESTERDAY_WORDS:
+        return 24.0
+
+    best: Optional[Tuple[int, float, str]] = None
+    for match in _RELATIVE_RE.finditer(cleaned):
+        priority, multiplier = _UNIT_HOURS[match.lastgroup]
+        if best is None or priority < best[0]:
+            best = (priority, multiplier, match.group("value"))
+            if priority == 0:
+                break
+
+    if best is None:
+        return None
+    try:
+        return float(best[2].replace(",", ".")) * best[1]
+    except ValueError:
+        return None
+
+
+def relative_time_to_hours(text: Any) -> Optional[float]:
+    """
+    Converte texto relativo (ex: "3 h", "2d", "1 sem", "44 minutes ago") para horas.
+    Retorna None quando nao consegue interpretar.
+    """
+    if text is None:
+        return None
+    lowered = str(text).strip().lower()
+    if not lowered:
+        return None
+    return _relative_hours_cached(lowered)
+
+
+def _parse_day(token: str) -> Optional[int]:
+    match = _DAY_RE.match(token)
+    if not match:
+        return None
+    day = int(match.group(0))
+    return day if 1 <= day <= 31 else None
+
+
+def _parse_year(token: str) -> Optional[int]:
+    match = _YEAR_RE.match(token)
+    if not match:
+        return None
+    year = int(match.group(0))
+    return year + 2000 if year < 100 else year
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _absolute_date_parts_cached(lowered: str) -> Optional[DateParts]:
+    normalized = unicodedata.normalize("NFD", lowered)
+    if not normalized.isascii():
+        normalized = "".join(ch for ch in normalized if unicodedata.category(ch) != "Mn")
+    normalized = _DE_RE.sub(" ", normalized.translate(_DATE_PUNCTUATION_TABLE))
+    tokens = normalized.split()
+
+    for idx, token in enumerate(tokens):
+        month = _MONTHS.get(token)
+        if not month:
+            continue
+
+        day = None
+        year = None
+
+        if idx + 1 < len(tokens):
+            day = _parse_day(tokens[idx + 1])
+            if day is not None and idx + 2 < len(tokens):
+                year = _parse_year(tokens[idx + 2])
+
+        if day is None and idx > 0:
+            day = _parse_day(tokens[idx - 1])
+            if day is not None and idx + 1 < len(tokens):
+                year = _parse_year(tokens[idx + 1])
+
+        if day is not None:
+            return month, day, year
+
+    return None
+
+
+def parse_absolute_date(text: Optional[str], now: datetime) -> Optional[datetime]:
+    """
+    Interpreta datas absolutas simples ("January 23", "23 de janeiro de 2024") em UTC.
+    Sem ano, usa o ano de `now` (ou o anterior, se a data cairia no futuro).
+    """
+    if not text:
+        return None
+    lowered = text.strip().lower()
+    if not lowered:
+        return None
+
+    parts = _absolute_date_parts_cached(lowered)
+    if parts is None:
+        return None
+    month, day, year = parts
+
+    try:
+        if year is not None:
+            return datetime(year, month, day, tzinfo=timezone.utc)
+        candidate = datetime(now.year, month, day, tzinfo=timezone.utc)
+        if candidate.date() > now.date():
+            candidate = datetime(now.year - 1, month, day, tzinfo=timezone.utc)
+        return candidate
+    except ValueError:
+        return None
+
+
+def parse_instagram_timestamp(value: Any, now: Optional[datetime] = None) -> Optional[datetime]:
+    """Converte timestamps do Instagram (ISO, relativo ou data absoluta) para datetime UTC."""
+    if value is None:
+        return None
+
+    effective_now = now or datetime.now(timezone.utc)
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+    text = str(value).strip()
+    if not text:
+        return None
+
+    if text[0].isdigit():
+        iso_candidate = text.replace("Z", "+00:00").replace("z", "+00:00")
+        try:
+            parsed = datetime.fromisoformat(iso_candidate)
+            return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+        except Exception:
+            pass
+
+    lowered = text.lower()
+    if lowered in _NOW_WORDS or lowered in _TODAY_WORDS:
+        return effective_now
+    if lowered in _YESTERDAY_WORDS:
+        return effective_now - timedelta(days=1)
+
+    relative_hours = _relative_hours_cached(lowered)
+    if relative_hours is not None:
+        return effective_now - timedelta(hours=relative_hours)
+
+    return parse_absolute_date(lowered, effective_now)
+
+
+def relative_times_to_hours(values: Iterable[Any]) -> List[Optional[float]]:
+    """Versao em lote de `relative_time_to_hours` (mantem a ordem da entrada)."""
+    return [relative_time_to_hours(value) for value in values]
+
+
+def parse_instagram_timestamps(
+    values: Iterable[Any],
+    now: Optional[datetime] = None,
+) -> List[Optional[datetime]]:
+    """Versao em lote de `parse_instagram_timestamp`, com o mesmo `now` para todos os itens."""
+    effective_now = now or datetime.now(timezone.utc)
+    return [parse_instagram_timestamp(value, now=effective_now) for value in values]
+
+
+def clear_caches() -> None:
+    _relative_hours_cached.cache_clear()
+    _absolute_date_parts_cached.cache_clear()
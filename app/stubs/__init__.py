@@ -0,0 +1,4 @@
+"""
+Stand-ins locais para dependencias externas (Browserless, OpenAI).
+Permitem medir performance e rodar testes de regressao sem rede.
+"""
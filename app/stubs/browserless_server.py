@@ -0,0 +1,352 @@
+"""
+Stand-in local do Browserless.
+
+Implementa os endpoints HTTP usados por `BrowserlessClient` e `BrowserUseAgent`
+(/content, /screenshot, /pdf, /function, /execute, /json/version, /session,
+/chromium/session, /health) servindo fixtures de paginas do Instagram, com
+latencia configuravel e injecao de erros.
+
+Uso:
+    python scripts/run_browserless_stub.py --port 3900 --latency-ms 150
+    BROWSERLESS_HOST=http://127.0.0.1:3900 BROWSERLESS_TOKEN=stub ...
+
+O CDP (websocket) nao e emulado: /json/version devolve `cdp_ws_url` quando
+configurado (ex.: um Chromium local), senao um endpoint ficticio.
+"""
+
+import asyncio
+import base64
+import os
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from string import Template
+from typing import Any, Dict, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+# PNG 1x1 transparente: screenshot padrao quando nao ha fixture .png.
+_DEFAULT_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+_DEFAULT_PDF = b"%PDF-1.4\n1 0 obj<<>>endobj\ntrailer<<>>\n%%EOF\n"
+
+_RESERVED_PATHS = {"accounts", "explore", "direct", "reels", "stories", "p", "reel", "tv"}
+
+
+@dataclass
+class BrowserlessStubConfig:
+    """Configuracao do stand-in (latencia, erros e fixtures)."""
+
+    fixtures_dir: Path = FIXTURES_DIR
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    endpoint_latency_ms: Dict[str, float] = field(default_factory=dict)
+    error_rate: float = 0.0
+    error_status: int = 503
+    error_endpoints: Optional[Set[str]] = None
+    seed: Optional[int] = None
+    cdp_ws_url: Optional[str] = None
+    function_result: Any = None
+
+    @classmethod
+    def from_env(cls) -> "BrowserlessStubConfig":
+        """Le BROWSERLESS_STUB_* do ambiente (usado pelo script de execucao)."""
+        endpoints_raw = os.getenv("BROWSERLESS_STUB_ERROR_ENDPOINTS", "").strip()
+        seed_raw = os.getenv("BROWSERLESS_STUB_SEED", "").strip()
+        return cls(
+            fixtures_dir=Path(os.getenv("BROWSERLESS_STUB_FIXTURES_DIR") or FIXTURES_DIR),
+            latency_ms=float(os.getenv("BROWSERLESS_STUB_LATENCY_MS", "0") or 0),
+            latency_jitter_ms=float(os.getenv("BROWSERLESS_STUB_LATENCY_JITTER_MS", "0") or 0),
+            error_rate=float(os.getenv("BROWSERLESS_STUB_ERROR_RATE", "0") or 0),
+            error_status=int(os.getenv("BROWSERLESS_STUB_ERROR_STATUS", "503") or 503),
+            error_endpoints=(
+                {item.strip() for item in endpoints_raw.split(",") if item.strip()}
+                if endpoints_raw
+                else None
+            ),
+            seed=int(seed_raw) if seed_raw else None,
+            cdp_ws_url=os.getenv("BROWSERLESS_STUB_CDP_WS_URL") or None,
+        )
+
+
+@dataclass
+class BrowserlessStubStats:
+    """Contadores expostos em /_stub/stats para benchmarks e testes."""
+
+    requests: Dict[str, int] = field(default_factory=dict)
+    errors_injected: int = 0
+    bytes_served: int = 0
+    sessions_created: int = 0
+    sessions_stopped: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": dict(self.requests),
+            "total_requests": sum(self.requests.values()),
+            "errors_injected": self.errors_injected,
+            "bytes_served": self.bytes_served,
+            "sessions_created": self.sessions_created,
+            "sessions_stopped": self.sessions_stopped,
+        }
+
+
+def _classify_instagram_url(url: str) -> Tuple[str, Dict[str, str]]:
+    """Mapeia a URL pedida para (fixture, variaveis do template)."""
+    parsed = urlparse(url or "")
+    parts = [part for part in (parsed.path or "").split("/") if part]
+    if len(parts) >= 2 and parts[0] in {"p", "reel", "tv"}:
+        return "post", {"shortcode": parts[1], "username": "stub_owner"}
+    if len(parts) >= 2 and parts[0] == "stories":
+        return "story", {"username": parts[1], "story_id": parts[2] if len(parts) > 2 else ""}
+    if parts and parts[0] not in _RESERVED_PATHS:
+        username = parts[0].lstrip("@")
+        return "profile", {"username": username, "full_name": username.replace("_", " ").replace(".", " ").title()}
+    return "default", {}
+
+
+class BrowserlessStub:
+    """Estado + app FastAPI do stand-in."""
+
+    def __init__(self, config: Optional[BrowserlessStubConfig] = None):
+        self.config = config or BrowserlessStubConfig()
+        self.stats = BrowserlessStubStats()
+        self.sessions: Dict[str, Dict[str, Any]] = {}
+        self._random = random.Random(self.config.seed)
+        self._template_cache: Dict[str, Optional[Template]] = {}
+        self.app = self._build_app()
+
+    def reset(self) -> None:
+        self.stats = BrowserlessStubStats()
+        self.sessions.clear()
+        self._random = random.Random(self.config.seed)
+
+    def _load_template(self, name: str, suffix: str = ".html") -> Optional[Template]:
+        key = f"{name}{suffix}"
+        if key not in self._template_cache:
+            path = Path(self.config.fixtures_dir) / key
+            self._template_cache[key] = (
+                Template(path.read_text(encoding="utf-8")) if path.exists() else None
+            )
+        return self._template_cache[key]
+
+    def render_html(self, url: str) -> str:
+        kind, variables = _classify_instagram_url(url)
+        template = self._load_template(kind) or self._load_template("default")
+        if template is None:
+            return "<html><body></body></html>"
+        variables.setdefault("posted_at", (datetime.utcnow() - timedelta(hours=2)).strftime("%Y-%m-%dT%H:%M:%S.000Z"))
+        variables.setdefault("username", "stub_user")
+        variables.setdefault("full_name", "Stub User")
+        variables.setdefault("shortcode", "")
+        return template.safe_substitute(variables)
+
+    def _binary_fixture(self, name: str, default: bytes) -> bytes:
+        path = Path(self.config.fixtures_dir) / name
+        return path.read_bytes() if path.exists() else default
+
+    async def _simulate(self, endpoint: str) -> Optional[Response]:
+        """Conta a requisicao, aplica latencia e, se sorteado, devolve um erro injetado."""
+        self.stats.requests[endpoint] = self.stats.requests.get(endpoint, 0) + 1
+        delay_ms = self.config.endpoint_latency_ms.get(endpoint, self.config.latency_ms)
+        if self.config.latency_jitter_ms:
+            delay_ms += self._random.uniform(0, self.config.latency_jitter_ms)
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000.0)
+
+        targets = self.config.error_endpoints
+        if self.config.error_rate > 0 and (targets is None or endpoint in targets):
+            if self._random.random() < self.config.error_rate:
+                self.stats.errors_injected += 1
+                return JSONResponse(
+                    status_code=self.config.error_status,
+                    content={"error": "stub_injected_error", "endpoint": endpoint},
+                )
+        return None
+
+    def _served(self, response: Response) -> Response:
+        self.stats.bytes_served += len(response.body or b"")
+        return response
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="Browserless stand-in", docs_url=None, redoc_url=None, openapi_url=None)
+        stub = self
+
+        @app.get("/health")
+        async def health():
+            return {"status": "ok"}
+
+        @app.post("/content")
+        async def content(request: Request):
+            payload = await request.json()
+            error = await stub._simulate("/content")
+            if error is not None:
+                return error
+            html = stub.render_html(str(payload.get("url") or ""))
+            return stub._served(Response(content=html.encode("utf-8"), media_type="text/html; charset=utf-8"))
+
+        @app.post("/screenshot")
+        async def screenshot(request: Request):
+            await request.json()
+            error = await stub._simulate("/screenshot")
+            if error is not None:
+                return error
+            return stub._served(Response(content=stub._binary_fixture("screenshot.png", _DEFAULT_PNG), media_type="image/png"))
+
+        @app.post("/pdf")
+        async def pdf(request: Request):
+            await request.json()
+            error = await stub._simulate("/pdf")
+            if error is not None:
+                return error
+            return stub._served(Response(content=stub._binary_fixture("page.pdf", _DEFAULT_PDF), media_type="application/pdf"))
+
+        async def _script(request: Request, endpoint: str):
+            payload = await request.json()
+            error = await stub._simulate(endpoint)
+            if error is not None:
+                return error
+            result = stub.config.function_result
+            if callable(result):
+                result = result(payload)
+            return stub._served(JSONResponse(content={"data": result, "type": "application/json"}))
+
+        @app.post("/function")
+        async def function(request: Request):
+            return await _script(request, "/function")
+
+        @app.post("/execute")
+        async def execute(request: Request):
+            return await _script(request, "/execute")
+
+        @app.get("/json/version")
+        async def json_version(request: Request):
+            error = await stub._simulate("/json/version")
+            if error is not None:
+                return error
+            ws_url = stub.config.cdp_ws_url or f"ws://{request.url.netloc}/devtools/browser/stub"
+            return {
+                "Browser": "HeadlessChrome/stub",
+                "Protocol-Version": "1.3",
+                "webSocketDebuggerUrl": ws_url,
+            }
+
+        async def _create_session(request: Request, endpoint: str):
+            try:
+                payload = await request.json()
+            except Exception:
+                payload = {}
+            error = await stub._simulate(endpoint)
+            if error is not None:
+                return error
+            session_id = uuid.uuid4().hex
+            netloc = request.url.netloc
+            ws_base = stub.config.cdp_ws_url or f"ws://{netloc}/devtools/browser/{session_id}"
+            session = {
+                "id": session_id,
+                "connect": ws_base,
+                "reconnect": ws_base,
+                "stop": f"http://{netloc}/session/{session_id}",
+                "ttl": payload.get("ttl") if isinstance(payload, dict) else None,
+                "created_at": time.time(),
+            }
+            stub.sessions[session_id] = session
+            stub.stats.sessions_created += 1
+            return session
+
+        @app.post("/session")
+        async def session(request: Request):
+            return await _create_session(request, "/session")
+
+        @app.post("/chromium/session")
+        async def chromium_session(request: Request):
+            return await _create_session(request, "/chromium/session")
+
+        @app.delete("/session/{session_id}")
+        async def stop_session(session_id: str):
+            await stub._simulate("/session/stop")
+            if stub.sessions.pop(session_id, None) is None:
+                return JSONResponse(status_code=404, content={"error": "session_not_found"})
+            stub.stats.sessions_stopped += 1
+            return {"stopped": True}
+
+        @app.get("/_stub/stats")
+        async def stats():
+            return stub.stats.as_dict()
+
+        @app.post("/_stub/reset")
+        async def reset():
+            stub.reset()
+            return {"reset": True}
+
+        return app
+
+
+def create_browserless_stub_app(config: Optional[BrowserlessStubConfig] = None) -> FastAPI:
+    """Cria a app FastAPI do stand-in (para uvicorn ou TestClient)."""
+    return BrowserlessStub(config).app
+
+
+class BrowserlessStubServer:
+    """
+    Sobe o stand-in em uma thread (uvicorn), para benchmarks e testes de integracao.
+
+        with BrowserlessStubServer(BrowserlessStubConfig(latency_ms=100)) as server:
+            settings.browserless_host = server.base_url
+    """
+
+    def __init__(
+        self,
+        config: Optional[BrowserlessStubConfig] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.stub = BrowserlessStub(config)
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "BrowserlessStubServer":
+        import socket
+
+        import uvicorn
+
+        if not self.port:
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+                sock.bind((self.host, 0))
+                self.port = sock.getsockname()[1]
+        uvicorn_config = uvicorn.Config(self.stub.app, host=self.host, port=self.port, log_level="warning")
+        self._server = uvicorn.Server(uvicorn_config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        deadline = time.time() + 10
+        while not self._server.started:
+            if time.time() > deadline:
+                raise RuntimeError("Stand-in Browserless nao iniciou em 10s")
+            time.sleep(0.02)
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+
+    def __enter__(self) -> "BrowserlessStubServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -0,0 +1,271 @@
+"""
+Backend de LLM deterministico (replay) para benchmarks e testes sem rede.
+
+Selecionado via `LLM_BACKEND=replay`. Substitui:
+- `ChatOpenAI` nos agentes Browser Use (`ReplayChatModel`);
+- `AsyncOpenAI` no `AIExtractor` (`ReplayAsyncOpenAI`).
+
+As respostas vem de um arquivo JSON (default: fixtures/llm_replay.json) com
+passos de agente e respostas do extrator, escolhidos por substring do prompt.
+Latencia e contagem de tokens seguem um perfil configuravel.
+"""
+
+import asyncio
+import json
+import random
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from string import Template
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from config import settings
+
+DEFAULT_REPLAY_PATH = Path(__file__).resolve().parent / "fixtures" / "llm_replay.json"
+
+
+@dataclass
+class LLMReplayProfile:
+    """Perfil de latencia/tokens. Tokens <= 0 estimam pelo tamanho do texto (~4 chars/token)."""
+
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    seed: Optional[int] = None
+
+    @classmethod
+    def from_settings(cls) -> "LLMReplayProfile":
+        return cls(
+            latency_ms=float(getattr(settings, "llm_replay_latency_ms", 0.0) or 0.0),
+            latency_jitter_ms=float(getattr(settings, "llm_replay_latency_jitter_ms", 0.0) or 0.0),
+            prompt_tokens=int(getattr(settings, "llm_replay_prompt_tokens", 0) or 0),
+            completion_tokens=int(getattr(settings, "llm_replay_completion_tokens", 0) or 0),
+        )
+
+
+@dataclass
+class LLMReplayStats:
+    """Contadores globais do backend replay (lidos pelos benchmarks)."""
+
+    calls: int = 0
+    agent_calls: int = 0
+    extractor_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, kind: str, prompt_tokens: int, completion_tokens: int) -> None:
+        with self._lock:
+            self.calls += 1
+            if kind == "agent":
+                self.agent_calls += 1
+            else:
+                self.extractor_calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls = 0
+            self.agent_calls = 0
+            self.extractor_calls = 0
+            self.prompt_tokens = 0
+            self.completion_tokens = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "agent_calls": self.agent_calls,
+            "extractor_calls": self.extractor_calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.prompt_tokens + self.completion_tokens,
+        }
+
+
+replay_llm_stats = LLMReplayStats()
+
+_replay_cache: Dict[str, Dict[str, Any]] = {}
+
+
+def load_replay_fixtures(path: Optional[str] = None) -> Dict[str, Any]:
+    resolved = str(path or getattr(settings, "llm_replay_fixtures_path", None) or DEFAULT_REPLAY_PATH)
+    if resolved not in _replay_cache:
+        _replay_cache[resolved] = json.loads(Path(resolved).read_text(encoding="utf-8"))
+    return _replay_cache[resolved]
+
+
+def _render(value: Any) -> Any:
+    """Aplica placeholders ($now) preservando a estrutura JSON."""
+    rendered = Template(json.dumps(value, ensure_ascii=False)).safe_substitute(
+        now=datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S"),
+    )
+    return json.loads(rendered)
+
+
+def _message_text(content: Any) -> str:
+    if content is None:
+        return ""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        parts: List[str] = []
+        for part in content:
+            if isinstance(part, dict):
+                if part.get("type") == "text":
+                    parts.append(str(part.get("text") or ""))
+            else:
+                text = getattr(part, "text", None)
+                if isinstance(text, str):
+                    parts.append(text)
+        return "\n".join(parts)
+    text = getattr(content, "text", None)
+    return text if isinstance(text, str) else str(content)
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _find_entry(entries: List[Dict[str, Any]], prompt_text: str) -> Optional[Dict[str, Any]]:
+    for entry in entries or []:
+        match = str(entry.get("match") or "")
+        if match and match in prompt_text:
+            return entry
+    return None
+
+
+class _ReplayBase:
+    def __init__(self, profile: Optional[LLMReplayProfile], fixtures_path: Optional[str]):
+        self.profile = profile or LLMReplayProfile.from_settings()
+        self.fixtures = load_replay_fixtures(fixtures_path)
+        self._random = random.Random(self.profile.seed)
+
+    async def _simulate_latency(self) -> None:
+        delay_ms = self.profile.latency_ms
+        if self.profile.latency_jitter_ms:
+            delay_ms += self._random.uniform(0, self.profile.latency_jitter_ms)
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000.0)
+
+    def _token_counts(self, prompt_text: str, completion_text: str) -> tuple[int, int]:
+        prompt_tokens = self.profile.prompt_tokens or _estimate_tokens(prompt_text)
+        completion_tokens = self.profile.completion_tokens or _estimate_tokens(completion_text)
+        return prompt_tokens, completion_tokens
+
+
+class ReplayChatModel(_ReplayBase):
+    """
+    Modelo compativel com `browser_use.llm.base.BaseChatModel` que reproduz passos gravados.
+
+    Cada instancia (uma por execucao de agente) avanca pelos `steps` do roteiro
+    cujo `match` aparece nas mensagens; ao esgotar, repete o ultimo passo.
+    """
+
+    _verified_api_keys = True
+
+    def __init__(
+        self,
+        model: str = "replay",
+        profile: Optional[LLMReplayProfile] = None,
+        fixtures_path: Optional[str] = None,
+    ):
+        super().__init__(profile, fixtures_path)
+        self.model = model
+        self._step_index = 0
+
+    @property
+    def provider(self) -> str:
+        return "replay"
+
+    @property
+    def name(self) -> str:
+        return self.model
+
+    @property
+    def model_name(self) -> str:
+        return self.model
+
+    async def ainvoke(self, messages: List[Any], output_format: Any = None, **kwargs: Any) -> Any:
+        from browser_use.llm.views import ChatInvokeCompletion, ChatInvokeUsage
+
+        prompt_text = "\n".join(_message_text(getattr(message, "content", None)) for message in messages or [])
+        entry = _find_entry(self.fixtures.get("agent") or [], prompt_text)
+        steps = (entry or {}).get("steps") or []
+        await self._simulate_latency()
+
+        if steps:
+            step = _render(steps[min(self._step_index, len(steps) - 1)])
+            self._step_index += 1
+        else:
+            default_text = str(self.fixtures.get("agent_default_text") or "{}")
+            step = {
+                "thinking": "",
+                "evaluation_previous_goal": "",
+                "memory": "",
+                "next_goal": "",
+                "action": [{"done": {"success": True, "text": default_text}}],
+            }
+
+        if output_format is None:
+            completion: Any = json.dumps(step, ensure_ascii=False)
+        else:
+            completion = output_format.model_validate(step)
+        completion_text = json.dumps(step, ensure_ascii=False)
+
+        prompt_tokens, completion_tokens = self._token_counts(prompt_text, completion_text)
+        replay_llm_stats.record("agent", prompt_tokens, completion_tokens)
+        return ChatInvokeCompletion(
+            completion=completion,
+            usage=ChatInvokeUsage(
+                prompt_tokens=prompt_tokens,
+                prompt_cached_tokens=None,
+                prompt_cache_creation_tokens=None,
+                prompt_image_tokens=None,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens,
+            ),
+        )
+
+
+class _ReplayChatCompletions(_ReplayBase):
+    async def create(self, *, model: str, messages: List[Dict[str, Any]], **kwargs: Any) -> Any:
+        prompt_text = "\n".join(_message_text(message.get("content")) for message in messages or [])
+        entry = _find_entry(self.fixtures.get("extractor") or [], prompt_text)
+        response = entry.get("response") if entry else self.fixtures.get("extractor_default_response", {})
+        content = json.dumps(_render(response), ensure_ascii=False)
+        await self._simulate_latency()
+
+        prompt_tokens, completion_tokens = self._token_counts(prompt_text, content)
+        replay_llm_stats.record("extractor", prompt_tokens, completion_tokens)
+        return SimpleNamespace(
+            id="replay",
+            model=model,
+            choices=[
+                SimpleNamespace(
+                    index=0,
+                    finish_reason="stop",
+                    message=SimpleNamespace(role="assistant", content=content),
+                )
+            ],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens,
+            ),
+        )
+
+
+class ReplayAsyncOpenAI:
+    """Substituto de `openai.AsyncOpenAI` com a mesma forma usada pelo `AIExtractor`."""
+
+    def __init__(
+        self,
+        profile: Optional[LLMReplayProfile] = None,
+        fixtures_path: Optional[str] = None,
+        **kwargs: Any,
+    ):
+        self.chat = SimpleNamespace(completions=_ReplayChatCompletions(profile, fixtures_path))
@@ -0,0 +1,292 @@
+"""
+Spans leves para medir etapas do pipeline de scraping.
+
+Uso:
+    trace = start_trace(job_id, flow="recent_likes")
+    try:
+        with span("scraper.posts", profile_url=url):
+            ...
+        metadata["timeline"] = trace.timeline()
+    finally:
+        trace.close()
+
+Spans aninham automaticamente via contextvars (inclusive entre tasks criadas com
+asyncio.gather, que herdam o contexto). Cada span finalizado vai para o log e,
+quando existe um trace ativo, entra na timeline serializavel do job.
+"""
+
+import functools
+import inspect
+import logging
+import time
+from contextvars import ContextVar, Token
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from uuid import uuid4
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("scrape_current_trace", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("scrape_current_span", default=None)
+
+_MAX_ATTRIBUTE_CHARS = 300
+
+
+def _log_spans_enabled() -> bool:
+    return bool(getattr(settings, "tracing_log_spans", True))
+
+
+def _log_level() -> int:
+    level_name = str(getattr(settings, "tracing_log_level", "INFO") or "INFO").upper()
+    return getattr(logging, level_name, logging.INFO)
+
+
+def _safe_attribute(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    text = str(value)
+    if len(text) > _MAX_ATTRIBUTE_CHARS:
+        text = f"{text[:_MAX_ATTRIBUTE_CHARS]}..."
+    return text
+
+
+class Span:
+    """
+    Intervalo medido com nome, atributos e span pai.
+
+    Como context manager (sync, valido tambem dentro de corrotinas) vira o span
+    corrente; `start()`/`end()` permitem ciclos manuais (ex.: hooks do agente).
+    """
+
+    __slots__ = (
+        "name",
+        "span_id",
+        "parent_id",
+        "trace",
+        "attributes",
+        "status",
+        "error",
+        "_started",
+        "_ended",
+        "_token",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace: Optional["Trace"] = None,
+        parent: Optional["Span"] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self.name = name
+        self.span_id = uuid4().hex[:12]
+        self.parent_id = parent.span_id if parent is not None else None
+        self.trace = trace
+        self.attributes: Dict[str, Any] = {}
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self._started: Optional[float] = None
+        self._ended: Optional[float] = None
+        self._token: Optional[Token] = None
+        if attributes:
+            self.set_attributes(**attributes)
+
+    @property
+    def duration_ms(self) -> float:
+        if self._started is None:
+            return 0.0
+        end = self._ended if self._ended is not None else time.perf_counter()
+        return (end - self._started) * 1000.0
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = _safe_attribute(value)
+
+    def set_attributes(self, **attributes: Any) -> None:
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def start(self) -> "Span":
+        if self._started is None:
+            self._started = time.perf_counter()
+        return self
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        if self._ended is not None or self._started is None:
+            return
+        self._ended = time.perf_counter()
+        if error is not None:
+            self.status = "error"
+            self.error = _safe_attribute(f"{type(error).__name__}: {error}")
+        if self.trace is not None:
+            self.trace.record(self)
+        if _log_spans_enabled():
+            logger.log(
+                _log_level(),
+                "⏱️ span=%s duration_ms=%.1f status=%s trace=%s attrs=%s",
+                self.name,
+                self.duration_ms,
+                self.status,
+                self.trace.trace_id if self.trace is not None else "-",
+                self.attributes,
+            )
+
+    def __enter__(self) -> "Span":
+        self.start()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if self._token is not None:
+            _current_span.reset(self._token)
+            self._token = None
+        self.end(exc)
+        return False
+
+    def as_dict(self, origin: float) -> Dict[str, Any]:
+        started = self._started if self._started is not None else origin
+        payload: Dict[str, Any] = {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ms": round((started - origin) * 1000.0, 1),
+            "duration_ms": round(self.duration_ms, 1),
+            "status": self.status,
+        }
+        if self.error:
+            payload["error"] = self.error
+        if self.attributes:
+            payload["attributes"] = dict(self.attributes)
+        return payload
+
+
+class Trace:
+    """Coleta os spans finalizados de um job e gera a timeline para metadata_json."""
+
+    def __init__(self, trace_id: str, max_spans: Optional[int] = None, **attributes: Any):
+        self.trace_id = trace_id
+        self.attributes = {key: _safe_attribute(value) for key, value in attributes.items()}
+        self.max_spans = max(1, int(max_spans or getattr(settings, "tracing_max_spans_per_job", 500) or 500))
+        self.started_at = datetime.utcnow()
+        self._origin = time.perf_counter()
+        self._spans: List[Span] = []
+        self._dropped = 0
+        self._token: Optional[Token] = None
+
+    def record(self, finished_span: Span) -> None:
+        if len(self._spans) >= self.max_spans:
+            self._dropped += 1
+            return
+        self._spans.append(finished_span)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Contagem, tempo total e maximo por nome de span."""
+        totals: Dict[str, Dict[str, float]] = {}
+        for item in self._spans:
+            entry = totals.setdefault(item.name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            entry["count"] += 1
+            entry["total_ms"] = round(entry["total_ms"] + item.duration_ms, 1)
+            entry["max_ms"] = round(max(entry["max_ms"], item.duration_ms), 1)
+        return totals
+
+    def timeline(self) -> Dict[str, Any]:
+        spans = sorted(self._spans, key=lambda item: item._started or self._origin)
+        return {
+            "trace_id": self.trace_id,
+            "started_at": self.started_at.isoformat(),
+            "total_ms": round((time.perf_counter() - self._origin) * 1000.0, 1),
+            "attributes": dict(self.attributes),
+            "spans": [item.as_dict(self._origin) for item in spans],
+            "summary": self.summary(),
+            "dropped_spans": self._dropped,
+        }
+
+    def log_summary(self) -> None:
+        if not _log_spans_enabled() or not self._spans:
+            return
+        ranked = sorted(self.summary().items(), key=lambda pair: pair[1]["total_ms"], reverse=True)
+        logger.info(
+            "⏱️ Timeline trace=%s total_ms=%.1f etapas=%s",
+            self.trace_id,
+            (time.perf_counter() - self._origin) * 1000.0,
+            ", ".join(f"{name}={data['total_ms']:.0f}ms/{int(data['count'])}x" for name, data in ranked[:10]),
+        )
+
+    def activate(self) -> "Trace":
+        if self._token is None:
+            self._token = _current_trace.set(self)
+        return self
+
+    def close(self) -> None:
+        if self._token is not None:
+            try:
+                _current_trace.reset(self._token)
+            except ValueError:
+                # Fechado em outro contexto (ex.: task diferente); apenas limpa o valor.
+                _current_trace.set(None)
+            self._token = None
+
+    def __enter__(self) -> "Trace":
+        return self.activate()
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
+
+
+def start_trace(trace_id: str, **attributes: Any) -> Trace:
+    """Cria e ativa um trace no contexto atual (feche com `close()` ou use `with`)."""
+    return Trace(trace_id, **attributes).activate()
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def span(name: str, **attributes: Any) -> Span:
+    """Cria um span filho do span corrente (use com `with`)."""
+    return Span(name, trace=_current_trace.get(), parent=_current_span.get(), attributes=attributes)
+
+
+def start_span(name: str, **attributes: Any) -> Span:
+    """Inicia um span manual (sem vira-lo corrente); finalize com `end()`."""
+    return span(name, **attributes).start()
+
+
+def traced(
+    name: Optional[str] = None,
+    capture: Sequence[str] = (),
+    **static_attributes: Any,
+) -> Callable:
+    """
+    Decorator para corrotinas: envolve a chamada inteira em um span.
+
+    `capture` lista argumentos da funcao copiados como atributos (ex.: post_url).
+    """
+
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+        signature = inspect.signature(func) if capture else None
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            attributes = dict(static_attributes)
+            if signature is not None:
+                try:
+                    bound = signature.bind_partial(*args, **kwargs).arguments
+                except TypeError:
+                    bound = kwargs
+                for key in capture:
+                    if key in bound:
+                        attributes[key] = bound[key]
+            with span(span_name, **attributes):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,349 @@
+"""
+Webhooks de conclusao dos jobs de scraping (alternativa ao polling).
+
+- `subscribe_job_webhook`: grava o callback_url do job em `webhook_outbox` na mesma
+  transacao que cria o job (ou que anexa a requisicao a um job coalescido).
+- `WebhookDispatcher`: loop em background que entrega as linhas cujo job ja terminou
+  (completed/failed). Como o criterio e o status do job, jobs derrubados pelo sweeper de
+  recovery tambem notificam, sem hook extra.
+- Entregas pendentes do mesmo callback_url sao agrupadas num unico POST
+  `{"events": [...]}` (ate WEBHOOK_BATCH_MAX_EVENTS), assinado com HMAC-SHA256.
+- Falhas sao reagendadas com backoff exponencial ate WEBHOOK_MAX_ATTEMPTS. A linha e
+  reivindicada (next_attempt_at empurrado) antes do POST; com varias replicas no Postgres o
+  SELECT usa FOR UPDATE SKIP LOCKED.
+
+Destinos: o host do callback_url precisa resolver so para enderecos globais (loopback, RFC1918,
+link-local/metadata etc. sao recusados), salvo se listado em WEBHOOK_ALLOWED_HOSTS. A checagem
+roda ao aceitar a requisicao e de novo antes de cada POST, que conecta no IP checado (Host e SNI
+mantem o nome original, sem nova resolucao). Redirects nao sao seguidos.
+
+Assinatura: header `X-Scraper-Signature: t=<unix>,v1=<hex>`, onde
+hex = HMAC_SHA256(WEBHOOK_SIGNING_SECRET, f"{t}." + corpo).
+"""
+
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import logging
+import random
+import socket
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+import orjson
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app import database
+from app.metrics import WEBHOOK_DELIVERIES_TOTAL
+from app.models import ScrapingJob, WebhookDelivery
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = "X-Scraper-Signature"
+TERMINAL_JOB_STATUSES = ("completed", "failed")
+
+# 4xx que valem retry; os demais 4xx sao erro de configuracao do receptor (falha definitiva).
+_RETRYABLE_CLIENT_ERRORS = frozenset({408, 409, 425, 429})
+
+_RESULTS_PATHS = {
+    "generic": "/api/generic_scrape/{job_id}/results",
+    "investing": "/api/investing_scrape/{job_id}/results",
+}
+_DEFAULT_RESULTS_PATH = "/api/scrape/{job_id}/results"
+
+
+# INSERT ... ON CONFLICT DO NOTHING por dialeto; nos demais, checagem antes do insert.
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _allowed_hosts() -> frozenset:
+    raw = getattr(settings, "webhook_allowed_hosts", None) or ""
+    return frozenset(host.strip().lower() for host in raw.split(",") if host.strip())
+
+
+def check_callback_host(callback_url: str) -> Optional[str]:
+    """
+    Resolve o host do callback_url e devolve o endereco checado (None para hosts de
+    WEBHOOK_ALLOWED_HOSTS). ValueError se algum endereco nao for global; falha de DNS
+    propaga como OSError (socket.gaierror). Bloqueante: chame via asyncio.to_thread.
+    """
+    parsed = urlparse(callback_url)
+    host = (parsed.hostname or "").lower()
+    if not host:
+        raise ValueError("callback_url sem host.")
+    if host in _allowed_hosts():
+        return None
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    addresses = []
+    for *_, sockaddr in socket.getaddrinfo(host, port, type=socket.SOCK_STREAM):
+        address = ipaddress.ip_address(str(sockaddr[0]).split("%", 1)[0])
+        if not address.is_global or address.is_multicast:
+            raise ValueError(
+                f"callback_url aponta para endereco nao publico ({address}); libere o host em WEBHOOK_ALLOWED_HOSTS."
+            )
+        addresses.append(str(address))
+    if not addresses:
+        raise ValueError("Host do callback_url nao resolve.")
+    return addresses[0]
+
+
+def pinned_request(callback_url: str, address: Optional[str]) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+    """(url, headers, extensions) para conectar no IP checado sem nova resolucao de DNS."""
+    if address is None:
+        return callback_url, {}, {}
+    parsed = urlparse(callback_url)
+    userinfo, _, host_port = parsed.netloc.rpartition("@")
+    netloc = f"[{address}]" if ":" in address else address
+    if parsed.port:
+        netloc = f"{netloc}:{parsed.port}"
+    if userinfo:
+        netloc = f"{userinfo}@{netloc}"
+    extensions: Dict[str, Any] = {"sni_hostname": parsed.hostname} if parsed.scheme == "https" else {}
+    return parsed._replace(netloc=netloc).geturl(), {"Host": host_port}, extensions
+
+
+async def validate_callback_url(callback_url: Optional[str]) -> Optional[str]:
+    """URL http(s) absoluta normalizada, ou None. ValueError se invalida, sem segredo ou nao publica."""
+    value = (callback_url or "").strip()
+    if not value:
+        return None
+    parsed = urlparse(value)
+    if parsed.scheme not in ("http", "https") or not parsed.netloc:
+        raise ValueError("callback_url deve ser uma URL http(s) absoluta.")
+    if len(value) > 1000:
+        raise ValueError("callback_url excede 1000 caracteres.")
+    if not getattr(settings, "webhook_signing_secret", None):
+        raise ValueError("Webhooks desabilitados: defina WEBHOOK_SIGNING_SECRET para usar callback_url.")
+    try:
+        # DNS fora do event loop: um resolver lento nao trava os demais handlers.
+        await asyncio.to_thread(check_callback_host, value)
+    except OSError as exc:
+        raise ValueError(f"Host do callback_url nao resolve: {exc}")
+    return value
+
+
+def subscribe_job_webhook(db: Session, job_id: str, callback_url: str) -> None:
+    """Inscreve o callback no job (idempotente por job_id + callback_url); o caller faz commit."""
+    upsert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if upsert is not None:
+        # Requisicoes identicas concorrentes: a segunda vira no-op em vez de IntegrityError.
+        db.execute(
+            upsert(WebhookDelivery)
+            .values(job_id=job_id, callback_url=callback_url)
+            .on_conflict_do_nothing(index_elements=["job_id", "callback_url"])
+        )
+        return
+    exists = (
+        db.query(WebhookDelivery.id)
+        .filter(WebhookDelivery.job_id == job_id, WebhookDelivery.callback_url == callback_url)
+        .first()
+    )
+    if exists is None:
+        db.add(WebhookDelivery(job_id=job_id, callback_url=callback_url))
+
+
+def sign_payload(body: bytes, timestamp: int, secret: str) -> str:
+    digest = hmac.new(secret.encode("utf-8"), f"{timestamp}.".encode("utf-8") + body, hashlib.sha256)
+    return f"t={timestamp},v1={digest.hexdigest()}"
+
+
+def retry_delay_seconds(attempts: int) -> float:
+    """Backoff exponencial com jitter de +-20%, limitado a WEBHOOK_BACKOFF_MAX_SECONDS."""
+    base = max(0.1, float(getattr(settings, "webhook_backoff_base_seconds", 5.0)))
+    ceiling = max(base, float(getattr(settings, "webhook_backoff_max_seconds", 900.0)))
+    delay = min(ceiling, base * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _job_flow(job: ScrapingJob) -> str:
+    metadata = job.metadata_json if isinstance(job.metadata_json, dict) else {}
+    request_payload = metadata.get("request") if isinstance(metadata.get("request"), dict) else {}
+    return str(metadata.get("flow") or request_payload.get("flow") or "default")
+
+
+def build_event(delivery: WebhookDelivery, job: ScrapingJob) -> Dict[str, Any]:
+    """Resumo do job (sem o resultado completo, que fica em results_url)."""
+    flow = _job_flow(job)
+    return {
+        "event": f"scrape_job.{job.status}",
+        "delivery_id": delivery.id,
+        "attempt": delivery.attempts,
+        "job_id": job.id,
+        "flow": flow,
+        "status": job.status,
+        "profile_url": job.profile_url,
+        "posts_scraped": job.posts_scraped or 0,
+        "interactions_scraped": job.interactions_scraped or 0,
+        "error_message": job.error_message,
+        "created_at": _iso(job.created_at),
+        "started_at": _iso(job.started_at),
+        "completed_at": _iso(job.completed_at),
+        "results_url": _RESULTS_PATHS.get(flow, _DEFAULT_RESULTS_PATH).format(job_id=job.id),
+    }
+
+
+class WebhookDispatcher:
+    """Entrega em lote das linhas de webhook_outbox; `dispatch_once` e um ciclo completo."""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self._session_factory = session_factory
+        self._transport = transport
+        self._task: Optional[asyncio.Task] = None
+
+    def _new_session(self) -> Session:
+        factory = self._session_factory or database.SessionLocal
+        return factory()
+
+    def claim_due(self, now: Optional[datetime] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Reivindica entregas vencidas de jobs terminados e monta os eventos por callback_url."""
+        now = now or datetime.utcnow()
+        fetch_limit = max(1, int(getattr(settings, "webhook_dispatch_fetch_limit", 500)))
+        timeout = max(1.0, float(getattr(settings, "webhook_timeout_seconds", 10.0)))
+        db = self._new_session()
+        try:
+            rows = (
+                db.query(WebhookDelivery, ScrapingJob)
+                .join(ScrapingJob, ScrapingJob.id == WebhookDelivery.job_id)
+                .filter(
+                    WebhookDelivery.status == "pending",
+                    WebhookDelivery.next_attempt_at <= now,
+                    ScrapingJob.status.in_(TERMINAL_JOB_STATUSES),
+                )
+                .order_by(WebhookDelivery.next_attempt_at)
+                .limit(fetch_limit)
+                .with_for_update(skip_locked=True, of=WebhookDelivery)
+                .all()
+            )
+            batches: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+            # Lease da tentativa: se o processo morrer no meio do POST, a linha volta a vencer.
+            claimed_until = now + timedelta(seconds=timeout * 3)
+            for delivery, job in rows:
+                delivery.attempts = (delivery.attempts or 0) + 1
+                delivery.next_attempt_at = claimed_until
+                batches[delivery.callback_url].append(build_event(delivery, job))
+            db.commit()
+            return dict(batches)
+        finally:
+            db.close()
+
+    def record_outcome(
+        self,
+        delivery_ids: List[str],
+        delivered: bool,
+        error: Optional[str] = None,
+        permanent: bool = False,
+        now: Optional[datetime] = None,
+    ) -> None:
+        now = now or datetime.utcnow()
+        max_attempts = max(1, int(getattr(settings, "webhook_max_attempts", 8)))
+        db = self._new_session()
+        try:
+            deliveries = db.query(WebhookDelivery).filter(WebhookDelivery.id.in_(delivery_ids)).all()
+            for delivery in deliveries:
+                if delivered:
+                    delivery.status = "delivered"
+                    delivery.delivered_at = now
+                    delivery.last_error = None
+                    continue
+                delivery.last_error = (error or "")[:2000]
+                if permanent or (delivery.attempts or 0) >= max_attempts:
+                    delivery.status = "failed"
+                else:
+                    delivery.next_attempt_at = now + timedelta(seconds=retry_delay_seconds(delivery.attempts or 1))
+            db.commit()
+        finally:
+            db.close()
+
+    async def _post_batch(self, client: httpx.AsyncClient, callback_url: str, events: List[Dict[str, Any]]) -> None:
+        secret = str(getattr(settings, "webhook_signing_secret", "") or "")
+        body = orjson.dumps({"events": events})
+        timestamp = int(time.time())
+        headers = {
+            "Content-Type": "application/json",
+            SIGNATURE_HEADER: sign_payload(body, timestamp, secret),
+        }
+        delivery_ids = [event["delivery_id"] for event in events]
+        error: Optional[str] = None
+        permanent = False
+        try:
+            # O DNS pode ter mudado desde a inscricao; o POST vai para o IP checado agora.
+            address = await asyncio.to_thread(check_callback_host, callback_url)
+            url, host_headers, extensions = pinned_request(callback_url, address)
+            response = await client.post(url, content=body, headers={**headers, **host_headers}, extensions=extensions)
+            if 200 <= response.status_code < 300:
+                WEBHOOK_DELIVERIES_TOTAL.inc(len(events), result="delivered")
+                await asyncio.to_thread(self.record_outcome, delivery_ids, True)
+                return
+            error = f"HTTP {response.status_code}"
+            permanent = 400 <= response.status_code < 500 and response.status_code not in _RETRYABLE_CLIENT_ERRORS
+        except ValueError as exc:
+            error, permanent = str(exc), True
+        except (httpx.HTTPError, OSError) as exc:
+            error = f"{type(exc).__name__}: {exc}"
+
+        WEBHOOK_DELIVERIES_TOTAL.inc(len(events), result="failed" if permanent else "retry")
+        logger.warning(
+            "⚠️ Falha ao entregar webhook (%s eventos) para %s: %s%s",
+            len(events),
+            callback_url,
+            error,
+            " (definitiva)" if permanent else "",
+        )
+        await asyncio.to_thread(self.record_outcome, delivery_ids, False, error, permanent)
+
+    async def dispatch_once(self) -> int:
+        """Um ciclo: reivindica, agrupa por callback_url e envia. Retorna eventos enviados."""
+        batches = await asyncio.to_thread(self.claim_due)
+        if not batches:
+            return 0
+        batch_size = max(1, int(getattr(settings, "webhook_batch_max_events", 50)))
+        timeout = max(1.0, float(getattr(settings, "webhook_timeout_seconds", 10.0)))
+        posts = []
+        async with httpx.AsyncClient(timeout=timeout, transport=self._transport) as client:
+            for callback_url, events in batches.items():
+                for start in range(0, len(events), batch_size):
+                    posts.append(self._post_batch(client, callback_url, events[start : start + batch_size]))
+            await asyncio.gather(*posts)
+        return sum(len(events) for events in batches.values())
+
+    async def _run(self) -> None:
+        interval = max(0.1, float(getattr(settings, "webhook_dispatch_interval_seconds", 2.0)))
+        while True:
+            try:
+                await self.dispatch_once()
+            except Exception as exc:
+                logger.warning("⚠️ Falha no ciclo de entrega de webhooks: %s", exc)
+            await asyncio.sleep(interval)
+
+    def start(self) -> None:
+        if not getattr(settings, "webhook_signing_secret", None):
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+
+webhook_dispatcher = WebhookDispatcher()
@@ -0,0 +1 @@
+"""Benchmarks end-to-end dos fluxos de /api/scrape (ver benchmarks/README.md)."""
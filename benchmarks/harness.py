@@ -0,0 +1,424 @@
+"""
+Harness dos benchmarks end-to-end.
+
+Executa `_scrape_profile_background` (o mesmo caminho do POST /api/scrape) para os
+fluxos `default`, `recent_likes` e `stories_interactions` contra stand-ins locais:
+
+- Browserless: `app.stubs.browserless_server.BrowserlessStubServer` (HTTP real, thread uvicorn);
+- OpenAI: backend `LLM_BACKEND=replay` (`app.stubs.fake_llm`);
+- Postgres: SQLite em arquivo temporario (mesmos modelos/queries via SQLAlchemy).
+
+Como nao ha Chromium/CDP aqui, os metodos do `browser_use_agent` que dirigem o
+navegador sao trocados por `StandInBrowserAgent`: cada execucao de agente abre e
+fecha uma sessao no stand-in do Browserless, carrega a pagina via /content e
+consome um passo do LLM replay. Todo o resto (scraper, fallbacks via Browserless,
+AIExtractor, persistencia e atualizacao do job) roda com o codigo real.
+
+IMPORTANTE: `prepare_environment()` precisa rodar antes de importar `config`/`app`,
+pois `settings` e os singletons sao criados no import.
+"""
+
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from unittest.mock import patch
+
+import httpx
+
+from app.stubs.browserless_server import BrowserlessStubConfig, BrowserlessStubServer
+
+FLOWS = ("default", "recent_likes", "stories_interactions")
+BENCH_SESSION_USERNAME = "bench_session"
+BENCH_PROFILE_URL = "https://www.instagram.com/stub_user/"
+BENCH_TOKEN = "bench-token"
+
+# Trechos de prompt reconhecidos pelas fixtures de app/stubs/fixtures/llm_replay.json.
+_TASK_HINTS = {
+    "profile_posts": "Extraia os primeiros {max_posts} posts do perfil {url}",
+    "post_like_users": "Sua tarefa e extrair os links dos perfis que curtiram um post: {url}",
+    "post_comments": "Sua tarefa e extrair comentarios de um post: {url}",
+    "profile_basic_info": "Extraia os dados do perfil {url}",
+}
+
+
+@dataclass
+class BenchmarkConfig:
+    """Parametros de uma rodada (gravados junto do baseline para comparacao justa)."""
+
+    iterations: int = 5
+    warmup: int = 1
+    browserless_latency_ms: float = 20.0
+    llm_latency_ms: float = 30.0
+    stories: int = 3
+    viewers_per_story: int = 20
+    human_delays: bool = False
+    seed: int = 1234
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "iterations": self.iterations,
+            "warmup": self.warmup,
+            "browserless_latency_ms": self.browserless_latency_ms,
+            "llm_latency_ms": self.llm_latency_ms,
+            "stories": self.stories,
+            "viewers_per_story": self.viewers_per_story,
+            "human_delays": self.human_delays,
+            "seed": self.seed,
+        }
+
+
+@dataclass
+class IterationSample:
+    wall_seconds: float
+    browser_sessions: int
+    browserless_requests: int
+    llm_calls: int
+    llm_tokens: int
+    db_round_trips: int
+    peak_memory_bytes: int
+    job_status: str
+
+
+@dataclass
+class FlowReport:
+    flow: str
+    samples: List[IterationSample] = field(default_factory=list)
+
+    @staticmethod
+    def _percentile(values: List[float], pct: float) -> float:
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        rank = (len(ordered) - 1) * pct
+        lower = int(rank)
+        upper = min(lower + 1, len(ordered) - 1)
+        return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+    def summary(self) -> Dict[str, Any]:
+        walls = [sample.wall_seconds for sample in self.samples]
+
+        def _median(attr: str) -> float:
+            return float(statistics.median(getattr(sample, attr) for sample in self.samples)) if self.samples else 0.0
+
+        return {
+            "iterations": len(self.samples),
+            "wall_p50_ms": round(self._percentile(walls, 0.50) * 1000, 2),
+            "wall_p95_ms": round(self._percentile(walls, 0.95) * 1000, 2),
+            "browser_sessions": _median("browser_sessions"),
+            "browserless_requests": _median("browserless_requests"),
+            "llm_calls": _median("llm_calls"),
+            "llm_tokens": _median("llm_tokens"),
+            "db_round_trips": _median("db_round_trips"),
+            "peak_memory_kb": round(max((s.peak_memory_bytes for s in self.samples), default=0) / 1024, 1),
+            "failed_jobs": sum(1 for sample in self.samples if sample.job_status != "completed"),
+        }
+
+
+def prepare_environment(stub_base_url: str, database_path: Path, config: BenchmarkConfig) -> None:
+    """Aponta settings para os stand-ins (deve rodar antes de importar config/app)."""
+    os.environ.update(
+        {
+            "DATABASE_URL": f"sqlite:///{database_path}",
+            "BROWSERLESS_HOST": stub_base_url,
+            "BROWSERLESS_TOKEN": BENCH_TOKEN,
+            "BROWSERLESS_SESSION_ENABLED": "false",
+            "OPENAI_API_KEY": "sk-benchmark",
+            "LLM_BACKEND": "replay",
+            "LLM_REPLAY_LATENCY_MS": str(config.llm_latency_ms),
+            "INSTAGRAM_SESSION_STRICT_VALIDATION": "false",
+            "FASTAPI_ENV": "benchmark",
+            "SQLALCHEMY_ECHO": "false",
+            "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+        }
+    )
+
+
+class StandInBrowserAgent:
+    """
+    Substitui os metodos do BrowserUseAgent que dirigem o Chromium.
+
+    Mantem os contratos de retorno usados pelo InstagramScraper; o custo de cada
+    execucao (sessao Browserless, carga da pagina e chamada de LLM) passa pelos
+    stand-ins e entra nas metricas.
+    """
+
+    def __init__(self, base_url: str, config: BenchmarkConfig):
+        self.config = config
+        self.http = httpx.AsyncClient(base_url=base_url, timeout=30.0)
+
+    async def close(self) -> None:
+        await self.http.aclose()
+
+    async def _open_session(self) -> Dict[str, Any]:
+        response = await self.http.post("/session", params={"token": BENCH_TOKEN}, json={"ttl": 60000})
+        response.raise_for_status()
+        return response.json()
+
+    async def _close_session(self, session: Dict[str, Any]) -> None:
+        stop_url = session.get("stop")
+        if stop_url:
+            await self.http.delete(stop_url, params={"token": BENCH_TOKEN, "force": "true"})
+
+    async def _load_page(self, url: str) -> None:
+        response = await self.http.post("/content", params={"token": BENCH_TOKEN}, json={"url": url})
+        response.raise_for_status()
+
+    async def _run_agent(self, hint_key: str, url: str, **hint_args: Any) -> Dict[str, Any]:
+        from browser_use.llm.messages import UserMessage
+
+        from app.stubs.fake_llm import ReplayChatModel
+
+        session = await self._open_session()
+        try:
+            await self._load_page(url)
+            llm = ReplayChatModel(model="benchmark")
+            prompt = _TASK_HINTS[hint_key].format(url=url, **hint_args)
+            completion = await llm.ainvoke([UserMessage(content=prompt)])
+        finally:
+            await self._close_session(session)
+
+        step = json.loads(completion.completion)
+        for action in step.get("action") or []:
+            done = action.get("done") if isinstance(action, dict) else None
+            if isinstance(done, dict):
+                try:
+                    return json.loads(done.get("text") or "{}")
+                except json.JSONDecodeError:
+                    return {"error": "parse_failed", "raw_result": done.get("text")}
+        return {"error": "no_done_action"}
+
+    async def scrape_profile_basic_info(self, profile_url: str, storage_state: Optional[Dict[str, Any]] = None):
+        return await self._run_agent("profile_basic_info", profile_url)
+
+    async def scrape_profile_posts(self, profile_url: str, storage_state: Optional[Dict[str, Any]] = None, max_posts: int = 5):
+        result = await self._run_agent("profile_posts", profile_url, max_posts=max_posts)
+        result["posts"] = (result.get("posts") or [])[:max_posts]
+        return result
+
+    async def scrape_post_like_users(self, post_url: str, storage_state: Optional[Dict[str, Any]] = None, max_users: int = 30):
+        result = await self._run_agent("post_like_users", post_url)
+        result["like_users"] = (result.get("like_users") or [])[:max_users]
+        return result
+
+    async def scrape_post_comments(
+        self,
+        post_url: str,
+        storage_state: Optional[Dict[str, Any]] = None,
+        max_comments: int = 80,
+        max_scrolls: int = 6,
+    ):
+        result = await self._run_agent("post_comments", post_url)
+        result["comments"] = (result.get("comments") or [])[:max_comments]
+        return result
+
+    async def scrape_story_interactions(
+        self,
+        profile_url: str,
+        storage_state: Optional[Dict[str, Any]] = None,
+        max_interactions: int = 300,
+        on_story_collected: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+    ):
+        """Fluxo de stories e JS-only (sem LLM): uma sessao + um /function por story."""
+        username = profile_url.rstrip("/").rsplit("/", 1)[-1]
+        story_posts: List[Dict[str, Any]] = []
+        remaining = max(1, int(max_interactions))
+        session = await self._open_session()
+        try:
+            await self._load_page(profile_url)
+            for story_index in range(self.config.stories):
+                if remaining <= 0:
+                    break
+                story_url = f"https://www.instagram.com/stories/{username}/{3100000000000000000 + story_index}/"
+                response = await self.http.post(
+                    "/function",
+                    params={"token": BENCH_TOKEN},
+                    json={"code": "export default async () => ({})", "context": {"url": story_url}},
+                )
+                response.raise_for_status()
+
+                viewer_count = min(self.config.viewers_per_story, remaining)
+                remaining -= viewer_count
+                viewers = [
+                    {
+                        "user_url": f"https://www.instagram.com/viewer_{story_index}_{viewer_index}/",
+                        "user_username": f"viewer_{story_index}_{viewer_index}",
+                        "liked": viewer_index % 4 == 0,
+                    }
+                    for viewer_index in range(viewer_count)
+                ]
+                story_item = {
+                    "story_url": story_url,
+                    "view_count": viewer_count,
+                    "viewer_users": viewers,
+                    "liked_users": [
+                        {"user_url": viewer["user_url"], "user_username": viewer["user_username"]}
+                        for viewer in viewers
+                        if viewer["liked"]
+                    ],
+                }
+                story_posts.append(story_item)
+                if on_story_collected is not None:
+                    await on_story_collected(story_item)
+        finally:
+            await self._close_session(session)
+
+        return {"story_posts": story_posts, "total_story_posts": len(story_posts)}
+
+
+class BenchmarkRunner:
+    """Sobe os stand-ins, executa as iteracoes e coleta as metricas por fluxo."""
+
+    def __init__(self, config: Optional[BenchmarkConfig] = None):
+        self.config = config or BenchmarkConfig()
+        self._tempdir = tempfile.TemporaryDirectory(prefix="brcom-bench-")
+        self.server = BrowserlessStubServer(
+            BrowserlessStubConfig(latency_ms=self.config.browserless_latency_ms, seed=self.config.seed)
+        )
+        self._db_round_trips = 0
+
+    def __enter__(self) -> "BenchmarkRunner":
+        self.server.start()
+        prepare_environment(self.server.base_url, Path(self._tempdir.name) / "bench.db", self.config)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.server.stop()
+        self._tempdir.cleanup()
+
+    def _count_round_trip(self, *args: Any, **kwargs: Any) -> None:
+        self._db_round_trips += 1
+
+    def _seed_database(self) -> None:
+        from app.database import SessionLocal, init_db
+        from app.models import InstagramSession
+
+        init_db()
+        db = SessionLocal()
+        try:
+            db.add(
+                InstagramSession(
+                    instagram_username=BENCH_SESSION_USERNAME,
+                    storage_state={
+                        "cookies": [
+                            {"name": "sessionid", "value": "bench", "domain": ".instagram.com", "path": "/"},
+                            {"name": "csrftoken", "value": "bench", "domain": ".instagram.com", "path": "/"},
+                        ],
+                        "origins": [],
+                    },
+                    is_active=True,
+                )
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _create_job(self, flow: str) -> str:
+        from app.database import SessionLocal
+        from app.models import ScrapingJob
+
+        db = SessionLocal()
+        try:
+            job = ScrapingJob(profile_url=BENCH_PROFILE_URL, status="pending")
+            db.add(job)
+            db.commit()
+            return str(job.id)
+        finally:
+            db.close()
+
+    def _job_status(self, job_id: str) -> str:
+        from app.database import SessionLocal
+        from app.models import ScrapingJob
+
+        db = SessionLocal()
+        try:
+            job = db.query(ScrapingJob).filter(ScrapingJob.id == job_id).first()
+            return str(job.status) if job else "missing"
+        finally:
+            db.close()
+
+    async def _run_iteration(self, flow: str, agent: StandInBrowserAgent) -> IterationSample:
+        from app.api.routes import _scrape_profile_background
+        from app.stubs.fake_llm import replay_llm_stats
+
+        job_id = self._create_job(flow)
+        self.server.stub.reset()
+        replay_llm_stats.reset()
+        self._db_round_trips = 0
+        tracemalloc.reset_peak()
+
+        started = time.perf_counter()
+        await _scrape_profile_background(
+            job_id=job_id,
+            profile_url=BENCH_PROFILE_URL,
+            options={"flow": flow, "session_username": BENCH_SESSION_USERNAME},
+        )
+        wall_seconds = time.perf_counter() - started
+
+        _, peak_memory = tracemalloc.get_traced_memory()
+        stub_stats = self.server.stub.stats.as_dict()
+        llm_stats = replay_llm_stats.as_dict()
+        sample = IterationSample(
+            wall_seconds=wall_seconds,
+            browser_sessions=stub_stats["sessions_created"],
+            browserless_requests=stub_stats["total_requests"],
+            llm_calls=llm_stats["calls"],
+            llm_tokens=llm_stats["total_tokens"],
+            db_round_trips=self._db_round_trips,
+            peak_memory_bytes=peak_memory,
+            job_status="",
+        )
+        sample.job_status = self._job_status(job_id)
+        return sample
+
+    async def _run_async(self, flows: List[str]) -> Dict[str, FlowReport]:
+        from sqlalchemy import event
+
+        from app.database import engine
+        from app.scraper.browser_use_agent import browser_use_agent
+        from app.scraper.instagram_scraper import InstagramScraper
+
+        self._seed_database()
+        agent = StandInBrowserAgent(self.server.base_url, self.config)
+        reports: Dict[str, FlowReport] = {}
+
+        with ExitStack() as stack:
+            for method_name in (
+                "scrape_profile_basic_info",
+                "scrape_profile_posts",
+                "scrape_post_like_users",
+                "scrape_post_comments",
+                "scrape_story_interactions",
+            ):
+                stack.enter_context(patch.object(browser_use_agent, method_name, getattr(agent, method_name)))
+            if not self.config.human_delays:
+                # Pausas "humanas" aleatorias dominariam o tempo medido sem dizer nada do codigo.
+                stack.enter_context(patch.object(InstagramScraper, "_get_random_delay", lambda self, *a, **k: 0.0))
+
+            event.listen(engine, "before_cursor_execute", self._count_round_trip)
+            tracemalloc.start()
+            try:
+                for flow in flows:
+                    report = FlowReport(flow=flow)
+                    for _ in range(self.config.warmup):
+                        await self._run_iteration(flow, agent)
+                    for _ in range(self.config.iterations):
+                        report.samples.append(await self._run_iteration(flow, agent))
+                    reports[flow] = report
+            finally:
+                tracemalloc.stop()
+                event.remove(engine, "before_cursor_execute", self._count_round_trip)
+                await agent.close()
+        return reports
+
+    def run(self, flows: Optional[List[str]] = None) -> Dict[str, FlowReport]:
+        random.seed(self.config.seed)
+        return asyncio.run(self._run_async(list(flows or FLOWS)))
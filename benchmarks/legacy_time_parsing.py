@@ -0,0 +1,220 @@
+"""
+Copia congelada das implementacoes de tempo anteriores a `app/scraper/time_parsing.py`
+(metodos de InstagramScraper/BrowserUseAgent). Usada apenas como referencia de
+equivalencia e de desempenho em `benchmarks/time_parsing_bench.py`.
+"""
+
+import re
+import unicodedata
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+
+def relative_time_to_hours(text: Optional[str]) -> Optional[float]:
+    """
+    Converte texto relativo (ex: "3 h", "2d", "1 sem") para horas.
+    Retorna None quando nao consegue interpretar.
+    """
+    if text is None:
+        return None
+
+    cleaned = str(text).strip().lower()
+    if not cleaned:
+        return None
+
+    cleaned = cleaned.replace("\u2022", " ").replace("\u00b7", " ")
+    cleaned = re.sub(r"\b(editado|editada|edited)\b", "", cleaned)
+    cleaned = re.sub(r"\bago\b", "", cleaned)
+    cleaned = re.sub(r"\bh[a\u00e1]\b", "", cleaned)
+    cleaned = cleaned.strip()
+
+    if cleaned in {"now", "just now", "agora", "agora mesmo"}:
+        return 0.0
+    if cleaned in {"today", "hoje"}:
+        return 0.0
+    if cleaned in {"yesterday", "ontem"}:
+        return 24.0
+
+    patterns = [
+        (r"(\d+(?:[.,]\d+)?)\s*(?:s|seg|segs|segundo|segundos|sec|secs|second|seconds)\b", 1 / 3600),
+        (r"(\d+(?:[.,]\d+)?)\s*(?:m|min|mins|minute|minutes|minuto|minutos)\b", 1 / 60),
+        (r"(\d+(?:[.,]\d+)?)\s*(?:h|hr|hrs|hour|hours|hora|horas)\b", 1),
+        (r"(\d+(?:[.,]\d+)?)\s*(?:d|day|days|dia|dias)\b", 24),
+        (r"(\d+(?:[.,]\d+)?)\s*(?:w|wk|wks|week|weeks|sem|semana|semanas)\b", 24 * 7),
+        (r"(\d+(?:[.,]\d+)?)\s*(?:mo|month|months|mes|m[e\u00ea]s|meses)\b", 24 * 30),
+        (r"(\d+(?:[.,]\d+)?)\s*(?:y|yr|year|years|ano|anos)\b", 24 * 365),
+    ]
+
+    for pattern, hour_multiplier in patterns:
+        match = re.search(pattern, cleaned)
+        if not match:
+            continue
+        value = match.group(1).replace(",", ".")
+        try:
+            return float(value) * hour_multiplier
+        except ValueError:
+            return None
+
+    return None
+
+def parse_absolute_date(text: str, now: datetime) -> Optional[datetime]:
+    """
+    Tenta interpretar datas absolutas sem ano (ex: "January 23", "23 de janeiro").
+    Retorna datetime em UTC quando possivel.
+    """
+    if not text:
+        return None
+
+    cleaned = text.strip().lower()
+    if not cleaned:
+        return None
+
+    normalized = unicodedata.normalize("NFD", cleaned)
+    normalized = "".join(ch for ch in normalized if unicodedata.category(ch) != "Mn")
+    normalized = normalized.replace(",", " ").replace(".", " ")
+    normalized = re.sub(r"\bde\b", " ", normalized)
+    normalized = re.sub(r"\s+", " ", normalized).strip()
+
+    month_map = {
+        "january": 1,
+        "jan": 1,
+        "february": 2,
+        "feb": 2,
+        "fevereiro": 2,
+        "fev": 2,
+        "march": 3,
+        "mar": 3,
+        "marco": 3,
+        "abril": 4,
+        "apr": 4,
+        "april": 4,
+        "maio": 5,
+        "may": 5,
+        "jun": 6,
+        "june": 6,
+        "junho": 6,
+        "jul": 7,
+        "july": 7,
+        "julho": 7,
+        "aug": 8,
+        "august": 8,
+        "ago": 8,
+        "agosto": 8,
+        "sep": 9,
+        "sept": 9,
+        "september": 9,
+        "set": 9,
+        "setembro": 9,
+        "oct": 10,
+        "october": 10,
+        "out": 10,
+        "outubro": 10,
+        "nov": 11,
+        "november": 11,
+        "novembro": 11,
+        "dec": 12,
+        "december": 12,
+        "dez": 12,
+        "dezembro": 12,
+    }
+
+    tokens = normalized.split()
+    if not tokens:
+        return None
+
+    def _parse_day(token: str) -> Optional[int]:
+        match = re.match(r"(\d{1,2})", token)
+        if not match:
+            return None
+        day = int(match.group(1))
+        if 1 <= day <= 31:
+            return day
+        return None
+
+    def _parse_year(token: Optional[str]) -> Optional[int]:
+        if not token:
+            return None
+        match = re.match(r"(\d{2,4})", token)
+        if not match:
+            return None
+        year = int(match.group(1))
+        if year < 100:
+            year += 2000
+        return year
+
+    for idx, token in enumerate(tokens):
+        month = month_map.get(token)
+        if not month:
+            continue
+
+        day = None
+        year = None
+
+        if idx + 1 < len(tokens):
+            day = _parse_day(tokens[idx + 1])
+            if day is not None and idx + 2 < len(tokens):
+                year = _parse_year(tokens[idx + 2])
+
+        if day is None and idx > 0:
+            day = _parse_day(tokens[idx - 1])
+            if day is not None and idx + 1 < len(tokens):
+                year = _parse_year(tokens[idx + 1])
+
+        if day is None:
+            continue
+
+        if year is None:
+            year = now.year
+            try:
+                candidate = datetime(year, month, day, tzinfo=timezone.utc)
+            except ValueError:
+                return None
+            if candidate.date() > now.date():
+                try:
+                    candidate = datetime(year - 1, month, day, tzinfo=timezone.utc)
+                except ValueError:
+                    return None
+            return candidate
+
+        try:
+            return datetime(year, month, day, tzinfo=timezone.utc)
+        except ValueError:
+            return None
+
+    return None
+
+
+def parse_instagram_timestamp(
+    value: Any,
+    now: Optional[datetime] = None,
+) -> Optional[datetime]:
+    """Converte timestamps do Instagram para datetime UTC quando possivel."""
+    if value is None:
+        return None
+
+    effective_now = now or datetime.now(timezone.utc)
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+    text = str(value).strip()
+    if not text:
+        return None
+
+    iso_candidate = text.replace("Z", "+00:00").replace("z", "+00:00")
+    try:
+        parsed = datetime.fromisoformat(iso_candidate)
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    except Exception:
+        pass
+
+    lowered = text.lower()
+    if lowered in {"now", "just now", "agora", "agora mesmo", "today", "hoje"}:
+        return effective_now
+    if lowered in {"yesterday", "ontem"}:
+        return effective_now - timedelta(days=1)
+
+    relative_hours = relative_time_to_hours(lowered)
+    if relative_hours is not None:
+        return effective_now - timedelta(hours=relative_hours)
+
+    return parse_absolute_date(lowered, effective_now)
@@ -0,0 +1,135 @@
+"""
+Micro-benchmark de `_extract_profile_info_from_html`: payload JSON em uma passada
+(`app/scraper/profile_parser.py`) contra a cascata de regex (caminho anterior, ainda usado
+como fallback).
+
+Exemplos:
+  python -m benchmarks.profile_parser_bench
+  python -m benchmarks.profile_parser_bench --padding-kb 800 --rounds 50
+
+As paginas partem da fixture do stand-in (`app/stubs/fixtures/profile.html`) e recebem
+blocos `<script type="application/json">` de "bootloader" ate o tamanho pedido, como no
+HTML real do Instagram (centenas de KB com o usuario perto do fim). Antes de medir, confere
+que os dois caminhos devolvem o mesmo resultado.
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from string import Template
+from typing import Callable, Dict, List, Tuple
+from unittest.mock import patch
+
+# `app.scraper` carrega config no import; o parser em si nao usa nenhuma dessas settings.
+for _name, _value in (
+    ("DATABASE_URL", "sqlite://"),
+    ("BROWSERLESS_HOST", "http://localhost:3000"),
+    ("BROWSERLESS_TOKEN", "benchmark"),
+    ("OPENAI_API_KEY", "sk-benchmark"),
+):
+    os.environ.setdefault(_name, _value)
+
+import app.scraper.instagram_scraper as instagram_scraper_module  # noqa: E402
+from app.scraper.instagram_scraper import InstagramScraper  # noqa: E402
+from app.stubs.browserless_server import FIXTURES_DIR  # noqa: E402
+
+USERNAME = "pepoton.kids"
+
+
+def _bootloader_block(rng: random.Random, index: int) -> str:
+    payload = {
+        "require": [
+            [
+                f"ScheduledServerJS{index}",
+                "handle",
+                None,
+                [
+                    {
+                        "__bbox": {
+                            "define": [
+                                [f"Module{index}_{item}", [], {"value": rng.random(), "text": "x" * rng.randint(20, 200)}, item]
+                                for item in range(rng.randint(20, 60))
+                            ]
+                        }
+                    }
+                ],
+            ]
+        ]
+    }
+    return f'<script type="application/json" data-sjs>{json.dumps(payload)}</script>\n'
+
+
+def build_pages(padding_kb: int, seed: int) -> Dict[str, str]:
+    rng = random.Random(seed)
+    base = Template((FIXTURES_DIR / "profile.html").read_text(encoding="utf-8")).safe_substitute(
+        username=USERNAME,
+        full_name="Pepoton Kids \\u2728",
+    )
+    padding: List[str] = []
+    size = 0
+    index = 0
+    while size < padding_kb * 1024:
+        block = _bootloader_block(rng, index)
+        padding.append(block)
+        size += len(block)
+        index += 1
+    head, tail = base.split("<body>", 1)
+    large = f"{head}<body>\n{''.join(padding)}{tail}"
+    return {"fixture": base, f"fixture+{padding_kb}kb": large}
+
+
+def _regex_only(scraper: InstagramScraper, html: str) -> Dict:
+    with patch.object(instagram_scraper_module, "parse_profile_payload", lambda *args, **kwargs: {}):
+        return scraper._extract_profile_info_from_html(html, username_hint=USERNAME)
+
+
+def _measure(func: Callable[[], object], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def run(pages: Dict[str, str], rounds: int) -> Tuple[List[str], List[tuple]]:
+    scraper = InstagramScraper.__new__(InstagramScraper)
+    mismatches: List[str] = []
+    rows: List[tuple] = []
+    for name, html in pages.items():
+        structured = scraper._extract_profile_info_from_html(html, username_hint=USERNAME)
+        legacy = _regex_only(scraper, html)
+        if structured != legacy:
+            mismatches.append(f"{name}: regex={legacy!r} estruturado={structured!r}")
+
+        with patch.object(instagram_scraper_module, "parse_profile_payload", lambda *args, **kwargs: {}):
+            regex_ms = _measure(lambda: scraper._extract_profile_info_from_html(html, username_hint=USERNAME), rounds)
+        structured_ms = _measure(lambda: scraper._extract_profile_info_from_html(html, username_hint=USERNAME), rounds)
+        rows.append((name, len(html) // 1024, regex_ms, structured_ms))
+    return mismatches, rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmark do parser de perfil")
+    parser.add_argument("--padding-kb", type=int, default=400, help="Tamanho aproximado dos blocos extras")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    mismatches, rows = run(build_pages(args.padding_kb, args.seed), args.rounds)
+    if mismatches:
+        print("DIVERGENCIAS ENTRE REGEX E PARSER ESTRUTURADO:")
+        for item in mismatches:
+            print(f"  - {item}")
+        return 1
+
+    print(f"rounds={args.rounds} (ms por pagina)")
+    print("pagina".ljust(22) + "KB".rjust(6) + "regex".rjust(10) + "estruturado".rjust(14) + "ganho".rjust(9))
+    for name, size_kb, regex_ms, structured_ms in rows:
+        speedup = regex_ms / structured_ms if structured_ms else float("inf")
+        print(f"{name.ljust(22)}{size_kb:6d}{regex_ms:10.3f}{structured_ms:14.3f}{speedup:8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,157 @@
+"""
+Executa os benchmarks end-to-end dos fluxos de /api/scrape e compara com o baseline.
+
+Exemplos:
+  python -m benchmarks.run_benchmarks
+  python -m benchmarks.run_benchmarks --flows default,recent_likes --iterations 10
+  python -m benchmarks.run_benchmarks --update-baselines
+  python -m benchmarks.run_benchmarks --json-output bench_output.json
+
+Sai com codigo 1 quando alguma metrica piora alem da tolerancia (ou um job falha),
+para que regressoes quebrem o CI de forma explicita.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from benchmarks.harness import FLOWS, BenchmarkConfig, BenchmarkRunner  # noqa: E402
+
+BASELINES_PATH = Path(__file__).resolve().parent / "baselines.json"
+
+# Metricas deterministicas (contagens) toleram pouca variacao; tempo e memoria variam
+# com a maquina e recebem folga relativa + absoluta.
+METRIC_TOLERANCES: Dict[str, Tuple[float, float]] = {
+    "wall_p50_ms": (0.50, 50.0),
+    "wall_p95_ms": (0.75, 100.0),
+    "browser_sessions": (0.0, 0.0),
+    "browserless_requests": (0.10, 1.0),
+    "llm_calls": (0.0, 0.0),
+    "llm_tokens": (0.10, 50.0),
+    "db_round_trips": (0.10, 5.0),
+    "peak_memory_kb": (0.50, 1024.0),
+}
+
+
+def compare_with_baseline(
+    summary: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Any],
+    tolerance_scale: float = 1.0,
+) -> List[str]:
+    """Retorna a lista de regressoes (metrica acima de baseline * (1 + rel) + abs)."""
+    regressions: List[str] = []
+    baseline_flows = baseline.get("flows") or {}
+    for flow, metrics in summary.items():
+        if metrics.get("failed_jobs"):
+            regressions.append(f"{flow}: {metrics['failed_jobs']} job(s) nao concluidos")
+        expected = baseline_flows.get(flow)
+        if not expected:
+            continue
+        for metric, (relative, absolute) in METRIC_TOLERANCES.items():
+            if metric not in expected or metric not in metrics:
+                continue
+            limit = expected[metric] * (1 + relative * tolerance_scale) + absolute * tolerance_scale
+            if metrics[metric] > limit:
+                regressions.append(
+                    f"{flow}.{metric}: {metrics[metric]} > limite {round(limit, 2)} (baseline {expected[metric]})"
+                )
+    return regressions
+
+
+def _print_table(summary: Dict[str, Dict[str, Any]]) -> None:
+    columns = [
+        ("flow", 22),
+        ("wall_p50_ms", 12),
+        ("wall_p95_ms", 12),
+        ("browser_sessions", 17),
+        ("llm_calls", 10),
+        ("llm_tokens", 11),
+        ("db_round_trips", 15),
+        ("peak_memory_kb", 15),
+    ]
+    print("".join(name.ljust(width) for name, width in columns))
+    for flow, metrics in summary.items():
+        row = [flow] + [str(metrics.get(name, "")) for name, _ in columns[1:]]
+        print("".join(value.ljust(width) for value, (_, width) in zip(row, columns)))
+
+
+def main() -> int:
+    defaults = BenchmarkConfig()
+    parser = argparse.ArgumentParser(description="Benchmarks end-to-end dos fluxos de /api/scrape")
+    parser.add_argument("--flows", default=",".join(FLOWS), help="Fluxos separados por virgula")
+    parser.add_argument("--iterations", type=int, default=defaults.iterations)
+    parser.add_argument("--warmup", type=int, default=defaults.warmup)
+    parser.add_argument("--browserless-latency-ms", type=float, default=defaults.browserless_latency_ms)
+    parser.add_argument("--llm-latency-ms", type=float, default=defaults.llm_latency_ms)
+    parser.add_argument("--human-delays", action="store_true", help="Mantem as pausas aleatorias do scraper")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--baselines", default=str(BASELINES_PATH))
+    parser.add_argument("--update-baselines", action="store_true", help="Grava o resultado como novo baseline")
+    parser.add_argument("--tolerance-scale", type=float, default=1.0, help="Multiplica as tolerancias padrao")
+    parser.add_argument("--json-output", default=None, help="Grava o resumo em JSON")
+    args = parser.parse_args()
+
+    flows = [item.strip() for item in args.flows.split(",") if item.strip()]
+    unknown = [flow for flow in flows if flow not in FLOWS]
+    if unknown:
+        parser.error(f"Fluxos desconhecidos: {', '.join(unknown)}")
+
+    config = BenchmarkConfig(
+        iterations=max(1, args.iterations),
+        warmup=max(0, args.warmup),
+        browserless_latency_ms=args.browserless_latency_ms,
+        llm_latency_ms=args.llm_latency_ms,
+        human_delays=args.human_delays,
+        seed=args.seed,
+    )
+    with BenchmarkRunner(config) as runner:
+        reports = runner.run(flows)
+    summary = {flow: report.summary() for flow, report in reports.items()}
+
+    _print_table(summary)
+    if args.json_output:
+        Path(args.json_output).write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+    baselines_path = Path(args.baselines)
+    if args.update_baselines:
+        existing = json.loads(baselines_path.read_text(encoding="utf-8")) if baselines_path.exists() else {}
+        flows_baseline = dict(existing.get("flows") or {})
+        flows_baseline.update(summary)
+        baselines_path.write_text(
+            json.dumps({"config": config.as_dict(), "flows": flows_baseline}, indent=2) + "\n",
+            encoding="utf-8",
+        )
+        print(f"Baseline atualizado em {baselines_path}")
+        return 0
+
+    if not baselines_path.exists():
+        print(f"Baseline nao encontrado em {baselines_path}; rode com --update-baselines.")
+        return 0
+
+    baseline = json.loads(baselines_path.read_text(encoding="utf-8"))
+    baseline_config = baseline.get("config") or {}
+    comparable_keys = ("browserless_latency_ms", "llm_latency_ms", "human_delays", "stories", "viewers_per_story")
+    mismatched = [key for key in comparable_keys if baseline_config.get(key) != config.as_dict().get(key)]
+    if mismatched:
+        print(f"Configuracao diferente do baseline ({', '.join(mismatched)}); comparacao ignorada.")
+        return 0
+
+    regressions = compare_with_baseline(summary, baseline, tolerance_scale=args.tolerance_scale)
+    if regressions:
+        print("\nREGRESSOES DETECTADAS:")
+        for item in regressions:
+            print(f"  - {item}")
+        return 1
+    print("\nSem regressoes em relacao ao baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""
+Micro-benchmark do parser de tempo compartilhado (`app/scraper/time_parsing.py`) contra as
+implementacoes anteriores (`benchmarks/legacy_time_parsing.py`).
+
+Exemplos:
+  python -m benchmarks.time_parsing_bench
+  python -m benchmarks.time_parsing_bench --rounds 200 --distinct 50
+
+O corpus imita um job de comentarios: poucas expressoes distintas repetidas muitas vezes.
+Antes de medir, confere que as duas implementacoes devolvem o mesmo resultado para todo o
+corpus (sai com codigo 1 se divergirem).
+"""
+
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timezone
+from typing import Callable, List
+
+# `app.scraper` carrega config no import; o parser em si nao usa nenhuma dessas settings.
+for _name, _value in (
+    ("DATABASE_URL", "sqlite://"),
+    ("BROWSERLESS_HOST", "http://localhost:3000"),
+    ("BROWSERLESS_TOKEN", "benchmark"),
+    ("OPENAI_API_KEY", "sk-benchmark"),
+):
+    os.environ.setdefault(_name, _value)
+
+from app.scraper import time_parsing  # noqa: E402
+from benchmarks import legacy_time_parsing  # noqa: E402
+
+NOW = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+
+SAMPLES = [
+    "44 minutes ago",
+    "1 minute ago",
+    "2 h",
+    "3h",
+    "5 d",
+    "1 sem",
+    "2 semanas",
+    "12 w",
+    "há 3 horas",
+    "3 dias",
+    "editado • 4 h",
+    "30 s",
+    "1 mês",
+    "2 anos",
+    "ontem",
+    "agora",
+    "just now",
+    "January 23",
+    "23 de janeiro",
+    "23 de janeiro de 2024",
+    "Fev 2, 2025",
+    "março 14",
+    "2026-03-01T12:30:00+00:00",
+    "sem data",
+    "",
+]
+
+
+def build_corpus(size: int, distinct: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    pool = list(SAMPLES)
+    for index in range(max(0, distinct - len(pool))):
+        pool.append(f"{index % 59 + 1} {rng.choice(['min', 'h', 'd', 'sem', 'w'])}")
+    return [rng.choice(pool) for _ in range(size)]
+
+
+def check_equivalence(corpus: List[str]) -> List[str]:
+    mismatches = []
+    for text in sorted(set(corpus)):
+        checks = (
+            ("relative", legacy_time_parsing.relative_time_to_hours(text), time_parsing.relative_time_to_hours(text)),
+            ("absolute", legacy_time_parsing.parse_absolute_date(text, NOW), time_parsing.parse_absolute_date(text, NOW)),
+            (
+                "timestamp",
+                legacy_time_parsing.parse_instagram_timestamp(text, now=NOW),
+                time_parsing.parse_instagram_timestamp(text, now=NOW),
+            ),
+        )
+        for kind, expected, actual in checks:
+            if expected != actual:
+                mismatches.append(f"{kind} {text!r}: legado={expected!r} novo={actual!r}")
+    return mismatches
+
+
+def _measure(func: Callable[[str], object], corpus: List[str], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in corpus:
+            func(text)
+    return (time.perf_counter() - start) / (rounds * len(corpus)) * 1e6
+
+
+def run(corpus: List[str], rounds: int) -> List[tuple]:
+    cases = [
+        ("relative", legacy_time_parsing.relative_time_to_hours, time_parsing.relative_time_to_hours),
+        (
+            "absolute",
+            lambda text: legacy_time_parsing.parse_absolute_date(text, NOW),
+            lambda text: time_parsing.parse_absolute_date(text, NOW),
+        ),
+        (
+            "timestamp",
+            lambda text: legacy_time_parsing.parse_instagram_timestamp(text, now=NOW),
+            lambda text: time_parsing.parse_instagram_timestamp(text, now=NOW),
+        ),
+    ]
+    rows = []
+    for name, legacy, current in cases:
+        legacy_us = _measure(legacy, corpus, rounds)
+        time_parsing.clear_caches()
+        cold_us = _measure(current, corpus, 1)
+        warm_us = _measure(current, corpus, rounds)
+        rows.append((name, legacy_us, cold_us, warm_us))
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        time_parsing.relative_times_to_hours(corpus)
+    batch_us = (time.perf_counter() - start) / (rounds * len(corpus)) * 1e6
+    rows.append(("relative (lote)", rows[0][1], rows[0][2], batch_us))
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmark do parser de tempo do Instagram")
+    parser.add_argument("--size", type=int, default=2000, help="Itens no corpus")
+    parser.add_argument("--distinct", type=int, default=80, help="Expressoes distintas no corpus")
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.size, args.distinct, args.seed)
+    mismatches = check_equivalence(corpus)
+    if mismatches:
+        print("DIVERGENCIAS ENTRE LEGADO E NOVO:")
+        for item in mismatches:
+            print(f"  - {item}")
+        return 1
+
+    print(f"corpus={len(corpus)} distintos={len(set(corpus))} rounds={args.rounds} (us por item)")
+    print("caso".ljust(18) + "legado".rjust(10) + "novo frio".rjust(12) + "novo quente".rjust(14) + "ganho".rjust(9))
+    for name, legacy_us, cold_us, warm_us in run(corpus, args.rounds):
+        speedup = legacy_us / warm_us if warm_us else float("inf")
+        print(f"{name.ljust(18)}{legacy_us:10.2f}{cold_us:12.2f}{warm_us:14.2f}{speedup:8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -20,6 +20,9 @@ class Settings(BaseSettings):
 
     # PostgreSQL
     database_url: str
+    # Aplica migracoes Alembic pendentes no startup (sob advisory lock no Postgres).
+    # Com false, o startup falha se o schema estiver desatualizado (rode `alembic upgrade head`).
+    database_auto_migrate: bool = True
 
     # Browserless
     browserless_host: str
@@ -33,6 +36,9 @@ class Settings(BaseSettings):
     browserless_max_concurrency: int = 2
     browserless_request_retries: int = 3
     browserless_retry_backoff_seconds: float = 1.0
+    # Limite de bytes por resposta (/content, /screenshot, /pdf) e quanto fica em memoria antes de ir para disco.
+    browserless_max_response_bytes: int = 25 * 1024 * 1024
+    browserless_spool_max_memory_bytes: int = 1024 * 1024
     browser_use_max_retries: int = 3
     browser_use_retry_backoff: int = 2
     # "none" evita erros intermitentes de websocket/CDP em alguns proxies/browserless.
@@ -49,12 +55,22 @@ class Settings(BaseSettings):
     openai_fallback_model_vision: Optional[str] = None
     openai_temperature_text: float = 1.0
     openai_temperature_vision: float = 1.0
+    # Backend de LLM: "openai" (producao) ou "replay" (respostas gravadas, sem rede; ver app/stubs/fake_llm.py)
+    llm_backend: str = "openai"
+    llm_replay_fixtures_path: Optional[str] = None
+    llm_replay_latency_ms: float = 0.0
+    llm_replay_latency_jitter_ms: float = 0.0
+    llm_replay_prompt_tokens: int = 0
+    llm_replay_completion_tokens: int = 0
 
     # Instagram (opcional)
     instagram_username: Optional[str] = None
     instagram_password: Optional[str] = None
     instagram_session_strict_validation: bool = False
     instagram_direct_min_days_since_last_message: int = 30
+    # Paralelismo por conta: abas/contextos simultaneos ao coletar curtidores de posts.
+    recent_likes_parallel_tabs: int = 3
+    instagram_account_max_parallel_tabs: int = 3
 
     # Investing (opcional)
     investing_username: Optional[str] = None
@@ -72,11 +88,61 @@ class Settings(BaseSettings):
     api_key: Optional[str] = None   # backward-compatible single key
     api_auth_header_name: str = "X-API-Key"
     api_auth_public_paths: str = "/api/health,/docs,/openapi.json"
+    admin_api_keys: Optional[str] = None  # comma-separated; habilita /api/admin/*
     profile_cache_ttl_days: int = 2
+    # Cache em memoria das buscas de perfil por username (get_profile / scrape_profile_info).
+    profile_lookup_cache_size: int = 10000
+    profile_lookup_cache_seconds: int = 300
+    # Cache em memoria do "total" das listagens /profiles/{username}/posts|interactions.
+    profile_listing_total_cache_seconds: int = 60
     scrape_job_stale_recovery_enabled: bool = True
-    scrape_job_recover_running_on_startup: bool = True
+    # true derruba todo job "running" no startup; so e seguro com uma unica replica.
+    scrape_job_recover_running_on_startup: bool = False
+    # Limite para jobs "running" sem heartbeat (linhas anteriores ao heartbeat).
     scrape_job_max_running_minutes: int = 30
     scrape_job_max_pending_minutes: int = 15
+    # Heartbeat/lease: job "running" sem heartbeat ha mais de lease_seconds e considerado orfao.
+    scrape_job_heartbeat_interval_seconds: int = 30
+    scrape_job_lease_seconds: int = 120
+    # Sweeper periodico (apenas o lider via pg_try_advisory_lock executa a recuperacao).
+    scrape_job_sweep_interval_seconds: int = 60
+    # Coalescencia do /api/scrape: requisicoes identicas reaproveitam o job em voo ou um
+    # job concluido ha menos de coalesce_fresh_seconds (0 = so jobs em voo).
+    scrape_job_coalesce_enabled: bool = True
+    scrape_job_coalesce_fresh_seconds: int = 600
+    # POST /api/scrape/batch: jobs do mesmo lote executados ao mesmo tempo neste processo.
+    scrape_batch_concurrency: int = 3
+    # Stream SSE /api/scrape/{job_id}/events: intervalo da releitura de status (jobs em outra replica).
+    scrape_job_events_poll_seconds: float = 5.0
+    # Compressao do resultado em scraping_job_results: gzip, zstd (requer zstandard) ou none.
+    scrape_job_result_compression: str = "gzip"
+    # LRU em memoria dos corpos serializados de /scrape/{job_id}/results (jobs concluidos), por ETag.
+    scrape_results_body_cache_size: int = 256
+    scrape_results_body_cache_seconds: int = 600
+    scrape_results_body_cache_max_bytes: int = 4_000_000
+    # Webhooks de conclusao (callback_url): POST assinado com HMAC-SHA256; sem segredo, desabilitado.
+    webhook_signing_secret: Optional[str] = None
+    # Hosts liberados mesmo resolvendo para IP nao publico (loopback/RFC1918); separados por virgula.
+    webhook_allowed_hosts: Optional[str] = None
+    webhook_dispatch_interval_seconds: float = 2.0
+    webhook_dispatch_fetch_limit: int = 500
+    webhook_batch_max_events: int = 50
+    webhook_timeout_seconds: float = 10.0
+    webhook_max_attempts: int = 8
+    webhook_backoff_base_seconds: float = 5.0
+    webhook_backoff_max_seconds: float = 900.0
+
+    # Metricas Prometheus (GET /metrics)
+    metrics_enabled: bool = True
+
+    # Profiling sob demanda (/api/admin/profiling)
+    profiling_sampler_interval_ms: int = 10
+    profiling_max_window_seconds: int = 600
+
+    # Tracing (spans por etapa do scraping)
+    tracing_log_spans: bool = True
+    tracing_log_level: str = "INFO"
+    tracing_max_spans_per_job: int = 500
 
     class Config:
         env_file = ".env"
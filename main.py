@@ -8,13 +8,18 @@ from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from contextlib import asynccontextmanager
 
 from config import settings
-from app.database import init_db, health_check, SessionLocal
-from app.api.routes import router, recover_stale_scraping_jobs
+from app.database import init_db, health_check
+from app.api.routes import router
+from app.api.admin import router as admin_router
 from app.api.auth import require_private_api_key
+from app.job_recovery import job_sweeper
+from app.webhooks import webhook_dispatcher
+from app.metrics import CONTENT_TYPE_LATEST, registry as metrics_registry
+from app.scraper.browser_use_agent import browser_use_agent
 from app.scraper.instagram_scraper import instagram_scraper
 
 logger = logging.getLogger(__name__)
@@ -41,32 +46,25 @@ async def lifespan(app: FastAPI):
     if not health_check():
         logger.warning("⚠️ Banco de dados não está acessível")
 
-    # Recovery de jobs em background órfãos após restart do processo.
-    db = SessionLocal()
-    try:
-        recovered = recover_stale_scraping_jobs(
-            db,
-            force_recover_running=bool(
-                getattr(settings, "scrape_job_recover_running_on_startup", True)
-            ),
-        )
-        if recovered.get("total", 0) > 0:
-            logger.warning(
-                "⚠️ Recovery de jobs stale: running=%s pending=%s total=%s",
-                recovered.get("running", 0),
-                recovered.get("pending", 0),
-                recovered.get("total", 0),
-            )
-    except Exception as exc:
-        logger.warning("⚠️ Falha no recovery de jobs stale no startup: %s", exc)
-    finally:
-        db.close()
+    # Singletons de scraping criados aqui (nao no import). browser_use/openai so sao
+    # importados no primeiro job que usa navegador/LLM.
+    browser_use_agent.initialize()
+    instagram_scraper.initialize()
+
+    # Heartbeat dos jobs locais + recovery de jobs orfaos (varredura so no lider do
+    # advisory lock; a primeira varredura roda imediatamente).
+    job_sweeper.start()
+    # Entrega de webhooks de conclusao (webhook_outbox); so roda com WEBHOOK_SIGNING_SECRET.
+    webhook_dispatcher.start()
 
     yield
 
     # Shutdown
     logger.info("🛑 Encerrando aplicação...")
-    await instagram_scraper.close()
+    await job_sweeper.stop()
+    await webhook_dispatcher.stop()
+    if instagram_scraper.initialized:
+        await instagram_scraper.close()
     logger.info("✅ Aplicação encerrada")
 
 
@@ -100,6 +98,7 @@ app.include_router(
     router,
     dependencies=[Depends(require_private_api_key)],
 )
+app.include_router(admin_router)
 
 
 # ==================== Protected Docs ====================
@@ -124,6 +123,16 @@ async def swagger_ui():
     )
 
 
+# ==================== Metrics ====================
+
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_private_api_key)])
+async def metrics():
+    """Metricas Prometheus (adicione /metrics em API_AUTH_PUBLIC_PATHS para scrape sem API key)."""
+    if not getattr(settings, "metrics_enabled", True):
+        return Response(status_code=404)
+    return Response(content=metrics_registry.render(), media_type=CONTENT_TYPE_LATEST)
+
+
 # ==================== Root ====================
 
 @app.get("/")
@@ -135,6 +144,7 @@ async def root():
         "environment": settings.fastapi_env,
         "docs": "/docs",
         "health": "/api/health",
+        "metrics": "/metrics",
     }
 
 
@@ -0,0 +1,54 @@
+"""
+Ambiente Alembic.
+
+Usa o mesmo engine da aplicacao (`app.database.engine`, DATABASE_URL). Quando chamado por
+`app.database.run_migrations`, reaproveita a conexao que ja segura o advisory lock.
+
+Nova migracao:
+  alembic revision --autogenerate -m "descricao"
+e atualize `SCHEMA_HEAD_REVISION` em app/database.py.
+"""
+
+from alembic import context
+
+from app.database import engine
+from app.models import Base
+
+target_metadata = Base.metadata
+
+
+def _configure_and_run(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        compare_type=True,
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=str(engine.url),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connection = context.config.attributes.get("connection")
+    if connection is not None:
+        _configure_and_run(connection)
+        return
+    with engine.connect() as connection:
+        _configure_and_run(connection)
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,195 @@
+"""baseline: schema existente + ajustes que rodavam a cada startup
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-19
+
+Bancos novos: cria todas as tabelas. Bancos criados antes das migracoes (create_all +
+_ensure_* no init_db): cria apenas o que faltar e aplica, uma unica vez, os ajustes que
+antes rodavam em todo boot (profiles.full_name, interactions.post_url/comment_posted_at,
+indices de dedupe e valor VIEW no enum interactiontype).
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INTERACTION_TYPES = ("LIKE", "COMMENT", "SHARE", "SAVE", "VIEW")
+
+
+def _create_missing_tables(existing: set) -> None:
+    if "profiles" not in existing:
+        op.create_table(
+            "profiles",
+            sa.Column("id", sa.String(36), primary_key=True),
+            sa.Column("instagram_username", sa.String(255), nullable=False),
+            sa.Column("full_name", sa.String(255), nullable=True),
+            sa.Column("instagram_url", sa.String(500), nullable=False),
+            sa.Column("bio", sa.Text(), nullable=True),
+            sa.Column("is_private", sa.Boolean(), nullable=True),
+            sa.Column("follower_count", sa.Integer(), nullable=True),
+            sa.Column("following_count", sa.Integer(), nullable=True),
+            sa.Column("post_count", sa.Integer(), nullable=True),
+            sa.Column("profile_picture_url", sa.String(500), nullable=True),
+            sa.Column("verified", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+            sa.Column("last_scraped_at", sa.DateTime(), nullable=True),
+            sa.Column("metadata", sa.JSON(), nullable=True),
+        )
+        op.create_index("ix_profiles_instagram_username", "profiles", ["instagram_username"], unique=True)
+        op.create_index("ix_profiles_full_name", "profiles", ["full_name"])
+
+    if "posts" not in existing:
+        op.create_table(
+            "posts",
+            sa.Column("id", sa.String(36), primary_key=True),
+            sa.Column("profile_id", sa.String(36), sa.ForeignKey("profiles.id"), nullable=False),
+            sa.Column("post_id", sa.String(255), nullable=True),
+            sa.Column("post_url", sa.String(500), nullable=True),
+            sa.Column("caption", sa.Text(), nullable=True),
+            sa.Column("like_count", sa.Integer(), nullable=True),
+            sa.Column("comment_count", sa.Integer(), nullable=True),
+            sa.Column("share_count", sa.Integer(), nullable=True),
+            sa.Column("save_count", sa.Integer(), nullable=True),
+            sa.Column("posted_at", sa.DateTime(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+            sa.Column("metadata", sa.JSON(), nullable=True),
+        )
+        op.create_index("ix_posts_profile_id", "posts", ["profile_id"])
+        op.create_index("ix_posts_post_url", "posts", ["post_url"])
+
+    if "interactions" not in existing:
+        op.create_table(
+            "interactions",
+            sa.Column("id", sa.String(36), primary_key=True),
+            sa.Column("post_id", sa.String(36), sa.ForeignKey("posts.id"), nullable=False),
+            sa.Column("post_url", sa.String(500), nullable=True),
+            sa.Column("profile_id", sa.String(36), sa.ForeignKey("profiles.id"), nullable=False),
+            sa.Column("user_username", sa.String(255), nullable=False),
+            sa.Column("user_url", sa.String(500), nullable=False),
+            sa.Column("user_bio", sa.Text(), nullable=True),
+            sa.Column("user_is_private", sa.Boolean(), nullable=True),
+            sa.Column("user_follower_count", sa.Integer(), nullable=True),
+            sa.Column("interaction_type", sa.Enum(*INTERACTION_TYPES, name="interactiontype"), nullable=False),
+            sa.Column("comment_text", sa.Text(), nullable=True),
+            sa.Column("comment_likes", sa.Integer(), nullable=True),
+            sa.Column("comment_replies", sa.Integer(), nullable=True),
+            sa.Column("comment_posted_at", sa.String(64), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+            sa.Column("metadata", sa.JSON(), nullable=True),
+            sa.UniqueConstraint(
+                "post_url",
+                "user_url",
+                "interaction_type",
+                name="uq_interactions_post_url_user_url_type",
+            ),
+        )
+        op.create_index("ix_interactions_post_id", "interactions", ["post_id"])
+        op.create_index("ix_interactions_post_url", "interactions", ["post_url"])
+        op.create_index("ix_interactions_profile_id", "interactions", ["profile_id"])
+        op.create_index("ix_interactions_user_username", "interactions", ["user_username"])
+
+    if "scraping_jobs" not in existing:
+        op.create_table(
+            "scraping_jobs",
+            sa.Column("id", sa.String(36), primary_key=True),
+            sa.Column("profile_url", sa.String(500), nullable=False),
+            sa.Column("status", sa.String(50), nullable=True),
+            sa.Column("started_at", sa.DateTime(), nullable=True),
+            sa.Column("completed_at", sa.DateTime(), nullable=True),
+            sa.Column("error_message", sa.Text(), nullable=True),
+            sa.Column("posts_scraped", sa.Integer(), nullable=True),
+            sa.Column("interactions_scraped", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("metadata", sa.JSON(), nullable=True),
+        )
+
+    if "instagram_sessions" not in existing:
+        op.create_table(
+            "instagram_sessions",
+            sa.Column("id", sa.String(36), primary_key=True),
+            sa.Column("instagram_username", sa.String(255), nullable=True),
+            sa.Column("storage_state", sa.JSON(), nullable=False),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+            sa.Column("last_used_at", sa.DateTime(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_instagram_sessions_instagram_username", "instagram_sessions", ["instagram_username"])
+
+    if "investing_sessions" not in existing:
+        op.create_table(
+            "investing_sessions",
+            sa.Column("id", sa.String(36), primary_key=True),
+            sa.Column("investing_username", sa.String(255), nullable=True),
+            sa.Column("storage_state", sa.JSON(), nullable=False),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+            sa.Column("last_used_at", sa.DateTime(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_investing_sessions_investing_username", "investing_sessions", ["investing_username"])
+
+
+def _upgrade_legacy_tables(inspector: sa.engine.Inspector, existing: set) -> None:
+    """Ajustes equivalentes aos antigos _ensure_* do init_db (so em tabelas pre-existentes)."""
+    if "profiles" in existing:
+        columns = {column["name"] for column in inspector.get_columns("profiles")}
+        if "full_name" not in columns:
+            op.add_column("profiles", sa.Column("full_name", sa.String(255), nullable=True))
+
+    if "interactions" in existing:
+        columns = {column["name"] for column in inspector.get_columns("interactions")}
+        if "post_url" not in columns:
+            op.add_column("interactions", sa.Column("post_url", sa.String(500), nullable=True))
+        if "comment_posted_at" not in columns:
+            op.add_column("interactions", sa.Column("comment_posted_at", sa.String(64), nullable=True))
+        op.execute("CREATE INDEX IF NOT EXISTS ix_interactions_post_url ON interactions (post_url)")
+        op.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_interactions_post_url_user_url_type "
+            "ON interactions (post_url, user_url, interaction_type)"
+        )
+
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    labels = {
+        str(row[0])
+        for row in bind.execute(
+            sa.text(
+                "SELECT e.enumlabel FROM pg_type t JOIN pg_enum e ON e.enumtypid = t.oid "
+                "WHERE t.typname = 'interactiontype'"
+            )
+        )
+    }
+    if not labels:
+        return
+    target_label = "view" if "like" in labels and "LIKE" not in labels else "VIEW"
+    if target_label not in labels:
+        # ALTER TYPE ... ADD VALUE nao pode rodar no mesmo bloco transacional que usa o valor.
+        with op.get_context().autocommit_block():
+            op.execute(f"ALTER TYPE interactiontype ADD VALUE IF NOT EXISTS '{target_label}'")
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    existing = set(inspector.get_table_names())
+    _upgrade_legacy_tables(inspector, existing)
+    _create_missing_tables(existing)
+
+
+def downgrade() -> None:
+    op.drop_table("investing_sessions")
+    op.drop_table("instagram_sessions")
+    op.drop_table("scraping_jobs")
+    op.drop_table("interactions")
+    op.drop_table("posts")
+    op.drop_table("profiles")
+    sa.Enum(name="interactiontype").drop(op.get_bind(), checkfirst=True)
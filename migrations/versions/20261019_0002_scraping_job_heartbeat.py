@@ -0,0 +1,24 @@
+"""scraping_jobs.heartbeat_at (lease de execucao) + indice para o sweeper
+
+Revision ID: 0002_scraping_job_heartbeat
+Revises: 0001_baseline
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_scraping_job_heartbeat"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("scraping_jobs", sa.Column("heartbeat_at", sa.DateTime(), nullable=True))
+    op.create_index("ix_scraping_jobs_status_heartbeat_at", "scraping_jobs", ["status", "heartbeat_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_scraping_jobs_status_heartbeat_at", table_name="scraping_jobs")
+    op.drop_column("scraping_jobs", "heartbeat_at")
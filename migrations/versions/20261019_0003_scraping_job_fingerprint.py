@@ -0,0 +1,39 @@
+"""scraping_jobs.request_fingerprint + indices de coalescencia de jobs
+
+Revision ID: 0003_scraping_job_fingerprint
+Revises: 0002_scraping_job_heartbeat
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_scraping_job_fingerprint"
+down_revision = "0002_scraping_job_heartbeat"
+branch_labels = None
+depends_on = None
+
+IN_FLIGHT = sa.text("status IN ('pending', 'running')")
+
+
+def upgrade() -> None:
+    op.add_column("scraping_jobs", sa.Column("request_fingerprint", sa.String(64), nullable=True))
+    op.create_index(
+        "ix_scraping_jobs_request_fingerprint",
+        "scraping_jobs",
+        ["request_fingerprint", "completed_at"],
+    )
+    op.create_index(
+        "uq_scraping_jobs_inflight_fingerprint",
+        "scraping_jobs",
+        ["request_fingerprint"],
+        unique=True,
+        postgresql_where=IN_FLIGHT,
+        sqlite_where=IN_FLIGHT,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_scraping_jobs_inflight_fingerprint", table_name="scraping_jobs")
+    op.drop_index("ix_scraping_jobs_request_fingerprint", table_name="scraping_jobs")
+    op.drop_column("scraping_jobs", "request_fingerprint")
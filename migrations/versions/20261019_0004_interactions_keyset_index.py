@@ -0,0 +1,25 @@
+"""indice (profile_id, created_at, id) para paginacao por keyset das interacoes
+
+Revision ID: 0004_interactions_keyset_index
+Revises: 0003_scraping_job_fingerprint
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = "0004_interactions_keyset_index"
+down_revision = "0003_scraping_job_fingerprint"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_interactions_profile_id_created_at_id",
+        "interactions",
+        ["profile_id", "created_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_interactions_profile_id_created_at_id", table_name="interactions")
@@ -0,0 +1,38 @@
+"""scraping_job_results: resultado comprimido dos jobs fora de scraping_jobs.metadata
+
+Revision ID: 0005_scraping_job_results
+Revises: 0004_interactions_keyset_index
+Create Date: 2026-10-19
+
+Jobs ja concluidos mantem metadata["result"] (lido como fallback por
+app/job_results.load_job_result); nao ha copia de dados nesta migracao.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005_scraping_job_results"
+down_revision = "0004_interactions_keyset_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "scraping_job_results",
+        sa.Column(
+            "job_id",
+            sa.String(36),
+            sa.ForeignKey("scraping_jobs.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("encoding", sa.String(16), nullable=False),
+        sa.Column("payload", sa.LargeBinary(), nullable=False),
+        sa.Column("raw_size", sa.Integer(), nullable=False),
+        sa.Column("stored_size", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("scraping_job_results")
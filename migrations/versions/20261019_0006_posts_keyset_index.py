@@ -0,0 +1,21 @@
+"""indice (profile_id, created_at, id) para paginacao por keyset dos posts
+
+Revision ID: 0006_posts_keyset_index
+Revises: 0005_scraping_job_results
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = "0006_posts_keyset_index"
+down_revision = "0005_scraping_job_results"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_posts_profile_id_created_at_id", "posts", ["profile_id", "created_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_posts_profile_id_created_at_id", table_name="posts")
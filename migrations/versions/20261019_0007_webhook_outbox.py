@@ -0,0 +1,45 @@
+"""webhook_outbox: entregas de webhooks de conclusao de jobs
+
+Revision ID: 0007_webhook_outbox
+Revises: 0006_posts_keyset_index
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007_webhook_outbox"
+down_revision = "0006_posts_keyset_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "webhook_outbox",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column(
+            "job_id",
+            sa.String(36),
+            sa.ForeignKey("scraping_jobs.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("callback_url", sa.String(1000), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("delivered_at", sa.DateTime(), nullable=True),
+        sa.UniqueConstraint("job_id", "callback_url", name="uq_webhook_outbox_job_callback"),
+    )
+    op.create_index(
+        "ix_webhook_outbox_status_next_attempt_at",
+        "webhook_outbox",
+        ["status", "next_attempt_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_webhook_outbox_status_next_attempt_at", table_name="webhook_outbox")
+    op.drop_table("webhook_outbox")
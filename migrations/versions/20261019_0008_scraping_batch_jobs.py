@@ -0,0 +1,33 @@
+"""scraping_batch_jobs: jobs de cada lote do POST /api/scrape/batch
+
+Revision ID: 0008_scraping_batch_jobs
+Revises: 0007_webhook_outbox
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008_scraping_batch_jobs"
+down_revision = "0007_webhook_outbox"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "scraping_batch_jobs",
+        sa.Column("batch_id", sa.String(36), primary_key=True),
+        sa.Column(
+            "job_id",
+            sa.String(36),
+            sa.ForeignKey("scraping_jobs.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("position", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("scraping_batch_jobs")
@@ -0,0 +1,26 @@
+"""indice funcional lower(instagram_username) em profiles
+
+Revision ID: 0009_profiles_username_lower_index
+Revises: 0008_scraping_batch_jobs
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009_profiles_username_lower_index"
+down_revision = "0008_scraping_batch_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_profiles_instagram_username_lower",
+        "profiles",
+        [sa.text("lower(instagram_username)")],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_profiles_instagram_username_lower", table_name="profiles")
@@ -0,0 +1,61 @@
+"""
+Sobe o stand-in local do Browserless (fixtures do Instagram, latencia e erros configuraveis).
+
+Exemplos:
+  python scripts/run_browserless_stub.py --port 3900
+  python scripts/run_browserless_stub.py --port 3900 --latency-ms 200 --jitter-ms 50 --error-rate 0.05
+  python scripts/run_browserless_stub.py --error-rate 0.2 --error-endpoints /content,/screenshot --seed 42
+
+Depois aponte a API para ele:
+  BROWSERLESS_HOST=http://127.0.0.1:3900 BROWSERLESS_TOKEN=stub uvicorn main:app
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+
+def main() -> None:
+    import uvicorn
+
+    from app.stubs.browserless_server import BrowserlessStubConfig, create_browserless_stub_app
+
+    defaults = BrowserlessStubConfig.from_env()
+    parser = argparse.ArgumentParser(description="Stand-in local do Browserless")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3900)
+    parser.add_argument("--fixtures-dir", default=str(defaults.fixtures_dir))
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=defaults.latency_jitter_ms)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--error-status", type=int, default=defaults.error_status)
+    parser.add_argument(
+        "--error-endpoints",
+        default=",".join(sorted(defaults.error_endpoints or [])),
+        help="Lista separada por virgula (vazio = todos os endpoints)",
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--cdp-ws-url", default=defaults.cdp_ws_url, help="CDP real para /json/version e /session")
+    args = parser.parse_args()
+
+    error_endpoints = {item.strip() for item in args.error_endpoints.split(",") if item.strip()}
+    config = BrowserlessStubConfig(
+        fixtures_dir=Path(args.fixtures_dir),
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        error_endpoints=error_endpoints or None,
+        seed=args.seed,
+        cdp_ws_url=args.cdp_ws_url,
+    )
+    uvicorn.run(create_browserless_stub_app(config), host=args.host, port=args.port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
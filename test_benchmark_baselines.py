@@ -0,0 +1,45 @@
+import unittest
+
+from benchmarks.harness import FlowReport, IterationSample
+from benchmarks.run_benchmarks import compare_with_baseline
+
+
+def _sample(wall_seconds, llm_calls=2):
+    return IterationSample(
+        wall_seconds=wall_seconds,
+        browser_sessions=1,
+        browserless_requests=3,
+        llm_calls=llm_calls,
+        llm_tokens=100,
+        db_round_trips=10,
+        peak_memory_bytes=2048,
+        job_status="completed",
+    )
+
+
+class BenchmarkBaselineTest(unittest.TestCase):
+    def test_summary_reports_percentiles_and_counts(self):
+        report = FlowReport(flow="default", samples=[_sample(0.1), _sample(0.2), _sample(0.3)])
+
+        summary = report.summary()
+
+        self.assertEqual(summary["wall_p50_ms"], 200.0)
+        self.assertAlmostEqual(summary["wall_p95_ms"], 290.0)
+        self.assertEqual(summary["llm_calls"], 2)
+        self.assertEqual(summary["peak_memory_kb"], 2.0)
+        self.assertEqual(summary["failed_jobs"], 0)
+
+    def test_regressions_fail_on_extra_llm_calls_but_tolerate_small_jitter(self):
+        baseline = {"flows": {"default": FlowReport("default", [_sample(0.2)]).summary()}}
+
+        jitter = FlowReport("default", [_sample(0.22)]).summary()
+        self.assertEqual(compare_with_baseline({"default": jitter}, baseline), [])
+
+        regressed = FlowReport("default", [_sample(0.2, llm_calls=3)]).summary()
+        regressions = compare_with_baseline({"default": regressed}, baseline)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("default.llm_calls", regressions[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import base64
+import json
+import unittest
+
+import httpx
+
+from app.scraper.browserless_client import BrowserlessClient, BrowserlessResponseTooLarge
+
+
+def _build_client(handler, max_response_bytes=1024 * 1024, spool_max_memory_bytes=64):
+    client = BrowserlessClient()
+    client.max_retries = 1
+    client.max_response_bytes = max_response_bytes
+    client.spool_max_memory_bytes = spool_max_memory_bytes
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+class _BrokenStream(httpx.AsyncByteStream):
+    """Entrega um pedaco do corpo e cai no meio da leitura."""
+
+    async def __aiter__(self):
+        yield b"<html>partial"
+        raise httpx.RemoteProtocolError("peer closed connection without sending complete message body")
+
+
+class BrowserlessStreamingTest(unittest.IsolatedAsyncioTestCase):
+    async def test_get_html_stream_spools_body_to_file(self):
+        html = "<html>" + ("á" * 500) + "</html>"
+
+        def handler(request):
+            return httpx.Response(
+                200,
+                headers={"content-type": "text/html; charset=utf-8"},
+                content=html.encode("utf-8"),
+            )
+
+        client = _build_client(handler)
+        spool = await client.get_html_stream("https://www.instagram.com/x/")
+        with spool:
+            self.assertTrue(spool._rolled)
+            self.assertEqual(spool.read().decode("utf-8"), html)
+        self.assertEqual(await client.get_html("https://www.instagram.com/x/"), html)
+        await client.close()
+
+    async def test_get_html_unwraps_json_payload(self):
+        def handler(request):
+            return httpx.Response(200, json={"data": "<html>ok</html>"})
+
+        client = _build_client(handler)
+        self.assertEqual(await client.get_html("https://www.instagram.com/x/"), "<html>ok</html>")
+        await client.close()
+
+    async def test_response_over_limit_raises(self):
+        def handler(request):
+            return httpx.Response(200, headers={"content-type": "text/html"}, content=b"x" * 4096)
+
+        client = _build_client(handler, max_response_bytes=1024)
+        with self.assertRaises(BrowserlessResponseTooLarge):
+            await client.get_html("https://www.instagram.com/x/")
+        with self.assertRaises(BrowserlessResponseTooLarge):
+            await client.pdf("https://www.instagram.com/x/")
+        await client.close()
+
+    async def test_body_read_errors_are_retried(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request.url.path)
+            if len(calls) % 2:
+                return httpx.Response(200, headers={"content-type": "text/html"}, stream=_BrokenStream())
+            return httpx.Response(200, headers={"content-type": "text/html"}, content=b"<html>ok</html>")
+
+        client = _build_client(handler)
+        client.max_retries = 2
+        client.retry_backoff_seconds = 0
+        self.assertEqual(await client.get_html("https://www.instagram.com/x/"), "<html>ok</html>")
+        self.assertEqual(await client.get_html_prefix("https://www.instagram.com/x/", max_chars=100), "<html>ok</html>")
+        pdf = await client.pdf_stream("https://www.instagram.com/x/")
+        with pdf:
+            self.assertEqual(pdf.read(), b"<html>ok</html>")
+        self.assertEqual(len(calls), 6)
+
+        client.max_retries = 1
+        calls.clear()
+        with self.assertRaises(RuntimeError) as ctx:
+            await client.get_html("https://www.instagram.com/x/")
+        self.assertIsInstance(ctx.exception.__cause__, httpx.RemoteProtocolError)
+        await client.close()
+
+    async def test_response_over_limit_is_not_retried(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, headers={"content-type": "text/html"}, content=b"x" * 4096)
+
+        client = _build_client(handler, max_response_bytes=1024)
+        client.max_retries = 3
+        with self.assertRaises(BrowserlessResponseTooLarge):
+            await client.get_html("https://www.instagram.com/x/")
+        self.assertEqual(len(calls), 1)
+        await client.close()
+
+    async def test_get_html_prefix_stops_at_max_chars(self):
+        def handler(request):
+            return httpx.Response(200, headers={"content-type": "text/html"}, content=b"a" * 10000)
+
+        client = _build_client(handler)
+        prefix = await client.get_html_prefix("https://www.instagram.com/x/", max_chars=100)
+        self.assertEqual(prefix, "a" * 100)
+        await client.close()
+
+    async def test_screenshot_bytes_and_base64(self):
+        png = b"\x89PNG" + bytes(range(256))
+
+        def handler(request):
+            payload = json.loads(request.content)
+            if payload.get("fullPage") is False:
+                return httpx.Response(200, json={"data": base64.b64encode(png).decode("ascii")})
+            return httpx.Response(200, headers={"content-type": "image/png"}, content=png)
+
+        client = _build_client(handler)
+        image = await client.screenshot_bytes("https://www.instagram.com/x/")
+        self.assertIsInstance(image, memoryview)
+        self.assertEqual(image.tobytes(), png)
+        self.assertEqual(
+            await client.screenshot("https://www.instagram.com/x/", full_page=False),
+            base64.b64encode(png).decode("ascii"),
+        )
+        await client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+
+import httpx
+
+from app.scraper.browserless_client import BrowserlessClient
+from app.scraper.instagram_scraper import InstagramScraper
+from app.stubs.browserless_server import BrowserlessStub, BrowserlessStubConfig
+
+
+def _client_for(stub):
+    client = BrowserlessClient()
+    client.host = "http://stub"
+    client.max_retries = 1
+    client.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=stub.app))
+    return client
+
+
+class BrowserlessStubTest(unittest.IsolatedAsyncioTestCase):
+    async def test_content_serves_profile_fixture_parsed_by_scraper(self):
+        stub = BrowserlessStub(BrowserlessStubConfig(seed=1))
+        client = _client_for(stub)
+
+        html = await client.get_html("https://www.instagram.com/pepoton.kids/")
+        scraper = InstagramScraper.__new__(InstagramScraper)
+        info = scraper._extract_profile_info_from_html(html, username_hint="pepoton.kids")
+
+        self.assertEqual(info["username"], "pepoton.kids")
+        self.assertEqual(info["follower_count"], 1234)
+        self.assertEqual(info["post_count"], 56)
+        self.assertEqual(stub.stats.requests["/content"], 1)
+        await client.close()
+
+    async def test_screenshot_and_function_endpoints(self):
+        stub = BrowserlessStub(BrowserlessStubConfig(function_result={"ok": True}))
+        client = _client_for(stub)
+
+        image = await client.screenshot_bytes("https://www.instagram.com/p/ABC/")
+        self.assertTrue(image.tobytes().startswith(b"\x89PNG"))
+        result = await client.execute_script("https://www.instagram.com/", "() => 1")
+        self.assertEqual(result, {"ok": True})
+        await client.close()
+
+    async def test_error_injection_surfaces_as_browserless_failure(self):
+        stub = BrowserlessStub(
+            BrowserlessStubConfig(error_rate=1.0, error_status=502, error_endpoints={"/content"})
+        )
+        client = _client_for(stub)
+
+        with self.assertRaises(RuntimeError) as ctx:
+            await client.get_html("https://www.instagram.com/pepoton.kids/")
+        self.assertIn("status=502", str(ctx.exception))
+        self.assertEqual(stub.stats.errors_injected, 1)
+        await client.screenshot("https://www.instagram.com/pepoton.kids/")
+        await client.close()
+
+    async def test_session_lifecycle_and_json_version(self):
+        stub = BrowserlessStub(BrowserlessStubConfig(cdp_ws_url="ws://127.0.0.1:9222/devtools/browser/x"))
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=stub.app),
+            base_url="http://stub",
+        ) as http:
+            version = (await http.get("/json/version?token=x")).json()
+            self.assertEqual(version["webSocketDebuggerUrl"], "ws://127.0.0.1:9222/devtools/browser/x")
+
+            session = (await http.post("/session?token=x", json={"ttl": 1000})).json()
+            self.assertIn("connect", session)
+            stop_path = session["stop"].replace("http://stub", "")
+            self.assertEqual((await http.delete(f"{stop_path}?token=x&force=true")).status_code, 200)
+
+            stats = (await http.get("/_stub/stats")).json()
+            self.assertEqual(stats["sessions_created"], 1)
+            self.assertEqual(stats["sessions_stopped"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
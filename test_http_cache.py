@@ -0,0 +1,147 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from fastapi import Response
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import app.api.routes as routes
+from app.http_cache import http_date, is_not_modified, weak_etag
+from app.job_results import save_job_result
+from app.models import Base, Interaction, InteractionType, Post, Profile, ScrapingJob
+
+
+class HttpCacheTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{Path(self._tmp.name) / 'http_cache.db'}")
+        Base.metadata.create_all(self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.updated_at = datetime(2026, 10, 19, 12, 0, 0, 500)
+        routes._results_bodies.clear()
+        routes._listing_totals.clear()
+
+        self.db.add(
+            Profile(
+                id="p",
+                instagram_username="alice",
+                instagram_url="https://www.instagram.com/alice/",
+                updated_at=self.updated_at,
+            )
+        )
+        self.db.add(Post(id="post", profile_id="p", post_url="https://www.instagram.com/p/1/"))
+        self.db.add(
+            Interaction(
+                id="i1",
+                post_id="post",
+                profile_id="p",
+                user_username="bob",
+                user_url="https://www.instagram.com/bob/",
+                interaction_type=InteractionType.LIKE,
+            )
+        )
+        self.db.add(
+            ScrapingJob(
+                id="default",
+                profile_url="https://www.instagram.com/alice/",
+                status="completed",
+                completed_at=datetime(2026, 10, 19, 11),
+                metadata_json={"request": {"flow": "default"}},
+            )
+        )
+        self.db.add(
+            ScrapingJob(
+                id="stories",
+                profile_url="https://www.instagram.com/alice/",
+                status="completed",
+                completed_at=datetime(2026, 10, 19, 11),
+                metadata_json={"request": {"flow": "stories_interactions"}},
+            )
+        )
+        save_job_result(self.db, "stories", {"summary": {}, "story_posts": []})
+        self.db.commit()
+
+    def tearDown(self):
+        routes._results_bodies.clear()
+        routes._listing_totals.clear()
+        self.db.close()
+        self.engine.dispose()
+        self._tmp.cleanup()
+
+    def _bump_profile(self):
+        self.db.get(Profile, "p").updated_at = self.updated_at + timedelta(minutes=5)
+        self.db.commit()
+
+    async def test_completed_results_revalidate_and_reuse_serialized_body(self):
+        first = await routes.get_scraping_results("stories", db=self.db)
+        etag = first.headers["etag"]
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertEqual(first.headers["last-modified"], "Mon, 19 Oct 2026 11:00:00 GMT")
+
+        not_modified = await routes.get_scraping_results("stories", if_none_match=etag, db=self.db)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.body, b"")
+
+        statements = []
+        event.listen(self.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        cached = await routes.get_scraping_results("stories", db=self.db)
+        self.assertEqual(cached.body, first.body)
+        self.assertFalse([sql for sql in statements if "scraping_job_results" in sql])
+
+        slim = await routes.get_scraping_results("stories", include_raw=False, db=self.db)
+        self.assertNotEqual(slim.headers["etag"], etag)
+
+    async def test_default_flow_etag_follows_profile_version(self):
+        first = await routes.get_scraping_results("default", db=self.db)
+        etag = first.headers["etag"]
+        self.assertEqual(first.headers["last-modified"], http_date(self.updated_at))
+        self.assertEqual(
+            (await routes.get_scraping_results("default", if_none_match=etag, db=self.db)).status_code, 304
+        )
+
+        self._bump_profile()
+        fresh = await routes.get_scraping_results("default", if_none_match=etag, db=self.db)
+        self.assertEqual(fresh.status_code, 200)
+        self.assertNotEqual(fresh.headers["etag"], etag)
+
+    async def test_profile_and_listings_answer_304(self):
+        response = Response()
+        profile = await routes.get_profile("alice", response=response, db=self.db)
+        self.assertEqual(profile.instagram_username, "alice")
+        self.assertEqual(
+            (await routes.get_profile("alice", if_modified_since=response.headers["last-modified"], db=self.db)).status_code,
+            304,
+        )
+
+        for endpoint in (routes.get_profile_posts, routes.get_profile_interactions):
+            with self.subTest(endpoint=endpoint.__name__):
+                response = Response()
+                page = await endpoint("alice", response=response, db=self.db)
+                self.assertEqual(page["total"], 1)
+                etag = response.headers["etag"]
+                self.assertEqual((await endpoint("alice", if_none_match=etag, db=self.db)).status_code, 304)
+
+                other_page = Response()
+                await endpoint("alice", limit=1, response=other_page, db=self.db)
+                self.assertNotEqual(other_page.headers["etag"], etag)
+
+        self._bump_profile()
+        page = await routes.get_profile_posts("alice", if_none_match=etag, db=self.db)
+        self.assertIsInstance(page, dict)
+
+    def test_conditional_header_rules(self):
+        etag = weak_etag("x", 1)
+        modified = datetime(2026, 10, 19, 12, 0, 0, 999)
+        self.assertTrue(is_not_modified(etag, modified, f'"other", {etag.removeprefix("W/")}', None))
+        self.assertTrue(is_not_modified(etag, modified, "*", None))
+        # If-None-Match tem precedencia sobre If-Modified-Since.
+        self.assertFalse(is_not_modified(etag, modified, '"other"', http_date(modified)))
+        self.assertTrue(is_not_modified(etag, modified, None, http_date(modified)))
+        self.assertFalse(is_not_modified(etag, modified + timedelta(seconds=1), None, http_date(modified)))
+        self.assertFalse(is_not_modified(etag, modified, None, "not a date"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import csv
+import io
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+import orjson
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.api.routes as routes
+import app.interaction_export as interaction_export
+from app.models import Base, Interaction, InteractionType, Post, Profile
+
+
+class InteractionExportTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{Path(self._tmp.name) / 'export.db'}")
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.db = self.Session()
+        self.base = datetime(2026, 10, 1)
+
+        self.db.add(Profile(id="p", instagram_username="alice", instagram_url="https://www.instagram.com/alice/"))
+        self.db.add(Post(id="post", profile_id="p", post_url="https://www.instagram.com/p/1/"))
+        for index in range(7):
+            self.db.add(
+                Interaction(
+                    id=f"i{index}",
+                    post_id="post",
+                    post_url="https://www.instagram.com/p/1/",
+                    profile_id="p",
+                    user_username=f"user{index}",
+                    user_url=f"https://www.instagram.com/user{index}/",
+                    interaction_type=InteractionType.COMMENT if index % 2 else InteractionType.LIKE,
+                    comment_text="oi, tudo bem?" if index % 2 else None,
+                    created_at=self.base + timedelta(days=index),
+                )
+            )
+        self.db.commit()
+
+        self._patches = [
+            patch.object(routes, "SessionLocal", self.Session),
+            patch.object(interaction_export, "YIELD_PER", 2),
+        ]
+        for item in self._patches:
+            item.start()
+
+    def tearDown(self):
+        for item in self._patches:
+            item.stop()
+        self.db.close()
+        self.engine.dispose()
+        self._tmp.cleanup()
+
+    async def _export(self, **params):
+        response = await routes.export_profile_interactions("alice", db=self.db, **params)
+        chunks = [chunk async for chunk in response.body_iterator]
+        return response, chunks
+
+    async def test_ndjson_streams_every_row_in_chunks(self):
+        response, chunks = await self._export()
+
+        self.assertEqual(response.media_type, "application/x-ndjson")
+        self.assertEqual(len(chunks), 4)
+        rows = [orjson.loads(line) for line in b"".join(chunks).splitlines()]
+        self.assertEqual([row["id"] for row in rows], [f"i{index}" for index in range(7)])
+        self.assertEqual(rows[1]["type"], "comment")
+        self.assertEqual(rows[0]["created_at"], self.base.isoformat())
+
+    async def test_filters_by_type_and_date(self):
+        _, chunks = await self._export(
+            interaction_type="COMMENT",
+            since=self.base + timedelta(days=2),
+            until=self.base + timedelta(days=6),
+        )
+        rows = [orjson.loads(line) for line in b"".join(chunks).splitlines()]
+        self.assertEqual([row["id"] for row in rows], ["i3", "i5"])
+
+    async def test_csv_has_header_and_escapes_text(self):
+        response, chunks = await self._export(format="csv", interaction_type="comment")
+
+        self.assertTrue(response.media_type.startswith("text/csv"))
+        rows = list(csv.reader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+        self.assertEqual(tuple(rows[0]), interaction_export.EXPORT_COLUMNS)
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[1][interaction_export.EXPORT_COLUMNS.index("comment_text")], "oi, tudo bem?")
+
+        _, empty = await self._export(format="csv", post_url="https://www.instagram.com/p/other/")
+        self.assertEqual(b"".join(empty).decode("utf-8").strip(), ",".join(interaction_export.EXPORT_COLUMNS))
+
+    async def test_invalid_parameters_are_rejected(self):
+        for params in ({"format": "xml"}, {"interaction_type": "follow"}):
+            with self.subTest(params=params):
+                with self.assertRaises(HTTPException) as ctx:
+                    await routes.export_profile_interactions("alice", db=self.db, **params)
+                self.assertEqual(ctx.exception.status_code, 400)
+
+        with self.assertRaises(HTTPException) as ctx:
+            await routes.export_profile_interactions("nobody", db=self.db)
+        self.assertEqual(ctx.exception.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
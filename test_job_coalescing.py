@@ -0,0 +1,113 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+from fastapi import BackgroundTasks
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+import app.api.routes as routes
+from app.job_coalescing import scrape_request_fingerprint
+from app.models import Base, ScrapingJob
+from app.schemas import ScrapingJobCreate
+from config import settings
+
+
+class JobCoalescingTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{Path(self._tmp.name) / 'jobs.db'}")
+        Base.metadata.create_all(self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self._patch = patch.object(
+            routes,
+            "_require_active_scrape_session",
+            lambda db, username, flow: (username or "operator", None),
+        )
+        self._patch.start()
+
+    def tearDown(self):
+        self._patch.stop()
+        self.db.close()
+        self.engine.dispose()
+        self._tmp.cleanup()
+
+    async def _scrape(self, payload):
+        tasks = BackgroundTasks()
+        response = await routes.start_scraping(ScrapingJobCreate.model_validate(payload), tasks, self.db)
+        return response, len(tasks.tasks)
+
+    async def test_identical_request_attaches_to_in_flight_job(self):
+        first, first_tasks = await self._scrape({"profile_url": "alice", "session_username": "operator"})
+        second, second_tasks = await self._scrape(
+            {
+                "profile_url": "https://instagram.com/alice",
+                "flow": " DEFAULT ",
+                "max_posts": 5,
+                "session_username": "operator",
+            }
+        )
+
+        self.assertEqual((first_tasks, second_tasks), (1, 0))
+        self.assertEqual(second.id, first.id)
+        self.assertFalse(first.coalesced)
+        self.assertTrue(second.coalesced)
+        self.assertEqual(self.db.query(ScrapingJob).count(), 1)
+
+    async def test_different_options_start_a_new_job(self):
+        first, _ = await self._scrape({"profile_url": "alice", "session_username": "operator"})
+        second, tasks = await self._scrape({"profile_url": "alice", "max_posts": 2, "session_username": "operator"})
+        self.assertNotEqual(second.id, first.id)
+        self.assertEqual(tasks, 1)
+
+    async def test_completed_job_is_reused_only_within_freshness_window(self):
+        first, _ = await self._scrape({"profile_url": "alice", "session_username": "operator"})
+        job = self.db.get(ScrapingJob, first.id)
+        job.status = "completed"
+        job.completed_at = datetime.utcnow()
+        self.db.commit()
+
+        fresh, tasks = await self._scrape({"profile_url": "alice", "session_username": "operator"})
+        self.assertEqual((fresh.id, fresh.status, tasks), (first.id, "completed", 0))
+
+        job.completed_at = datetime.utcnow() - timedelta(seconds=settings.scrape_job_coalesce_fresh_seconds + 1)
+        self.db.commit()
+        expired, tasks = await self._scrape({"profile_url": "alice", "session_username": "operator"})
+        self.assertNotEqual(expired.id, first.id)
+        self.assertEqual(tasks, 1)
+
+    async def test_stale_in_flight_job_is_failed_and_replaced(self):
+        first, _ = await self._scrape({"profile_url": "alice", "session_username": "operator"})
+        job = self.db.get(ScrapingJob, first.id)
+        job.status = "running"
+        job.heartbeat_at = datetime.utcnow() - timedelta(days=1)
+        self.db.commit()
+
+        second, tasks = await self._scrape({"profile_url": "alice", "session_username": "operator"})
+        self.assertNotEqual(second.id, first.id)
+        self.assertEqual(tasks, 1)
+        self.db.refresh(job)
+        self.assertEqual(job.status, "failed")
+
+    def test_in_flight_index_rejects_a_second_pending_job(self):
+        fingerprint = scrape_request_fingerprint({"profile_url": "https://www.instagram.com/alice/"})
+        self.db.add(ScrapingJob(profile_url="u", status="completed", request_fingerprint=fingerprint))
+        self.db.add(ScrapingJob(profile_url="u", status="pending", request_fingerprint=fingerprint))
+        self.db.commit()
+
+        self.db.add(ScrapingJob(profile_url="u", status="running", request_fingerprint=fingerprint))
+        with self.assertRaises(IntegrityError):
+            self.db.commit()
+
+    async def test_coalescing_can_be_disabled(self):
+        with patch.object(settings, "scrape_job_coalesce_enabled", False):
+            first, _ = await self._scrape({"profile_url": "alice", "session_username": "operator"})
+            second, _ = await self._scrape({"profile_url": "alice", "session_username": "operator"})
+        self.assertNotEqual(second.id, first.id)
+
+
+if __name__ == "__main__":
+    unittest.main()
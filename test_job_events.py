@@ -0,0 +1,105 @@
+import asyncio
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import ANY, patch
+
+import orjson
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.api.routes as routes
+from app.job_events import emit_progress, job_events
+from app.models import Base, ScrapingJob
+from app.tracing import start_trace
+from config import settings
+
+
+class _ConnectedRequest:
+    async def is_disconnected(self):
+        return False
+
+
+def _parse(chunk: bytes):
+    if chunk.startswith(b":"):
+        return "comment", None
+    fields = dict(line.split(": ", 1) for line in chunk.decode("utf-8").strip().splitlines())
+    return fields["event"], orjson.loads(fields["data"])
+
+
+class JobEventsTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{Path(self._tmp.name) / 'events.db'}")
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        with self.Session() as db:
+            db.add(ScrapingJob(id="job", profile_url="u", status="pending", created_at=datetime(2026, 10, 19)))
+            db.commit()
+        self._patch = patch.object(routes, "SessionLocal", self.Session)
+        self._patch.start()
+
+    def tearDown(self):
+        self._patch.stop()
+        self.engine.dispose()
+        self._tmp.cleanup()
+
+    def _set_status(self, status):
+        with self.Session() as db:
+            db.get(ScrapingJob, "job").status = status
+            db.commit()
+        job_events.status_changed("job")
+
+    async def test_stream_pushes_transitions_and_progress_then_closes(self):
+        response = await routes.stream_scraping_events("job", _ConnectedRequest())
+        self.assertEqual(response.media_type, "text/event-stream")
+        stream = response.body_iterator
+
+        self.assertEqual(_parse(await stream.__anext__()), ("status", ANY))
+        self.assertEqual(job_events.subscriber_count("job"), 1)
+
+        self._set_status("running")
+        event, data = _parse(await stream.__anext__())
+        self.assertEqual((event, data["status"]), ("status", "running"))
+
+        trace = start_trace("job")
+        try:
+            emit_progress("post_completed", post_url="https://www.instagram.com/p/1/", posts_completed=1)
+        finally:
+            trace.close()
+        self.assertEqual(
+            _parse(await stream.__anext__()),
+            ("post_completed", {"post_url": "https://www.instagram.com/p/1/", "posts_completed": 1}),
+        )
+
+        self._set_status("completed")
+        event, data = _parse(await stream.__anext__())
+        self.assertEqual((event, data["status"]), ("status", "completed"))
+        with self.assertRaises(StopAsyncIteration):
+            await stream.__anext__()
+        self.assertEqual(job_events.subscriber_count("job"), 0)
+
+    async def test_status_from_another_replica_is_picked_up_by_polling(self):
+        with patch.object(settings, "scrape_job_events_poll_seconds", 0.5):
+            response = await routes.stream_scraping_events("job", _ConnectedRequest())
+        stream = response.body_iterator
+        await stream.__anext__()
+
+        with self.Session() as db:
+            db.get(ScrapingJob, "job").status = "failed"
+            db.commit()
+
+        event, data = _parse(await asyncio.wait_for(stream.__anext__(), timeout=5))
+        self.assertEqual((event, data["status"]), ("status", "failed"))
+
+    async def test_unknown_job_is_404_and_progress_without_trace_is_noop(self):
+        with self.assertRaises(HTTPException) as ctx:
+            await routes.stream_scraping_events("missing", _ConnectedRequest())
+        self.assertEqual(ctx.exception.status_code, 404)
+        emit_progress("story_collected", story_url="x")
+
+
+if __name__ == "__main__":
+    unittest.main()
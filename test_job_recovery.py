@@ -0,0 +1,129 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import app.database as database_module
+from app.job_recovery import (
+    STALE_PENDING_MESSAGE,
+    STALE_RUNNING_MESSAGE,
+    JobHeartbeat,
+    LeaderLock,
+    StaleJobSweeper,
+    is_job_stale,
+    sweep_stale_jobs,
+)
+from app.models import Base, ScrapingJob
+from config import settings
+
+
+class JobRecoveryTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{Path(self._tmp.name) / 'jobs.db'}")
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self._patch = patch.object(database_module, "engine", self.engine)
+        self._patch.start()
+        self.now = datetime(2026, 10, 19, 12, 0, 0)
+
+    def tearDown(self):
+        self._patch.stop()
+        self.engine.dispose()
+        self._tmp.cleanup()
+
+    def _add_jobs(self, *jobs):
+        with self.Session() as db:
+            db.add_all(jobs)
+            db.commit()
+
+    def _statuses(self):
+        with self.Session() as db:
+            return {job.id: (job.status, job.error_message) for job in db.query(ScrapingJob).all()}
+
+    def _seed(self):
+        lease = timedelta(seconds=settings.scrape_job_lease_seconds)
+        self._add_jobs(
+            ScrapingJob(id="alive", profile_url="u", status="running", created_at=self.now - timedelta(hours=3),
+                        started_at=self.now - timedelta(hours=3), heartbeat_at=self.now - lease / 2),
+            ScrapingJob(id="dead", profile_url="u", status="running", created_at=self.now,
+                        started_at=self.now, heartbeat_at=self.now - lease * 2),
+            ScrapingJob(id="legacy", profile_url="u", status="running", created_at=self.now - timedelta(hours=3),
+                        started_at=self.now - timedelta(hours=3)),
+            ScrapingJob(id="queued", profile_url="u", status="pending", created_at=self.now - timedelta(hours=3)),
+            ScrapingJob(id="fresh", profile_url="u", status="pending", created_at=self.now),
+            ScrapingJob(id="done", profile_url="u", status="completed", created_at=self.now - timedelta(hours=3)),
+        )
+
+    def test_sweep_uses_heartbeat_lease_in_a_single_statement(self):
+        self._seed()
+        statements = []
+        event.listen(self.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+        with self.Session() as db:
+            recovered = sweep_stale_jobs(db, now=self.now)
+
+        self.assertEqual(recovered, {"running": 2, "pending": 1, "total": 3})
+        self.assertEqual(len([sql for sql in statements if sql.lstrip().upper().startswith("UPDATE")]), 1)
+        statuses = self._statuses()
+        self.assertEqual(statuses["dead"], ("failed", STALE_RUNNING_MESSAGE))
+        self.assertEqual(statuses["legacy"], ("failed", STALE_RUNNING_MESSAGE))
+        self.assertEqual(statuses["queued"], ("failed", STALE_PENDING_MESSAGE))
+        for job_id in ("alive", "fresh", "done"):
+            self.assertNotEqual(statuses[job_id][0], "failed")
+
+        with self.Session() as db:
+            for job in db.query(ScrapingJob).all():
+                if job.status in {"running", "pending"}:
+                    self.assertFalse(is_job_stale(job, self.now))
+
+    def test_force_recover_running_fails_every_running_job(self):
+        self._seed()
+        with self.Session() as db:
+            recovered = sweep_stale_jobs(db, now=self.now, force_recover_running=True)
+        self.assertEqual(recovered["running"], 3)
+        self.assertEqual(self._statuses()["alive"][0], "failed")
+
+    def test_heartbeat_renews_only_registered_running_jobs(self):
+        old = self.now - timedelta(hours=1)
+        self._add_jobs(
+            ScrapingJob(id="mine", profile_url="u", status="running", heartbeat_at=old),
+            ScrapingJob(id="other", profile_url="u", status="running", heartbeat_at=old),
+            ScrapingJob(id="finished", profile_url="u", status="completed", heartbeat_at=old),
+        )
+        heartbeat = JobHeartbeat()
+        heartbeat.register("mine")
+        heartbeat.register("finished")
+
+        with self.Session() as db:
+            self.assertEqual(heartbeat.beat(db, now=self.now), 1)
+            beats = {job.id: job.heartbeat_at for job in db.query(ScrapingJob).all()}
+        self.assertEqual(beats, {"mine": self.now, "other": old, "finished": old})
+
+        heartbeat.unregister("mine")
+        heartbeat.unregister("finished")
+        with self.Session() as db:
+            self.assertEqual(heartbeat.beat(db), 0)
+
+    def test_sweeper_skips_sweep_when_not_leader(self):
+        self._add_jobs(
+            ScrapingJob(id="dead", profile_url="u", status="running", heartbeat_at=datetime.utcnow() - timedelta(days=1)),
+        )
+        leader = LeaderLock()
+        sweeper = StaleJobSweeper(JobHeartbeat(), leader, session_factory=self.Session)
+
+        with patch.object(leader, "acquire", return_value=False):
+            self.assertEqual(sweeper.run_once()["total"], 0)
+        self.assertEqual(self._statuses()["dead"][0], "running")
+
+        self.assertTrue(leader.acquire())
+        self.assertEqual(sweeper.run_once()["total"], 1)
+        self.assertEqual(self._statuses()["dead"][0], "failed")
+
+
+if __name__ == "__main__":
+    unittest.main()
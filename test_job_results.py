@@ -0,0 +1,106 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import orjson
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import app.api.routes as routes
+import app.job_results as job_results
+from app.models import Base, ScrapingJob, ScrapingJobResult
+from config import settings
+
+
+def _stories_result(viewers: int) -> dict:
+    return {
+        "summary": {"total_story_posts": 1, "total_story_viewers": viewers},
+        "story_posts": [
+            {
+                "story_url": "https://www.instagram.com/stories/alice/1/",
+                "viewer_users": [
+                    {"user_username": f"viewer{index}", "user_url": f"https://www.instagram.com/viewer{index}/"}
+                    for index in range(viewers)
+                ],
+            }
+        ],
+    }
+
+
+class JobResultsTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{Path(self._tmp.name) / 'results.db'}")
+        Base.metadata.create_all(self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+        self._tmp.cleanup()
+
+    def test_round_trip_and_compression(self):
+        result = _stories_result(2000)
+        for encoding in ("gzip", "identity"):
+            with self.subTest(encoding=encoding):
+                stored_encoding, payload, raw_size = job_results.encode_result(result, encoding)
+                self.assertEqual(stored_encoding, encoding)
+                self.assertEqual(job_results.decode_result(encoding, payload), result)
+                if encoding == "gzip":
+                    self.assertLess(len(payload) * 5, raw_size)
+
+    def test_zstd_falls_back_to_gzip_without_package(self):
+        with patch.object(settings, "scrape_job_result_compression", "zstd"), patch.object(
+            job_results, "_zstandard", return_value=None
+        ):
+            encoding, _, _ = job_results.encode_result({"a": 1})
+        self.assertEqual(encoding, "gzip")
+
+    def test_results_live_outside_the_job_row(self):
+        self.db.add(ScrapingJob(id="job", profile_url="u", status="completed", metadata_json={"flow": "generic"}))
+        job_results.save_job_result(self.db, "job", {"data": {"ok": True}})
+        self.db.commit()
+
+        job = self.db.get(ScrapingJob, "job")
+        self.assertNotIn("result", job.metadata_json)
+        self.assertEqual(job_results.load_job_result(self.db, job), {"data": {"ok": True}})
+
+        job_results.save_job_result(self.db, "job", {"data": {"ok": False}})
+        self.db.commit()
+        self.assertEqual(self.db.query(ScrapingJobResult).count(), 1)
+        self.assertEqual(job_results.load_job_result(self.db, job), {"data": {"ok": False}})
+
+    async def test_legacy_result_in_metadata_is_still_read(self):
+        self.db.add(
+            ScrapingJob(
+                id="old",
+                profile_url="https://example.com",
+                status="completed",
+                metadata_json={"request": {"url": "https://example.com", "prompt": "p"}, "result": {"data": [1]}},
+            )
+        )
+        self.db.commit()
+
+        response = await routes.get_generic_scrape_results("old", db=self.db)
+        self.assertEqual(orjson.loads(response.body)["data"], [1])
+
+    async def test_status_poll_does_not_read_metadata_or_result(self):
+        self.db.add(ScrapingJob(id="job", profile_url="u", status="completed", metadata_json={"flow": "generic"}))
+        job_results.save_job_result(self.db, "job", _stories_result(500))
+        self.db.commit()
+        self.db.expunge_all()
+
+        statements = []
+        event.listen(self.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        response = await routes.get_scraping_status("job", db=self.db)
+
+        self.assertEqual(response.status, "completed")
+        self.assertTrue(statements)
+        for statement in statements:
+            self.assertNotIn("metadata", statement)
+            self.assertNotIn("scraping_job_results", statement)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from app.lazy import LazySingleton
+
+
+class _Service:
+    created = 0
+
+    def __init__(self):
+        type(self).created += 1
+        self.value = 1
+
+    def describe(self):
+        return "real"
+
+
+class LazyImportsTest(unittest.TestCase):
+    def test_importing_main_does_not_load_scraping_dependencies(self):
+        env = {
+            **os.environ,
+            "DATABASE_URL": "sqlite://",
+            "BROWSERLESS_HOST": "http://localhost:3000",
+            "BROWSERLESS_TOKEN": "x",
+            "OPENAI_API_KEY": "sk-x",
+        }
+        code = (
+            "import sys, main\n"
+            "from app.scraper.browser_use_agent import browser_use_agent\n"
+            "heavy = [name for name in ('browser_use', 'openai', 'playwright') if name in sys.modules]\n"
+            "print(','.join(heavy) or '-', browser_use_agent.initialized)\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=Path(__file__).resolve().parent,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip().splitlines()[-1]
+        self.assertEqual(output, "- False")
+
+    def test_lazy_singleton_creates_once_and_supports_patch_object(self):
+        _Service.created = 0
+        proxy = LazySingleton(_Service, "service")
+        self.assertFalse(proxy.initialized)
+
+        with patch.object(proxy, "describe", lambda: "patched"):
+            self.assertEqual(proxy.describe(), "patched")
+        self.assertEqual(proxy.describe(), "real")
+
+        proxy.value = 5
+        self.assertEqual(proxy.initialize().value, 5)
+        self.assertEqual(_Service.created, 1)
+        proxy.reset()
+        self.assertEqual(proxy.value, 1)
+        self.assertEqual(_Service.created, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from unittest.mock import patch
+
+from browser_use import ChatOpenAI
+from browser_use.llm.messages import UserMessage
+
+from app.scraper.ai_extractor import AIExtractor
+from app.scraper.browser_use_agent import BrowserUseAgent
+from app.stubs.fake_llm import LLMReplayProfile, ReplayAsyncOpenAI, ReplayChatModel, replay_llm_stats
+from config import settings
+
+
+class LLMReplayBackendTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        replay_llm_stats.reset()
+
+    def test_backend_selected_via_settings(self):
+        agent = BrowserUseAgent.__new__(BrowserUseAgent)
+        agent.model = "gpt-4o-mini"
+        agent.api_key = "sk-test"
+
+        with patch.object(settings, "llm_backend", "openai"):
+            self.assertIsInstance(agent._create_llm(), ChatOpenAI)
+            self.assertNotIsInstance(AIExtractor().client, ReplayAsyncOpenAI)
+        with patch.object(settings, "llm_backend", "replay"):
+            self.assertIsInstance(agent._create_llm(), ReplayChatModel)
+            self.assertIsInstance(AIExtractor().client, ReplayAsyncOpenAI)
+
+    async def test_extractor_replays_recorded_response(self):
+        with patch.object(settings, "llm_backend", "replay"):
+            extractor = AIExtractor()
+        extractor.client = ReplayAsyncOpenAI(profile=LLMReplayProfile(prompt_tokens=100, completion_tokens=20))
+
+        result = await extractor.extract_user_info(html_content="<html></html>", username="viewer1")
+
+        self.assertEqual(result["follower_count"], 100)
+        self.assertEqual(replay_llm_stats.extractor_calls, 1)
+        self.assertEqual(replay_llm_stats.prompt_tokens, 100)
+        self.assertEqual(replay_llm_stats.completion_tokens, 20)
+
+    async def test_chat_model_replays_agent_done_step(self):
+        llm = ReplayChatModel(model="replay-test")
+
+        result = await llm.ainvoke(
+            [UserMessage(content="Sua tarefa e extrair os links dos perfis que curtiram um post.")]
+        )
+
+        self.assertIn("likes_accessible", result.completion)
+        self.assertGreater(result.usage.total_tokens, 0)
+        self.assertEqual(replay_llm_stats.agent_calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
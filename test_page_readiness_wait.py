@@ -0,0 +1,67 @@
+import asyncio
+import unittest
+
+from app.scraper.browser_use_agent import BrowserUseAgent
+
+
+class _FakePage:
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.calls = []
+
+    async def evaluate(self, script, *args):
+        self.calls.append((script, args))
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class PageReadinessWaitTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.agent = BrowserUseAgent.__new__(BrowserUseAgent)
+
+    async def test_returns_ready_when_page_signals_condition(self):
+        page = _FakePage(result='{"ready": true, "trigger": "mutation", "elapsed_ms": 42}')
+
+        ready = await self.agent._wait_for_page_condition(
+            page,
+            "(...args) => () => true",
+            "abc",
+            timeout_seconds=10.0,
+        )
+
+        self.assertTrue(ready)
+        script, args = page.calls[0]
+        self.assertIn("MutationObserver", script)
+        self.assertIn("(...args) => () => true", script)
+        self.assertEqual(args, (10000, ["abc"]))
+
+    async def test_returns_false_on_timeout_payload(self):
+        page = _FakePage(result={"ready": False, "trigger": "timeout", "elapsed_ms": 800})
+
+        ready = await self.agent._wait_for_page_condition(
+            page,
+            "(...args) => () => false",
+            timeout_seconds=0.8,
+        )
+
+        self.assertFalse(ready)
+
+    async def test_evaluate_error_falls_back_to_bounded_sleep(self):
+        page = _FakePage(error=RuntimeError("Execution context was destroyed"))
+        loop = asyncio.get_event_loop()
+        started_at = loop.time()
+
+        ready = await self.agent._wait_for_page_condition(
+            page,
+            "(...args) => () => true",
+            timeout_seconds=10.0,
+        )
+
+        self.assertFalse(ready)
+        self.assertLess(loop.time() - started_at, 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import app.api.routes as routes
+from app.models import Base, Profile
+from app.profile_cache import profile_cache
+from app.scraper.instagram_scraper import InstagramScraper
+
+
+class ProfileCacheTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{Path(self._tmp.name) / 'profiles.db'}")
+        Base.metadata.create_all(self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        profile_cache.clear()
+        self.db.add(
+            Profile(
+                id="p",
+                instagram_username="alice",
+                instagram_url="https://www.instagram.com/alice/",
+                follower_count=10,
+                last_scraped_at=datetime.utcnow(),
+            )
+        )
+        self.db.commit()
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute", lambda *args: self.statements.append(args[2]))
+
+    def tearDown(self):
+        profile_cache.clear()
+        self.db.close()
+        self.engine.dispose()
+        self._tmp.cleanup()
+
+    async def test_lookups_are_served_from_memory_by_normalized_username(self):
+        first = await routes.get_profile("alice", db=self.db)
+        self.assertEqual(len(self.statements), 1)
+        self.assertIn("lower(profiles.instagram_username)", self.statements[0])
+
+        second = await routes.get_profile("@ALICE", db=self.db)
+        self.assertIs(second, first)
+
+        scraper = InstagramScraper.__new__(InstagramScraper)
+        info = await InstagramScraper.scrape_profile_info(
+            scraper, "https://www.instagram.com/Alice/", db=self.db, cache_ttl_days=2
+        )
+        self.assertEqual((info["profile_id"], info["follower_count"]), ("p", 10))
+        self.assertEqual(len(self.statements), 1)
+
+    async def test_save_profile_invalidates_entry(self):
+        await routes.get_profile("alice", db=self.db)
+
+        scraper = InstagramScraper.__new__(InstagramScraper)
+        await InstagramScraper._save_profile(
+            scraper, self.db, "https://www.instagram.com/alice/", {"username": "alice", "follower_count": 99}
+        )
+
+        refreshed = await routes.get_profile("alice", db=self.db)
+        self.assertEqual(refreshed.follower_count, 99)
+
+    def test_missing_profile_is_not_cached(self):
+        self.assertIsNone(profile_cache.get(self.db, "bob"))
+        self.db.add(Profile(id="b", instagram_username="bob", instagram_url="https://www.instagram.com/bob/"))
+        self.db.commit()
+        self.assertEqual(profile_cache.get(self.db, "bob").id, "b")
+
+    async def test_null_booleans_do_not_break_lookup(self):
+        self.db.add(
+            Profile(
+                id="n",
+                instagram_username="nulls",
+                instagram_url="https://www.instagram.com/nulls/",
+                last_scraped_at=datetime.utcnow(),
+            )
+        )
+        self.db.commit()
+        # No INSERT o default do modelo cobre o None; o NULL chega pelo UPDATE de _save_profile.
+        profile = self.db.get(Profile, "n")
+        profile.is_private, profile.verified = None, None
+        self.db.commit()
+
+        snapshot = profile_cache.get(self.db, "nulls")
+        self.assertEqual((snapshot.is_private, snapshot.verified), (False, False))
+
+        scraper = InstagramScraper.__new__(InstagramScraper)
+        info = await InstagramScraper.scrape_profile_info(
+            scraper, "https://www.instagram.com/nulls/", db=self.db, cache_ttl_days=2
+        )
+        self.assertEqual((info["profile_id"], info["is_private"], info["verified"]), ("n", False, False))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import app.api.routes as routes
+from app.models import Base, Interaction, InteractionType, Post, Profile
+from app.ttl_cache import TTLCache
+
+
+class ProfileListingsTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{Path(self._tmp.name) / 'listings.db'}")
+        Base.metadata.create_all(self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.base = datetime(2026, 10, 1)
+        routes._listing_totals.clear()
+
+        self.db.add(Profile(id="p", instagram_username="alice", instagram_url="https://www.instagram.com/alice/"))
+        for index in range(9):
+            # Pares com o mesmo created_at exercitam o desempate por id.
+            self._add_post(f"post-{index}", self.base + timedelta(minutes=index // 2))
+        self.db.add(
+            Interaction(
+                id="i1",
+                post_id="post-0",
+                profile_id="p",
+                user_username="bob",
+                user_url="https://www.instagram.com/bob/",
+                interaction_type=InteractionType.LIKE,
+                created_at=self.base,
+            )
+        )
+        self.db.commit()
+
+    def tearDown(self):
+        routes._listing_totals.clear()
+        self.db.close()
+        self.engine.dispose()
+        self._tmp.cleanup()
+
+    def _add_post(self, post_id, created_at):
+        self.db.add(
+            Post(id=post_id, profile_id="p", post_url=f"https://www.instagram.com/p/{post_id}/", created_at=created_at)
+        )
+
+    async def test_cursor_pages_are_stable_under_inserts(self):
+        first = await routes.get_profile_posts("alice", limit=4, db=self.db)
+        self.assertEqual(first["total"], 9)
+        self.assertEqual([post.id for post in first["posts"]], ["post-0", "post-1", "post-2", "post-3"])
+
+        # Insert concorrente antes do cursor nao desloca as proximas paginas.
+        self._add_post("post-early", self.base - timedelta(days=1))
+        self.db.commit()
+
+        seen = [post.id for post in first["posts"]]
+        cursor = first["next_cursor"]
+        while cursor:
+            page = await routes.get_profile_posts("alice", limit=4, cursor=cursor, db=self.db)
+            seen.extend(post.id for post in page["posts"])
+            cursor = page["next_cursor"]
+        self.assertEqual(seen, [f"post-{index}" for index in range(9)])
+
+    async def test_total_is_counted_once_and_cached(self):
+        statements = []
+        event.listen(self.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+        await routes.get_profile_interactions("alice", db=self.db)
+        response = await routes.get_profile_interactions("alice", db=self.db)
+
+        self.assertEqual(response["total"], 1)
+        self.assertIsNone(response["next_cursor"])
+        self.assertEqual(len([sql for sql in statements if "count(" in sql.lower()]), 1)
+
+    async def test_legacy_skip_still_works(self):
+        response = await routes.get_profile_posts("alice", skip=7, limit=5, db=self.db)
+        self.assertEqual([post.id for post in response["posts"]], ["post-7", "post-8"])
+        self.assertIsNone(response["next_cursor"])
+
+    async def test_limit_is_capped_and_reported(self):
+        with patch.object(routes, "PROFILE_POSTS_PAGE_MAX", 3):
+            response = await routes.get_profile_posts("alice", skip=1, limit=5000, db=self.db)
+        self.assertEqual(response["limit"], 3)
+        self.assertEqual([post.id for post in response["posts"]], ["post-1", "post-2", "post-3"])
+        self.assertIsNotNone(response["next_cursor"])
+        interactions = await routes.get_profile_interactions("alice", limit=5000, db=self.db)
+        self.assertEqual(interactions["limit"], routes.PROFILE_INTERACTIONS_PAGE_MAX)
+
+    async def test_invalid_cursor_is_rejected(self):
+        with self.assertRaises(HTTPException) as ctx:
+            await routes.get_profile_posts("alice", cursor="%%%", db=self.db)
+        self.assertEqual(ctx.exception.status_code, 400)
+
+    def test_ttl_cache_expires_and_evicts(self):
+        now = [0.0]
+        cache = TTLCache(maxsize=2, ttl_seconds=10, clock=lambda: now[0])
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual((cache.get("a"), cache.get("b"), cache.get("c")), (1, None, 3))
+
+        now[0] = 11
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get_or_set("a", lambda: 5), 5)
+        cache.invalidate("a")
+        self.assertIsNone(cache.get("a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
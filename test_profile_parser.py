@@ -0,0 +1,69 @@
+import json
+import unittest
+
+from app.scraper.instagram_scraper import InstagramScraper
+from app.scraper.profile_parser import parse_profile_payload
+from benchmarks.profile_parser_bench import USERNAME, build_pages
+
+
+def _user(username, followers, **extra):
+    return {
+        "username": username,
+        "full_name": f"{username} nome",
+        "biography": "bio \"com aspas\"\nlinha 2",
+        "is_private": False,
+        "is_verified": True,
+        "edge_followed_by": {"count": followers},
+        "edge_follow": {"count": 10},
+        "edge_owner_to_timeline_media": {"count": 5},
+        **extra,
+    }
+
+
+class ProfileParserTest(unittest.TestCase):
+    def setUp(self):
+        self.scraper = InstagramScraper.__new__(InstagramScraper)
+
+    def test_prefers_hinted_user_over_viewer_payload(self):
+        viewer = json.dumps({"viewer": _user("viewer.account", 3)})
+        profile = json.dumps({"data": {"user": _user("target", 900)}})
+        html = (
+            f'<script type="application/json" data-sjs>{viewer}</script>'
+            "<script>var x = 1;</script>"
+            f'<script type="application/json">{profile}</script>'
+        )
+
+        info = parse_profile_payload(html, username_hint="@Target")
+        self.assertEqual(info["username"], "target")
+        self.assertEqual(info["follower_count"], 900)
+        self.assertEqual(info["bio"], 'bio "com aspas"\nlinha 2')
+        self.assertTrue(info["verified"])
+        self.assertEqual(parse_profile_payload(html)["username"], "viewer.account")
+
+    def test_shared_data_and_api_style_counts(self):
+        shared = json.dumps(
+            {"entry_data": {"ProfilePage": [{"graphql": {"user": {"username": "legacy", "follower_count": "77", "media_count": 4}}}]}}
+        )
+        info = parse_profile_payload(f"<script>window._sharedData = {shared};</script>", username_hint="legacy")
+        self.assertEqual((info["follower_count"], info["post_count"], info["following_count"]), (77, 4, None))
+
+    def test_regex_fallback_when_payload_is_not_decodable(self):
+        html = (
+            '<script type="application/json">{"user":{"username":"broken","biography":"b",'
+            '"edge_followed_by":{"count":12}</script>'
+        )
+        self.assertEqual(parse_profile_payload(html), {})
+        info = self.scraper._extract_profile_info_from_html(html, username_hint="broken")
+        self.assertEqual(info["username"], "broken")
+        self.assertEqual(info["follower_count"], 12)
+
+    def test_large_fixture_matches_regex_cascade(self):
+        pages = build_pages(padding_kb=64, seed=7)
+        info = self.scraper._extract_profile_info_from_html(pages["fixture+64kb"], username_hint=USERNAME)
+        self.assertEqual(info["username"], USERNAME)
+        self.assertEqual((info["follower_count"], info["following_count"], info["post_count"]), (1234, 321, 56))
+        self.assertEqual(info["full_name"], "Pepoton Kids ✨")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from fastapi import HTTPException
+
+import app.profiling as profiling_module
+from app.api.auth import require_admin_api_key
+from app.profiling import ProfilingManager, artifact_path
+from config import settings
+
+
+def _busy_work() -> int:
+    return sum(index * index for index in range(200000))
+
+
+class ProfilingHooksTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self._tmp.name) / "profiling"
+        self._patch = patch.object(profiling_module, "_artifacts_dir", lambda: self.output_dir)
+        self._patch.start()
+
+    def tearDown(self):
+        self._patch.stop()
+        self._tmp.cleanup()
+
+    async def test_armed_job_profiles_until_job_finishes(self):
+        manager = ProfilingManager()
+        self.assertTrue(manager.arm_job("job-1", mode="cprofile")["armed"])
+
+        manager.job_started("job-1")
+        self.assertEqual(manager.status()["active"]["job_id"], "job-1")
+        _busy_work()
+        manager.job_finished("job-1")
+
+        self.assertIsNone(manager.status()["active"])
+        names = sorted(path.name for path in self.output_dir.iterdir())
+        self.assertTrue(any(name.endswith("_job-job-1_cprofile.prof") for name in names))
+        report = next(path for path in self.output_dir.iterdir() if path.suffix == ".txt").read_text()
+        self.assertIn("_busy_work", report)
+
+    async def test_window_sampler_writes_folded_stacks_and_rejects_overlap(self):
+        manager = ProfilingManager()
+        with patch.object(settings, "profiling_sampler_interval_ms", 1):
+            manager.start_window(0.2, mode="sampler", label="hot path")
+        with self.assertRaises(RuntimeError):
+            manager.start_window(1, mode="cprofile")
+
+        deadline = asyncio.get_running_loop().time() + 0.15
+        while asyncio.get_running_loop().time() < deadline:
+            _busy_work()
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.2)
+
+        self.assertIsNone(manager.status()["active"])
+        folded = next(self.output_dir.glob("*_hot-path_sampler.folded")).read_text()
+        self.assertIn("_busy_work", folded)
+        self.assertEqual(len(manager.list_artifacts()), 2)
+
+    async def test_invalid_requests_and_artifact_traversal(self):
+        manager = ProfilingManager()
+        with self.assertRaises(ValueError):
+            manager.start_window(5, mode="perf")
+        with self.assertRaises(ValueError):
+            manager.start_window(0)
+
+        self.output_dir.mkdir(parents=True)
+        (self.output_dir / "ok.txt").write_text("x")
+        self.assertIsNotNone(artifact_path("ok.txt")[0])
+        self.assertIsNone(artifact_path("../profiling/../secret.txt")[0])
+
+    def test_admin_key_required(self):
+        with patch.object(settings, "admin_api_keys", None):
+            with self.assertRaises(HTTPException) as ctx:
+                require_admin_api_key("anything")
+            self.assertEqual(ctx.exception.status_code, 403)
+        with patch.object(settings, "admin_api_keys", "admin-1,admin-2"):
+            self.assertTrue(require_admin_api_key("admin-2"))
+            with self.assertRaises(HTTPException):
+                require_admin_api_key("regular-key")
+
+
+if __name__ == "__main__":
+    unittest.main()
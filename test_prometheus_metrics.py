@@ -0,0 +1,107 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool, QueuePool
+
+from app.metrics import (
+    BROWSERLESS_REQUEST_DURATION_SECONDS,
+    BROWSERLESS_REQUEST_ERRORS_TOTAL,
+    OPENAI_RATE_LIMITED_TOTAL,
+    OPENAI_TOKENS_TOTAL,
+    MetricsRegistry,
+    PoolUsageTracker,
+    registry,
+)
+from app.scraper.ai_extractor import AIExtractor
+from app.scraper.browserless_client import BrowserlessClient
+from app.stubs.browserless_server import BrowserlessStub, BrowserlessStubConfig
+from app.stubs.fake_llm import LLMReplayProfile, ReplayAsyncOpenAI
+from config import settings
+
+
+class PrometheusMetricsTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        registry.reset()
+
+    def test_exposition_format_for_counter_and_histogram(self):
+        local = MetricsRegistry()
+        jobs = local.counter("jobs_total", "Jobs.", ("flow", "status"))
+        latency = local.histogram("latency_seconds", "Latencia.", ("endpoint",), buckets=(0.1, 1.0))
+
+        jobs.inc(flow="default", status="completed")
+        jobs.inc(2, flow="default", status="completed")
+        latency.observe(0.05, endpoint="/content")
+        latency.observe(0.5, endpoint="/content")
+        latency.observe(5, endpoint="/content")
+
+        text = local.render()
+        self.assertIn("# TYPE jobs_total counter", text)
+        self.assertIn('jobs_total{flow="default",status="completed"} 3', text)
+        self.assertIn('latency_seconds_bucket{endpoint="/content",le="0.1"} 1', text)
+        self.assertIn('latency_seconds_bucket{endpoint="/content",le="1"} 2', text)
+        self.assertIn('latency_seconds_bucket{endpoint="/content",le="+Inf"} 3', text)
+        self.assertIn('latency_seconds_count{endpoint="/content"} 3', text)
+        with self.assertRaises(ValueError):
+            jobs.inc(flow="default")
+
+    async def test_browserless_latency_and_error_codes_recorded(self):
+        stub = BrowserlessStub(BrowserlessStubConfig(error_rate=1.0, error_status=502, error_endpoints={"/content"}))
+        client = BrowserlessClient()
+        client.host = "http://stub"
+        client.max_retries = 1
+        client.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=stub.app))
+
+        await client.screenshot("https://www.instagram.com/p/ABC/")
+        with self.assertRaises(RuntimeError):
+            await client.get_html("https://www.instagram.com/pepoton.kids/")
+        await client.close()
+
+        self.assertEqual(BROWSERLESS_REQUEST_DURATION_SECONDS.count(endpoint="/screenshot"), 1)
+        self.assertEqual(BROWSERLESS_REQUEST_DURATION_SECONDS.count(endpoint="/content"), 1)
+        self.assertEqual(BROWSERLESS_REQUEST_ERRORS_TOTAL.value(endpoint="/content", code="502"), 1)
+        self.assertIn("db_pool_connections", registry.render())
+
+    async def test_extractor_records_tokens_and_rate_limits(self):
+        with patch.object(settings, "llm_backend", "replay"):
+            extractor = AIExtractor()
+        extractor.client = ReplayAsyncOpenAI(profile=LLMReplayProfile(prompt_tokens=10, completion_tokens=4))
+
+        await extractor.extract_user_info(html_content="<html></html>", username="viewer1")
+        self.assertEqual(OPENAI_TOKENS_TOTAL.value(client="extractor", kind="prompt"), 10)
+        self.assertEqual(OPENAI_TOKENS_TOTAL.value(client="extractor", kind="completion"), 4)
+
+        async def _rate_limited(**kwargs):
+            raise RuntimeError("Error code: 429 - rate_limit_exceeded")
+
+        extractor.client.chat.completions.create = _rate_limited
+        with self.assertRaises(RuntimeError):
+            await extractor._chat_completion_with_fallback(model="gpt-4o-mini", messages=[], temperature=1)
+        self.assertEqual(OPENAI_RATE_LIMITED_TOTAL.value(client="extractor"), 1)
+
+    def test_pool_usage_is_tracked_for_any_pool_class(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for poolclass in (NullPool, QueuePool):
+                with self.subTest(poolclass=poolclass.__name__):
+                    tracker = PoolUsageTracker()
+                    engine = create_engine(f"sqlite:///{Path(tmp) / 'pool.db'}", poolclass=poolclass)
+                    tracker.attach(engine)
+
+                    first, second = engine.connect(), engine.connect()
+                    first.execute(text("select 1"))
+                    self.assertEqual(tracker.snapshot(), {"open": 2, "checked_out": 2, "checked_in": 0})
+
+                    first.close()
+                    idle = 0 if poolclass is NullPool else 1
+                    self.assertEqual(tracker.snapshot(), {"open": 1 + idle, "checked_out": 1, "checked_in": idle})
+
+                    second.close()
+                    engine.dispose()
+                    self.assertEqual(tracker.snapshot(), {"open": 0, "checked_out": 0, "checked_in": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
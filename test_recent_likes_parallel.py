@@ -0,0 +1,183 @@
+import asyncio
+import gc
+import unittest
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import app.scraper.instagram_scraper as instagram_scraper_module
+from app.scraper.browser_use_agent import BrowserUseAgent
+from app.scraper.instagram_scraper import InstagramScraper
+
+
+class RecentLikesParallelTest(unittest.IsolatedAsyncioTestCase):
+    def _build_scraper(self, posts):
+        scraper = InstagramScraper.__new__(InstagramScraper)
+        for name in (
+            "_require_session_username",
+            "_extract_username_from_url",
+            "_is_recent_post",
+            "_parse_absolute_date",
+            "_relative_time_to_hours",
+        ):
+            setattr(scraper, name, getattr(InstagramScraper, name).__get__(scraper, InstagramScraper))
+        scraper._scrape_posts = AsyncMock(return_value=posts)
+        scraper._scrape_post_interactions = AsyncMock(return_value=[])
+        scraper._save_profile = AsyncMock(return_value=SimpleNamespace(id="profile-1"))
+        scraper._save_posts_and_interactions = AsyncMock()
+        return scraper
+
+    async def test_posts_run_in_parallel_with_account_cap_and_keep_order(self):
+        now_iso = datetime.utcnow().isoformat()
+        posts = [
+            {"post_url": f"https://www.instagram.com/p/POST{index}/", "posted_at": now_iso}
+            for index in range(5)
+        ]
+        scraper = self._build_scraper(posts)
+        storage_state = {
+            "cookies": [{"name": "sessionid", "value": "x"}],
+            "_browserless_reconnect": "wss://browserless/reconnect",
+        }
+
+        running = 0
+        max_running = 0
+        seen_states = []
+        delays = [0.05, 0.01, 0.04, 0.0, 0.02]
+
+        async def fake_like_users(post_url, storage_state, max_users):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            seen_states.append(storage_state)
+            index = int(post_url.rstrip("/")[-1])
+            await asyncio.sleep(delays[index])
+            running -= 1
+            return {
+                "likes_accessible": True,
+                "like_users": [f"https://www.instagram.com/user{index}/"],
+                "error": None,
+            }
+
+        agent = instagram_scraper_module.browser_use_agent
+        with patch.object(
+            instagram_scraper_module,
+            "_account_tab_semaphores",
+            {},
+        ), patch.object(
+            instagram_scraper_module.settings,
+            "recent_likes_parallel_tabs",
+            4,
+        ), patch.object(
+            instagram_scraper_module.settings,
+            "instagram_account_max_parallel_tabs",
+            2,
+        ), patch.object(
+            agent,
+            "ensure_instagram_session",
+            AsyncMock(return_value=storage_state),
+        ), patch.object(
+            agent,
+            "scrape_post_like_users",
+            AsyncMock(side_effect=fake_like_users),
+        ):
+            result = await InstagramScraper.scrape_recent_posts_like_users(
+                scraper,
+                profile_url="https://www.instagram.com/pepoton.kids/",
+                max_posts=5,
+                db=object(),
+                session_username="pepoton.kids",
+            )
+
+        self.assertEqual(max_running, 2)
+        self.assertEqual(
+            [post["post_url"] for post in result["posts"]],
+            [post["post_url"] for post in posts],
+        )
+        self.assertEqual(result["summary"]["total_like_users"], 5)
+        self.assertEqual(
+            sum(1 for state in seen_states if "_browserless_reconnect" in state),
+            sum(1 for state in seen_states if state is storage_state),
+        )
+        self.assertTrue(any("_browserless_reconnect" not in state for state in seen_states))
+        saved_interactions = scraper._save_posts_and_interactions.await_args.args[3]
+        self.assertEqual(
+            [item["_post_url"] for item in saved_interactions],
+            [post["post_url"] for post in posts],
+        )
+
+    async def test_failing_post_cancels_sibling_tabs(self):
+        now_iso = datetime.utcnow().isoformat()
+        posts = [
+            {"post_url": f"https://www.instagram.com/p/POST{index}/", "posted_at": now_iso}
+            for index in range(4)
+        ]
+        scraper = self._build_scraper(posts)
+        started = []
+        finished = []
+
+        async def fake_like_users(post_url, storage_state, max_users):
+            started.append(post_url)
+            if post_url.endswith("POST0/"):
+                await asyncio.sleep(0.01)
+                raise RuntimeError("browserless caiu")
+            await asyncio.sleep(0.5)
+            finished.append(post_url)
+            return {"likes_accessible": True, "like_users": [], "error": None}
+
+        agent = instagram_scraper_module.browser_use_agent
+        semaphores = type(instagram_scraper_module._account_tab_semaphores)()
+        with patch.object(instagram_scraper_module, "_account_tab_semaphores", semaphores), patch.object(
+            instagram_scraper_module.settings, "recent_likes_parallel_tabs", 4
+        ), patch.object(instagram_scraper_module.settings, "instagram_account_max_parallel_tabs", 4), patch.object(
+            agent, "ensure_instagram_session", AsyncMock(return_value={"cookies": []})
+        ), patch.object(
+            agent, "scrape_post_like_users", AsyncMock(side_effect=fake_like_users)
+        ):
+            semaphore = instagram_scraper_module._get_account_tab_semaphore("pepoton.kids")
+            with self.assertRaisesRegex(RuntimeError, "browserless caiu"):
+                await InstagramScraper.scrape_recent_posts_like_users(
+                    scraper,
+                    profile_url="https://www.instagram.com/pepoton.kids/",
+                    max_posts=4,
+                    db=object(),
+                    session_username="pepoton.kids",
+                )
+            # Todas as vagas da conta voltaram antes do erro subir.
+            self.assertEqual(semaphore._value, 4)
+
+        await asyncio.sleep(0.6)
+        self.assertEqual(len(started), 4)
+        self.assertEqual(finished, [])
+
+    async def test_account_semaphores_are_shared_while_held_and_then_evicted(self):
+        semaphores = instagram_scraper_module._account_tab_semaphores
+        with patch.object(instagram_scraper_module, "_account_tab_semaphores", type(semaphores)()):
+            registry = instagram_scraper_module._account_tab_semaphores
+            held = instagram_scraper_module._get_account_tab_semaphore("acc1")
+            async with held:
+                self.assertIs(instagram_scraper_module._get_account_tab_semaphore("acc1"), held)
+            for name in ("acc2", "acc3"):
+                instagram_scraper_module._get_account_tab_semaphore(name)
+            gc.collect()
+            self.assertEqual(set(registry.keys()), {"acc1"})
+
+            del held
+            gc.collect()
+            self.assertEqual(len(registry), 0)
+
+    def test_isolated_storage_state_drops_persistent_session(self):
+        agent = BrowserUseAgent.__new__(BrowserUseAgent)
+        storage_state = {
+            "cookies": [{"name": "sessionid", "value": "x"}],
+            "_browserless_reconnect": "wss://browserless/reconnect",
+            "_browserless_session": {"connect": "wss://browserless/session"},
+        }
+
+        isolated = agent.get_isolated_storage_state(storage_state)
+
+        self.assertEqual(isolated, {"cookies": storage_state["cookies"]})
+        self.assertIn("_browserless_reconnect", storage_state)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, event, inspect, text
+
+import app.database as database_module
+from app.models import Base
+from config import settings
+
+
+class SchemaMigrationsTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{Path(self._tmp.name) / 'schema.db'}")
+        self._patch = patch.object(database_module, "engine", self.engine)
+        self._patch.start()
+
+    def tearDown(self):
+        self._patch.stop()
+        self.engine.dispose()
+        self._tmp.cleanup()
+
+    def test_head_constant_matches_migration_scripts(self):
+        scripts = ScriptDirectory.from_config(database_module._alembic_config())
+        self.assertEqual(scripts.get_current_head(), database_module.SCHEMA_HEAD_REVISION)
+
+    def test_fresh_database_matches_models_and_boot_check_is_one_query(self):
+        database_module.init_db()
+        self.assertEqual(database_module.get_schema_revision(), database_module.SCHEMA_HEAD_REVISION)
+        with self.engine.connect() as conn:
+            self.assertEqual(compare_metadata(MigrationContext.configure(conn), Base.metadata), [])
+
+        statements = []
+        event.listen(self.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        database_module.init_db()
+        self.assertEqual(statements, ["SELECT version_num FROM alembic_version"])
+
+    def test_legacy_database_is_upgraded_once(self):
+        with self.engine.begin() as conn:
+            conn.execute(
+                text(
+                    "CREATE TABLE profiles (id VARCHAR(36) PRIMARY KEY, instagram_username VARCHAR(255) NOT NULL, "
+                    "instagram_url VARCHAR(500) NOT NULL)"
+                )
+            )
+            conn.execute(
+                text(
+                    "CREATE TABLE interactions (id VARCHAR(36) PRIMARY KEY, post_id VARCHAR(36) NOT NULL, "
+                    "profile_id VARCHAR(36) NOT NULL, user_username VARCHAR(255) NOT NULL, "
+                    "user_url VARCHAR(500) NOT NULL, interaction_type VARCHAR(7) NOT NULL, created_at DATETIME)"
+                )
+            )
+            conn.execute(text("INSERT INTO profiles VALUES ('p1', 'legacy', 'https://www.instagram.com/legacy/')"))
+
+        database_module.init_db()
+
+        inspector = inspect(self.engine)
+        self.assertIn("full_name", {column["name"] for column in inspector.get_columns("profiles")})
+        interaction_columns = {column["name"] for column in inspector.get_columns("interactions")}
+        self.assertTrue({"post_url", "comment_posted_at"} <= interaction_columns)
+        self.assertIn("scraping_jobs", inspector.get_table_names())
+        with self.engine.connect() as conn:
+            self.assertEqual(conn.execute(text("SELECT instagram_username FROM profiles")).scalar(), "legacy")
+
+    def test_outdated_schema_fails_when_auto_migrate_disabled(self):
+        with patch.object(settings, "database_auto_migrate", False):
+            with self.assertRaises(RuntimeError):
+                database_module.init_db()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+import asyncio
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+from fastapi import BackgroundTasks, HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+import app.api.routes as routes
+from app.job_recovery import is_job_stale, job_heartbeat
+from app.models import Base, ScrapingJob
+from app.schemas import ScrapingBatchCreate, ScrapingJobCreate
+from config import settings
+
+
+class ScrapeBatchTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{Path(self._tmp.name) / 'batch.db'}")
+        Base.metadata.create_all(self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.session_checks = 0
+
+        def require_session(db, username, flow):
+            self.session_checks += 1
+            return username or "operator", None
+
+        self._patch = patch.object(routes, "_require_active_scrape_session", require_session)
+        self._patch.start()
+
+    def tearDown(self):
+        self._patch.stop()
+        for job_id in job_heartbeat.job_ids:
+            job_heartbeat.unregister(job_id)
+        self.db.close()
+        self.engine.dispose()
+        self._tmp.cleanup()
+
+    async def _batch(self, profile_urls, **options):
+        tasks = BackgroundTasks()
+        request = ScrapingBatchCreate(profile_urls=profile_urls, session_username="operator", **options)
+        return await routes.start_scraping_batch(request, tasks, self.db), tasks
+
+    async def test_batch_inserts_jobs_once_and_coalesces_duplicates(self):
+        single = await routes.start_scraping(
+            ScrapingJobCreate(profile_url="carol", session_username="operator"), BackgroundTasks(), self.db
+        )
+        self.session_checks = 0
+        inserts = []
+        event.listen(
+            self.engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: inserts.append(statement)
+            if statement.startswith("INSERT INTO scraping_jobs")
+            else None,
+        )
+
+        response, tasks = await self._batch(["alice", "https://instagram.com/alice", "bob", "carol", " "])
+
+        self.assertEqual(self.session_checks, 1)
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual((response.total, response.created, response.coalesced), (3, 2, 1))
+        self.assertEqual(
+            [job.profile_url for job in response.jobs],
+            [f"https://www.instagram.com/{name}/" for name in ("alice", "bob", "carol")],
+        )
+        self.assertEqual(response.jobs[2].id, single.id)
+        self.assertTrue(response.jobs[2].coalesced)
+        self.assertEqual(len(tasks.tasks), 1)
+        self.assertEqual(job_heartbeat.job_ids, {job.id for job in response.jobs[:2]})
+
+    async def test_progress_is_aggregated_by_status(self):
+        response, _ = await self._batch(["alice", "bob", "carol"])
+        first, second, _ = [self.db.get(ScrapingJob, job.id) for job in response.jobs]
+        first.status, first.posts_scraped = "completed", 4
+        second.status = "running"
+        self.db.commit()
+
+        progress = await routes.get_scraping_batch_status(response.batch_id, db=self.db)
+        self.assertEqual(
+            (progress.total, progress.pending, progress.running, progress.completed, progress.finished),
+            (3, 1, 1, 1, False),
+        )
+        self.assertEqual(progress.posts_scraped, 4)
+        self.assertIsNone(progress.jobs)
+
+        detailed = await routes.get_scraping_batch_status(response.batch_id, include_jobs=True, db=self.db)
+        self.assertEqual([job.id for job in detailed.jobs], [job.id for job in response.jobs])
+
+        with self.assertRaises(HTTPException) as ctx:
+            await routes.get_scraping_batch_status("missing", db=self.db)
+        self.assertEqual(ctx.exception.status_code, 404)
+
+    async def test_queued_jobs_keep_a_lease_instead_of_pending_timeout(self):
+        response, _ = await self._batch(["alice"])
+        job = self.db.get(ScrapingJob, response.jobs[0].id)
+        now = datetime.utcnow()
+        job.created_at = now - timedelta(minutes=settings.scrape_job_max_pending_minutes + 5)
+        self.db.commit()
+
+        job_heartbeat.beat(self.db, now)
+        self.db.refresh(job)
+        self.assertFalse(is_job_stale(job, now))
+        self.assertTrue(is_job_stale(job, now + timedelta(seconds=settings.scrape_job_lease_seconds + 1)))
+
+    async def test_repeated_insert_conflicts_retry_then_answer_409(self):
+        insert_batch = routes._insert_scraping_batch
+        calls = []
+
+        def conflicting(conflicts):
+            def _insert(db, *args):
+                calls.append(args[0])
+                if len(calls) <= conflicts:
+                    raise IntegrityError("INSERT INTO scraping_jobs", {}, Exception("uq_scraping_jobs_in_flight"))
+                return insert_batch(db, *args)
+
+            return _insert
+
+        with patch.object(routes, "_insert_scraping_batch", conflicting(2)):
+            response, _ = await self._batch(["alice"])
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(response.created, 1)
+
+        calls.clear()
+        with patch.object(routes, "_insert_scraping_batch", conflicting(10)):
+            with self.assertRaises(HTTPException) as ctx:
+                await self._batch(["bob"])
+        self.assertEqual(ctx.exception.status_code, 409)
+        self.assertEqual(len(calls), routes._BATCH_INSERT_ATTEMPTS)
+        # A sessao continua utilizavel depois do conflito.
+        self.assertEqual(self.db.query(ScrapingJob).count(), 1)
+
+    async def test_runner_limits_concurrency(self):
+        running = []
+        peak = []
+
+        async def fake_scrape(job_id, profile_url, options):
+            running.append(job_id)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.remove(job_id)
+
+        jobs = [(f"job-{index}", f"https://www.instagram.com/u{index}/") for index in range(6)]
+        with patch.object(routes, "_scrape_profile_background", fake_scrape), patch.object(
+            settings, "scrape_batch_concurrency", 2
+        ):
+            await routes._run_scrape_batch("batch", jobs, {"flow": "default"})
+        self.assertEqual(max(peak), 2)
+        self.assertEqual(len(peak), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import orjson
+
+import app.api.routes as routes
+from app.job_results import save_job_result
+from app.models import Base, Interaction, InteractionType, Post, Profile, ScrapingJob
+from app.pagination import decode_cursor, encode_cursor
+from app.schemas import ScrapingCompleteResponse
+
+
+class ScrapingResultsAssemblyTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{Path(self._tmp.name) / 'results.db'}")
+        Base.metadata.create_all(self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+
+        profile = Profile(id="p", instagram_username="alice", instagram_url="https://www.instagram.com/alice/")
+        self.db.add(profile)
+        base = datetime(2026, 10, 1)
+        for post_index in range(3):
+            post_id = f"post-{post_index}"
+            self.db.add(Post(id=post_id, profile_id="p", post_url=f"https://www.instagram.com/p/{post_index}/"))
+            for user_index in range(4):
+                self.db.add(
+                    Interaction(
+                        id=f"i-{post_index}-{user_index}",
+                        post_id=post_id,
+                        post_url=f"https://www.instagram.com/p/{post_index}/",
+                        profile_id="p",
+                        user_username=f"user{user_index}",
+                        user_url=f"https://www.instagram.com/user{user_index}/",
+                        interaction_type=InteractionType.LIKE,
+                        # Empates de created_at exercitam o desempate por id.
+                        created_at=base + timedelta(minutes=user_index),
+                    )
+                )
+        self.db.add(
+            ScrapingJob(
+                id="job",
+                profile_url="https://www.instagram.com/alice/",
+                status="completed",
+                completed_at=base,
+                metadata_json={"request": {"flow": "default"}},
+            )
+        )
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+        self._tmp.cleanup()
+
+    async def _results(self, job_id="job", **params):
+        response = await routes.get_scraping_results(job_id, db=self.db, **params)
+        return ScrapingCompleteResponse.model_validate_json(response.body)
+
+    @staticmethod
+    def _pairs(response):
+        return {
+            (post.post_url, interaction.user_username)
+            for post in response.profile.posts
+            for interaction in post.interactions
+        }
+
+    async def test_interactions_are_grouped_by_post(self):
+        response = await self._results()
+
+        self.assertEqual(response.total_posts, 3)
+        self.assertEqual(response.total_interactions, 12)
+        self.assertIsNone(response.next_interactions_cursor)
+        for post in response.profile.posts:
+            self.assertEqual(len(post.interactions), 4)
+        self.assertEqual(len(self._pairs(response)), 12)
+
+    async def test_keyset_pages_cover_every_interaction_once(self):
+        seen = []
+        cursor = None
+        while True:
+            page = await self._results(interactions_limit=5, interactions_cursor=cursor)
+            self.assertEqual(page.total_interactions, 12)
+            seen.extend(sorted(self._pairs(page)))
+            cursor = page.next_interactions_cursor
+            if cursor is None:
+                break
+
+        self.assertEqual(len(seen), 12)
+        self.assertEqual(set(seen), self._pairs(await self._results()))
+
+    async def test_invalid_cursor_is_rejected(self):
+        with self.assertRaises(HTTPException) as ctx:
+            await routes.get_scraping_results("job", interactions_cursor="not-a-cursor", db=self.db)
+        self.assertEqual(ctx.exception.status_code, 400)
+
+    async def test_include_raw_false_drops_raw_result(self):
+        raw = {
+            "summary": {"total_story_posts": 1, "total_story_viewers": 2},
+            "story_posts": [
+                {
+                    "story_url": "https://www.instagram.com/stories/alice/1",
+                    "viewer_users": [{"user_username": "v1"}, {"user_username": "v2", "liked": True}],
+                }
+            ],
+        }
+        self.db.add(
+            ScrapingJob(
+                id="stories",
+                profile_url="https://www.instagram.com/alice/",
+                status="completed",
+                completed_at=datetime(2026, 10, 19, 12, 0, 0, 5),
+                metadata_json={"request": {"flow": "stories_interactions"}},
+            )
+        )
+        save_job_result(self.db, "stories", raw)
+        self.db.commit()
+
+        full = await routes.get_scraping_results("stories", db=self.db)
+        self.assertEqual(full.media_type, "application/json")
+        body = orjson.loads(full.body)
+        self.assertEqual(body["raw_result"], raw)
+        self.assertEqual(body["completed_at"], "2026-10-19T12:00:00.000005")
+        self.assertEqual(body["story_posts"][0]["liked_users"], [
+            {"user_username": "v2", "user_url": "https://www.instagram.com/v2/"}
+        ])
+
+        slim = orjson.loads((await routes.get_scraping_results("stories", include_raw=False, db=self.db)).body)
+        self.assertNotIn("raw_result", slim)
+        self.assertEqual({key: value for key, value in body.items() if key != "raw_result"}, slim)
+
+    def test_cursor_round_trip(self):
+        created_at = datetime(2026, 10, 19, 12, 30, 5, 123)
+        self.assertEqual(decode_cursor(encode_cursor(created_at, "abc")), (created_at, "abc"))
+
+
+if __name__ == "__main__":
+    unittest.main()
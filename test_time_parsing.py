@@ -0,0 +1,54 @@
+import unittest
+from datetime import datetime, timezone
+
+from app.scraper import time_parsing
+from app.scraper.browser_use_agent import BrowserUseAgent
+from app.scraper.instagram_scraper import InstagramScraper
+from benchmarks import legacy_time_parsing
+from benchmarks.time_parsing_bench import SAMPLES
+
+
+class TimeParsingTest(unittest.TestCase):
+    def setUp(self):
+        time_parsing.clear_caches()
+
+    def test_matches_legacy_implementations(self):
+        now = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+        for text in SAMPLES + ["1 h 30 min", "editado 2 sem", "15/02", None]:
+            with self.subTest(text=text):
+                self.assertEqual(
+                    time_parsing.relative_time_to_hours(text),
+                    legacy_time_parsing.relative_time_to_hours(text),
+                )
+                self.assertEqual(
+                    time_parsing.parse_instagram_timestamp(text, now=now),
+                    legacy_time_parsing.parse_instagram_timestamp(text, now=now),
+                )
+                if text is not None:
+                    self.assertEqual(
+                        time_parsing.parse_absolute_date(text, now),
+                        legacy_time_parsing.parse_absolute_date(text, now),
+                    )
+
+    def test_absolute_date_cache_does_not_pin_reference_year(self):
+        january = datetime(2026, 1, 10, tzinfo=timezone.utc)
+        june = datetime(2026, 6, 10, tzinfo=timezone.utc)
+
+        self.assertEqual(time_parsing.parse_absolute_date("23 de março", january).year, 2025)
+        self.assertEqual(time_parsing.parse_absolute_date("23 de março", june).year, 2026)
+
+    def test_batch_api_and_class_delegates(self):
+        self.assertEqual(time_parsing.relative_times_to_hours(["2 h", None, "1 d", "??"]), [2.0, None, 24.0, None])
+        now = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+        parsed = time_parsing.parse_instagram_timestamps(["ontem", "2026-03-01T12:30:00Z"], now=now)
+        self.assertEqual(parsed, [datetime(2026, 3, 9, 12, 0, tzinfo=timezone.utc), datetime(2026, 3, 1, 12, 30, tzinfo=timezone.utc)])
+
+        scraper = InstagramScraper.__new__(InstagramScraper)
+        agent = BrowserUseAgent.__new__(BrowserUseAgent)
+        self.assertEqual(scraper._relative_time_to_hours("3 sem"), 3 * 24 * 7)
+        self.assertEqual(agent._relative_time_to_hours("3 sem"), 3 * 24 * 7)
+        self.assertGreater(time_parsing._relative_hours_cached.cache_info().hits, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
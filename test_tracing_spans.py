@@ -0,0 +1,81 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+from app.scraper.browser_use_agent import BrowserUseAgent
+from app.tracing import current_span, span, start_trace, traced
+
+
+class TracingSpansTest(unittest.IsolatedAsyncioTestCase):
+    async def test_nested_spans_and_gather_children_share_parent(self):
+        @traced("scraper.post_comments", capture=("post_url",))
+        async def _scrape(post_url: str, attempt: int = 1):
+            with span("db.save", rows=2):
+                await asyncio.sleep(0)
+            return post_url
+
+        with start_trace("job-1", flow="recent_likes") as trace:
+            with span("flow.recent_likes") as root:
+                await asyncio.gather(_scrape("https://www.instagram.com/p/A/"), _scrape(post_url="https://www.instagram.com/p/B/"))
+            self.assertIsNone(current_span())
+
+        timeline = trace.timeline()
+        by_name = {}
+        for item in timeline["spans"]:
+            by_name.setdefault(item["name"], []).append(item)
+
+        self.assertEqual(timeline["attributes"], {"flow": "recent_likes"})
+        self.assertEqual(len(by_name["scraper.post_comments"]), 2)
+        self.assertTrue(all(item["parent_id"] == root.span_id for item in by_name["scraper.post_comments"]))
+        self.assertEqual(
+            sorted(item["attributes"]["post_url"] for item in by_name["scraper.post_comments"]),
+            ["https://www.instagram.com/p/A/", "https://www.instagram.com/p/B/"],
+        )
+        comment_ids = {item["span_id"] for item in by_name["scraper.post_comments"]}
+        self.assertTrue(all(item["parent_id"] in comment_ids for item in by_name["db.save"]))
+        self.assertEqual(timeline["summary"]["db.save"]["count"], 2)
+
+    async def test_error_status_recorded_and_span_limit_respected(self):
+        with start_trace("job-2", max_spans=1) as trace:
+            with self.assertRaises(RuntimeError):
+                with span("session.ensure"):
+                    raise RuntimeError("login_required")
+            with span("dropped"):
+                pass
+
+        timeline = trace.timeline()
+        self.assertEqual(timeline["spans"][0]["status"], "error")
+        self.assertIn("login_required", timeline["spans"][0]["error"])
+        self.assertEqual(timeline["dropped_spans"], 1)
+
+    async def test_run_agent_records_one_span_per_agent_step(self):
+        class _FakeAgent:
+            async def run(self, max_steps: int = 100, on_step_start=None, on_step_end=None):
+                for _ in range(3):
+                    await on_step_start(self)
+                    await on_step_end(self)
+                return SimpleNamespace(steps=3, max_steps=max_steps)
+
+        agent = BrowserUseAgent.__new__(BrowserUseAgent)
+        with start_trace("job-3") as trace:
+            history = await agent._run_agent(
+                _FakeAgent(),
+                "post_comments",
+                run_kwargs={"max_steps": 2},
+                post_url="https://www.instagram.com/p/C/",
+                attempt=2,
+            )
+
+        self.assertEqual(history.max_steps, 2)
+        spans = trace.timeline()["spans"]
+        run_span = next(item for item in spans if item["name"] == "agent.run")
+        steps = [item for item in spans if item["name"] == "agent.step"]
+        self.assertEqual(run_span["attributes"]["attempt"], 2)
+        self.assertEqual(run_span["attributes"]["steps"], 3)
+        self.assertIn("startup_ms", run_span["attributes"])
+        self.assertEqual([item["attributes"]["step"] for item in steps], [1, 2, 3])
+        self.assertTrue(all(item["parent_id"] == run_span["span_id"] for item in steps))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,231 @@
+import hashlib
+import hmac
+import socket
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+import orjson
+from fastapi import BackgroundTasks, HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import app.api.routes as routes
+from app.models import Base, ScrapingJob, WebhookDelivery
+from app.schemas import ScrapingJobCreate
+from app.webhooks import (
+    SIGNATURE_HEADER,
+    WebhookDispatcher,
+    pinned_request,
+    subscribe_job_webhook,
+    validate_callback_url,
+)
+from config import settings
+
+CALLBACK = "https://orchestrator.example/hooks/scrape"
+ADDRESSES = {
+    "orchestrator.example": "93.184.216.34",
+    "other.example": "93.184.216.35",
+    "internal.example": "10.0.0.5",
+    "metadata.example": "169.254.169.254",
+    "localhost": "127.0.0.1",
+    "v6.example": "::1",
+}
+
+
+class WebhooksTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{Path(self._tmp.name) / 'webhooks.db'}")
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.db = self.Session()
+        self.requests = []
+        self.status_code = 200
+        self.dispatcher = WebhookDispatcher(
+            session_factory=self.Session,
+            transport=httpx.MockTransport(self._handle),
+        )
+        self.addresses = dict(ADDRESSES)
+        self._patches = [
+            patch.object(settings, "webhook_signing_secret", "s3cret"),
+            patch.object(settings, "webhook_allowed_hosts", None),
+            patch("app.webhooks.socket.getaddrinfo", self._resolve),
+            patch.object(
+                routes,
+                "_require_active_scrape_session",
+                lambda db, username, flow: (username or "operator", None),
+            ),
+        ]
+        for item in self._patches:
+            item.start()
+
+    def tearDown(self):
+        for item in self._patches:
+            item.stop()
+        self.db.close()
+        self.engine.dispose()
+        self._tmp.cleanup()
+
+    def _resolve(self, host, port, *args, **kwargs):
+        if host not in self.addresses:
+            raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+        address = self.addresses[host]
+        family = socket.AF_INET6 if ":" in address else socket.AF_INET
+        return [(family, socket.SOCK_STREAM, 6, "", (address, port))]
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        return httpx.Response(self.status_code)
+
+    def _add_job(self, job_id, status, callback_url=CALLBACK):
+        self.db.add(
+            ScrapingJob(
+                id=job_id,
+                profile_url=f"https://www.instagram.com/{job_id}/",
+                status=status,
+                completed_at=datetime.utcnow() if status in ("completed", "failed") else None,
+                metadata_json={"flow": "generic"} if job_id.startswith("generic") else {"request": {"flow": "default"}},
+            )
+        )
+        self.db.add(WebhookDelivery(job_id=job_id, callback_url=callback_url))
+        self.db.commit()
+
+    def _deliveries(self):
+        self.db.expire_all()
+        return {row.job_id: row for row in self.db.query(WebhookDelivery).all()}
+
+    async def test_finished_jobs_are_batched_per_endpoint_and_signed(self):
+        self._add_job("a", "completed")
+        self._add_job("generic-b", "failed")
+        self._add_job("c", "running")
+        self._add_job("d", "completed", callback_url="https://other.example/hook")
+
+        self.assertEqual(await self.dispatcher.dispatch_once(), 3)
+
+        self.assertEqual(len(self.requests), 2)
+        request = next(item for item in self.requests if item.headers["host"] == "orchestrator.example")
+        # Conecta no IP checado; nome original vai no Host e no SNI.
+        self.assertEqual(str(request.url), "https://93.184.216.34/hooks/scrape")
+        self.assertEqual(request.extensions["sni_hostname"], "orchestrator.example")
+        events = orjson.loads(request.content)["events"]
+        self.assertEqual({event["job_id"]: event["event"] for event in events}, {
+            "a": "scrape_job.completed",
+            "generic-b": "scrape_job.failed",
+        })
+        generic = next(event for event in events if event["job_id"] == "generic-b")
+        self.assertEqual(generic["results_url"], "/api/generic_scrape/generic-b/results")
+
+        timestamp, signature = [part.split("=", 1)[1] for part in request.headers[SIGNATURE_HEADER].split(",")]
+        expected = hmac.new(b"s3cret", f"{timestamp}.".encode() + request.content, hashlib.sha256).hexdigest()
+        self.assertEqual(signature, expected)
+
+        deliveries = self._deliveries()
+        self.assertEqual(deliveries["a"].status, "delivered")
+        self.assertEqual(deliveries["c"].status, "pending")
+        self.assertEqual(deliveries["c"].attempts, 0)
+
+    async def test_failures_back_off_then_give_up(self):
+        self._add_job("a", "completed")
+        self.status_code = 503
+
+        with patch.object(settings, "webhook_max_attempts", 2):
+            await self.dispatcher.dispatch_once()
+            delivery = self._deliveries()["a"]
+            self.assertEqual((delivery.status, delivery.attempts, delivery.last_error), ("pending", 1, "HTTP 503"))
+            self.assertGreater(delivery.next_attempt_at, datetime.utcnow())
+
+            # Ainda dentro do backoff: nada e reenviado.
+            self.assertEqual(await self.dispatcher.dispatch_once(), 0)
+
+            delivery.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+            self.db.commit()
+            await self.dispatcher.dispatch_once()
+
+        self.assertEqual(self._deliveries()["a"].status, "failed")
+        self.assertEqual(len(self.requests), 2)
+
+    async def test_client_error_is_permanent(self):
+        self._add_job("a", "completed")
+        self.status_code = 410
+        await self.dispatcher.dispatch_once()
+        self.assertEqual(self._deliveries()["a"].status, "failed")
+
+    async def test_scrape_request_subscribes_callback_also_when_coalesced(self):
+        payload = {"profile_url": "alice", "session_username": "operator", "callback_url": CALLBACK}
+        first = await routes.start_scraping(ScrapingJobCreate.model_validate(payload), BackgroundTasks(), self.db)
+        payload["callback_url"] = "https://other.example/hook"
+        second = await routes.start_scraping(ScrapingJobCreate.model_validate(payload), BackgroundTasks(), self.db)
+
+        self.assertTrue(second.coalesced)
+        urls = {row.callback_url for row in self.db.query(WebhookDelivery).filter_by(job_id=first.id)}
+        self.assertEqual(urls, {CALLBACK, "https://other.example/hook"})
+
+        for callback_url, secret in (("ftp://x", "s3cret"), (CALLBACK, None)):
+            with self.subTest(callback_url=callback_url), patch.object(settings, "webhook_signing_secret", secret):
+                request = ScrapingJobCreate(profile_url="bob", session_username="operator", callback_url=callback_url)
+                with self.assertRaises(HTTPException) as ctx:
+                    await routes.start_scraping(request, BackgroundTasks(), self.db)
+                self.assertEqual(ctx.exception.status_code, 400)
+
+    async def test_callback_must_resolve_to_public_address_unless_allowed(self):
+        self.assertEqual(await validate_callback_url(f" {CALLBACK} "), CALLBACK)
+        for url in (
+            "http://internal.example/hook",
+            "http://metadata.example/latest/meta-data",
+            "http://localhost:8000/api/health",
+            "http://127.0.0.1/hook",
+            "http://[::1]/hook",
+            "http://v6.example/hook",
+            "http://missing.example/hook",
+        ):
+            with self.subTest(url=url), self.assertRaises(ValueError):
+                await validate_callback_url(url)
+
+        with patch.object(settings, "webhook_allowed_hosts", "Internal.example, other"):
+            self.assertEqual(await validate_callback_url("http://internal.example/hook"), "http://internal.example/hook")
+            with self.assertRaises(ValueError):
+                await validate_callback_url("http://localhost/hook")
+
+    def test_pinned_request_keeps_original_host(self):
+        self.assertEqual(
+            pinned_request("http://user:pw@v6.example:8080/hook?x=1", "2606:2800:220:1::1"),
+            ("http://user:pw@[2606:2800:220:1::1]:8080/hook?x=1", {"Host": "v6.example:8080"}, {}),
+        )
+        self.assertEqual(pinned_request(CALLBACK, None), (CALLBACK, {}, {}))
+
+    async def test_dispatch_rechecks_host_before_posting(self):
+        self._add_job("a", "completed")
+        self._add_job("b", "completed", callback_url="https://other.example/hook")
+        # Host passou a resolver para a rede interna depois da inscricao.
+        self.addresses["orchestrator.example"] = "192.168.0.10"
+        del self.addresses["other.example"]
+
+        await self.dispatcher.dispatch_once()
+
+        self.assertEqual(self.requests, [])
+        deliveries = self._deliveries()
+        self.assertEqual(deliveries["a"].status, "failed")
+        self.assertIn("192.168.0.10", deliveries["a"].last_error)
+        # Falha de DNS e transitoria: continua pendente para nova tentativa.
+        self.assertEqual(deliveries["b"].status, "pending")
+
+    def test_subscription_is_a_single_conflict_free_insert(self):
+        # Requisicoes concorrentes passariam juntas por um SELECT previo; o insert precisa absorver o conflito.
+        self._add_job("a", "running")
+        statements = []
+        event.listen(self.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+        subscribe_job_webhook(self.db, "a", CALLBACK)
+        subscribe_job_webhook(self.db, "a", "https://other.example/hook")
+        self.db.commit()
+
+        self.assertEqual(len(statements), 2)
+        self.assertTrue(all("ON CONFLICT" in sql and sql.startswith("INSERT") for sql in statements))
+        self.assertEqual(self.db.query(WebhookDelivery).filter_by(job_id="a").count(), 2)
+
+if __name__ == "__main__":
+    unittest.main()